@@ -5,8 +5,6 @@ from uvloop import install  # type: ignore
 install()
 
 import os
-import subprocess
-import time
 from asyncio import Lock, new_event_loop, set_event_loop
 from datetime import datetime
 from logging import (
@@ -28,11 +26,6 @@ from pytz import timezone
 
 from sabnzbdapi import SabnzbdClient
 
-try:
-    import requests
-except ImportError:
-    requests = None
-
 
 class SuppressUnclosedSessionFilter(Filter):
     """Filter to suppress unclosed client session and connector warnings"""
@@ -204,134 +197,4 @@ sabnzbd_client = SabnzbdClient(
 )
 
 
-def is_qbittorrent_running():
-    """Check if qBittorrent is already running by testing the web UI and process"""
-    # First check if the process is running
-    try:
-        result = subprocess.run(
-            ["pgrep", "-f", "qbittorrent-nox|xnox"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            check=False,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            # Process is running, now check if web UI is accessible
-            if requests is not None:
-                try:
-                    response = requests.get(
-                        "http://localhost:8090/api/v2/app/version", timeout=2
-                    )
-                    return response.status_code == 200
-                except (
-                    requests.exceptions.RequestException,
-                    requests.exceptions.Timeout,
-                ):
-                    return False
-            else:
-                # If requests is not available, assume it's running if process exists
-                return True
-    except (
-        subprocess.TimeoutExpired,
-        subprocess.SubprocessError,
-        FileNotFoundError,
-    ):
-        pass
-
-    # If process check failed, try web UI check as fallback
-    if requests is not None:
-        try:
-            response = requests.get(
-                "http://localhost:8090/api/v2/app/version", timeout=2
-            )
-            if response.status_code == 200:
-                return True
-        except (requests.exceptions.RequestException, requests.exceptions.Timeout):
-            pass
-
-    return False
-
-
-try:
-    # Check if qBittorrent is already running before starting it
-    if not is_qbittorrent_running():
-        LOGGER.info("Starting qBittorrent daemon...")
-
-        # Start qBittorrent in daemon mode
-        try:
-            process = subprocess.Popen(
-                ["xnox", "-d", f"--profile={os.getcwd()}"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-
-            # Wait for the daemon to start (daemon process exits after spawning)
-            time.sleep(3)
-
-            # For daemon mode, the parent process exits with code 0 after spawning the daemon
-            # So we need to check if the daemon is actually running by checking for the process
-            retry_count = 0
-            max_retries = 10
-            daemon_started = False
-
-            while retry_count < max_retries:
-                if is_qbittorrent_running():
-                    LOGGER.info("qBittorrent daemon started successfully")
-                    daemon_started = True
-                    break
-                time.sleep(1)
-                retry_count += 1
-
-            if not daemon_started:
-                # Check for any error output
-                stdout, stderr = process.communicate()
-                stderr_text = stderr.decode().strip() if stderr else ""
-
-                if stderr_text:
-                    if (
-                        "You cannot use -d (or --daemon): qBittorrent is already running"
-                        in stderr_text
-                    ):
-                        LOGGER.info(
-                            "qBittorrent is already running (detected from error message)"
-                        )
-                    else:
-                        LOGGER.error(f"qBittorrent startup failed: {stderr_text}")
-                else:
-                    LOGGER.warning(
-                        "qBittorrent daemon may not have started - web UI not accessible"
-                    )
-
-        except subprocess.SubprocessError as e:
-            LOGGER.error(f"Failed to start qBittorrent process: {e}")
-    else:
-        LOGGER.info("qBittorrent is already running - skipping daemon startup")
-
-except (FileNotFoundError, PermissionError) as e:
-    LOGGER.warning(f"qBittorrent binary not found or permission denied: {e}")
-except Exception as e:
-    LOGGER.error(f"Unexpected error during qBittorrent startup: {e}")
-
-try:
-    subprocess.run(
-        [
-            "xnzb",
-            "-f",
-            "sabnzbd/SABnzbd.ini",
-            "-s",
-            ":::8070",
-            "-b",
-            "0",
-            "-d",
-            "-c",
-            "-l",
-            "0",
-            "--console",
-        ],
-        check=False,
-    )
-except (FileNotFoundError, PermissionError):
-    pass  # Ignore if xnzb is not available or permission denied
-
-
 scheduler = AsyncIOScheduler(event_loop=bot_loop)
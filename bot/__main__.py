@@ -6,15 +6,20 @@ from asyncio import create_task, gather
 from pyrogram.types import BotCommand
 
 from . import LOGGER, bot_loop
+from .core.boot import boot_daemons, boot_timer
 from .core.config_manager import Config, SystemEnv
 
 LOGGER.info("Loading config...")
-Config.load()
-SystemEnv.load()
+with boot_timer.phase("config"):
+    Config.load()
+    SystemEnv.load()
 
 from .core.startup import load_settings
 
-bot_loop.run_until_complete(load_settings())
+# qBittorrent and SABnzbd start while the settings load and the clients connect
+daemons_task = bot_loop.create_task(boot_daemons())
+with boot_timer.phase("settings"):
+    bot_loop.run_until_complete(load_settings())
 
 from .core.aeon_client import TgClient
 from .helper.telegram_helper.bot_commands import BotCommands
@@ -110,54 +115,57 @@ async def main():
         update_variables,
     )
 
-    await gather(
-        TgClient.start_bot(), TgClient.start_user(), TgClient.start_helper_bots()
-    )
-    await gather(load_configurations(), update_variables())
+    with boot_timer.phase("telegram"):
+        await gather(
+            TgClient.start_bot(), TgClient.start_user(), TgClient.start_helper_bots()
+        )
+    with boot_timer.phase("configurations"):
+        await gather(load_configurations(), update_variables())
     from .core.torrent_manager import TorrentManager
 
-    await TorrentManager.initiate()
-    await gather(
-        update_qb_options(),
-        update_aria2_options(),
-        update_nzb_options(),
-    )
+    with boot_timer.phase("download clients"):
+        await TorrentManager.initiate()
+        await gather(
+            update_qb_options(),
+            update_aria2_options(),
+            update_nzb_options(),
+        )
 
     # Start the scheduled deletion checker and other tasks
-    await start_bot()
+    with boot_timer.phase("start bot"):
+        await start_bot()
     from .core.jdownloader_booter import jdownloader
     from .helper.ext_utils.files_utils import clean_all
-    from .helper.ext_utils.gc_utils import (
-        log_memory_usage,
-        smart_garbage_collection,
-    )
+    from .helper.ext_utils.gc_utils import memory_governor
     from .helper.ext_utils.telegraph_helper import telegraph
     from .helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
+    from .helper.telegram_helper.broadcast_engine import resume_broadcasts
     from .modules import (
         get_packages_version,
         initiate_search_tools,
         restart_notification,
     )
 
-    await gather(
-        set_commands(),
-        jdownloader.boot(),
-    )
+    with boot_timer.phase("services"):
+        await gather(
+            set_commands(),
+            jdownloader.boot(),
+        )
+        # Optimized startup sequence - prioritize essential tasks
+        await gather(
+            save_settings(),
+            clean_all(),
+            restart_notification(),
+            telegraph.create_account(),
+        )
     from .helper.ext_utils.task_manager import start_queue_processor
     from .helper.ext_utils.task_monitor import start_monitoring
 
-    # Optimized startup sequence - prioritize essential tasks
-    await gather(
-        save_settings(),
-        clean_all(),
-        restart_notification(),
-        telegraph.create_account(),
-    )
-
     # Initialize non-critical services with delay to reduce startup load
     create_task(initiate_search_tools())  # noqa: RUF006
     create_task(get_packages_version())  # noqa: RUF006
     create_task(rclone_serve_booter())  # noqa: RUF006
+    create_task(resume_broadcasts())  # noqa: RUF006
 
     # Start background services immediately without delays
     LOGGER.info("Starting background services...")
@@ -176,6 +184,11 @@ async def main():
             "Task monitoring is disabled - skipping task monitor and queue processor (recommended for resource optimization)"
         )
 
+    # The RSS job and the shared scheduler, which also runs the auto restart
+    from .modules.rss import start_rss
+
+    start_rss()
+
     # Initialize auto-restart scheduler
     from .helper.ext_utils.auto_restart import init_auto_restart
 
@@ -185,14 +198,12 @@ async def main():
     from .helper.ext_utils.bot_utils import _load_user_data
 
     LOGGER.info("Loading user data for limits tracking...")
-    await _load_user_data()
+    with boot_timer.phase("user data"):
+        await _load_user_data()
 
-    # Initial garbage collection and memory usage logging (less aggressive during startup)
-    LOGGER.info("Performing initial garbage collection...")
-    smart_garbage_collection(
-        aggressive=False  # Use less aggressive mode during startup to reduce resource usage
-    )
-    log_memory_usage()
+    # Memory sampling, loop lag tracking and collections run in the background
+    LOGGER.info("Starting memory governor...")
+    memory_governor.start()
 
     LOGGER.info("All background services initialized successfully")
 
@@ -205,13 +216,15 @@ async def main():
 
 bot_loop.run_until_complete(main())
 
-from .core.handlers import add_handlers
-from .helper.ext_utils.bot_utils import create_help_buttons
-from .helper.listeners.aria2_listener import add_aria2_callbacks
+with boot_timer.phase("handlers"):
+    from .core.handlers import add_handlers
+    from .helper.ext_utils.bot_utils import create_help_buttons
+    from .helper.listeners.aria2_listener import add_aria2_callbacks
 
-add_aria2_callbacks()
-create_help_buttons()
-add_handlers()
+    add_aria2_callbacks()
+    create_help_buttons()
+    add_handlers()
+boot_timer.report()
 
 
 # Setup cleanup handler
@@ -234,6 +247,14 @@ async def cleanup():
     except Exception as e:
         LOGGER.error(f"Error during streamrip cleanup: {e}")
 
+    # Close pooled MEGA sessions (local logout keeps the SDK cache reusable)
+    try:
+        from .helper.mega_utils.session_pool import mega_session_pool
+
+        await mega_session_pool.close_all()
+    except Exception as e:
+        LOGGER.error(f"Error during MEGA session cleanup: {e}")
+
     # Stop database heartbeat task
     await database.stop_heartbeat()
 
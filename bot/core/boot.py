@@ -0,0 +1,174 @@
+"""
+Start up of the bot.
+
+qBittorrent and SABnzbd used to be started while ``bot`` was imported, with
+a blocking ``Popen``, a three second sleep and up to ten one second polls,
+then ``subprocess.run`` for SABnzbd, before the event loop even existed.
+Both are now started together from the loop while the database and the
+Telegram clients connect, and each has a readiness probe on its web UI that
+the code talking to it waits on.
+
+``boot_timer`` times the phases of the start up, from the import of ``bot``
+to the registration of the handlers, and logs the breakdown with the
+resident memory once the bot answers commands.
+"""
+
+from asyncio import (
+    create_subprocess_exec,
+    create_task,
+    gather,
+    shield,
+    sleep,
+    wait_for,
+)
+from asyncio.subprocess import DEVNULL, PIPE
+from contextlib import contextmanager, suppress
+from os import getcwd
+from time import monotonic, time
+
+from httpx import AsyncClient, HTTPError
+from psutil import Process
+
+from bot import LOGGER, bot_start_time
+
+# Seconds a daemon may take until its web UI answers
+READY_TIMEOUT = 15
+
+# Seconds between two probes of a starting daemon
+PROBE_INTERVAL = 0.25
+
+
+class Daemon:
+    """External daemon, started once and probed until its web UI answers"""
+
+    __slots__ = ("_task", "args", "name", "probe", "ready", "took")
+
+    def __init__(self, name, args, probe):
+        self.name = name
+        self.args = args
+        self.probe = probe
+        self.ready = False
+        self.took = 0.0
+        self._task = None
+
+    async def _answers(self, client):
+        try:
+            await client.get(self.probe, timeout=2)
+        except HTTPError:
+            return False
+        # Any answer, even a refused login, means the web UI is up
+        return True
+
+    async def _boot(self, client):
+        started = monotonic()
+        if await self._answers(client):
+            LOGGER.info(f"{self.name} is already running")
+            self.ready = True
+            return True
+        LOGGER.info(f"Starting {self.name}...")
+        try:
+            process = await create_subprocess_exec(
+                *self.args, stdout=DEVNULL, stderr=PIPE
+            )
+        except (FileNotFoundError, PermissionError) as e:
+            LOGGER.warning(f"{self.name} binary not found or not executable: {e}")
+            return False
+        error = ""
+        while monotonic() - started < READY_TIMEOUT:
+            if await self._answers(client):
+                self.ready = True
+                self.took = monotonic() - started
+                LOGGER.info(f"{self.name} ready after {self.took:.1f}s")
+                return True
+            # Daemons fork and their parent exits, only a failure says why
+            if process.returncode and not error:
+                error = (await process.stderr.read()).decode(errors="ignore")
+                if "already running" in error:
+                    LOGGER.info(f"{self.name} is already running")
+                else:
+                    LOGGER.error(f"{self.name} startup failed: {error.strip()}")
+            await sleep(PROBE_INTERVAL)
+        self.took = monotonic() - started
+        LOGGER.warning(f"{self.name} web UI not accessible after {self.took:.0f}s")
+        return False
+
+    def start(self, client):
+        if self._task is None:
+            self._task = create_task(self._boot(client))
+        return self._task
+
+    async def wait_ready(self):
+        """True once the web UI answers, waits at most ``READY_TIMEOUT``"""
+        if self._task is not None and not self._task.done():
+            with suppress(TimeoutError):
+                await wait_for(shield(self._task), READY_TIMEOUT)
+        return self.ready
+
+
+qbittorrent_daemon = Daemon(
+    "qBittorrent",
+    ("xnox", "-d", f"--profile={getcwd()}"),
+    "http://localhost:8090/api/v2/app/version",
+)
+sabnzbd_daemon = Daemon(
+    "SABnzbd",
+    (
+        "xnzb",
+        "-f",
+        "sabnzbd/SABnzbd.ini",
+        "-s",
+        ":::8070",
+        "-b",
+        "0",
+        "-d",
+        "-c",
+        "-l",
+        "0",
+        "--console",
+    ),
+    "http://localhost:8070/api?mode=version",
+)
+
+
+async def boot_daemons():
+    """Start qBittorrent and SABnzbd together, returns once both are probed"""
+    with boot_timer.phase("daemons"):
+        async with AsyncClient() as client:
+            await gather(
+                qbittorrent_daemon.start(client),
+                sabnzbd_daemon.start(client),
+                return_exceptions=True,
+            )
+
+
+class BootTimer:
+    """Durations of the start up phases, in the order they began"""
+
+    def __init__(self):
+        self.phases = {}
+        self.ready = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time()
+        self.phases[name] = (started - bot_start_time, 0.0)
+        try:
+            yield
+        finally:
+            self.phases[name] = (started - bot_start_time, time() - started)
+
+    def report(self):
+        """Log the breakdown, the first call marks the bot as ready"""
+        if self.ready is None:
+            self.ready = time() - bot_start_time
+        rss = Process().memory_info().rss / 1048576
+        lines = [f"Bot ready after {self.ready:.2f}s, RSS {rss:.0f} MiB"]
+        lines.extend(
+            f"  {name:<16} +{start:6.2f}s  {took:6.2f}s"
+            for name, (start, took) in self.phases.items()
+        )
+        LOGGER.info("\n".join(lines))
+        return lines
+
+
+boot_timer = BootTimer()
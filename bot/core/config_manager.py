@@ -135,6 +135,8 @@ class Config:
 
     # Google Drive Upload Settings
     GDRIVE_UPLOAD_ENABLED: bool = True  # Enable/disable Google Drive upload feature
+    GDRIVE_CLONE_WORKERS: int = 8  # Files copied at once by a folder clone
+    GDRIVE_UPLOAD_WORKERS: int = 4  # Files uploaded at once from a folder
 
     HELPER_TOKENS: str = ""
     HYPER_THREADS: int = 0
@@ -148,6 +150,9 @@ class Config:
     MEGA_ENABLED: bool = True
     MEGA_EMAIL: str = ""
     MEGA_PASSWORD: str = ""
+    MEGA_SESSION_POOL_SIZE: int = 2  # Concurrent logged-in sessions per account
+    MEGA_SESSION_IDLE_TIMEOUT: int = 1800  # Seconds before idle sessions close
+    MEGA_SESSION_WAIT_TIMEOUT: int = 900  # Seconds a task waits for a free session
 
     # MEGA Upload Settings
     MEGA_UPLOAD_ENABLED: bool = True
@@ -186,6 +191,7 @@ class Config:
     LOGIN_PASS: str = ""
     MEDIA_GROUP: bool = False
     HYBRID_LEECH: bool = False
+    LEECH_UPLOAD_CONCURRENCY: int = 1
     MEDIA_SEARCH_CHATS: ClassVar[list] = []
     HYDRA_IP: str = ""
     HYDRA_API_KEY: str = ""
@@ -194,6 +200,9 @@ class Config:
     QUEUE_ALL: int = 0
     QUEUE_DOWNLOAD: int = 0
     QUEUE_UPLOAD: int = 0
+    QUEUE_PROCESS: int = 0
+    QUEUE_UPLOAD_PER_DEST: int = 0
+    QUEUE_USER_LIMIT: int = 0
     RCLONE_FLAGS: str = ""
     RCLONE_PATH: str = ""
     RCLONE_SERVE_URL: str = ""
@@ -211,6 +220,7 @@ class Config:
     STOP_DUPLICATE: bool = False
     STREAMWISH_API: str = ""
     SUDO_USERS: str = ""
+    PREMIUM_USERS: str = ""
     TELEGRAM_API: int = 0
     TELEGRAM_HASH: str = ""
     TG_PROXY: ClassVar[dict[str, str]] = {}
@@ -346,6 +356,7 @@ class Config:
 
     # Zotify Download Settings
     ZOTIFY_DOWNLOAD_REAL_TIME: bool = False
+    ZOTIFY_CONCURRENT_DOWNLOADS: int = 3  # Tracks of a collection at once
     ZOTIFY_REPLACE_EXISTING: bool = False
     ZOTIFY_SKIP_DUPLICATES: bool = True  # Default True in Zotify
     ZOTIFY_SKIP_PREVIOUS: bool = True  # Default True in Zotify
@@ -993,6 +1004,9 @@ class Config:
     # Bulk Operation Settings
     BULK_ENABLED: bool = True  # Enable/disable bulk operations (-b flag)
 
+    # Startup Settings
+    LAZY_MODULE_LOADING: bool = True  # Import command modules on their first use
+
     # Task Monitoring Settings - Optimized for reduced resource usage
     TASK_MONITOR_ENABLED: bool = False  # Disabled by default for better performance
     TASK_MONITOR_INTERVAL: int = 120  # Increased to 2 minutes to reduce CPU usage
@@ -1074,6 +1088,7 @@ class Config:
 
     # Media Search Settings
     MEDIA_SEARCH_ENABLED: bool = True
+    MEDIA_SEARCH_INDEX: bool = True  # Search a local index of MEDIA_SEARCH_CHATS
 
     # Rclone Settings
     RCLONE_ENABLED: bool = True
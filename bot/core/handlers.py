@@ -2,6 +2,7 @@ from pyrogram import filters
 from pyrogram.filters import command, regex
 from pyrogram.handlers import (
     CallbackQueryHandler,
+    ChosenInlineResultHandler,
     EditedMessageHandler,
     MessageHandler,
 )
@@ -23,6 +24,7 @@ from bot.modules import (
     cancel_all_update,
     cancel_multi,
     check_scheduled_deletions,
+    chosen_inline_result_handler,
     clear,
     clone_node,
     confirm_restart,
@@ -38,6 +40,7 @@ from bot.modules import (
     encode_command,
     encoding_callback,
     execute,
+    font_styles_callback,
     font_styles_cmd,
     force_delete_all_messages,
     gdrive_search,
@@ -66,7 +69,9 @@ from bot.modules import (
     login,
     media_cancel_callback,
     media_get_callback,
+    media_page_callback,
     media_search,
+    media_tools_help_callback,
     media_tools_help_cmd,
     media_tools_settings,
     mediainfo,
@@ -100,8 +105,6 @@ from bot.modules import (
     ytdl,
     ytdl_leech,
 )
-from bot.modules.font_styles import font_styles_callback
-from bot.modules.media_tools_help import media_tools_help_callback
 
 from .aeon_client import TgClient
 
@@ -376,7 +379,7 @@ def add_handlers():
 
     # Add streamrip handlers if streamrip is enabled
     if Config.STREAMRIP_ENABLED:
-        from bot.modules.streamrip import (
+        from bot.modules import (
             streamrip_leech,
             streamrip_mirror,
             streamrip_search,
@@ -405,7 +408,7 @@ def add_handlers():
 
     # Add zotify handlers if zotify is enabled
     if Config.ZOTIFY_ENABLED:
-        from bot.modules.zotify import (
+        from bot.modules import (
             zotify_leech,
             zotify_mirror,
             zotify_search,
@@ -434,7 +437,7 @@ def add_handlers():
 
     # Add MEGA handlers if MEGA is enabled
     if Config.MEGA_ENABLED:
-        from bot.modules.megaclone import mega_clone
+        from bot.modules import mega_clone
 
         mega_handlers = {
             "mega_clone": (
@@ -446,7 +449,7 @@ def add_handlers():
 
         # Add MEGA search handler if MEGA search is enabled
         if Config.MEGA_SEARCH_ENABLED:
-            from bot.modules.mega_search import mega_search_command
+            from bot.modules import mega_search_command
 
             mega_handlers["mega_search"] = (
                 mega_search_command,
@@ -508,8 +511,6 @@ def add_handlers():
         "^botrestart": confirm_restart,
         "^aeon": aeon_callback,
         "^imdb": imdb_callback,
-        "^medget": media_get_callback,
-        "^medcancel": media_cancel_callback,
         "^gensession$": gen_session,
         "delete_pending": delete_pending_messages,
         "force_delete_all": force_delete_all_messages,
@@ -523,6 +524,10 @@ def add_handlers():
         "^mthelp": media_tools_help_callback,
         "^gensession_cancel$": handle_cancel_button,
         "^quickinfo_": quickinfo_callback,  # QuickInfo callbacks
+        # Media search results are shared through inline queries
+        "^medget_": media_get_callback,
+        "^medcancel_": media_cancel_callback,
+        "^medpage": media_page_callback,
     }
 
     # Add encoding/decoding callback handlers if enabled
@@ -531,7 +536,7 @@ def add_handlers():
 
     # Add VirusTotal callback handler if enabled
     if Config.VT_ENABLED:
-        from bot.modules.virustotal import vt_callback_handler
+        from bot.modules import vt_callback_handler
 
         public_regex_filters["^vt_"] = vt_callback_handler
 
@@ -872,11 +877,14 @@ def add_handlers():
         group=1,  # Higher priority group
     )
 
-    # Import and initialize the media search module
-    from bot.modules.media_search import init_media_search
+    TgClient.bot.add_handler(ChosenInlineResultHandler(chosen_inline_result_handler))
 
-    # Initialize media search module (this will register handlers except inline query)
-    init_media_search(TgClient.bot)
+    # The media index follows the search chats from start up, the rest of
+    # media search is loaded with the first search
+    if Config.MEDIA_SEARCH_INDEX and TgClient.user:
+        from bot.modules.media_search import init_media_index
+
+        init_media_index()
 
     # Initialize unified inline search handler that supports both media and streamrip
     from bot.helper.inline_search_router import init_unified_inline_search
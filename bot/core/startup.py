@@ -31,8 +31,10 @@ from bot import (
 # Use compatibility layer for aiofiles
 from bot.helper.ext_utils.aiofiles_compat import aiopath, makedirs, remove
 from bot.helper.ext_utils.db_handler import database
+from bot.helper.telegram_helper.deletion_scheduler import deletion_scheduler
 
 from .aeon_client import TgClient
+from .boot import sabnzbd_daemon
 from .config_manager import Config
 from .torrent_manager import TorrentManager
 
@@ -66,6 +68,7 @@ async def update_aria2_options():
 
 
 async def update_nzb_options():
+    await sabnzbd_daemon.wait_ready()
     no = (await sabnzbd_client.get_config())["config"]["misc"]
     nzb_options.update(no)
 
@@ -651,7 +654,7 @@ async def load_configurations():
 
 
 async def process_pending_deletions():
-    """Process messages that were scheduled for deletion"""
+    """Load the deletions stored in the database into the deletion scheduler"""
     from bot.core.config_manager import get_config_bool
 
     # Check if scheduled deletion is enabled
@@ -662,144 +665,16 @@ async def process_pending_deletions():
         LOGGER.info("Database is None, skipping pending deletions check")
         return
 
-    # Check if TgClient.bot is initialized
-    if not hasattr(TgClient, "bot") or TgClient.bot is None:
-        # TgClient.bot not initialized yet, skipping pending deletions
-        return
-
-    # Check all scheduled deletions for debugging
-    await database.get_all_scheduled_deletions()
-
-    # Clean up old scheduled deletion entries once a day
-    current_time = int(time())
-    last_cleanup_time = getattr(process_pending_deletions, "last_cleanup_time", 0)
-    if current_time - last_cleanup_time > 86400:  # 86400 seconds = 1 day
-        await database.clean_old_scheduled_deletions(days=1)
-        process_pending_deletions.last_cleanup_time = current_time
-
-    pending_deletions = await database.get_pending_deletions()
-
-    if not pending_deletions:
-        return
-
-    # Process each pending deletion individually
-    success_count = 0
-    fail_count = 0
-    removed_from_db_count = 0
-
-    for chat_id, msg_id, bot_id in pending_deletions:
-        # Get the appropriate bot client
-        bot_client = None
-        if bot_id == TgClient.ID:
-            bot_client = TgClient.bot
-        elif hasattr(TgClient, "helper_bots") and bot_id in TgClient.helper_bots:
-            bot_client = TgClient.helper_bots[bot_id]
-
-        if bot_client is None:
-            # Bot not found, skipping message
-            fail_count += 1
-            continue
-
-        try:
-            # Try to get the message first to verify it exists
-            try:
-                msg = await bot_client.get_messages(
-                    chat_id=chat_id,
-                    message_ids=int(msg_id),
-                )
-
-                if msg is None or getattr(msg, "empty", False):
-                    # Message not found, removing from database
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                    continue
-
-                # Message found, will attempt to delete
-            except Exception:
-                # Error getting message, skipping
-                continue
-
-            # Make sure message_id is an integer
-            message_id_int = int(msg_id)
-            await bot_client.delete_messages(
-                chat_id=chat_id,
-                message_ids=[message_id_int],  # Pass as a list with a single item
-            )
-            # Successfully deleted the message
-            success_count += 1
-            # Remove from database after successful deletion
-            try:
-                await database.remove_scheduled_deletion(chat_id, msg_id)
-                removed_from_db_count += 1
-            except Exception as e:
-                LOGGER.error(
-                    f"Error removing scheduled deletion after successful deletion: {e}"
-                )
-        except Exception as e:
-            error_str = str(e)
-            # Handle different types of errors appropriately
-            if "MESSAGE_DELETE_FORBIDDEN" in error_str or "403" in error_str:
-                # Cannot delete message due to permissions, remove from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for forbidden message: {e}"
-                    )
-            elif "MESSAGE_ID_INVALID" in error_str or "400" in error_str:
-                # Message doesn't exist, remove from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid message: {e}"
-                    )
-            elif (
-                "CHANNEL_INVALID" in error_str
-                or "CHAT_INVALID" in error_str
-                or "USER_INVALID" in error_str
-                or "PEER_ID_INVALID" in error_str
-            ):
-                # Chat is invalid, removing from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid chat: {e}"
-                    )
-            else:
-                # Other errors count as failures
-                fail_count += 1
-
-    # Log summary
-    LOGGER.info(
-        f"Auto-deletion results: {success_count} deleted, {fail_count} failed, {removed_from_db_count} removed from database",
-    )
+    await deletion_scheduler.load()
 
 
 async def scheduled_deletion_checker():
-    from bot.core.config_manager import get_config_bool
-
-    LOGGER.info("Optimized scheduled deletion checker started")
-    while True:
-        try:
-            # Check if scheduled deletion is still enabled during runtime
-            if not get_config_bool("SCHEDULED_DELETION_ENABLED", True):
-                LOGGER.info(
-                    "Scheduled deletion has been disabled via configuration - stopping checker"
-                )
-                break
-
-            await process_pending_deletions()
-        except Exception as e:
-            LOGGER.error(f"Error in scheduled deletion checker: {e}")
-        await sleep(
-            900
-        )  # Optimized: Check every 15 minutes to reduce resource usage
-
+    LOGGER.info("Scheduled deletion checker started")
+    try:
+        # Deletes due messages until disabled via configuration
+        await deletion_scheduler.run()
+    except Exception as e:
+        LOGGER.error(f"Error in scheduled deletion checker: {e}")
     LOGGER.info("Scheduled deletion checker stopped")
 
 
@@ -1,7 +1,10 @@
 import contextlib
-from asyncio import gather, sleep
+from asyncio import Lock, gather, sleep
+from datetime import UTC, datetime, timedelta
 from inspect import iscoroutinefunction
 from pathlib import Path
+from time import time
+from typing import ClassVar
 
 from aioaria2 import Aria2WebsocketClient  # type: ignore
 from aiohttp import ClientError
@@ -14,8 +17,42 @@ from tenacity import (  # type: ignore
 )
 
 from bot import LOGGER, aria2_options
+from bot.core.boot import qbittorrent_daemon
 from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 
+# Status renders and listeners within this window share one snapshot
+SNAPSHOT_TTL = 1
+
+_QB_CONVERTERS = {
+    "eta": lambda v: timedelta(seconds=v),
+    "seeding_time": lambda v: timedelta(seconds=v),
+    "time_active": lambda v: timedelta(seconds=v),
+    "added_on": lambda v: datetime.fromtimestamp(v, tz=UTC),
+    "completion_on": lambda v: datetime.fromtimestamp(v, tz=UTC),
+    "tags": lambda v: [t.strip() for t in v.split(",") if t.strip()],
+}
+
+
+class QbTorrentView:
+    """
+    Read-only view over a merged ``sync/maindata`` torrent entry that exposes
+    the same attributes (and conversions) as aioqbt's ``TorrentInfo``
+    """
+
+    __slots__ = ("_data", "hash")
+
+    def __init__(self, hash_, data):
+        self.hash = hash_
+        self._data = data
+
+    def __getattr__(self, name):
+        try:
+            value = self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        converter = _QB_CONVERTERS.get(name)
+        return converter(value) if converter else value
+
 
 def wrap_with_retry(obj, max_retries=5):
     for attr_name in dir(obj):
@@ -40,11 +77,20 @@ class TorrentManager:
     aria2 = None
     qbittorrent = None
 
+    # Shared state snapshots, refreshed at most once per SNAPSHOT_TTL
+    _qb_rid = 0
+    _qb_data: ClassVar[dict] = {}
+    _qb_torrents: ClassVar[dict] = {}
+    _qb_by_tag: ClassVar[dict] = {}
+    _qb_snapshot_time = 0
+    _qb_snapshot_lock = Lock()
+    _aria2_downloads: ClassVar[dict] = {}
+    _aria2_snapshot_time = 0
+    _aria2_snapshot_lock = Lock()
+
     @classmethod
-    async def initiate(cls):
-        # Initialize aria2 with retry logic
+    async def _connect_aria2(cls, max_retries=5):
         retry_count = 0
-        max_retries = 5
         while retry_count < max_retries:
             try:
                 LOGGER.info(
@@ -55,7 +101,7 @@ class TorrentManager:
                     timeout=30,  # Increased timeout
                 )
                 LOGGER.info("Successfully connected to Aria2")
-                break
+                return
             except Exception as e:
                 retry_count += 1
                 if retry_count >= max_retries:
@@ -67,7 +113,11 @@ class TorrentManager:
                     LOGGER.info(f"Waiting {wait_time} seconds before retrying...")
                     await sleep(wait_time)
 
-        # Initialize qBittorrent with retry logic
+    @classmethod
+    async def _connect_qbittorrent(cls, max_retries=5):
+        # The daemon is started in the background, connecting before its web
+        # UI answers would only burn retries
+        await qbittorrent_daemon.wait_ready()
         retry_count = 0
         while retry_count < max_retries:
             try:
@@ -81,7 +131,7 @@ class TorrentManager:
                 # Apply retry wrapper to make all API calls more resilient
                 cls.qbittorrent = wrap_with_retry(cls.qbittorrent)
                 LOGGER.info("Successfully connected to qBittorrent")
-                break
+                return
             except Exception as e:
                 retry_count += 1
                 if retry_count >= max_retries:
@@ -96,11 +146,94 @@ class TorrentManager:
                     await sleep(wait_time)
                 # Additional connection test is already done by the create_client function
 
+    @classmethod
+    async def initiate(cls):
+        """Connect to aria2 and qBittorrent at the same time"""
+        await gather(cls._connect_aria2(), cls._connect_qbittorrent())
         # Log connection status
         LOGGER.info(
             f"Torrent services initialized - Aria2: {'Connected' if cls.aria2 else 'Failed'}, qBittorrent: {'Connected' if cls.qbittorrent else 'Failed'}",
         )
 
+    @classmethod
+    async def _sync_qb_maindata(cls):
+        data = await cls.qbittorrent.sync.maindata(cls._qb_rid)
+        if data.full_update:
+            cls._qb_data = {}
+        for hash_, changes in data.torrents.items():
+            if hash_ in cls._qb_data:
+                cls._qb_data[hash_].update(changes)
+            else:
+                cls._qb_data[hash_] = dict(changes)
+        for hash_ in data.torrents_removed:
+            cls._qb_data.pop(hash_, None)
+        cls._qb_rid = data.rid
+        return {
+            hash_: QbTorrentView(hash_, info) for hash_, info in cls._qb_data.items()
+        }
+
+    @classmethod
+    async def qb_snapshot(cls, max_age=SNAPSHOT_TTL):
+        """
+        Return ``{hash: torrent}`` for all qBittorrent torrents. Only the
+        changes since the previous ``sync/maindata`` rid are transferred, and
+        concurrent callers share a single request.
+        """
+        async with cls._qb_snapshot_lock:
+            if time() - cls._qb_snapshot_time < max_age:
+                return cls._qb_torrents
+            try:
+                torrents = await cls._sync_qb_maindata()
+            except Exception:
+                # Start over with a full update on the next tick
+                cls._qb_rid = 0
+                raise
+            by_tag = {}
+            for tor in torrents.values():
+                for tag in tor.tags:
+                    by_tag[tag] = tor
+            cls._qb_torrents = torrents
+            cls._qb_by_tag = by_tag
+            cls._qb_snapshot_time = time()
+            return torrents
+
+    @classmethod
+    async def qb_torrent(cls, tag):
+        """Snapshot entry of the torrent with this tag, or None"""
+        await cls.qb_snapshot()
+        return cls._qb_by_tag.get(tag)
+
+    @classmethod
+    async def aria2_snapshot(cls, max_age=SNAPSHOT_TTL):
+        """
+        Return ``{gid: download}`` for all aria2 downloads, fetched with a
+        single ``system.multicall`` shared by concurrent callers
+        """
+        async with cls._aria2_snapshot_lock:
+            if time() - cls._aria2_snapshot_time < max_age:
+                return cls._aria2_downloads
+            results = await cls.aria2.multicall(
+                [
+                    {"methodName": "aria2.tellActive", "params": []},
+                    {"methodName": "aria2.tellWaiting", "params": [0, 1000]},
+                    {"methodName": "aria2.tellStopped", "params": [0, 1000]},
+                ],
+            )
+            downloads = {}
+            for result in results or []:
+                # Each element is [value] or a fault struct
+                if isinstance(result, list) and result:
+                    for download in result[0]:
+                        downloads[download["gid"]] = download
+            cls._aria2_downloads = downloads
+            cls._aria2_snapshot_time = time()
+            return downloads
+
+    @classmethod
+    async def aria2_download(cls, gid):
+        """Snapshot entry of this gid, or None"""
+        return (await cls.aria2_snapshot()).get(gid)
+
     @classmethod
     async def close_all(cls):
         tasks = []
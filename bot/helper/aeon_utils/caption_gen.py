@@ -1,4 +1,3 @@
-import gc
 import json
 import os
 import re
@@ -15,11 +14,6 @@ from bot.helper.ext_utils.status_utils import (
 )
 from bot.helper.ext_utils.template_processor import process_template
 
-try:
-    from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-except ImportError:
-    smart_garbage_collection = None
-
 
 class DefaultDict(dict):
     """A dictionary that returns 'Unknown' for missing keys."""
@@ -508,16 +502,6 @@ async def generate_caption(
                 LOGGER.info(
                     f"Successfully applied leech caption template for: {filename}"
                 )
-            # Force garbage collection after processing media info
-            # This can create large objects in memory
-            if smart_garbage_collection:
-                # Use aggressive collection for media info processing
-                smart_garbage_collection(aggressive=True)
-            else:
-                # Collect all generations for thorough cleanup
-                gc.collect(0)
-                gc.collect(1)
-                gc.collect(2)
             return processed_caption
         except Exception as e:
             LOGGER.error(f"Error processing template with advanced processor: {e}")
@@ -5,6 +5,7 @@ import shlex
 from asyncio import gather, sleep
 from collections import Counter
 from copy import deepcopy
+from functools import partial
 from os import path as ospath
 from os import walk
 from re import IGNORECASE, findall, sub
@@ -44,10 +45,9 @@ from .ext_utils.bot_utils import get_size_bytes, new_task, sync_to_async
 from .ext_utils.bulk_links import extract_bulk_links
 from .ext_utils.files_utils import (
     SevenZ,
-    get_base_name,
+    get_archive_sets,
     get_path_size,
     is_archive,
-    is_archive_split,
     is_first_archive_split,
     split_file,
 )
@@ -67,6 +67,7 @@ from .ext_utils.media_utils import (
     merge_images,
     take_ss,
 )
+from .ext_utils.split_pipeline import SplitPipeline
 from .mirror_leech_utils.gdrive_utils.list import GoogleDriveList
 from .mirror_leech_utils.rclone_utils.list import RcloneList
 from .mirror_leech_utils.status_utils.ffmpeg_status import FFmpegStatus
@@ -313,6 +314,9 @@ class TaskConfig:
         self.is_nzb = False
         self.is_clone = False
         self.is_ytdlp = False
+        # Info dict of the quality selection, reused by the yt-dlp download
+        self.ytdl_info = None
+        self.ytdl_info_time = 0
         self.user_transmission = False
         self.hybrid_leech = False
         self.extract = False
@@ -338,11 +342,13 @@ class TaskConfig:
         self.user_trans = False
         self.progress = True
         self.ffmpeg_cmds = None
+        self.media_plan = None
         self.chat_thread_id = None
         self.subproc = None
         self.thumb = None
         self.excluded_extensions = []
         self.files_to_proceed = []
+        self.split_pipeline = None
         # Set is_super_chat with better error handling
         try:
             if hasattr(self.message, "chat") and hasattr(self.message.chat, "type"):
@@ -4466,53 +4472,25 @@ class TaskConfig:
 
         if not self.files_to_proceed:
             return dl_path
-        t_path = dl_path
         sevenz = SevenZ(self)
         LOGGER.info(f"Extracting: {self.name}")
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Extract")
-        for dirpath, _, files in await sync_to_async(
-            walk,
+        # Independent archive sets are extracted side by side, bounded by
+        # the cores and the disk, and their volumes removed as each finishes
+        sets = await sync_to_async(
+            get_archive_sets,
             self.up_dir or self.dir,
-            topdown=False,
-        ):
-            for file_ in files:
-                if self.is_cancelled:
-                    return False
-                if is_first_archive_split(file_) or (
-                    is_archive(file_) and not file_.strip().lower().endswith(".rar")
-                ):
-                    self.proceed_count += 1
-                    f_path = ospath.join(dirpath, file_)
-                    t_path = get_base_name(f_path) if self.is_file else dirpath
-                    if not self.is_file:
-                        self.subname = file_
-                    code = await sevenz.extract(f_path, t_path, pswd)
-                else:
-                    code = 0
-            if self.is_cancelled:
-                return code
-            # Ensure code is an integer for comparison
-            try:
-                code = int(code) if code is not None else 0
-            except (ValueError, TypeError):
-                code = 1  # Set to non-zero to indicate failure
-            if code == 0:
-                for file_ in files:
-                    if is_archive_split(file_) or is_archive(file_):
-                        del_path = ospath.join(dirpath, file_)
-                        try:
-                            await remove(del_path)
-                        except Exception:
-                            self.is_cancelled = True
-        if self.proceed_count == 0:
+            self.is_file,
+        )
+        self.proceed_count += sum(len(archive_set.heads) for archive_set in sets)
+        failed = await sevenz.extract_sets(sets, pswd)
+        if self.is_cancelled:
+            return False
+        if not sets:
             LOGGER.info("No files able to extract!")
-        # Ensure code is an integer for final comparison
-        try:
-            code = int(code) if code is not None else 1
-        except (ValueError, TypeError):
-            code = 1  # Set to non-zero to indicate failure
-        return t_path if self.is_file and code == 0 else dl_path
+            return dl_path
+        return sets[0].t_path if self.is_file and not failed else dl_path
 
     async def proceed_ffmpeg(
         self, dl_path, gid
@@ -9380,10 +9358,13 @@ class TaskConfig:
                     if f_size > self.split_size:
                         self.files_to_proceed[f_path] = [f_size, file_]
         if self.files_to_proceed:
+            # The parts are written by the uploader's pipeline while the
+            # previous part uploads, here only the split of each file is planned
             ffmpeg = FFMpeg(self)
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Split")
-            LOGGER.info(f"Splitting: {self.name}")
+            self.split_pipeline = SplitPipeline(self)
+            LOGGER.info(f"Splitting while uploading: {self.name}")
             for f_path, (f_size, file_) in self.files_to_proceed.items():
                 self.proceed_count += 1
                 if self.is_file:
@@ -9447,23 +9428,53 @@ class TaskConfig:
 
                 # Calculate number of parts using math.ceil for consistency
                 parts = math.ceil(f_size / split_size)
+                is_video = not self.as_doc and (await get_document_type(f_path))[0]
 
-                if not self.as_doc and (await get_document_type(f_path))[0]:
-                    self.progress = True
-                    res = await ffmpeg.split(f_path, file_, parts, split_size)
-                else:
-                    self.progress = False
-                    res = await split_file(f_path, split_size, self)
-                if self.is_cancelled:
-                    return False
-                if res or f_size >= self.max_split_size:
-                    try:
-                        await remove(f_path)
-                    except Exception:
-                        self.is_cancelled = True
+                self.split_pipeline.add(
+                    f_path,
+                    f_size,
+                    partial(
+                        self._split_for_upload,
+                        ffmpeg,
+                        f_path,
+                        file_,
+                        f_size,
+                        parts,
+                        split_size,
+                        is_video,
+                    ),
+                )
             return None
         return None
 
+    async def _split_for_upload(
+        self, ffmpeg, f_path, file_, f_size, parts, split_size, is_video, part_sink
+    ):
+        # The upload status shows the progress, see TelegramStatus.split
+        if is_video:
+            res = await ffmpeg.split(f_path, file_, parts, split_size, part_sink)
+        else:
+            res = await split_file(f_path, split_size, self, part_sink)
+        if self.is_cancelled:
+            return None
+        if res or f_size >= self.max_split_size:
+            try:
+                await remove(f_path)
+            except Exception:
+                self.is_cancelled = True
+            return True
+        # Small enough to be uploaded in one piece
+        return False
+
+    async def _fused(self, stage, path):
+        """``stage`` was already applied to ``path`` by the fused media pass"""
+        if self.media_plan is None or not await self.media_plan.covers(stage, path):
+            return False
+        LOGGER.info(
+            f"{stage.capitalize()} already applied in the fused pass: {path}"
+        )
+        return True
+
     async def proceed_metadata(self, dl_path, gid):
         # Get global metadata values with priority
         # metadata_all takes priority over individual settings
@@ -9522,6 +9533,9 @@ class TaskConfig:
 
         # Function to check if a file is supported for metadata
         async def is_metadata_supported(file_path):
+            if await self._fused("metadata", file_path):
+                return False, ""
+
             # Get file extension
             ext = ospath.splitext(file_path)[1].lower()
 
@@ -10670,7 +10684,7 @@ class TaskConfig:
         checked = False
         if self.is_file:
             # Check if the file is a supported media type for watermarking
-            if is_mkv(dl_path):  # is_mkv now checks for all supported media types
+            if is_mkv(dl_path) and not await self._fused("watermark", dl_path):
                 # Get subtitle watermark interval if available
                 subtitle_watermark_interval = None
                 if hasattr(self, "subtitle_watermark_interval"):
@@ -10780,9 +10794,9 @@ class TaskConfig:
                         return ""
 
                     # Check if the file is a supported media type for watermarking
-                    if is_mkv(
-                        file_path
-                    ):  # is_mkv now checks for all supported media types
+                    if is_mkv(file_path) and not await self._fused(
+                        "watermark", file_path
+                    ):
                         # Get subtitle watermark interval if available
                         subtitle_watermark_interval = None
                         if hasattr(self, "subtitle_watermark_interval"):
@@ -11426,6 +11440,8 @@ class TaskConfig:
         # Import the media_utils module
 
         if self.is_file:
+            if await self._fused("remove", dl_path):
+                return dl_path
             # Process a single file
             # Set up FFmpeg status
             if not checked:
@@ -11542,6 +11558,8 @@ class TaskConfig:
                         if checked:
                             cpu_eater_lock.release()
                         return ""
+                    if await self._fused("remove", file_path):
+                        continue
 
                     # Set up FFmpeg status if not already done
                     if not checked:
@@ -12214,6 +12232,8 @@ class TaskConfig:
         delete_original = self.trim_delete_original
 
         if self.is_file:
+            if await self._fused("trim", dl_path):
+                return dl_path
             # Process a single file
             cmd, temp_file = await get_trim_cmd(
                 dl_path,
@@ -12386,6 +12406,8 @@ class TaskConfig:
                         if checked:
                             cpu_eater_lock.release()
                         return ""
+                    if await self._fused("trim", file_path):
+                        continue
 
                     # Generate trim command for the file
                     cmd, temp_file = await get_trim_cmd(
@@ -17,11 +17,6 @@ from bot import LOGGER, bot_loop, user_data
 from bot.core.config_manager import Config
 from bot.helper.telegram_helper.button_build import ButtonMaker
 
-try:
-    from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-except ImportError:
-    smart_garbage_collection = None
-
 from .help_messages import (
     AI_HELP_DICT,
     CLONE_HELP_DICT,
@@ -571,14 +566,9 @@ async def _save_user_data():
             await f.write(json.dumps(user_data, separators=(",", ":"), indent=None))
 
         # Force garbage collection after saving large data
-        try:
-            from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-
-            smart_garbage_collection(aggressive=False)
-        except ImportError:
-            import gc
+        from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 
-            gc.collect()
+        smart_garbage_collection(aggressive=False)
 
     except Exception:
         pass
@@ -620,16 +610,11 @@ async def _load_user_data():
 
                         # Force garbage collection after each batch
                         if (i + batch_size) < len(keys):
-                            try:
-                                from bot.helper.ext_utils.gc_utils import (
-                                    smart_garbage_collection,
-                                )
+                            from bot.helper.ext_utils.gc_utils import (
+                                smart_garbage_collection,
+                            )
 
-                                smart_garbage_collection(aggressive=False)
-                            except ImportError:
-                                import gc
-
-                                gc.collect()
+                            smart_garbage_collection(aggressive=False)
 
                     # Data loaded successfully
 
@@ -637,16 +622,11 @@ async def _load_user_data():
                     del loaded_data
 
                     # Final garbage collection
-                    try:
-                        from bot.helper.ext_utils.gc_utils import (
-                            smart_garbage_collection,
-                        )
-
-                        smart_garbage_collection(aggressive=True)
-                    except ImportError:
-                        import gc
+                    from bot.helper.ext_utils.gc_utils import (
+                        smart_garbage_collection,
+                    )
 
-                        gc.collect()
+                    smart_garbage_collection(aggressive=True)
     except Exception:
         # Keep using the empty user_data dictionary
         pass
@@ -739,17 +719,8 @@ async def cmd_exec(cmd, shell=False, task_type="FFmpeg"):
     except Exception:
         stderr = "Unable to decode the error!"
 
-    # Force garbage collection after resource-intensive operations
-    if (
-        task_type in ["FFmpeg", "Watermark", "Merge", "7z", "Split File"]
-        and smart_garbage_collection is not None
-    ):
-        smart_garbage_collection(
-            aggressive=True
-        )  # Use aggressive mode for resource-intensive operations
-    elif proc.returncode != 0 and smart_garbage_collection is not None:
-        # Also collect garbage after failed operations to clean up any partial resources
-        smart_garbage_collection(aggressive=False)
+    if proc.returncode != 0:
+        LOGGER.debug(f"{task_type} command exited with {proc.returncode}")
 
     return stdout, stderr, proc.returncode
 
@@ -776,41 +747,13 @@ async def sync_to_async(func, *args, wait=True, **kwargs):
         The result of the function if wait=True, otherwise the future
     """
     try:
-        # Check if we should run garbage collection before creating a new thread
-        # This helps prevent resource exhaustion in high-load situations
-        if smart_garbage_collection is not None:
-            # Monitor thread usage and run garbage collection if needed
-            from bot.helper.ext_utils.gc_utils import monitor_thread_usage
-
-            if monitor_thread_usage():
-                smart_garbage_collection(aggressive=True)
-
-        # Create partial function with arguments
         pfunc = partial(func, *args, **kwargs)
-
-        # Run in executor using default thread pool
         future = bot_loop.run_in_executor(None, pfunc)
-        result = await future if wait else future
-
-        # Force garbage collection after large operations
-        if (
-            smart_garbage_collection is not None
-            and hasattr(func, "__name__")
-            and func.__name__
-            in ["walk", "get_media_info", "extract", "zip", "get_path_size"]
-        ):
-            smart_garbage_collection(
-                aggressive=False
-            )  # Use normal mode for standard operations
-
-        return result
+        return await future if wait else future
     except RuntimeError as e:
         # Handle thread creation errors
         if "can't start new thread" in str(e):
             LOGGER.error(f"Thread limit reached: {e}")
-            # Force aggressive garbage collection
-            if smart_garbage_collection is not None:
-                smart_garbage_collection(aggressive=True)
             # Wait a bit and retry
             await sleep(1)
 
@@ -0,0 +1,277 @@
+"""
+Shared bounded caches.
+
+Search results, callback ids, probe results, file references and API
+clients used to be kept in module level dicts, each with its own eviction
+rules and no way to tell how big they were. ``Cache`` gives all of them the
+same behaviour: entries expire after a TTL (absolute or since last use),
+the cache is bounded by entry count and by an estimated memory weight, the
+victim is chosen by LRU or LFU, concurrent misses of one key share a single
+load, and every cache registers itself with hit/miss/eviction counters that
+``/stats`` shows.
+"""
+
+from asyncio import CancelledError, Future, get_running_loop, shield
+from collections import OrderedDict
+from sys import getsizeof
+from time import monotonic
+
+from bot import LOGGER
+
+# Every Cache by name, for /stats
+CACHES = {}
+
+
+def estimate_size(value, depth=2):
+    """Rough memory footprint of a value and, a few levels deep, its items"""
+    size = getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(k, depth - 1) + estimate_size(v, depth - 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, list | tuple | set | frozenset):
+        size += sum(estimate_size(item, depth - 1) for item in value)
+    return size
+
+
+class _LoadCancelled(Exception):
+    """The task running a shared load was cancelled, waiters load again"""
+
+
+class _Entry:
+    __slots__ = ("expires", "hits", "used", "value", "weight")
+
+    def __init__(self, value, weight, expires, now):
+        self.value = value
+        self.weight = weight
+        self.expires = expires
+        self.used = now
+        self.hits = 0
+
+
+class Cache:
+    """
+    Bounded key/value cache for code running on the event loop.
+
+    ``ttl`` expires an entry that many seconds after it was stored, ``idle``
+    after it was last read. ``max_weight`` bounds the summed weights, which
+    ``weigher(value)`` returns (estimated memory size by default). The
+    ``policy`` is ``"lru"`` or ``"lfu"``. ``on_evict(key, value)`` runs for
+    entries dropped by expiry or eviction, not for ``pop``.
+    """
+
+    def __init__(
+        self,
+        name,
+        max_entries=128,
+        max_weight=0,
+        ttl=0,
+        idle=0,
+        policy="lru",
+        weigher=None,
+        on_evict=None,
+    ):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.name = name
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self.idle = idle
+        self.policy = policy
+        self.weigher = weigher or (estimate_size if max_weight else None)
+        self.on_evict = on_evict
+        self.weight = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self._live(key, monotonic()) is not None
+
+    def _expired(self, entry, now):
+        return (entry.expires and now >= entry.expires) or (
+            self.idle and now - entry.used >= self.idle
+        )
+
+    def _drop(self, key, counter):
+        entry = self._entries.pop(key)
+        self.weight -= entry.weight
+        self.stats[counter] += 1
+        if self.on_evict is not None:
+            try:
+                self.on_evict(key, entry.value)
+            except Exception as e:
+                LOGGER.error(f"Cache {self.name}: eviction callback failed: {e}")
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry, now):
+            self._drop(key, "expirations")
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        now = monotonic()
+        entry = self._live(key, now)
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+        self.stats["hits"] += 1
+        entry.hits += 1
+        entry.used = now
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def contains(self, key):
+        return key in self
+
+    def touch(self, key):
+        """Mark an entry as used without counting a lookup"""
+        if (entry := self._live(key, monotonic())) is not None:
+            entry.used = monotonic()
+            self._entries.move_to_end(key)
+
+    def put(self, key, value, weight=None):
+        now = monotonic()
+        if weight is None:
+            weight = self.weigher(value) if self.weigher else 1
+        if (old := self._entries.pop(key, None)) is not None:
+            self.weight -= old.weight
+        self._entries[key] = _Entry(
+            value, weight, now + self.ttl if self.ttl else 0, now
+        )
+        self.weight += weight
+        self._shrink(keep=key)
+        return value
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry.weight
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
+        self.weight = 0
+
+    def keys(self):
+        self.purge()
+        return list(self._entries)
+
+    def items(self):
+        self.purge()
+        return [(key, entry.value) for key, entry in self._entries.items()]
+
+    def _victim(self, keep):
+        # Never evict the entry that is being stored. Iteration runs from
+        # least to most recently used, so LFU ties go to the oldest entry.
+        candidates = (key for key in self._entries if key != keep)
+        if self.policy == "lfu":
+            return min(candidates, key=lambda k: self._entries[k].hits)
+        return next(candidates)
+
+    def _shrink(self, keep=None):
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_weight and self.weight > self.max_weight)
+        ):
+            self._drop(self._victim(keep), "evictions")
+
+    def purge(self):
+        """Drop expired entries, returns how many were dropped"""
+        now = monotonic()
+        expired = [k for k, e in self._entries.items() if self._expired(e, now)]
+        for key in expired:
+            self._drop(key, "expirations")
+        return len(expired)
+
+    async def get_or_load(self, key, loader):
+        """
+        Cached value of ``key`` or the result of ``await loader()``, stored.
+        Concurrent misses of the same key wait for one load. When the task
+        running the load is cancelled, a waiter starts the load again.
+        """
+        while True:
+            now = monotonic()
+            entry = self._live(key, now)
+            if entry is not None:
+                self.stats["hits"] += 1
+                entry.hits += 1
+                entry.used = now
+                self._entries.move_to_end(key)
+                return entry.value
+            if (future := self._inflight.get(key)) is None:
+                break
+            self.stats["coalesced"] += 1
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared load
+                return await shield(future)
+            except _LoadCancelled:
+                continue
+        self.stats["misses"] += 1
+        self.stats["loads"] += 1
+        future = self._inflight[key] = Future(loop=get_running_loop())
+        try:
+            value = await loader()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except CancelledError:
+            # The cancellation is this task's, not the waiters'
+            future.set_exception(_LoadCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters receive the exception, mark it retrieved for the owner
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def info(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "weight": self.weight,
+            "max_weight": self.max_weight,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+def cache_report():
+    """One line per registered cache, busiest first"""
+    lines = []
+    for cache in sorted(
+        CACHES.values(),
+        key=lambda c: c.stats["hits"] + c.stats["misses"],
+        reverse=True,
+    ):
+        info = cache.info()
+        line = (
+            f"{cache.name}: {info['entries']}/{info['max_entries']} | "
+            f"hit {info['hit_rate']:.0%} ({info['hits']}/{info['misses']}) | "
+            f"evicted {info['evictions'] + info['expirations']}"
+        )
+        if cache.max_weight:
+            line += f" | {info['weight'] / 1048576:.1f} MiB"
+        lines.append(line)
+    return lines
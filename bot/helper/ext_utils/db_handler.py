@@ -5,7 +5,7 @@ from importlib import import_module
 from time import time as get_time
 
 from aiofiles import open as aiopen
-from pymongo import AsyncMongoClient
+from pymongo import AsyncMongoClient, UpdateOne
 from pymongo.errors import (
     ConnectionFailure,
     PyMongoError,
@@ -778,10 +778,15 @@ class DbManager:
             LOGGER.warning(f"Failed to add incomplete task to database: {e}")
             # Continue with the operation even if database update fails
 
-    async def get_pm_uids(self):
+    async def get_pm_uids(self, after=None):
+        """PM user ids in ascending order, those above ``after`` if given"""
         if self._return:
             return None
-        return [doc["_id"] async for doc in self.db.pm_users[TgClient.ID].find({})]
+        query = {} if after is None else {"_id": {"$gt": after}}
+        return [
+            doc["_id"]
+            async for doc in self.db.pm_users[TgClient.ID].find(query).sort("_id", 1)
+        ]
 
     async def update_pm_users(self, user_id):
         if self._return:
@@ -795,6 +800,32 @@ class DbManager:
             return
         await self.db.pm_users[TgClient.ID].delete_one({"_id": user_id})
 
+    async def rm_pm_users(self, user_ids):
+        if self._return or not user_ids:
+            return
+        await self.db.pm_users[TgClient.ID].delete_many({"_id": {"$in": user_ids}})
+
+    async def save_broadcast(self, job_id, data):
+        """Store the checkpoint of a running broadcast"""
+        if self._return:
+            return
+        await self.db.broadcasts.update_one(
+            {"_id": job_id},
+            {"$set": {**data, "bot": TgClient.ID}},
+            upsert=True,
+        )
+
+    async def remove_broadcast(self, job_id):
+        if self._return:
+            return
+        await self.db.broadcasts.delete_one({"_id": job_id})
+
+    async def get_broadcasts(self):
+        """Checkpoints of the broadcasts of this bot that did not finish"""
+        if self._return:
+            return []
+        return [doc async for doc in self.db.broadcasts.find({"bot": TgClient.ID})]
+
     async def update_user_tdata(self, user_id, token, expiry_time):
         if self._return:
             return
@@ -917,69 +948,65 @@ class DbManager:
         if bot_id is None:
             bot_id = TgClient.ID
 
-        # Storing messages for deletion
-
-        # Store each message individually to avoid bulk write issues
-        for chat_id, message_id in zip(chat_ids, message_ids, strict=True):
-            try:
-                await self.db.scheduled_deletions.update_one(
-                    {"chat_id": chat_id, "message_id": message_id},
-                    {"$set": {"delete_time": delete_time, "bot_id": bot_id}},
-                    upsert=True,
-                )
-            except PyMongoError as e:
-                LOGGER.error(f"Error storing scheduled deletion: {e}")
-                await self.ensure_connection()  # Try to reconnect for next operation
-
-        # Messages stored for deletion
+        requests = [
+            UpdateOne(
+                {"chat_id": chat_id, "message_id": message_id},
+                {"$set": {"delete_time": delete_time, "bot_id": bot_id}},
+                upsert=True,
+            )
+            for chat_id, message_id in zip(chat_ids, message_ids, strict=True)
+        ]
+        if not requests:
+            return
+        try:
+            await self.db.scheduled_deletions.bulk_write(requests, ordered=False)
+        except PyMongoError as e:
+            LOGGER.error(f"Error storing scheduled deletion: {e}")
+            await self.ensure_connection()  # Try to reconnect for next operation
 
-    async def remove_scheduled_deletion(self, chat_id, message_id):
-        """Remove a message from scheduled deletions"""
-        if not await self.ensure_connection():
+    async def remove_scheduled_deletions(self, messages):
+        """Remove (chat_id, message_id) pairs from scheduled deletions"""
+        if not messages or not await self.ensure_connection():
             return
+        chats = {}
+        for chat_id, message_id in messages:
+            chats.setdefault(chat_id, []).append(message_id)
         try:
-            await self.db.scheduled_deletions.delete_one(
-                {"chat_id": chat_id, "message_id": message_id},
+            await self.db.scheduled_deletions.delete_many(
+                {
+                    "$or": [
+                        {"chat_id": chat_id, "message_id": {"$in": ids}}
+                        for chat_id, ids in chats.items()
+                    ]
+                },
             )
         except PyMongoError as e:
-            LOGGER.error(f"Error removing scheduled deletion: {e}")
+            LOGGER.error(f"Error removing scheduled deletions: {e}")
             await self.ensure_connection()  # Try to reconnect for next operation
 
-    async def get_pending_deletions(self):
-        """Get messages that are due for deletion"""
+    async def remove_scheduled_deletion(self, chat_id, message_id):
+        """Remove a message from scheduled deletions"""
+        await self.remove_scheduled_deletions([(chat_id, message_id)])
+
+    async def get_scheduled_deletions(self):
+        """All stored deletions as (chat_id, message_id, bot_id, delete_time)"""
         if not await self.ensure_connection():
             return []
 
-        current_time = int(get_time())
-        # Get current time for comparison
-
         try:
             # Create index for better performance if it doesn't exist
             await self.db.scheduled_deletions.create_index([("delete_time", 1)])
-
-            # Get all documents for manual processing
-            all_docs = []
-            try:
-                async for doc in self.db.scheduled_deletions.find():
-                    all_docs.append(doc)
-            except PyMongoError as e:
-                LOGGER.error(f"Error retrieving scheduled deletions: {e}")
-                await self.ensure_connection()  # Try to reconnect
-                return []
-
-            # Process documents manually to ensure we catch all due messages
-            # Include a buffer of 30 seconds to catch messages that are almost due
-            buffer_time = 30  # 30 seconds buffer
-
-            # Use list comprehension for better performance and return directly
-            # Messages found for deletion
             return [
-                (doc["chat_id"], doc["message_id"], doc.get("bot_id", TgClient.ID))
-                for doc in all_docs
-                if doc.get("delete_time", 0) <= current_time + buffer_time
+                (
+                    doc["chat_id"],
+                    doc["message_id"],
+                    doc.get("bot_id", TgClient.ID),
+                    doc.get("delete_time", 0),
+                )
+                async for doc in self.db.scheduled_deletions.find({}, {"_id": 0})
             ]
         except PyMongoError as e:
-            LOGGER.error(f"Error in get_pending_deletions: {e}")
+            LOGGER.error(f"Error retrieving scheduled deletions: {e}")
             await self.ensure_connection()  # Try to reconnect
             return []
 
@@ -993,37 +1020,12 @@ class DbManager:
             return 0
 
         try:
-            # Calculate the timestamp for 'days' ago
-            one_day_ago = int(get_time() - (days * 86400))  # 86400 seconds = 1 day
-
-            # Cleaning up old scheduled deletion entries
-
-            # Get all entries to check which ones are actually old and processed
-            entries_to_check = [
-                doc async for doc in self.db.scheduled_deletions.find({})
-            ]
-
-            # Count entries by type
-            current_time = int(get_time())
-            past_due = [
-                doc for doc in entries_to_check if doc["delete_time"] < current_time
-            ]
-
-            # Only delete entries that are more than 'days' old AND have already been processed
-            # (i.e., their delete_time is in the past)
-            deleted_count = 0
-            for doc in past_due:
-                # If the entry is more than 'days' old from its scheduled deletion time
-                if doc["delete_time"] < one_day_ago:
-                    result = await self.db.scheduled_deletions.delete_one(
-                        {"_id": doc["_id"]},
-                    )
-                    if result.deleted_count > 0:
-                        deleted_count += 1
-
-            # No need to log cleanup results
-
-            return deleted_count
+            # Entries more than 'days' past their scheduled deletion time
+            cutoff = int(get_time() - (days * 86400))  # 86400 seconds = 1 day
+            result = await self.db.scheduled_deletions.delete_many(
+                {"delete_time": {"$lt": cutoff}},
+            )
+            return result.deleted_count
         except PyMongoError as e:
             LOGGER.error(f"Error cleaning old scheduled deletions: {e}")
             await self.ensure_connection()  # Try to reconnect for next operation
@@ -13,3 +13,15 @@ class RssShutdownException(Exception):
 
 class TgLinkException(Exception):
     """No Access granted for this chat"""
+
+
+class MegaSessionError(Exception):
+    """A MEGA session could not be opened or is no longer usable"""
+
+
+class TelegramBusy(Exception):
+    """The client waits out a FloodWait and the request was not allowed to wait"""
+
+    def __init__(self, value):
+        super().__init__(f"Telegram client paused for {value:.0f}s")
+        self.value = value
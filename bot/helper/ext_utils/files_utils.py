@@ -1,17 +1,18 @@
-import gc
+import contextlib
 import math
-from asyncio import create_subprocess_exec, sleep, wait_for
+from asyncio import Semaphore, create_subprocess_exec, gather, sleep, wait_for
 from asyncio.subprocess import PIPE
+from os import copy_file_range, pread, readlink, walk
 from os import path as ospath
-from os import readlink, walk
 from re import IGNORECASE, escape
 from re import search as re_search
 from re import split as re_split
+from re import sub as re_sub
 
 from aioshutil import rmtree as aiormtree
 from magic import Magic
 
-from bot import DOWNLOAD_DIR, LOGGER
+from bot import DOWNLOAD_DIR, LOGGER, cpu_no
 from bot.core.torrent_manager import TorrentManager
 from bot.helper.ext_utils.aiofiles_compat import listdir, remove, rmdir, symlink
 from bot.helper.ext_utils.aiofiles_compat import makedirs as aiomakedirs
@@ -95,6 +96,20 @@ FIRST_SPLIT_REGEX = (
 
 SPLIT_REGEX = r"\.r\d+$|\.7z\.\d+$|\.z\d+$|\.zip\.\d+$|\.part\d+\.rar$"
 
+# Suffixes that differ between the volumes of one split archive
+ARCHIVE_SET_REGEX = (
+    r"\.part\d+\.rar$|\.r\d+$|\.rar$|\.7z(?:\.\d+)?$|\.zip(?:\.\d+)?$|\.z\d+$"
+)
+
+# Formats whose 7z decoder uses more than one thread
+MT_EXTRACT_EXT = (".7z", ".zip", ".bz2", ".tbz2", ".xz")
+
+# Archive sets extracted at the same time over all tasks, more only
+# contend for the disk
+MAX_EXTRACT_JOBS = 4
+EXTRACT_JOBS = max(1, min(MAX_EXTRACT_JOBS, cpu_no or 1))
+extract_slots = Semaphore(EXTRACT_JOBS)
+
 
 def is_first_archive_split(file):
     return bool(re_search(FIRST_SPLIT_REGEX, file.lower(), IGNORECASE))
@@ -108,6 +123,11 @@ def is_archive_split(file):
     return bool(re_search(SPLIT_REGEX, file.lower(), IGNORECASE))
 
 
+def archive_set_name(file):
+    """Name shared by all volumes of a split archive"""
+    return re_sub(ARCHIVE_SET_REGEX, "", file.strip().lower(), flags=IGNORECASE)
+
+
 async def clean_target(path):
     if await aiopath.exists(path):
         LOGGER.info(f"Cleaning Target: {path}")
@@ -224,9 +244,6 @@ async def get_mime_type(file_path):
     finally:
         # Explicitly delete the Magic object to free resources
         del mime
-        # Force garbage collection after handling large files
-        if ospath.getsize(file_path) > 100 * 1024 * 1024:  # 100MB
-            smart_garbage_collection(aggressive=False)
 
 
 # Non-async version for backward compatibility
@@ -245,11 +262,6 @@ def get_mime_type_sync(file_path):
         # Explicitly delete the Magic object to free resources
         if mime:
             del mime
-        # Optimized garbage collection only for very large files
-        if (
-            ospath.getsize(file_path) > 500 * 1024 * 1024
-        ):  # Increased threshold to 500MB
-            gc.collect(0)  # Only collect generation 0 for better performance
 
 
 async def remove_excluded_files(fpath, ee):
@@ -294,7 +306,54 @@ async def join_files(opath):
                     await remove(f"{opath}/{file_}")
 
 
-async def split_file(f_path, split_size, listener):
+def _copy_range(src, dst, offset, length):
+    """Copy ``length`` bytes of ``src`` from ``offset`` into a new file"""
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while length > 0:
+            try:
+                copied = copy_file_range(
+                    fin.fileno(), fout.fileno(), length, offset_src=offset
+                )
+            except OSError:
+                # Not supported by the filesystem, copy through user space
+                chunk = pread(fin.fileno(), min(length, 4 * 1024 * 1024), offset)
+                copied = fout.write(chunk) if chunk else 0
+            if not copied:
+                break
+            offset += copied
+            length -= copied
+
+
+async def _split_ranges(f_path, out_path, split_size, listener, part_sink):
+    """Write the byte-split parts one by one, reporting each to the sink"""
+    total = await aiopath.getsize(f_path)
+    count = math.ceil(total / split_size)
+    for index in range(count):
+        if listener.is_cancelled:
+            return False
+        await part_sink.reserve()
+        part_path = f"{out_path}{index + 1:03}"
+        offset = index * split_size
+        try:
+            await sync_to_async(
+                _copy_range,
+                f_path,
+                part_path,
+                offset,
+                min(split_size, total - offset),
+            )
+        except Exception as e:
+            LOGGER.error(f"Split error: {e}. File: {f_path}")
+            part_sink.discard()
+            with contextlib.suppress(Exception):
+                await remove(part_path)
+            return False
+        part_sink.add(part_path)
+    LOGGER.info(f"Successfully split {f_path} into {count} parts")
+    return True
+
+
+async def split_file(f_path, split_size, listener, part_sink=None):
     """
     Split a file into multiple parts using the Linux split command.
 
@@ -302,6 +361,9 @@ async def split_file(f_path, split_size, listener):
         f_path: Path to the file to split
         split_size: Size of each split in bytes
         listener: Listener object for tracking progress and cancellation
+        part_sink: Receives each part as soon as it is written. The parts are
+            then copied one at a time instead of by the split command, so
+            they can be uploaded while the next one is written.
 
     Returns:
         bool: True if splitting was successful, False otherwise
@@ -376,6 +438,11 @@ async def split_file(f_path, split_size, listener):
             f"Final adjustment: split size set to {split_size_bytes / (1024 * 1024 * 1024):.2f} GiB"
         )
 
+    if part_sink is not None:
+        return await _split_ranges(
+            f_path, out_path, split_size_bytes, listener, part_sink
+        )
+
     cmd = [
         "split",
         "--numeric-suffixes=1",
@@ -470,43 +537,116 @@ async def split_file(f_path, split_size, listener):
         return False
 
 
+class ArchiveSet:
+    """
+    Archives of one directory that share a set name, ``heads`` are
+    extracted and ``volumes`` are every file of the set
+    """
+
+    __slots__ = ("heads", "size", "t_path", "volumes")
+
+    def __init__(self, t_path):
+        self.t_path = t_path
+        self.heads = []
+        self.volumes = []
+        self.size = 0
+
+
+def get_archive_sets(path, single=False):
+    """
+    Archive sets under ``path``, largest first. A ``single`` archive is
+    extracted next to itself into a folder of its base name.
+    """
+    sets = {}
+    for dirpath, _, files in walk(path, topdown=False):
+        heads = {
+            file_
+            for file_ in files
+            if is_first_archive_split(file_)
+            or (is_archive(file_) and not file_.strip().lower().endswith(".rar"))
+        }
+        names = {archive_set_name(file_) for file_ in heads}
+        for file_ in sorted(files):
+            if (name := archive_set_name(file_)) not in names or not (
+                file_ in heads or is_archive_split(file_) or is_archive(file_)
+            ):
+                continue
+            f_path = ospath.join(dirpath, file_)
+            if (archive_set := sets.get((dirpath, name))) is None:
+                archive_set = sets[(dirpath, name)] = ArchiveSet(dirpath)
+            if file_ in heads:
+                archive_set.heads.append(f_path)
+                if single:
+                    archive_set.t_path = get_base_name(f_path)
+            archive_set.volumes.append(f_path)
+            with contextlib.suppress(OSError):
+                archive_set.size += ospath.getsize(f_path)
+    return sorted(sets.values(), key=lambda archive_set: -archive_set.size)
+
+
+class ExtractJob:
+    __slots__ = ("proc", "processed", "size")
+
+    def __init__(self, size):
+        self.size = size
+        self.processed = 0
+        self.proc = None
+
+
 class SevenZ:
     def __init__(self, listener):
         self._listener = listener
         self._processed_bytes = 0
         self._percentage = "0%"
+        # Running jobs of extract_sets, their total size and the size of
+        # the sets that are done
+        self._jobs = []
+        self._total = 0
+        self._finished = 0
 
     @property
     def processed_bytes(self):
+        if self._total:
+            return self._finished + sum(job.processed for job in self._jobs)
         return self._processed_bytes
 
     @property
     def progress(self):
+        if self._total:
+            return f"{min(self.processed_bytes / self._total, 1) * 100:.0f}%"
         return self._percentage
 
-    async def _sevenz_progress(self):
+    def kill(self):
+        """Stop the 7z processes of extract_sets"""
+        for job in self._jobs:
+            if job.proc is not None and job.proc.returncode is None:
+                with contextlib.suppress(Exception):
+                    job.proc.kill()
+
+    async def _sevenz_progress(self, job=None):
+        proc = self._listener.subproc if job is None else job.proc
         pattern = r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)"
         while not (
-            self._listener.subproc.returncode is not None
+            proc.returncode is not None
             or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
+            or proc.stdout.at_eof()
         ):
             try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 2)
+                line = await wait_for(proc.stdout.readline(), 2)
             except Exception:
                 break
             line = line.decode().strip()
-            if match := re_search(pattern, line):
+            if job is None and (match := re_search(pattern, line)):
                 self._listener.subsize = int(match[1] or match[2])
             await sleep(0.05)
         s = b""
         while not (
             self._listener.is_cancelled
-            or self._listener.subproc.returncode is not None
-            or self._listener.subproc.stdout.at_eof()
+            or proc.returncode is not None
+            or proc.stdout.at_eof()
         ):
             try:
-                char = await wait_for(self._listener.subproc.stdout.read(1), 60)
+                char = await wait_for(proc.stdout.read(1), 60)
             except Exception:
                 break
             if not char:
@@ -514,10 +654,13 @@ class SevenZ:
             s += char
             if char == b"%":
                 try:
-                    self._percentage = s.decode().rsplit(" ", 1)[-1].strip()
-                    self._processed_bytes = (
-                        int(self._percentage.strip("%")) / 100
-                    ) * self._listener.subsize
+                    percentage = s.decode().rsplit(" ", 1)[-1].strip()
+                    fraction = int(percentage.strip("%")) / 100
+                    if job is None:
+                        self._percentage = percentage
+                        self._processed_bytes = fraction * self._listener.subsize
+                    else:
+                        job.processed = fraction * job.size
                 except Exception:
                     self._processed_bytes = 0
                     self._percentage = "0%"
@@ -527,7 +670,7 @@ class SevenZ:
         self._processed_bytes = 0
         self._percentage = "0%"
 
-    async def extract(self, f_path, t_path, pswd):
+    async def extract(self, f_path, t_path, pswd, job=None, threads=0):
         cmd = [
             "7z",
             "x",
@@ -542,18 +685,26 @@ class SevenZ:
         ]
         if not pswd:
             del cmd[2]
+        if threads and re_sub(r"\.\d+$", "", f_path.lower()).endswith(
+            MT_EXTRACT_EXT
+        ):
+            cmd.append(f"-mmt{threads}")
         if self._listener.is_cancelled:
             return False
 
         # Execute the command
-        self._listener.subproc = await create_subprocess_exec(
+        proc = await create_subprocess_exec(
             *cmd,
             stdout=PIPE,
             stderr=PIPE,
         )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        if job is None:
+            self._listener.subproc = proc
+        else:
+            job.proc = proc
+        await self._sevenz_progress(job)
+        _, stderr = await proc.communicate()
+        code = proc.returncode
 
         if self._listener.is_cancelled:
             return False
@@ -568,6 +719,64 @@ class SevenZ:
             LOGGER.error(f"{stderr}. Unable to extract archive!. Path: {f_path}")
         return code
 
+    async def _extract_set(self, archive_set, pswd, threads):
+        job = ExtractJob(archive_set.size)
+        async with extract_slots:
+            self._jobs.append(job)
+            try:
+                for head in archive_set.heads:
+                    if not self._listener.is_file:
+                        self._listener.subname = ospath.basename(head)
+                    code = await self.extract(
+                        head, archive_set.t_path, pswd, job, threads
+                    )
+                    # A cancelled extraction returns False, which equals 0
+                    if self._listener.is_cancelled or code != 0:
+                        return False
+            finally:
+                if job.proc is not None and job.proc.returncode is None:
+                    with contextlib.suppress(Exception):
+                        job.proc.kill()
+                self._jobs.remove(job)
+                self._finished += archive_set.size
+        # The next set needs the disk space more than these volumes do
+        for volume in archive_set.volumes:
+            try:
+                await remove(volume)
+            except Exception as e:
+                LOGGER.error(f"Unable to remove extracted volume {volume}: {e}")
+        return True
+
+    async def extract_sets(self, sets, pswd):
+        """
+        Extract ``sets`` concurrently, removing the volumes of each set as
+        soon as it is extracted. Returns the number of sets that failed.
+        """
+        if not sets:
+            return 0
+        workers = min(len(sets), EXTRACT_JOBS)
+        # The threads 7z may use for one set
+        threads = max(1, (cpu_no or 1) // workers)
+        self._total = sum(archive_set.size for archive_set in sets) or 1
+        self._listener.subsize = self._total
+        queue = iter(sets)
+        failed = 0
+
+        async def worker():
+            nonlocal failed
+            for archive_set in queue:
+                if self._listener.is_cancelled:
+                    return
+                try:
+                    if await self._extract_set(archive_set, pswd, threads):
+                        continue
+                except Exception as e:
+                    LOGGER.error(f"Unable to extract {archive_set.heads}: {e}")
+                failed += 1
+
+        await gather(*(worker() for _ in range(workers)))
+        return failed
+
     async def zip(self, dl_path, up_path, pswd):
         size = await get_path_size(dl_path)
         split_size = self._listener.split_size
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import contextlib
+import json
 import os
+import re
 from logging import getLogger
+from time import time
 
 import aiohttp
 
+from bot.helper.ext_utils.cache_utils import Cache
 from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 
 LOGGER = getLogger(__name__)
@@ -12,55 +16,19 @@ LOGGER = getLogger(__name__)
 # Directory to store Google Fonts
 FONTS_DIR = "fonts"
 
-# Font styles mapping
-FONT_STYLES = {
-    # Telegram HTML Styles
-    "monospace": lambda text: f"<pre>{text}</pre>",
-    "bold": lambda text: f"<b>{text}</b>",
-    "italic": lambda text: f"<i>{text}</i>",
-    "underline": lambda text: f"<u>{text}</u>",
-    "strike": lambda text: f"<s>{text}</s>",
-    # Spoiler tag (supported by Telegram)
-    "spoiler": lambda text: f"<spoiler>{text}</spoiler>",
-    "code": lambda text: f"<code>{text}</code>",
-    "quote": lambda text: f"<blockquote>{text}</blockquote>",
-    # Combined HTML Styles (properly nested according to Telegram docs)
-    # These combinations are valid in Telegram
-    "bold_italic": lambda text: f"<b><i>{text}</i></b>",
-    "underline_italic": lambda text: f"<u><i>{text}</i></u>",
-    "underline_bold": lambda text: f"<u><b>{text}</b></u>",
-    "underline_bold_italic": lambda text: f"<u><b><i>{text}</i></b></u>",
-    # Expandable blockquote (supported by Electrogram)
-    "quote_expandable": lambda text: f"<blockquote expandable>{text}\n</blockquote>",
-    # Bold text in a blockquote
-    "bold_quote": lambda text: f"<blockquote><b>{text}</b></blockquote>",
-    # Google Unicode Font Styles - Mathematical Variants
-    "serif": lambda text: "".join([_map_to_serif(c) for c in text]),
-    "sans": lambda text: "".join([_map_to_sans(c) for c in text]),
-    "script": lambda text: "".join([_map_to_script(c) for c in text]),
-    "double": lambda text: "".join([_map_to_double(c) for c in text]),
-    "gothic": lambda text: "".join([_map_to_gothic(c) for c in text]),
-    "fraktur": lambda text: "".join([_map_to_fraktur(c) for c in text]),
-    "mono": lambda text: "".join([_map_to_mono(c) for c in text]),
-    # Additional Unicode Font Styles
-    "small_caps": lambda text: "".join([_map_to_small_caps(c) for c in text]),
-    "circled": lambda text: "".join([_map_to_circled(c) for c in text]),
-    "bubble": lambda text: "".join([_map_to_bubble(c) for c in text]),
-    "inverted": lambda text: "".join([_map_to_inverted(c) for c in text]),
-    "squared": lambda text: "".join([_map_to_squared(c) for c in text]),
-    "regional": lambda text: "".join([_map_to_regional(c) for c in text]),
-    "superscript": lambda text: "".join([_map_to_superscript(c) for c in text]),
-    "subscript": lambda text: "".join([_map_to_subscript(c) for c in text]),
-    "wide": lambda text: "".join([_map_to_wide(c) for c in text]),
-    "cursive": lambda text: "".join([_map_to_cursive(c) for c in text]),
-    # Note: Removed combined HTML styles that cannot be nested according to Telegram docs
-    # The following tags cannot contain other formatting tags in Telegram: code, pre
-    # The following combinations are valid according to Telegram docs:
-    "bold_spoiler": lambda text: f"<spoiler><b>{text}</b></spoiler>",
-    "italic_spoiler": lambda text: f"<spoiler><i>{text}</i></spoiler>",
-    "bold_quote_expandable": lambda text: f"<blockquote expandable><b>{text}</b></blockquote>",
-    "italic_quote_expandable": lambda text: f"<blockquote expandable><i>{text}</i></blockquote>",
-}
+# Results of Google Font lookups, so a style name is only looked up once
+FONT_LOOKUPS_FILE = f"{FONTS_DIR}/lookups.json"
+
+# Seconds a name that is not a Google Font is remembered, found fonts are
+# kept on disk anyway
+MISSING_FONT_TTL = 7 * 86400
+
+# Google Font family names, anything else (emoji, symbols) is never looked up
+FONT_NAME_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9 ]*")
+
+# Lower case name: [exists, checked at], loaded from FONT_LOOKUPS_FILE
+_font_lookups = None
+_resolved_fonts = Cache("google_fonts", max_entries=512)
 
 # Unicode character mappings for different font styles
 # These mappings convert regular ASCII characters to their Unicode variants
@@ -525,6 +493,78 @@ def _map_to_cursive(char):
     return cursive_map.get(char, char)
 
 
+def _translator(mapper):
+    """
+    Build a ``str.translate`` based styler from a character mapper. The
+    mappers only change printable ASCII, so the table covers all of it and
+    styling a string no longer calls a Python function per character.
+    """
+    table = str.maketrans(
+        {
+            char: mapper(char)
+            for char in map(chr, range(32, 127))
+            if mapper(char) != char
+        }
+    )
+    return lambda text: text.translate(table)
+
+
+# Font styles mapping
+FONT_STYLES = {
+    # Telegram HTML Styles
+    "monospace": lambda text: f"<pre>{text}</pre>",
+    "bold": lambda text: f"<b>{text}</b>",
+    "italic": lambda text: f"<i>{text}</i>",
+    "underline": lambda text: f"<u>{text}</u>",
+    "strike": lambda text: f"<s>{text}</s>",
+    # Spoiler tag (supported by Telegram)
+    "spoiler": lambda text: f"<spoiler>{text}</spoiler>",
+    "code": lambda text: f"<code>{text}</code>",
+    "quote": lambda text: f"<blockquote>{text}</blockquote>",
+    # Combined HTML Styles (properly nested according to Telegram docs)
+    # These combinations are valid in Telegram
+    "bold_italic": lambda text: f"<b><i>{text}</i></b>",
+    "underline_italic": lambda text: f"<u><i>{text}</i></u>",
+    "underline_bold": lambda text: f"<u><b>{text}</b></u>",
+    "underline_bold_italic": lambda text: f"<u><b><i>{text}</i></b></u>",
+    # Expandable blockquote (supported by Electrogram)
+    "quote_expandable": lambda text: f"<blockquote expandable>{text}\n</blockquote>",
+    # Bold text in a blockquote
+    "bold_quote": lambda text: f"<blockquote><b>{text}</b></blockquote>",
+    # Google Unicode Font Styles - Mathematical Variants, applied with
+    # precomputed str.translate tables
+    "serif": _translator(_map_to_serif),
+    "sans": _translator(_map_to_sans),
+    "script": _translator(_map_to_script),
+    "double": _translator(_map_to_double),
+    "gothic": _translator(_map_to_gothic),
+    "fraktur": _translator(_map_to_fraktur),
+    "mono": _translator(_map_to_mono),
+    # Additional Unicode Font Styles
+    "small_caps": _translator(_map_to_small_caps),
+    "circled": _translator(_map_to_circled),
+    "bubble": _translator(_map_to_bubble),
+    "inverted": _translator(_map_to_inverted),
+    "squared": _translator(_map_to_squared),
+    "regional": _translator(_map_to_regional),
+    "superscript": _translator(_map_to_superscript),
+    "subscript": _translator(_map_to_subscript),
+    "wide": _translator(_map_to_wide),
+    "cursive": _translator(_map_to_cursive),
+    # Note: Removed combined HTML styles that cannot be nested according to Telegram docs
+    # The following tags cannot contain other formatting tags in Telegram: code, pre
+    # The following combinations are valid according to Telegram docs:
+    "bold_spoiler": lambda text: f"<spoiler><b>{text}</b></spoiler>",
+    "italic_spoiler": lambda text: f"<spoiler><i>{text}</i></spoiler>",
+    "bold_quote_expandable": lambda text: (
+        f"<blockquote expandable><b>{text}</b></blockquote>"
+    ),
+    "italic_quote_expandable": lambda text: (
+        f"<blockquote expandable><i>{text}</i></blockquote>"
+    ),
+}
+
+
 async def apply_font_style(text, style):
     """
     Apply a font style to the given text.
@@ -697,9 +737,49 @@ async def is_google_font(font_name):
     if font_name.lower() == "style":
         return False
 
-    # Try to download the font to check if it exists
-    font_path = await download_google_font(font_name)
-    return font_path is not None
+    if not FONT_NAME_PATTERN.fullmatch(font_name):
+        return False
+
+    # Concurrent lookups of a name share one download
+    return await _resolved_fonts.get_or_load(
+        font_name.lower(), lambda: _lookup_google_font(font_name)
+    )
+
+
+def _load_font_lookups():
+    global _font_lookups
+    if _font_lookups is None:
+        _font_lookups = {}
+        with (
+            contextlib.suppress(OSError, ValueError),
+            open(FONT_LOOKUPS_FILE, encoding="utf-8") as f,
+        ):
+            _font_lookups = json.load(f)
+    return _font_lookups
+
+
+def _save_font_lookups():
+    try:
+        os.makedirs(FONTS_DIR, exist_ok=True)
+        with open(f"{FONT_LOOKUPS_FILE}.tmp", "w", encoding="utf-8") as f:
+            json.dump(_font_lookups, f)
+        os.replace(f"{FONT_LOOKUPS_FILE}.tmp", FONT_LOOKUPS_FILE)
+    except OSError as e:
+        LOGGER.warning(f"Could not save font lookups: {e}")
+
+
+async def _lookup_google_font(font_name):
+    """Whether a font exists, from earlier lookups or by downloading it"""
+    lookups = _load_font_lookups()
+    key = font_name.lower()
+    if (known := lookups.get(key)) is not None:
+        exists, checked = known
+        if exists or time() - checked < MISSING_FONT_TTL:
+            return exists
+    exists = await download_google_font(font_name) is not None
+    lookups[key] = [exists, time()]
+    _save_font_lookups()
+    return exists
 
 
 async def apply_google_font_style(text, font_name):
@@ -726,6 +806,11 @@ async def apply_google_font_style(text, font_name):
         # If not a valid Google font, treat as regular text
         return text
 
+    return google_font_markup(text, font_name, font_weight)
+
+
+def google_font_markup(text, font_name, font_weight=""):
+    """Telegram markup standing in for a Google Font that is known to exist"""
     # Since Telegram doesn't support custom fonts, we apply appropriate fallback styling
     # based on font characteristics and weight
 
@@ -1,8 +1,22 @@
+"""
+Background memory governor.
+
+Garbage collection used to be triggered inline from about fifty places
+(every ffmpeg/7z command, thread pool calls, every uploaded file), each
+time sampling memory and often running a full ``gc.collect`` right on the
+event loop. Now a single task samples memory off the loop, measures how late
+the loop wakes up and schedules rate limited collections between loop ticks
+when memory is actually under pressure. ``smart_garbage_collection`` only
+leaves a hint for that task. Every collection, including the automatic ones
+of the interpreter, is timed so the time GC paused the loop can be reported.
+"""
+
 import contextlib
 import gc
 import logging
 import threading
-import time
+from asyncio import CancelledError, Event, get_running_loop, wait_for
+from time import monotonic, perf_counter
 
 # Optional imports with fallbacks
 try:
@@ -12,20 +26,21 @@ except ImportError:
 
 LOGGER = logging.getLogger(__name__)
 
-# Optimized global state - minimal memory footprint
-_last_gc_time = 0.0  # Use 0.0 instead of time.time() for better performance
-_gc_interval = 60  # Default interval, will be updated from config
+# Seconds between loop lag measurements
+TICK_INTERVAL = 1.0
 
+# Memory is sampled every this many ticks
+SAMPLE_EVERY = 5
 
-def _is_gc_enabled():
-    """Check if garbage collection is enabled via configuration with caching."""
-    try:
-        from bot.core.config_manager import get_config_bool
+# Shortest gap in seconds between two governor collections of a generation,
+# the full collection uses GC_INTERVAL
+MIN_GAPS = {0: 5, 1: 15}
 
-        return get_config_bool("GC_ENABLED", True)
-    except ImportError:
-        # Fallback to enabled if config not available
-        return True
+# A loop lagging more than this is busy, collections wait for a calmer tick
+BUSY_LAG = 0.5
+
+# System memory percent from which generations 0, 1 and 2 are collected
+PRESSURE_LEVELS = ((90, 2), (80, 1), (60, 0))
 
 
 def _get_gc_config():
@@ -49,74 +64,214 @@ def _get_gc_config():
         }
 
 
-def force_garbage_collection(threshold_mb=None, generation=None):
-    """
-    Optimized garbage collection with configuration support.
+def monitor_thread_usage():
+    """Monitor thread usage efficiently."""
+    try:
+        thread_count = threading.active_count()
 
-    Args:
-        threshold_mb: Memory threshold in MB to trigger collection (uses config if None)
-        generation: Specific generation to collect (0, 1, 2, or None for all)
+        # Use simple threshold instead of complex limit calculation
+        if thread_count > 100:  # High threshold
+            LOGGER.warning(f"High thread usage: {thread_count}")
+            return True
+        if thread_count > 50:  # Moderate threshold
+            return True
 
-    Returns:
-        bool: True if garbage collection was performed, False if disabled or not needed
-    """
-    global _last_gc_time
+        return False
+    except Exception:
+        return False
 
-    # Get configuration settings
-    gc_config = _get_gc_config()
 
-    # Check if GC is completely disabled
-    if not gc_config["enabled"]:
-        LOGGER.debug("Garbage collection is disabled via configuration")
-        return False
+def _sample_memory():
+    """Process RSS in MB, system memory percent and thread pressure"""
+    rss_mb = 0.0
+    percent = 0.0
+    if psutil is not None:
+        with contextlib.suppress(Exception):
+            rss_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+            percent = psutil.virtual_memory().percent
+    return rss_mb, percent, monitor_thread_usage()
+
+
+class MemoryGovernor:
+    """Single sampling task that decides when and how much to collect"""
+
+    def __init__(self):
+        self._task = None
+        self._wake = Event()
+        self._hint = -1
+        self._urgent = False
+        self._pending = None
+        self._last = {0: 0.0, 1: 0.0, 2: 0.0}
+        self._gc_started = 0.0
+        self.rss_mb = 0.0
+        self.memory_percent = 0.0
+        self.lag = 0.0
+        self.lag_avg = 0.0
+        self.lag_max = 0.0
+        self.pauses = 0
+        self.pause_total = 0.0
+        self.pause_max = 0.0
+        self.collections = {0: 0, 1: 0, 2: 0}
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+        self._task = get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _on_gc(self, phase, _info):
+        # Runs for every collection, automatic ones included
+        if phase == "start":
+            self._gc_started = perf_counter()
+            return
+        if not self._gc_started:
+            return
+        pause = perf_counter() - self._gc_started
+        self._gc_started = 0.0
+        self.pauses += 1
+        self.pause_total += pause
+        self.pause_max = max(self.pause_max, pause)
+
+    def request(self, generation, urgent=False):
+        """Ask for a collection of at least ``generation`` at the next sample"""
+        self._hint = max(self._hint, generation)
+        if urgent:
+            self._urgent = True
+            self._wake.set()
+
+    async def _run(self):
+        loop = get_running_loop()
+        ticks = 0
+        while True:
+            expected = monotonic() + TICK_INTERVAL
+            with contextlib.suppress(TimeoutError):
+                await wait_for(self._wake.wait(), TICK_INTERVAL)
+            woken = self._wake.is_set()
+            self._wake.clear()
+            if not woken:
+                self.lag = max(0.0, monotonic() - expected)
+                self.lag_avg = self.lag_avg * 0.9 + self.lag * 0.1
+                self.lag_max = max(self.lag_max, self.lag)
+            ticks += 1
+            if not woken and ticks % SAMPLE_EVERY:
+                continue
+            try:
+                rss_mb, percent, busy_threads = await loop.run_in_executor(
+                    None, _sample_memory
+                )
+            except CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Memory governor sample failed: {e}")
+                continue
+            self.rss_mb = rss_mb
+            self.memory_percent = percent
+            if busy_threads:
+                self.request(1)
+            generation = self._plan()
+            if generation >= 0 and self._pending is None:
+                # Queued behind the callbacks that are ready now, so the
+                # collection runs between loop ticks and not inside one
+                self._pending = loop.call_soon(self._collect, generation)
+
+    def _plan(self):
+        """Generation to collect now, or -1"""
+        config = _get_gc_config()
+        urgent, hint = self._urgent, self._hint
+        if not config["enabled"] and not urgent:
+            self._hint = -1
+            return -1
+        pressure = next(
+            (gen for level, gen in PRESSURE_LEVELS if self.memory_percent >= level),
+            -1,
+        )
+        if pressure < 0 and self.rss_mb >= config["threshold_mb"]:
+            pressure = 0
+        if config["aggressive_mode"] and hint >= 0:
+            hint = min(hint + 1, 2)
+        # Hints only matter under pressure, otherwise the interpreter's own
+        # collections keep up
+        generation = 2 if urgent else max(pressure, hint if pressure >= 0 else -1)
+        if generation < 0:
+            return -1
+        if self.lag > BUSY_LAG and not urgent:
+            return -1
+        now = monotonic()
+        gaps = {**MIN_GAPS, 2: config["interval"]}
+        while generation >= 0 and now - self._last[generation] < (
+            MIN_GAPS[0] if urgent else gaps[generation]
+        ):
+            generation -= 1
+        if generation >= 0:
+            self._urgent = False
+            self._hint = -1
+        return generation
+
+    def _collect(self, generation):
+        self._pending = None
+        try:
+            collected = gc.collect(generation)
+            if generation == 2 and gc.garbage:
+                gc.garbage.clear()
+        except Exception as e:
+            LOGGER.error(f"GC error: {e}")
+            return
+        now = monotonic()
+        for gen in range(generation + 1):
+            self._last[gen] = now
+        self.collections[generation] += 1
+        LOGGER.debug(
+            f"Memory governor collected generation {generation}: {collected} objects"
+        )
 
-    # Use config values if not provided
-    if threshold_mb is None:
-        threshold_mb = gc_config["threshold_mb"]
+    def status(self):
+        return {
+            "rss_mb": self.rss_mb,
+            "memory_percent": self.memory_percent,
+            "loop_lag_ms": self.lag * 1000,
+            "loop_lag_avg_ms": self.lag_avg * 1000,
+            "loop_lag_max_ms": self.lag_max * 1000,
+            "gc_pauses": self.pauses,
+            "gc_pause_total_ms": self.pause_total * 1000,
+            "gc_pause_max_ms": self.pause_max * 1000,
+            "governor_collections": dict(self.collections),
+        }
 
-    current_time = time.time()
-    gc_interval = gc_config["interval"]
 
-    # Quick time-based check first (most common case)
-    if current_time - _last_gc_time < gc_interval:
-        return False
+memory_governor = MemoryGovernor()
 
-    # Memory check only if psutil is available
-    if psutil is not None:
-        try:
-            memory_mb = psutil.Process().memory_info().rss / (1024 * 1024)
-            if memory_mb < threshold_mb:
-                return False
-        except Exception:
-            pass  # Continue with time-based collection
 
-    # Perform collection
-    try:
-        if generation is not None:
-            gc.collect(generation)
-        else:
-            # Optimized: only collect what's needed
-            collected = gc.collect(0)  # Start with youngest
-            if (
-                collected > 100 or gc_config["aggressive_mode"]
-            ):  # Use config for aggressiveness
-                gc.collect(1)
-                gc.collect(2)
-
-        # Clear garbage list if not empty
-        if gc.garbage:
-            gc.garbage.clear()
-
-        _last_gc_time = current_time
-        return True
-
-    except Exception as e:
-        LOGGER.error(f"GC error: {e}")
-        return False
+def smart_garbage_collection(
+    aggressive=False,
+    for_split_file=False,
+    memory_error=False,
+    for_music_download=False,
+):
+    """
+    Hint that a collection may be worthwhile. Nothing is collected here, the
+    memory governor decides at its next sample based on memory pressure.
+    """
+    if memory_error:
+        LOGGER.warning("Memory error reported, scheduling a full collection")
+        memory_governor.request(2, urgent=True)
+    elif aggressive or for_split_file or for_music_download:
+        memory_governor.request(1)
+    else:
+        memory_governor.request(0)
+    return True
 
 
-# Memory tracking functions removed for optimization
-# They added complexity without significant benefit
+def music_download_cleanup():
+    """Hint a collection after a music download finished."""
+    return smart_garbage_collection(for_music_download=True)
 
 
 def log_memory_usage():
@@ -142,200 +297,11 @@ def get_memory_usage():
     return log_memory_usage()
 
 
-def set_gc_parameters(threshold=700, interval=60):
-    """
-    Configure garbage collection parameters.
-
-    Args:
-        threshold: Memory threshold in MB to trigger collection
-        interval: Minimum time in seconds between collections
-    """
-    global _gc_interval
-
-    try:
-        # Set Python's GC thresholds
-        # These control how many allocations trigger automatic collection
-        current_thresholds = gc.get_threshold()
-
-        # Only change if significantly different to avoid unnecessary changes
-        if abs(current_thresholds[0] - threshold) > 50:
-            gc.set_threshold(threshold, current_thresholds[1], current_thresholds[2])
-        # Set our custom interval
-        _gc_interval = interval
-    except Exception as e:
-        LOGGER.error(f"Failed to set garbage collection parameters: {e}")
-
-
-def optimized_garbage_collection(aggressive=None):
-    """Optimized garbage collection with configuration support."""
-    # Check if GC is enabled
-    if not _is_gc_enabled():
-        LOGGER.debug("Garbage collection is disabled via configuration")
-        return False
-
-    try:
-        # Get configuration
-        gc_config = _get_gc_config()
-
-        # Use config aggressive mode if not specified
-        if aggressive is None:
-            aggressive = gc_config["aggressive_mode"]
-
-        # Smart collection based on generation 0 results
-        collected_gen0 = gc.collect(0)
-
-        # Only collect older generations if needed
-        if aggressive or collected_gen0 > 1000:
-            collected_gen1 = gc.collect(1)
-            if aggressive or collected_gen1 > 100:
-                gc.collect(2)
-
-        # Clear garbage if present
-        if gc.garbage:
-            gc.garbage.clear()
-
-        return True
-    except Exception as e:
-        LOGGER.error(f"GC error: {e}")
-        return False
-
-
-def cleanup_large_objects():
-    """Optimized cleanup for critical memory situations."""
-    # Allow cleanup even if GC is disabled (emergency situations)
-    try:
-        # Clear garbage first
-        if gc.garbage:
-            gc.garbage.clear()
-
-        # Efficient collection sequence
-        gc.collect(0)
-        gc.collect(1)
-        gc.collect(2)
-
-        return True
-    except Exception as e:
-        LOGGER.error(f"GC cleanup error: {e}")
-        with contextlib.suppress(Exception):
-            gc.collect()
-        return False
-
-
-def monitor_thread_usage():
-    """Monitor thread usage efficiently."""
-    try:
-        thread_count = threading.active_count()
-
-        # Use simple threshold instead of complex limit calculation
-        if thread_count > 100:  # High threshold
-            LOGGER.warning(f"High thread usage: {thread_count}")
-            return True
-        if thread_count > 50:  # Moderate threshold
-            return True
-
-        return False
-    except Exception:
-        return False
-
-
-def smart_garbage_collection(
-    aggressive=False,
-    for_split_file=False,
-    memory_error=False,
-    for_music_download=False,
-):
-    """Smart garbage collection with configuration support and optimized decision logic."""
-    # Check if GC is enabled
-    if not _is_gc_enabled():
-        LOGGER.debug("Garbage collection is disabled via configuration")
-        return False
-
-    try:
-        # Get configuration
-        gc_config = _get_gc_config()
-
-        # Get memory usage efficiently
-        memory_percent = 0
-        if psutil is not None:
-            with contextlib.suppress(Exception):
-                memory_percent = psutil.virtual_memory().percent
-
-        # Check thread usage
-        high_thread_usage = monitor_thread_usage()
-
-        # Emergency memory cleanup (always allowed even if GC is configured conservatively)
-        if memory_error:
-            LOGGER.warning("Emergency memory cleanup - overriding GC configuration")
-            if gc.garbage:
-                gc.garbage.clear()
-            gc.collect(0)
-            gc.collect(1)
-            gc.collect(2)
-            cleanup_large_objects()
-            return True
-
-        # Determine aggressiveness (consider config setting)
-        should_be_aggressive = (
-            aggressive
-            or gc_config["aggressive_mode"]
-            or for_split_file
-            or high_thread_usage
-            or (for_music_download and memory_percent > 60)
-        )
-
-        # Collection strategy based on memory pressure
-        if should_be_aggressive or memory_percent > 90:
-            if memory_percent > 95 or for_split_file:
-                return cleanup_large_objects()
-            return optimized_garbage_collection(aggressive=True)
-        if memory_percent > 80:
-            return optimized_garbage_collection(aggressive=False)
-        if memory_percent > 60:
-            gc.collect(0)  # Quick collection of young objects
-
-        return True
-
-    except Exception as e:
-        LOGGER.error(f"Smart GC error: {e}")
-        try:
-            gc.collect()
-            return True
-        except Exception:
-            return False
-
-
-def music_download_cleanup():
-    """Optimized cleanup for music download tasks."""
-    # Check if GC is enabled
-    if not _is_gc_enabled():
-        LOGGER.debug("Garbage collection is disabled via configuration")
-        return False
-
-    try:
-        if gc.garbage:
-            gc.garbage.clear()
-
-        gc.collect(0)
-        gc.collect(1)
-
-        # Only collect gen 2 if memory is high
-        if psutil is not None:
-            try:
-                if psutil.virtual_memory().percent > 80:
-                    gc.collect(2)
-            except Exception:
-                pass
-
-        return True
-    except Exception:
-        return False
-
-
 def get_gc_status():
     """Get current garbage collection configuration and status."""
     gc_config = _get_gc_config()
 
-    status = {
+    return {
         "enabled": gc_config["enabled"],
         "interval": gc_config["interval"],
         "threshold_mb": gc_config["threshold_mb"],
@@ -343,23 +309,24 @@ def get_gc_status():
         "python_gc_enabled": gc.isenabled(),
         "python_gc_thresholds": gc.get_threshold(),
         "python_gc_counts": gc.get_count(),
+        **memory_governor.status(),
     }
 
-    # Add memory info if available
-    if psutil is not None:
-        try:
-            memory_info = psutil.Process().memory_info()
-            system_memory = psutil.virtual_memory()
-            status.update(
-                {
-                    "current_memory_mb": memory_info.rss / (1024 * 1024),
-                    "system_memory_percent": system_memory.percent,
-                }
-            )
-        except Exception:
-            pass
 
-    return status
+def gc_report():
+    """Loop lag and GC pause lines for /stats"""
+    status = memory_governor.status()
+    collections = status["governor_collections"]
+    return [
+        f"loop lag: {status['loop_lag_ms']:.0f}ms | "
+        f"avg {status['loop_lag_avg_ms']:.0f}ms | "
+        f"max {status['loop_lag_max_ms']:.0f}ms",
+        f"gc pauses: {status['gc_pauses']} | "
+        f"total {status['gc_pause_total_ms']:.0f}ms | "
+        f"max {status['gc_pause_max_ms']:.1f}ms",
+        f"governor: gen0 {collections[0]} | gen1 {collections[1]} | "
+        f"gen2 {collections[2]} | rss {status['rss_mb']:.0f}MB",
+    ]
 
 
 def log_gc_status():
@@ -372,12 +339,11 @@ def log_gc_status():
             f"Threshold: {status['threshold_mb']}MB | "
             f"Aggressive: {status['aggressive_mode']}"
         )
-
-        if "current_memory_mb" in status:
-            LOGGER.info(
-                f"💾 Memory: {status['current_memory_mb']:.1f}MB | "
-                f"System: {status['system_memory_percent']:.1f}%"
-            )
+        LOGGER.info(
+            f"💾 Memory: {status['rss_mb']:.1f}MB | "
+            f"System: {status['memory_percent']:.1f}% | "
+            f"GC paused the loop {status['gc_pause_total_ms']:.0f}ms"
+        )
     else:
         LOGGER.info("🗑️ GC Status: DISABLED via configuration")
 
@@ -420,6 +386,3 @@ def update_gc_config(
             "Cannot update GC configuration - config system not available"
         )
         return False
-
-
-# Removed unused helper functions for optimization
@@ -7,19 +7,23 @@ from asyncio import (
     sleep,
     wait_for,
 )
+from contextlib import suppress
 from datetime import datetime
-from math import ceil, floor
+from errno import ENOSPC
+from math import ceil
 from mimetypes import guess_extension
+from os import O_CREAT, O_RDWR, O_TRUNC, ftruncate, pwrite
+from os import close as os_close
+from os import open as os_open
 from os import path as ospath
 from pathlib import Path
 from re import sub
+from struct import Struct
 from sys import argv
-from time import time
 
-from aiofiles import open as aiopen
 from aioshutil import move
 
-from bot.helper.ext_utils.aiofiles_compat import makedirs, remove
+from bot.helper.ext_utils.aiofiles_compat import aiopath, makedirs, remove
 
 try:
     # Fall back to pyrogram
@@ -48,9 +52,22 @@ except ImportError:
     )
 
 
-from bot import LOGGER
+from bot import LOGGER, bot_loop
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
+from bot.helper.ext_utils.cache_utils import Cache
+
+try:
+    from os import posix_fallocate
+except ImportError:
+    posix_fallocate = None
+
+# File references per (chat, message, helper bot index), shared by downloads
+FILE_REF_CACHE = Cache("hyperdl.file_refs", max_entries=100, idle=45 * 60)
+
+# Sidecar bitmap header: magic, file size, chunk size
+BITMAP_HEADER = Struct("<4sQI")
+BITMAP_MAGIC = b"HDLB"
 
 
 class HyperTGDownload:
@@ -65,20 +82,16 @@ class HyperTGDownload:
         self.download_dir = "downloads/"
         self.directory = None
         self.num_parts = Config.HYPER_THREADS or max(8, len(self.clients))
-        self.cache_file_ref = {}
-        self.cache_last_access = {}
-        self.cache_max_size = 100
         self._processed_bytes = 0
         self.file_size = 0
         self.chunk_size = 1024 * 1024
         self.file_name = ""
+        self._fd = None
+        self._bitmap_fd = None
+        self._bitmap = bytearray()
+        self._partial = ()
         self._cancel_event = Event()
         self.session_pool = {}
-        self._clean_task = create_task(self._clean_cache())
-
-    def __del__(self):
-        if hasattr(self, "_clean_task") and not self._clean_task.done():
-            self._clean_task.cancel()
 
     async def _check_helper_bot_access(self, chat_id):
         """Check if at least one helper bot has access to the specified chat"""
@@ -187,15 +200,6 @@ class HyperTGDownload:
         # If we get here, no media was found
         raise ValueError("This message doesn't contain any downloadable media")
 
-    def _update_cache(self, index, file_ref):
-        self.cache_file_ref[index] = file_ref
-        self.cache_last_access[index] = time()
-
-        if len(self.cache_file_ref) > self.cache_max_size:
-            oldest = sorted(self.cache_last_access.items(), key=lambda x: x[1])[0][0]
-            del self.cache_file_ref[oldest]
-            del self.cache_last_access[oldest]
-
     async def get_specific_file_ref(self, mid, client, max_retries=3):
         retries = 0
         last_error = None
@@ -240,31 +244,14 @@ class HyperTGDownload:
         )
 
     async def get_file_id(self, client, index) -> FileId:
-        if index not in self.cache_file_ref:
-            file_ref = await self.get_specific_file_ref(self.message.id, client)
-            self._update_cache(index, file_ref)
-        else:
-            self.cache_last_access[index] = time()
-
-        return self.cache_file_ref[index]
-
-    async def _clean_cache(self):
-        while True:
-            await sleep(15 * 60)  # Clean every 15 minutes
-
-            current_time = time()
-            expired_keys = [
-                k
-                for k, v in self.cache_last_access.items()
-                if current_time - v > 45 * 60  # Remove entries older than 45 minutes
-            ]
-
-            if expired_keys:
-                for key in expired_keys:
-                    if key in self.cache_file_ref:
-                        del self.cache_file_ref[key]
-                    if key in self.cache_last_access:
-                        del self.cache_last_access[key]
+        chat_id = (
+            self.dump_chat[0] if isinstance(self.dump_chat, list) else self.dump_chat
+        )
+        # Parts on the same helper bot wait for one lookup of the reference
+        return await FILE_REF_CACHE.get_or_load(
+            (chat_id, self.message.id, index),
+            lambda: self.get_specific_file_ref(self.message.id, client),
+        )
 
     async def generate_media_session(self, client, file_id, index, max_retries=3):
         session_key = (index, file_id.dc_id)
@@ -376,21 +363,17 @@ class HyperTGDownload:
             thumb_size=file_id.thumbnail_size,
         )
 
-    async def get_file(
-        self,
-        offset_bytes: int,
-        first_part_cut: int,
-        last_part_cut: int,
-        part_count: int,
-        max_retries=5,
-    ):
+    async def get_file(self, first_chunk: int, chunk_count: int, max_retries=5):
+        """Yield ``(chunk_index, data)`` for a run of consecutive chunks"""
         # Select client with minimum workload
         index = min(self.work_loads, key=self.work_loads.get)
         client = self.clients[index]
-        getattr(client.me, "username", f"client_{index}")
 
         self.work_loads[index] += 1
         current_retry = 0
+        # Kept across retries so a reconnect continues where it stopped
+        current_chunk = first_chunk
+        end_chunk = first_chunk + chunk_count
 
         try:
             while current_retry < max_retries:
@@ -405,11 +388,7 @@ class HyperTGDownload:
                         self.get_location(file_id),
                     )
 
-                    current_part = 1
-                    current_offset = offset_bytes
-                    total_bytes_downloaded = 0
-
-                    while current_part <= part_count:
+                    while current_chunk < end_chunk:
                         if self._cancel_event.is_set():
                             LOGGER.info("Download cancelled during part download")
                             raise CancelledError("Download cancelled")
@@ -419,7 +398,7 @@ class HyperTGDownload:
                                 media_session.invoke(
                                     raw.functions.upload.GetFile(
                                         location=location,
-                                        offset=current_offset,
+                                        offset=current_chunk * self.chunk_size,
                                         limit=self.chunk_size,
                                     ),
                                 ),
@@ -428,24 +407,11 @@ class HyperTGDownload:
 
                             if isinstance(r, raw.types.upload.File):
                                 chunk = r.bytes
-                                chunk_size = len(chunk)
-                                total_bytes_downloaded += chunk_size
-
                                 if not chunk:
                                     break
 
-                                if part_count == 1:
-                                    yield chunk[first_part_cut:last_part_cut]
-                                elif current_part == 1:
-                                    yield chunk[first_part_cut:]
-                                elif current_part == part_count:
-                                    yield chunk[:last_part_cut]
-                                else:
-                                    yield chunk
-
-                                current_part += 1
-                                current_offset += self.chunk_size
-                                self._processed_bytes += chunk_size
+                                yield current_chunk, chunk
+                                current_chunk += 1
                             else:
                                 LOGGER.error(f"Unexpected response type: {type(r)}")
                                 raise ValueError(f"Unexpected response: {r}")
@@ -457,8 +423,8 @@ class HyperTGDownload:
                             await sleep(1)
                             continue
 
-                    if current_part <= part_count:
-                        error_msg = f"Incomplete download: got {current_part - 1} of {part_count} parts"
+                    if current_chunk < end_chunk:
+                        error_msg = f"Incomplete download: got {current_chunk - first_chunk} of {chunk_count} chunks"
                         LOGGER.error(error_msg)
                         raise ValueError(error_msg)
 
@@ -498,50 +464,123 @@ class HyperTGDownload:
                 # Otherwise continue with a short delay
                 await sleep(1)
 
-    async def single_part(self, start, end, part_index, max_retries=3):
-        until_bytes, from_bytes = min(end, self.file_size - 1), start
-        until_bytes - from_bytes + 1
-
-        offset = from_bytes - (from_bytes % self.chunk_size)
-        first_part_cut = from_bytes - offset
-        last_part_cut = until_bytes % self.chunk_size + 1
-
-        part_count = ceil(until_bytes / self.chunk_size) - floor(
-            offset / self.chunk_size
+    def _chunk_length(self, chunk_index):
+        return min(self.chunk_size, self.file_size - chunk_index * self.chunk_size)
+
+    def _is_done(self, chunk_index):
+        return self._bitmap[chunk_index >> 3] & (1 << (chunk_index & 7))
+
+    def _mark_done(self, chunk_index):
+        byte_index = chunk_index >> 3
+        self._bitmap[byte_index] |= 1 << (chunk_index & 7)
+        # Single byte positional write into the page cache, done on the loop
+        # so two workers touching the same byte can never reorder
+        pwrite(
+            self._bitmap_fd,
+            self._bitmap[byte_index : byte_index + 1],
+            BITMAP_HEADER.size + byte_index,
         )
-        part_file_path = ospath.join(
-            self.directory, f"{self.file_name}.temp.{part_index:02d}"
+
+    def _missing_runs(self, first_chunk, end_chunk):
+        """Yield ``(start, count)`` for runs of chunks not written yet"""
+        start = None
+        for chunk_index in range(first_chunk, end_chunk):
+            if self._is_done(chunk_index):
+                if start is not None:
+                    yield start, chunk_index - start
+                    start = None
+            elif start is None:
+                start = chunk_index
+        if start is not None:
+            yield start, end_chunk - start
+
+    async def _write_chunk(self, chunk_index, chunk):
+        expected = self._chunk_length(chunk_index)
+        if len(chunk) != expected:
+            raise ValueError(
+                f"Chunk {chunk_index} has {len(chunk)} bytes, expected {expected}"
+            )
+        await bot_loop.run_in_executor(
+            None, pwrite, self._fd, chunk, chunk_index * self.chunk_size
         )
+        self._mark_done(chunk_index)
+        self._processed_bytes += expected
 
+    async def single_part(self, first_chunk, end_chunk, part_index, max_retries=3):
         for attempt in range(max_retries):
             try:
-                bytes_written = 0
-
-                async with aiopen(part_file_path, "wb") as f:
-                    async for chunk in self.get_file(
-                        offset, first_part_cut, last_part_cut, part_count
-                    ):
+                # A retry only fetches the chunks the bitmap is still missing
+                for start, count in self._missing_runs(first_chunk, end_chunk):
+                    async for chunk_index, chunk in self.get_file(start, count):
                         if self._cancel_event.is_set():
                             raise CancelledError("Download cancelled")
-                        await f.write(chunk)
-                        bytes_written += len(chunk)
+                        await self._write_chunk(chunk_index, chunk)
 
-                return part_index, part_file_path
+                return part_index
 
             except (TimeoutError, ConnectionError):
                 if attempt == max_retries - 1:
                     raise
                 sleep_time = (attempt + 1) * 2
                 await sleep(sleep_time)
-                self._processed_bytes = 0
 
         # If we reach here, all attempts failed
         raise ValueError(
             f"Failed to download part {part_index} after {max_retries} attempts"
         )
 
+    def _open_target(self, temp_file_path, bitmap_path, total_chunks):
+        """
+        Open the preallocated target and its chunk bitmap, resuming from an
+        existing pair when it belongs to the same file. Runs in a thread.
+        """
+        header = BITMAP_HEADER.pack(BITMAP_MAGIC, self.file_size, self.chunk_size)
+        bitmap_len = (total_chunks + 7) >> 3
+        bitmap = None
+        if ospath.exists(temp_file_path) and ospath.exists(bitmap_path):
+            with open(bitmap_path, "rb") as f:
+                data = f.read()
+            if (
+                data[: BITMAP_HEADER.size] == header
+                and len(data) == BITMAP_HEADER.size + bitmap_len
+                and ospath.getsize(temp_file_path) == self.file_size
+            ):
+                bitmap = bytearray(data[BITMAP_HEADER.size :])
+
+        if bitmap is None:
+            bitmap = bytearray(bitmap_len)
+            fd = os_open(temp_file_path, O_RDWR | O_CREAT | O_TRUNC, 0o644)
+            try:
+                if posix_fallocate is None:
+                    ftruncate(fd, self.file_size)
+                else:
+                    try:
+                        # Reserve the blocks up front so a full disk fails
+                        # now rather than halfway through the download
+                        posix_fallocate(fd, 0, self.file_size)
+                    except OSError as e:
+                        if e.errno == ENOSPC:
+                            raise
+                        ftruncate(fd, self.file_size)
+            except BaseException:
+                os_close(fd)
+                raise
+            with open(bitmap_path, "wb") as f:
+                f.write(header + bitmap)
+        else:
+            fd = os_open(temp_file_path, O_RDWR)
+
+        bitmap_fd = os_open(bitmap_path, O_RDWR)
+        return fd, bitmap_fd, bitmap
+
+    def _close_target(self):
+        for fd in (self._fd, self._bitmap_fd):
+            if fd is not None:
+                with suppress(OSError):
+                    os_close(fd)
+        self._fd = self._bitmap_fd = None
+
     async def handle_download(self, progress, progress_args):
-        download_start_time = time()
         self._cancel_event.clear()
         await makedirs(self.directory, exist_ok=True)
 
@@ -551,6 +590,9 @@ class HyperTGDownload:
             )
             + ".temp"
         )
+        bitmap_path = f"{temp_file_path}.map"
+        self._partial = (temp_file_path, bitmap_path)
+        total_chunks = ceil(self.file_size / self.chunk_size)
 
         # Calculate optimal number of parts
         num_parts = min(self.num_parts, max(1, self.file_size // (10 * 1024 * 1024)))
@@ -558,9 +600,9 @@ class HyperTGDownload:
         if self.file_size < 10 * 1024 * 1024:
             num_parts = 1
 
-        part_size = self.file_size // num_parts if num_parts > 0 else self.file_size
+        # Each part is a contiguous run of whole chunks
         ranges = [
-            (i * part_size, min((i + 1) * part_size - 1, self.file_size - 1))
+            (i * total_chunks // num_parts, (i + 1) * total_chunks // num_parts)
             for i in range(num_parts)
         ]
 
@@ -568,8 +610,22 @@ class HyperTGDownload:
         prog_task = None
 
         try:
-            for i, (start, end) in enumerate(ranges):
-                task = create_task(self.single_part(start, end, i))
+            self._fd, self._bitmap_fd, self._bitmap = await bot_loop.run_in_executor(
+                None, self._open_target, temp_file_path, bitmap_path, total_chunks
+            )
+            self._processed_bytes = sum(
+                self._chunk_length(i)
+                for i in range(total_chunks)
+                if self._is_done(i)
+            )
+            if self._processed_bytes:
+                LOGGER.info(
+                    f"Resuming hyper download of {self.file_name} at "
+                    f"{self._processed_bytes}/{self.file_size} bytes"
+                )
+
+            for i, (first_chunk, end_chunk) in enumerate(ranges):
+                task = create_task(self.single_part(first_chunk, end_chunk, i))
                 tasks.append(task)
 
             if progress:
@@ -577,36 +633,17 @@ class HyperTGDownload:
                     self.progress_callback(progress, progress_args)
                 )
 
-            results = await gather(*tasks)
-
-            total_bytes_combined = 0
-
-            async with aiopen(temp_file_path, "wb") as temp_file:
-                for _part_index, part_file_path in sorted(
-                    results, key=lambda x: x[0]
-                ):
-                    try:
-                        part_bytes = 0
-
-                        async with aiopen(part_file_path, "rb") as part_file:
-                            while True:
-                                chunk = await part_file.read(8 * 1024 * 1024)
-                                if not chunk:
-                                    break
-                                await temp_file.write(chunk)
-                                part_bytes += len(chunk)
-                                total_bytes_combined += len(chunk)
-
-                        await remove(part_file_path)
-
-                    except Exception:
-                        raise
+            await gather(*tasks)
 
             if prog_task and not prog_task.done():
                 prog_task.cancel()
 
+            self._close_target()
+            await remove(bitmap_path)
+
             file_path = ospath.splitext(temp_file_path)[0]
             await move(temp_file_path, file_path)
+            self._partial = ()
 
             return file_path
 
@@ -614,6 +651,10 @@ class HyperTGDownload:
             raise fw
         except (CancelledError, StopTransmission):
             return None
+        except OSError as e:
+            if e.errno == ENOSPC:
+                raise
+            return None
         except Exception:
             return None
         finally:
@@ -626,16 +667,19 @@ class HyperTGDownload:
                 if not task.done():
                     task.cancel()
 
-            # Clean up temporary part files
-            for i in range(len(ranges) if "ranges" in locals() else 0):
-                part_path = ospath.join(
-                    self.directory, f"{self.file_name}.temp.{i:02d}"
-                )
-                try:
-                    if ospath.exists(part_path):
-                        await remove(part_path)
-                except Exception:
-                    pass
+            # A failed or cancelled download keeps its pair to resume from
+            self._close_target()
+
+    async def discard_partial(self):
+        """
+        Remove the resume pair of an unfinished download, for a fallback to
+        a normal download into the same directory.
+        """
+        for path in self._partial:
+            with suppress(Exception):
+                if await aiopath.exists(path):
+                    await remove(path)
+        self._partial = ()
 
     @staticmethod
     async def get_extension(file_type, mime_type):
@@ -0,0 +1,336 @@
+"""
+Local full-text index of the media search chats.
+
+``/mds`` and the inline media search used to query Telegram for every
+search: four ``search_messages`` calls per chat, plus probes and history
+scans, so a search over many channels cost dozens of round trips and often
+ran into FloodWait. Here the media messages of ``MEDIA_SEARCH_CHATS`` are
+kept in an SQLite FTS5 index. The history of a chat is read once through the
+user session and is then kept current from new, edited and deleted message
+updates, so searches run locally and return ranked pages.
+"""
+
+from asyncio import CancelledError, sleep
+from re import findall
+from sqlite3 import OperationalError, connect
+from threading import Lock
+
+from bot import LOGGER, bot_loop
+from bot.helper.ext_utils.bot_utils import sync_to_async
+
+MEDIA_INDEX_DB = "media_index.db"
+
+# Rows written per transaction while reading a chat's history
+BACKFILL_BATCH = 200
+
+COLUMNS = (
+    "chat_id",
+    "message_id",
+    "media_type",
+    "title",
+    "performer",
+    "file_name",
+    "caption",
+    "duration",
+    "file_size",
+    "mime_type",
+    "file_id",
+    "relevance",
+    "date",
+)
+
+# bm25 weights of the title, performer, file_name and caption columns
+RANK = "bm25(media_fts, 10.0, 8.0, 6.0, 3.0)"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    media_type TEXT NOT NULL,
+    title TEXT,
+    performer TEXT,
+    file_name TEXT,
+    caption TEXT,
+    duration INTEGER,
+    file_size INTEGER,
+    mime_type TEXT,
+    file_id TEXT,
+    relevance INTEGER,
+    date INTEGER,
+    UNIQUE (chat_id, message_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(
+    title, performer, file_name, caption,
+    content='media', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS media_ai AFTER INSERT ON media BEGIN
+    INSERT INTO media_fts(rowid, title, performer, file_name, caption)
+    VALUES (new.id, new.title, new.performer, new.file_name, new.caption);
+END;
+CREATE TRIGGER IF NOT EXISTS media_ad AFTER DELETE ON media BEGIN
+    INSERT INTO media_fts(media_fts, rowid, title, performer, file_name, caption)
+    VALUES ('delete', old.id, old.title, old.performer, old.file_name, old.caption);
+END;
+CREATE TRIGGER IF NOT EXISTS media_au AFTER UPDATE ON media BEGIN
+    INSERT INTO media_fts(media_fts, rowid, title, performer, file_name, caption)
+    VALUES ('delete', old.id, old.title, old.performer, old.file_name, old.caption);
+    INSERT INTO media_fts(rowid, title, performer, file_name, caption)
+    VALUES (new.id, new.title, new.performer, new.file_name, new.caption);
+END;
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id INTEGER PRIMARY KEY,
+    max_id INTEGER NOT NULL DEFAULT 0,
+    min_id INTEGER NOT NULL DEFAULT 0,
+    backfilled INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+UPSERT = (
+    f"INSERT INTO media ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(COLUMNS))}) "
+    "ON CONFLICT (chat_id, message_id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[2:])
+)
+
+
+def match_expression(query):
+    """FTS5 query matching every word of ``query``, the last one as prefix"""
+    words = findall(r"\w+", query.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class MediaIndex:
+    """SQLite store of the indexed media messages and each chat's progress"""
+
+    def __init__(self, path=MEDIA_INDEX_DB):
+        self.path = path
+        self.enabled = False
+        self.indexed = set()
+        self._conn = None
+        self._lock = Lock()
+        self._task = None
+
+    def _open(self):
+        conn = connect(self.path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except OperationalError:
+            conn.close()
+            raise
+        self._conn = conn
+        self.indexed = {
+            chat_id
+            for (chat_id,) in conn.execute(
+                "SELECT chat_id FROM chats WHERE backfilled = 1"
+            )
+        }
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, rows, chat_state=None):
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany(UPSERT, rows)
+            if chat_state is not None:
+                self._conn.execute(
+                    "INSERT INTO chats (chat_id, max_id, min_id, backfilled) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT (chat_id) DO UPDATE SET "
+                    "max_id = excluded.max_id, min_id = excluded.min_id, "
+                    "backfilled = excluded.backfilled",
+                    chat_state,
+                )
+
+    def _delete(self, chat_id, message_ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM media WHERE chat_id = ? AND message_id = ?",
+                [(chat_id, message_id) for message_id in message_ids],
+            )
+
+    def _search(self, expression, media_type, chat_ids, limit, offset):
+        where = [
+            "media_fts MATCH ?",
+            f"m.chat_id IN ({', '.join('?' * len(chat_ids))})",
+        ]
+        params = [expression, *chat_ids]
+        if media_type != "all":
+            where.append("m.media_type = ?")
+            params.append(media_type)
+        body = (
+            "FROM media_fts JOIN media m ON m.id = media_fts.rowid "
+            f"WHERE {' AND '.join(where)}"
+        )
+        with self._lock:
+            (total,) = self._conn.execute(
+                f"SELECT count(*) {body}", params
+            ).fetchone()
+            rows = self._conn.execute(
+                f"SELECT m.chat_id, m.message_id, m.media_type, m.title, "
+                f"m.performer, m.file_name, m.duration, m.file_size, m.file_id, "
+                f"m.relevance, {RANK} AS rank {body} "
+                "ORDER BY rank, m.relevance DESC, m.message_id DESC "
+                "LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return rows, total
+
+    async def start(self, client, chat_ids, row_of):
+        """
+        Open the index and read the history of the given chats in the
+        background. ``row_of(message)`` returns the row of a media message
+        in ``COLUMNS`` order, or None for other messages.
+        """
+        if self._conn is None:
+            try:
+                await sync_to_async(self._open)
+            except Exception as e:
+                LOGGER.error(f"Media index unavailable, using live search: {e}")
+                return
+        self.enabled = True
+        if client is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = bot_loop.create_task(
+            self._backfill_all(client, chat_ids, row_of)
+        )
+
+    async def _backfill_all(self, client, chat_ids, row_of):
+        for chat_id in chat_ids:
+            try:
+                await self._backfill(client, chat_id, row_of)
+            except CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Media index: could not read chat {chat_id}: {e}")
+
+    async def _read_history(self, client, chat_id, row_of, offset_id, stop_id):
+        """Yield batches of (rows, lowest id) from ``offset_id`` down"""
+        rows = []
+        lowest = offset_id
+        async for message in client.get_chat_history(chat_id, offset_id=offset_id):
+            if message.id <= stop_id:
+                break
+            lowest = message.id
+            if (row := await row_of(message)) is not None:
+                rows.append(row)
+            if len(rows) >= BACKFILL_BATCH:
+                yield rows, lowest
+                rows = []
+                # Leave room for the other users of the session
+                await sleep(0)
+        yield rows, lowest
+
+    async def _backfill(self, client, chat_id, row_of):
+        state = await sync_to_async(
+            self._execute,
+            "SELECT max_id, min_id, backfilled FROM chats WHERE chat_id = ?",
+            (chat_id,),
+        )
+        max_id, min_id, backfilled = state[0] if state else (0, 0, 0)
+        top = 0
+        if max_id:
+            async for message in client.get_chat_history(chat_id, limit=1):
+                top = message.id
+            # Catch up with the messages sent while the bot was offline
+            async for rows, _ in self._read_history(
+                client, chat_id, row_of, 0, max_id
+            ):
+                await sync_to_async(self._write, rows)
+        if not backfilled:
+            LOGGER.info(f"Media index: reading the history of {chat_id}")
+            async for rows, lowest in self._read_history(
+                client, chat_id, row_of, min_id, 0
+            ):
+                if not max_id:
+                    max_id = rows[0][1] if rows else lowest
+                min_id = lowest
+                # Saved per batch, an interrupted read resumes below min_id
+                await sync_to_async(self._write, rows, (chat_id, max_id, min_id, 0))
+            backfilled = 1
+        max_id = max(max_id, top)
+        await sync_to_async(self._write, [], (chat_id, max_id, min_id, backfilled))
+        self.indexed.add(chat_id)
+        (count,) = (
+            await sync_to_async(
+                self._execute,
+                "SELECT count(*) FROM media WHERE chat_id = ?",
+                (chat_id,),
+            )
+        )[0]
+        LOGGER.info(f"Media index: {chat_id} is current ({count} media messages)")
+
+    async def add(self, message, row_of):
+        """Index a new or edited message of a search chat"""
+        if not self.enabled:
+            return
+        row = await row_of(message)
+        if row is None:
+            # Edited into a message without media
+            await sync_to_async(self._delete, message.chat.id, [message.id])
+        else:
+            await sync_to_async(self._write, [row])
+
+    async def remove(self, chat_id, message_ids):
+        if self.enabled and message_ids:
+            await sync_to_async(self._delete, chat_id, message_ids)
+
+    def covers(self, chat_id):
+        return self.enabled and chat_id in self.indexed
+
+    async def search(self, query, media_type, chat_ids, limit=50, offset=0):
+        """
+        Ranked results of the indexed chats among ``chat_ids`` as result
+        dicts of the media search, and the total number of matches
+        """
+        expression = match_expression(query)
+        chat_ids = [chat_id for chat_id in chat_ids if self.covers(chat_id)]
+        if expression is None or not chat_ids:
+            return [], 0
+        try:
+            rows, total = await sync_to_async(
+                self._search, expression, media_type, chat_ids, limit, offset
+            )
+        except OperationalError as e:
+            LOGGER.error(f"Media index query failed for {query!r}: {e}")
+            return [], 0
+        return [
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "title": title or file_name or "",
+                "performer": performer or "",
+                "duration": duration or 0,
+                "file_size": file_size or 0,
+                "file_id": file_id or "",
+                "file_name": file_name or "",
+                "client": "user",
+                # bm25 is negative, better matches are more negative
+                "relevance": (relevance or 0) + round(-rank * 10),
+                "media_type": media_type_found,
+            }
+            for (
+                chat_id,
+                message_id,
+                media_type_found,
+                title,
+                performer,
+                file_name,
+                duration,
+                file_size,
+                file_id,
+                relevance,
+                rank,
+            ) in rows
+        ], total
+
+
+media_index = MediaIndex()
@@ -0,0 +1,537 @@
+"""
+Execution plan for the media tools of a task.
+
+The media tools used to run one after the other and each of watermark,
+trim, track removal, metadata and conversion read and wrote the whole file
+again, so a big remux with a watermark, tags and a conversion went through
+ffmpeg four times. The stages of a task are now planned first:
+
+- the first run of adjacent stages that ffmpeg can apply together is
+  compiled into one invocation per video file: the trim seek around the
+  input, the stream maps of the watermark and the removal, the watermark
+  filter, one set of codec options, the tags and the output container
+- a file only gets the stages of the run up to the first one it does not
+  fit, so the order of the stages stays the same
+- files written by the fused pass are remembered by inode and the stages
+  it covered skip them, everything else (other files, settings that cannot
+  be fused, a failed fused pass) still runs stage by stage
+- the plan is written to the log
+"""
+
+import os
+from os import path as ospath
+from os import walk
+
+from bot import LOGGER, cpu_eater_lock, task_dict, task_dict_lock
+from bot.core.config_manager import Config
+from bot.helper.aeon_utils.command_gen import (
+    get_metadata_cmd,
+    get_trim_cmd,
+    get_watermark_cmd,
+)
+from bot.helper.ext_utils.aiofiles_compat import aiopath, remove
+from bot.helper.ext_utils.bot_utils import sync_to_async
+from bot.helper.ext_utils.media_utils import FFMpeg, get_media_type, get_streams
+from bot.helper.mirror_leech_utils.status_utils.ffmpeg_status import FFmpegStatus
+
+# Stages that can be compiled into one ffmpeg invocation
+FUSIBLE = ("watermark", "trim", "remove", "metadata", "convert")
+
+# Containers the fused pass may convert to
+CONVERT_EXTS = ("mp4", "mkv", "mov")
+
+STREAM_TYPES = ("v", "a", "s", "t")
+REMOVE_TYPES = (
+    ("audio", "a", "ra"),
+    ("subtitle", "s", "rs"),
+    ("attachment", "t", "rt"),
+)
+
+# Removal settings the fused pass does not apply, all of them must be unset
+REMOVE_OPTIONS = (
+    "remove_video_codec",
+    "remove_audio_codec",
+    "remove_subtitle_codec",
+    "remove_video_format",
+    "remove_audio_format",
+    "remove_subtitle_format",
+    "remove_attachment_format",
+    "remove_video_quality",
+    "remove_video_preset",
+    "remove_video_bitrate",
+    "remove_video_resolution",
+    "remove_video_fps",
+    "remove_audio_bitrate",
+    "remove_audio_channels",
+    "remove_audio_sampling",
+    "remove_audio_volume",
+    "remove_subtitle_language",
+    "remove_subtitle_encoding",
+    "remove_subtitle_font",
+    "remove_subtitle_font_size",
+    "remove_attachment_filter",
+)
+
+
+def _unset(value):
+    return value is None or str(value).strip().lower() in {"", "none", "0"}
+
+
+def _option(cmd, name):
+    """Value of the last ``name`` option of ``cmd``"""
+    value = None
+    for i, arg in enumerate(cmd[:-1]):
+        if arg == name:
+            value = cmd[i + 1]
+    return value
+
+
+def _map_states(maps):
+    """
+    Which input streams of each type reach the output, as ``"all"``,
+    ``"first"`` or ``"none"``. Returns None when stream indexes are not kept
+    one to one.
+    """
+    states = dict.fromkeys(STREAM_TYPES, "none")
+    for spec in maps:
+        negative = spec.startswith("-")
+        parts = spec.lstrip("-").rstrip("?").split(":")
+        if parts[0] != "0" or len(parts) > 3:
+            return None
+        if len(parts) == 1:
+            if negative:
+                return None
+            states = dict.fromkeys(STREAM_TYPES, "all")
+            continue
+        stream_type = parts[1]
+        if stream_type not in STREAM_TYPES:
+            return None
+        if len(parts) == 2:
+            states[stream_type] = "none" if negative else "all"
+        elif parts[2] == "0" and not negative:
+            if states[stream_type] == "none":
+                states[stream_type] = "first"
+        else:
+            return None
+    return states
+
+
+async def _file_key(path):
+    try:
+        st = await sync_to_async(os.stat, path)
+    except OSError:
+        return None
+    # Renames keep the inode and mtime, so the file is still recognised
+    # after a later stage moves it
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class MediaPlan:
+    """Stage order of one task and the stages fused into one ffmpeg pass"""
+
+    def __init__(self, listener, tools, metadata):
+        """``tools`` are the media tools of the task in the order they run"""
+        self.listener = listener
+        self.stages = list(tools)
+        if metadata:
+            self.stages.append("metadata")
+        if listener.ffmpeg_cmds:
+            self.stages.append("ffmpeg")
+        if listener.name_sub:
+            # Substitutions may depend on the extension before conversion
+            self.stages.append("rename")
+        if listener.convert_audio or listener.convert_video:
+            self.stages.append("convert")
+        if listener.sample_video:
+            self.stages.append("sample")
+        self.fused = self._pick_run()
+        self._covered = {}
+        if self.stages:
+            LOGGER.info(self.describe())
+
+    # Settings of the whole task
+
+    def _watermark_fits(self):
+        listener = self.listener
+        return bool(
+            listener.watermark
+            and listener.watermark_remove_original
+            and not getattr(listener, "watermark_image", None)
+            and not listener.image_watermark_enabled
+            and not listener.audio_watermark_enabled
+            and not listener.subtitle_watermark_enabled
+        )
+
+    def _trim_fits(self):
+        listener = self.listener
+        if not listener.trim_enabled or not listener.trim_delete_original:
+            return False
+        if not listener.trim and not hasattr(listener, "trim_start_time"):
+            return False
+        if listener.trim_video_enabled and not (
+            _unset(listener.trim_video_codec)
+            and _unset(listener.trim_video_preset)
+            and _unset(listener.trim_video_format)
+        ):
+            return False
+        return not listener.trim_audio_enabled or (
+            _unset(listener.trim_audio_codec) and _unset(listener.trim_audio_format)
+        )
+
+    def _remove_fits(self):
+        listener = self.listener
+        if listener.remove_video_enabled or not listener.remove_delete_original:
+            return False
+        removed = False
+        for name, _, _ in REMOVE_TYPES:
+            if not getattr(listener, f"remove_{name}_enabled", False):
+                continue
+            removed = True
+            # Only whole stream types, indexes shift the per-stream tags
+            if getattr(listener, f"remove_{name}_index", None) is not None or (
+                getattr(listener, f"remove_{name}_indices", None)
+            ):
+                return False
+        if not removed and not listener.remove_metadata:
+            return False
+        return all(_unset(getattr(listener, name, None)) for name in REMOVE_OPTIONS)
+
+    def _convert_ext(self):
+        """Target of a plain video conversion, None for anything else"""
+        spec = self.listener.convert_video
+        if not spec or not isinstance(spec, str):
+            return None
+        spec = spec.replace("-del", "").split()
+        # A + or - file filter is left to the conversion stage
+        if len(spec) != 1 or spec[0].lower() not in CONVERT_EXTS:
+            return None
+        return spec[0].lower()
+
+    def _fits(self, stage):
+        if stage == "watermark":
+            return self._watermark_fits()
+        if stage == "trim":
+            return self._trim_fits()
+        if stage == "remove":
+            return self._remove_fits()
+        if stage == "convert":
+            return self._convert_ext() is not None
+        return stage == "metadata"
+
+    def _pick_run(self):
+        run = []
+        for stage in self.stages:
+            if stage in FUSIBLE and self._fits(stage):
+                run.append(stage)
+                continue
+            if len(run) > 1:
+                break
+            run = []
+        return tuple(run) if len(run) > 1 else ()
+
+    def describe(self):
+        if not self.stages:
+            return f"Media plan for {self.listener.name}: nothing to run"
+        passes = []
+        for stage in self.stages:
+            if stage not in self.fused:
+                passes.append(stage)
+            elif stage == self.fused[0]:
+                passes.append(f"[{'+'.join(self.fused)}] in one ffmpeg pass")
+        return f"Media plan for {self.listener.name}: {' -> '.join(passes)}"
+
+    def stage(self, name, func):
+        """``func`` of stage ``name``, preceded by the fused pass if it is first"""
+        if not self.fused or name != self.fused[0]:
+            return func
+
+        async def run_stage(dl_path, gid):
+            dl_path = await self.run(dl_path, gid)
+            if self.listener.is_cancelled:
+                return dl_path
+            self.listener.clear()
+            return await func(dl_path, gid)
+
+        return run_stage
+
+    async def covers(self, stage, path):
+        """``stage`` was already applied to ``path`` by the fused pass"""
+        if not self._covered:
+            return False
+        key = await _file_key(path)
+        return key is not None and stage in self._covered.get(key, ())
+
+    # Command of one file
+
+    async def _metadata_options(self, path, maps):
+        listener = self.listener
+        cmd, _ = await get_metadata_cmd(
+            path,
+            listener.metadata,
+            title=listener.metadata_title,
+            author=listener.metadata_author,
+            comment=listener.metadata_comment,
+            metadata_all=listener.metadata_all,
+            video_title=listener.metadata_video_title,
+            video_author=listener.metadata_video_author,
+            video_comment=listener.metadata_video_comment,
+            audio_title=listener.metadata_audio_title,
+            audio_author=listener.metadata_audio_author,
+            audio_comment=listener.metadata_audio_comment,
+            subtitle_title=listener.metadata_subtitle_title,
+            subtitle_author=listener.metadata_subtitle_author,
+            subtitle_comment=listener.metadata_subtitle_comment,
+        )
+        if not cmd or cmd[0] != "xtra" or "-map_metadata" not in cmd:
+            return None
+        states = _map_states(maps)
+        if states is None:
+            return None
+        options = []
+        for i, arg in enumerate(cmd[:-2]):
+            if arg != "-map_metadata" and not arg.startswith("-metadata"):
+                continue
+            parts = arg.split(":")
+            if len(parts) == 4 and parts[1] == "s":
+                state = states.get(parts[2], "none")
+                if state == "none" or (state == "first" and parts[3] != "0"):
+                    # The stream is not in the output
+                    continue
+            options.extend((arg, cmd[i + 1]))
+        return options
+
+    async def _watermark_cmd(self, path):
+        listener = self.listener
+        cmd, _ = await get_watermark_cmd(
+            path,
+            listener.watermark,
+            listener.watermark_position,
+            listener.watermark_size,
+            listener.watermark_color,
+            listener.watermark_font,
+            True,
+            listener.user_dict.get("WATERMARK_OPACITY", Config.WATERMARK_OPACITY),
+            quality=None,
+            speed=listener.user_dict.get("WATERMARK_SPEED", Config.WATERMARK_SPEED),
+            remove_original=True,
+        )
+        if not cmd or "-vf" not in cmd or "-filter_complex" in cmd:
+            return None
+        return cmd
+
+    async def _trim_times(self, path):
+        listener = self.listener
+        cmd, _ = await get_trim_cmd(
+            path,
+            listener.trim,
+            start_time=getattr(listener, "trim_start_time", None),
+            end_time=getattr(listener, "trim_end_time", None),
+            delete_original=True,
+        )
+        if not cmd or cmd[0] != "xtra":
+            return None
+        return _option(cmd, "-ss"), _option(cmd, "-to")
+
+    async def _build(self, path):
+        """Fused command, temporary and final path and stages of one file"""
+        if await get_media_type(path) != "video":
+            return None
+        streams = await get_streams(path) or []
+        if not any(
+            s.get("codec_type") == "video"
+            and not s.get("disposition", {}).get("attached_pic")
+            for s in streams
+        ):
+            return None
+        present = {s.get("codec_type") for s in streams}
+        listener = self.listener
+        stages = []
+        seek, end = None, None
+        watermark = None
+        removed = set()
+        meta = []
+        convert_ext = None
+        for stage in self.fused:
+            if stage == "watermark":
+                if (watermark := await self._watermark_cmd(path)) is None:
+                    break
+            elif stage == "trim":
+                if (times := await self._trim_times(path)) is None:
+                    break
+                seek, end = times
+            elif stage == "remove":
+                removed = {
+                    letter
+                    for name, letter, _ in REMOVE_TYPES
+                    if getattr(listener, f"remove_{name}_enabled", False)
+                }
+            elif stage == "metadata":
+                maps = self._maps(watermark, removed)
+                if (options := await self._metadata_options(path, maps)) is None:
+                    break
+                meta = options
+            elif stage == "convert":
+                convert_ext = self._convert_ext()
+                if path.lower().endswith(f".{convert_ext}"):
+                    break
+                # Subtitles and attachments mostly need a transcode or are
+                # dropped there, the conversion stage knows how to retry
+                if convert_ext != "mkv" and (
+                    ("subtitle" in present and "s" not in removed)
+                    or ("attachment" in present and "t" not in removed)
+                ):
+                    break
+            stages.append(stage)
+        if len(stages) < 2:
+            return None
+        if "convert" not in stages:
+            convert_ext = None
+
+        final = path
+        if "remove" in stages:
+            suffix = [tag for _, letter, tag in REMOVE_TYPES if letter in removed]
+            if listener.remove_metadata:
+                suffix.append("rm")
+            final = f"{path.rsplit('.', 1)[0]}_{'_'.join(suffix)}{ospath.splitext(path)[1]}"
+        if convert_ext:
+            final = f"{ospath.splitext(final)[0]}.{convert_ext}"
+        # The watermark stage writes Matroska whatever the name is
+        out_ext = (
+            ".mkv"
+            if "watermark" in stages and not convert_ext
+            else ospath.splitext(final)[1]
+        )
+        temp = f"{final}.temp{out_ext}"
+
+        cmd = ["xtra", "-hide_banner", "-loglevel", "error", "-progress", "pipe:1"]
+        if seek:
+            cmd.extend(["-ss", seek])
+        cmd.extend(["-i", path])
+        if end:
+            cmd.extend(["-to", end])
+        cmd.append("-ignore_unknown")
+        for spec in self._maps(
+            watermark if "watermark" in stages else None, removed
+        ):
+            cmd.extend(["-map", spec])
+        cmd.extend(
+            self._video_options(
+                watermark if "watermark" in stages else None, convert_ext
+            )
+        )
+        cmd.extend(["-c:a", "copy", "-c:s", "copy"])
+        if seek or end:
+            cmd.extend(["-avoid_negative_ts", "make_zero"])
+        if convert_ext in ("mp4", "mov"):
+            cmd.extend(["-movflags", "+faststart"])
+        if (
+            listener.remove_metadata
+            and "remove" in stages
+            and "-map_metadata" not in meta
+        ):
+            cmd.extend(["-map_metadata", "-1"])
+        cmd.extend(meta)
+        cmd.append(temp)
+        return cmd, temp, final, stages
+
+    @staticmethod
+    def _maps(watermark, removed):
+        if watermark is not None:
+            # The watermark keeps the main video stream only
+            maps = ["0:v:0"]
+            maps.extend(f"0:{letter}?" for letter in "ast" if letter not in removed)
+            return maps
+        return ["0", *(f"-0:{letter}" for letter in "ast" if letter in removed)]
+
+    def _video_options(self, watermark, convert_ext):
+        listener = self.listener
+        codec = (
+            getattr(listener, "convert_video_codec", None) if convert_ext else None
+        )
+        custom = not _unset(codec) and codec.lower() != "copy"
+        if watermark is None and not custom:
+            return ["-c:v", "copy"]
+        options = []
+        if watermark is not None:
+            options.extend(["-vf", _option(watermark, "-vf")])
+        crf = preset = None
+        if custom:
+            crf = getattr(listener, "convert_video_crf", None)
+            preset = getattr(listener, "convert_video_preset", None)
+        if watermark is not None:
+            # A conversion after the watermark used to encode a second time,
+            # its codec is used for the one encode now
+            codec = codec if custom else _option(watermark, "-c:v")
+            crf = crf if not _unset(crf) else _option(watermark, "-crf")
+            preset = preset if not _unset(preset) else _option(watermark, "-preset")
+        options.extend(["-c:v", codec, "-pix_fmt", "yuv420p"])
+        if not _unset(crf):
+            options.extend(["-crf", str(crf)])
+        if not _unset(preset):
+            options.extend(["-preset", str(preset)])
+        return options
+
+    # Running the pass
+
+    async def run(self, dl_path, gid):
+        """Run the fused pass over ``dl_path``, returns the path after it"""
+        listener = self.listener
+        if listener.is_file:
+            paths = [dl_path]
+        else:
+            paths = [
+                ospath.join(dirpath, file_)
+                for dirpath, _, files in await sync_to_async(walk, dl_path)
+                for file_ in files
+            ]
+        ffmpeg = FFMpeg(listener)
+        checked = False
+        try:
+            for path in paths:
+                if listener.is_cancelled:
+                    return ""
+                try:
+                    job = await self._build(path)
+                except Exception as e:
+                    LOGGER.error(f"Media plan: could not plan {path}: {e}")
+                    job = None
+                if job is None:
+                    continue
+                cmd, temp, final, stages = job
+                if not checked:
+                    checked = True
+                    async with task_dict_lock:
+                        task_dict[listener.mid] = FFmpegStatus(
+                            listener,
+                            ffmpeg,
+                            gid,
+                            stages[0].capitalize(),
+                        )
+                    listener.progress = False
+                    await cpu_eater_lock.acquire()
+                    listener.progress = True
+                listener.subsize = await aiopath.getsize(path)
+                listener.subname = ospath.basename(path)
+                LOGGER.info(f"Running {'+'.join(stages)} in one pass: {path}")
+                if await ffmpeg.metadata_watermark_cmds(cmd, path) and (
+                    await aiopath.exists(temp)
+                ):
+                    os.replace(temp, final)
+                    if final != path and await aiopath.exists(path):
+                        await remove(path)
+                    if (key := await _file_key(final)) is not None:
+                        self._covered[key] = set(stages)
+                    if path == dl_path:
+                        dl_path = final
+                    continue
+                if await aiopath.exists(temp):
+                    await remove(temp)
+                if listener.is_cancelled:
+                    return ""
+                LOGGER.warning(
+                    f"Fused {'+'.join(stages)} pass failed, running the stages one by one: {path}"
+                )
+        finally:
+            if checked:
+                cpu_eater_lock.release()
+        return dl_path
@@ -0,0 +1,175 @@
+"""
+Shared ffprobe service.
+
+Every media helper (stream listing, duration and tags, document type, the
+FFmpeg tools, the uploader and MediaInfo) used to run its own ffprobe on the
+same file. Here a file is probed once with format, streams and chapters and
+the parsed result is cached by ``(path, size, mtime, inode)``, so an edited or
+replaced file is probed again while an unchanged one never is. Concurrent
+lookups of the same file share one ffprobe process.
+"""
+
+import json
+
+from aiofiles.os import stat as aiostat
+
+from bot import LOGGER
+
+from .bot_utils import cmd_exec
+from .cache_utils import Cache
+
+# Bounds for the result cache: entry count and the summed size of the raw
+# ffprobe JSON, which is a close estimate of the parsed objects' footprint
+PROBE_CACHE_ENTRIES = 256
+PROBE_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class MediaProbe:
+    """Parsed ``ffprobe -show_format -show_streams -show_chapters`` output"""
+
+    __slots__ = (
+        "chapters",
+        "format",
+        "mtime",
+        "path",
+        "programs",
+        "raw_size",
+        "size",
+        "streams",
+    )
+
+    def __init__(self, path, size, mtime, data, raw_size):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.format = data.get("format") or {}
+        self.streams = data.get("streams") or []
+        self.chapters = data.get("chapters") or []
+        self.programs = data.get("programs") or []
+        self.raw_size = raw_size
+
+    @property
+    def duration(self):
+        try:
+            return float(self.format.get("duration", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    @property
+    def tags(self):
+        return self.format.get("tags") or {}
+
+    def tag(self, name):
+        """Case-insensitive container tag lookup"""
+        tags = self.tags
+        return tags.get(name) or tags.get(name.upper()) or tags.get(name.title())
+
+    @property
+    def artist(self):
+        return self.tag("artist")
+
+    @property
+    def title(self):
+        return self.tag("title")
+
+    def streams_of(self, codec_type):
+        return [s for s in self.streams if s.get("codec_type") == codec_type]
+
+    @property
+    def video_streams(self):
+        """Real video streams, without attached pictures (cover art)"""
+        return [
+            s
+            for s in self.streams_of("video")
+            if not (s.get("disposition") or {}).get("attached_pic")
+        ]
+
+    @property
+    def audio_streams(self):
+        return self.streams_of("audio")
+
+    @property
+    def subtitle_streams(self):
+        return self.streams_of("subtitle")
+
+    @property
+    def has_video(self):
+        """True when there is a video stream that is not a still image codec"""
+        return any(
+            (s.get("codec_name") or "").lower() not in {"mjpeg", "png", "bmp"}
+            for s in self.streams_of("video")
+        )
+
+    @property
+    def has_audio(self):
+        return bool(self.audio_streams)
+
+    def as_dict(self):
+        """The ffprobe JSON layout, for code that parses it directly"""
+        return {
+            "format": self.format,
+            "streams": self.streams,
+            "chapters": self.chapters,
+            "programs": self.programs,
+        }
+
+
+def _probe_weight(probe):
+    # Failures are remembered with a nominal size so non-media files are not
+    # probed again by every helper
+    return probe.raw_size if probe is not None else 256
+
+
+probe_cache = Cache(
+    "media_probe",
+    max_entries=PROBE_CACHE_ENTRIES,
+    max_weight=PROBE_CACHE_BYTES,
+    weigher=_probe_weight,
+)
+
+
+async def _run_probe(path, size, mtime):
+    stdout, stderr, code = await cmd_exec(
+        [
+            "ffprobe",  # Keep as ffprobe, not xtra
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            "-show_chapters",
+            "-show_programs",
+            path,
+        ],
+    )
+    if code != 0 or not stdout:
+        LOGGER.error(f"ffprobe failed for {path}: {stderr}")
+        return None, 0
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError:
+        LOGGER.error(f"Invalid JSON in ffprobe output for {path}")
+        return None, 0
+    return MediaProbe(path, size, mtime, data, len(stdout)), len(stdout)
+
+
+async def probe_media(path):
+    """
+    Return the cached ``MediaProbe`` of a file, running ffprobe only when the
+    file is new or has changed. Returns None when the file is missing or
+    ffprobe cannot read it; that outcome is cached too.
+    """
+    try:
+        st = await aiostat(path)
+    except OSError:
+        LOGGER.error(f"File not found: {path}")
+        return None
+    key = (path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+    async def load():
+        probe, _ = await _run_probe(path, st.st_size, st.st_mtime)
+        return probe
+
+    return await probe_cache.get_or_load(key, load)
@@ -1,6 +1,4 @@
 import contextlib
-import gc
-import json
 import os
 import resource
 import shutil
@@ -23,18 +21,13 @@ from bot.helper.ext_utils.aiofiles_compat import aiopath, makedirs, remove
 
 from .bot_utils import cmd_exec, sync_to_async
 from .files_utils import get_mime_type, get_path_size, is_archive, is_archive_split
+from .gc_utils import smart_garbage_collection
+from .media_probe import probe_media
+from .split_pipeline import NULL_PART_SINK
 from .status_utils import time_to_seconds
 
-try:
-    from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-except ImportError:
-    smart_garbage_collection = None
-
-# Optimized media information cache with reduced memory footprint
-# This cache stores information about media files to avoid repeated ffprobe calls
-# The key is the file path and modification time, and the value is the media information
-MEDIA_INFO_CACHE = {}
-MEDIA_STREAMS_CACHE = {}
+# Caches the extension/content based media type of a file, keyed by path and
+# modification time. ffprobe results themselves are cached in media_probe.
 MEDIA_TYPE_CACHE = {}
 
 # Reduced maximum cache size to save memory
@@ -71,64 +64,13 @@ async def get_streams(file):
     Returns:
         list: List of stream dictionaries, or None if an error occurs
     """
-    # Check if file exists
-    if not await aiopath.exists(file):
-        LOGGER.error(f"File not found: {file}")
+    probe = await probe_media(file)
+    if probe is None:
         return None
-
-    # Get file modification time for cache key
-    try:
-        mtime = os.path.getmtime(file)
-        cache_key = f"{file}_{mtime}"
-
-        # Check if we have this in cache
-        if cache_key in MEDIA_STREAMS_CACHE:
-            return MEDIA_STREAMS_CACHE[cache_key]
-    except Exception:
-        cache_key = None
-
-    # If not in cache or couldn't get mtime, run ffprobe
-    cmd = [
-        "ffprobe",  # Keep as ffprobe, not xtra
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-print_format",
-        "json",
-        "-show_streams",
-        file,
-    ]
-
-    # Execute the command
-    stdout, stderr, code = await cmd_exec(cmd)
-
-    if code != 0:
-        LOGGER.error(f"Error getting stream info: {stderr}")
-        return None
-
-    try:
-        streams = json.loads(stdout)["streams"]
-
-        # Cache the result if we have a valid cache key
-        if cache_key and streams:
-            # If cache is too large, remove oldest entries
-            if len(MEDIA_STREAMS_CACHE) >= MAX_CACHE_SIZE:
-                # Remove the first item (oldest)
-                MEDIA_STREAMS_CACHE.pop(next(iter(MEDIA_STREAMS_CACHE)))
-
-            MEDIA_STREAMS_CACHE[cache_key] = streams
-
-        return streams
-    except KeyError:
-        LOGGER.error(
-            f"No streams found in the ffprobe output: {stdout}",
-        )
-        return None
-    except json.JSONDecodeError:
-        LOGGER.error(
-            f"Invalid JSON in ffprobe output: {stdout}",
-        )
+    if not probe.streams:
+        LOGGER.error(f"No streams found in the ffprobe output for {file}")
         return None
+    return probe.streams
 
 
 async def create_thumb(msg, _id=""):
@@ -175,70 +117,10 @@ async def get_media_info(path):
     Returns:
         tuple: (duration, artist, title)
     """
-    # Check if file exists
-    if not await aiopath.exists(path):
-        LOGGER.error(f"File not found: {path}")
-        return 0, None, None
-
-    # Get file modification time for cache key
-    try:
-        mtime = os.path.getmtime(path)
-        cache_key = f"{path}_{mtime}"
-
-        # Check if we have this in cache
-        if cache_key in MEDIA_INFO_CACHE:
-            return MEDIA_INFO_CACHE[cache_key]
-    except Exception:
-        cache_key = None
-
-    # If not in cache or couldn't get mtime, run ffprobe
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",  # Keep as ffprobe, not xtra
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_format",
-                path,
-            ],
-        )
-    except Exception as e:
-        LOGGER.error(f"Get Media Info: {e}. Mostly File not found! - File: {path}")
+    probe = await probe_media(path)
+    if probe is None or not probe.format:
         return 0, None, None
-
-    if result[0] and result[2] == 0:
-        try:
-            # Use json.loads instead of eval for better security and performance
-            data = json.loads(result[0])
-            fields = data.get("format")
-
-            if fields is None:
-                LOGGER.error(f"get_media_info: {result}")
-                return 0, None, None
-
-            duration = round(float(fields.get("duration", 0)))
-            tags = fields.get("tags", {})
-            artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
-            title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
-
-            # Cache the result if we have a valid cache key
-            if cache_key:
-                # If cache is too large, remove oldest entries
-                if len(MEDIA_INFO_CACHE) >= MAX_CACHE_SIZE:
-                    # Remove the first item (oldest)
-                    MEDIA_INFO_CACHE.pop(next(iter(MEDIA_INFO_CACHE)))
-
-                MEDIA_INFO_CACHE[cache_key] = (duration, artist, title)
-
-            return duration, artist, title
-        except json.JSONDecodeError:
-            LOGGER.error(f"Invalid JSON in ffprobe output: {result[0]}")
-            return 0, None, None
-
-    return 0, None, None
+    return round(probe.duration), probe.artist, probe.title
 
 
 async def get_document_type(path):
@@ -318,48 +200,12 @@ async def get_document_type(path):
         return is_video, is_audio, is_image
 
     # For video and more complex media files, use ffprobe for detailed analysis
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",  # Keep as ffprobe, not xtra
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ],
-        )
-        if result[1] and mime_type.startswith("video"):
-            is_video = True
-    except Exception as e:
-        LOGGER.error(
-            f"Get Document Type: {e}. Mostly File not found! - File: {path}",
-        )
-        if mime_type.startswith("audio"):
-            return False, True, False
-        if not mime_type.startswith("video") and not mime_type.endswith(
-            "octet-stream",
-        ):
-            return is_video, is_audio, is_image
+    probe = await probe_media(path)
+    if probe is None:
         if mime_type.startswith("video"):
             is_video = True
         return is_video, is_audio, is_image
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("streams")
-        if fields is None:
-            LOGGER.error(f"get_document_type: {result}")
-            return is_video, is_audio, is_image
-        is_video = False
-        for stream in fields:
-            if stream.get("codec_type") == "video":
-                codec_name = stream.get("codec_name", "").lower()
-                if codec_name not in {"mjpeg", "png", "bmp"}:
-                    is_video = True
-            elif stream.get("codec_type") == "audio":
-                is_audio = True
-    return is_video, is_audio, is_image
+    return probe.has_video, probe.has_audio, is_image
 
 
 async def get_media_type(file_path):
@@ -5030,44 +4876,12 @@ class FFMpeg:
         Returns:
             list: A list of stream indices
         """
-        from bot.helper.ext_utils.bot_utils import cmd_exec
-
-        # Map stream type to ffprobe stream specifier
-        stream_specifier = {
-            "video": "v",
-            "audio": "a",
-            "subtitle": "s",
-            "attachment": "t",
-        }.get(stream_type, "v")
-
-        try:
-            # Use ffprobe to get stream information
-            result = await cmd_exec(
-                [
-                    "ffprobe",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-select_streams",
-                    stream_specifier,
-                    "-show_entries",
-                    "stream=index",
-                    "-of",
-                    "csv=p=0",
-                    file_path,
-                ]
+        return [
+            stream.get("index", 0)
+            for stream in await self._get_detailed_stream_info(
+                file_path, stream_type
             )
-
-            if result[0] and result[2] == 0:
-                # Parse the output to get stream indices
-                return [
-                    int(idx) for idx in result[0].strip().split("\n") if idx.strip()
-                ]
-            LOGGER.error(f"Error getting {stream_type} stream info: {result[1]}")
-            return []
-        except Exception as e:
-            LOGGER.error(f"Exception getting {stream_type} stream info: {e}")
-            return []
+        ]
 
     async def _get_detailed_stream_info(self, file_path, stream_type):
         """
@@ -5080,63 +4894,26 @@ class FFMpeg:
         Returns:
             list: A list of dictionaries with stream information
         """
-        from bot.helper.ext_utils.bot_utils import cmd_exec
-
-        # Map stream type to ffprobe stream specifier
-        stream_specifier = {
-            "video": "v",
-            "audio": "a",
-            "subtitle": "s",
-            "attachment": "t",
-        }.get(stream_type, "v")
-
-        try:
-            # Use ffprobe to get detailed stream information
-            result = await cmd_exec(
-                [
-                    "ffprobe",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-select_streams",
-                    stream_specifier,
-                    "-show_entries",
-                    "stream=index,codec_name,codec_type:stream_tags=language,title",
-                    "-of",
-                    "json",
-                    file_path,
-                ]
-            )
-
-            if result[0] and result[2] == 0:
-                import json
-
-                # Parse the output to get stream information
-                data = json.loads(result[0])
-                streams = []
-                if "streams" in data:
-                    for stream in data["streams"]:
-                        stream_info = {
-                            "index": stream.get("index", 0),
-                            "codec_name": stream.get("codec_name", "unknown"),
-                            "codec_type": stream.get("codec_type", stream_type),
-                        }
-                        if "tags" in stream:
-                            if "language" in stream["tags"]:
-                                stream_info["language"] = stream["tags"]["language"]
-                            if "title" in stream["tags"]:
-                                stream_info["title"] = stream["tags"]["title"]
-                        streams.append(stream_info)
-                return streams
-            LOGGER.error(
-                f"Error getting detailed {stream_type} stream info: {result[1]}"
-            )
-            return []
-        except Exception as e:
-            LOGGER.error(
-                f"Exception getting detailed {stream_type} stream info: {e}"
-            )
+        if stream_type not in ("video", "audio", "subtitle", "attachment"):
+            stream_type = "video"
+        probe = await probe_media(file_path)
+        if probe is None:
+            LOGGER.error(f"Error getting detailed {stream_type} stream info")
             return []
+        streams = []
+        for stream in probe.streams_of(stream_type):
+            stream_info = {
+                "index": stream.get("index", 0),
+                "codec_name": stream.get("codec_name", "unknown"),
+                "codec_type": stream.get("codec_type", stream_type),
+            }
+            tags = stream.get("tags") or {}
+            if "language" in tags:
+                stream_info["language"] = tags["language"]
+            if "title" in tags:
+                stream_info["title"] = tags["title"]
+            streams.append(stream_info)
+        return streams
 
     async def ffmpeg_cmds(self, ffmpeg, f_path, user_provided_files=None):
         """Process one or more FFmpeg commands.
@@ -8558,7 +8335,12 @@ class FFMpeg:
             await remove(output_file)
         return False
 
-    async def split(self, f_path, file_, parts, split_size):
+    async def split(self, f_path, file_, parts, split_size, part_sink=None):
+        """
+        Split a media file into parts. ``part_sink`` receives every finished
+        part so it can be uploaded while the next one is written.
+        """
+        part_sink = part_sink or NULL_PART_SINK
         self.clear()
         multi_streams = True
         self._total_time = duration = (await get_media_info(f_path))[0]
@@ -8687,6 +8469,7 @@ class FFMpeg:
                 # Process this part
                 if self._listener.is_cancelled:
                     return False
+                await part_sink.reserve()
 
                 # Execute the command
                 self._listener.subproc = await create_subprocess_exec(
@@ -8711,11 +8494,13 @@ class FFMpeg:
                         stderr = "Unable to decode the error!"
                     with contextlib.suppress(Exception):
                         await remove(out_path)
+                    part_sink.discard()
                     continue
 
                 # Update progress
                 self._last_processed_time += end_time - start_time
                 self._last_processed_bytes += await get_path_size(out_path)
+                part_sink.add(out_path)
 
             return True
         # Use traditional file size-based splitting for non-equal splits
@@ -8839,6 +8624,7 @@ class FFMpeg:
                 del cmd[12]
             if self._listener.is_cancelled:
                 return False
+            await part_sink.reserve()
 
             # Execute the command
             self._listener.subproc = await create_subprocess_exec(
@@ -8863,6 +8649,7 @@ class FFMpeg:
                     stderr = "Unable to decode the error!"
                 with contextlib.suppress(Exception):
                     await remove(out_path)
+                part_sink.discard()
                 if multi_streams:
                     multi_streams = False
                     continue
@@ -8893,20 +8680,25 @@ class FFMpeg:
 
                 split_size -= reduction
                 await remove(out_path)
+                part_sink.discard()
                 continue
             lpd = (await get_media_info(out_path))[0]
             if lpd == 0:
                 LOGGER.error(
                     f"Something went wrong while splitting, mostly file is corrupted. Path: {f_path}",
                 )
+                part_sink.add(out_path)
                 break
             if duration == lpd:
+                part_sink.add(out_path)
                 break
             if lpd <= 3:
                 await remove(out_path)
+                part_sink.discard()
                 break
             self._last_processed_time += lpd
             self._last_processed_bytes += out_size
+            part_sink.add(out_path)
             start_time += lpd - 3
             i += 1
 
@@ -9269,10 +9061,7 @@ async def merge_pdfs(files, output_filename="merged.pdf"):
 
         # Force garbage collection after PDF merging
         # This can create large objects in memory
-        if smart_garbage_collection:
-            smart_garbage_collection(aggressive=True)
-        else:
-            gc.collect()
+        smart_garbage_collection(aggressive=True)
 
         return output_file
 
@@ -9781,10 +9570,7 @@ async def merge_images(
 
         # Force garbage collection after image merging
         # This can create large objects in memory
-        if smart_garbage_collection:
-            smart_garbage_collection(aggressive=True)
-        else:
-            gc.collect()
+        smart_garbage_collection(aggressive=True)
 
         return output_file
 
@@ -9953,10 +9739,7 @@ async def merge_documents(files, output_format="pdf"):
 
         # Force garbage collection after document merging
         # This can create large objects in memory
-        if smart_garbage_collection:
-            smart_garbage_collection(aggressive=True)
-        else:
-            gc.collect()
+        smart_garbage_collection(aggressive=True)
 
         return output_file
     except Exception as e:
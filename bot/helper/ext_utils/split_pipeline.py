@@ -0,0 +1,160 @@
+"""
+Streaming split for leech tasks.
+
+Files bigger than the leech split size used to be split completely before
+the upload started, so the original and all of its parts were on disk at
+once. Now the uploader asks for the parts of such a file when it reaches it:
+the split runs in the background and hands over each part as soon as it is
+written, while the previous part uploads. Only ``PARTS_ON_DISK`` parts exist
+at a time because the splitter waits for an uploaded part to be removed
+before writing another one.
+"""
+
+from asyncio import Queue, Semaphore, create_task
+from contextlib import suppress
+from os import path as ospath
+
+from bot import LOGGER
+
+# One part uploading and the next one being written
+PARTS_ON_DISK = 2
+
+
+class NullPartSink:
+    """Part sink for splits that are not streamed, every call is a no-op"""
+
+    async def reserve(self):
+        pass
+
+    def add(self, path):
+        pass
+
+    def discard(self):
+        pass
+
+
+NULL_PART_SINK = NullPartSink()
+
+
+class SplitParts:
+    """Parts of one source file, passed from the splitter to the uploader"""
+
+    def __init__(self, split, paths, size, listener):
+        # Part paths of the whole pipeline, mapped to the split they belong to
+        self.paths = paths
+        self.size = size
+        self.written = 0
+        self.count = 0
+        # The split did not replace the source file, it is uploaded as is
+        self.failed = False
+        self._split = split
+        self._listener = listener
+        self._slots = Semaphore(PARTS_ON_DISK)
+        self._queue = Queue()
+        # Parts handed over and not uploaded yet, each one holds a slot
+        self._pending = set()
+
+    async def reserve(self):
+        """Wait until another part may be written"""
+        await self._slots.acquire()
+
+    def add(self, path):
+        """A part is complete and can be uploaded"""
+        self.paths[path] = self
+        self._pending.add(path)
+        self.count += 1
+        with suppress(OSError):
+            self.written += ospath.getsize(path)
+        self._queue.put_nowait(path)
+
+    def discard(self):
+        """A reserved part was not produced after all"""
+        self._slots.release()
+
+    def done(self, path):
+        """The part was uploaded and removed, let the next one be made"""
+        if path in self._pending:
+            self._pending.discard(path)
+            self._slots.release()
+
+    async def _run(self):
+        try:
+            if await self._split(self) is False:
+                self.failed = True
+        except Exception as e:
+            LOGGER.error(f"Error while splitting for upload: {e}")
+            self.failed = True
+        finally:
+            self._queue.put_nowait(None)
+
+    async def stream(self):
+        """Yield parts as they are written; the split starts on first use"""
+        task = create_task(self._run())
+        try:
+            while (path := await self._queue.get()) is not None:
+                # The slot is freed by done() once the part is uploaded, with
+                # concurrent uploads that is after the next part is asked for
+                yield path
+            await task
+        finally:
+            if not task.done():
+                # Cancelling the task does not stop the ffmpeg it started
+                subproc = self._listener.subproc
+                if subproc is not None and subproc.returncode is None:
+                    with suppress(Exception):
+                        subproc.kill()
+                task.cancel()
+                with suppress(BaseException):
+                    await task
+
+
+class SplitPipeline:
+    """Split jobs of one task, keyed by the path of the file to split"""
+
+    def __init__(self, listener):
+        self.sources = {}
+        self.part_paths = {}
+        self.failed = set()
+        self.current = None
+        self._listener = listener
+
+    def add(self, f_path, size, split):
+        """
+        ``split(part_sink)`` writes the parts and reports them to the sink,
+        it returns False when the split failed and the source file is kept
+        """
+        self.sources[f_path] = SplitParts(
+            split, self.part_paths, size, self._listener
+        )
+
+    def is_source(self, path):
+        return path in self.sources
+
+    def is_part(self, path):
+        return path in self.part_paths
+
+    def split_failed(self, path):
+        return path in self.failed
+
+    def uploaded(self, path):
+        """Called by the uploader for every file it is done with"""
+        if (split := self.part_paths.get(path)) is not None:
+            split.done(path)
+
+    async def parts(self, f_path):
+        LOGGER.info(f"Splitting while uploading: {f_path}")
+        self.current = self.sources.pop(f_path)
+        try:
+            async for path in self.current.stream():
+                yield path
+            if self.current.failed:
+                self.failed.add(f_path)
+        finally:
+            self.current = None
+
+    def progress(self):
+        """Progress of the split running next to the upload, if any"""
+        if (split := self.current) is None:
+            return None
+        percent = min(split.written / split.size * 100, 100) if split.size else 0
+        return f"{percent:.2f}% | Parts: {split.count}"
@@ -343,6 +343,10 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
                 task_msg += f"\n<b>Count:</b> {count}"
             task_msg += f"<b>{task.size()}</b>"
             task_msg += f"\n<b>Estimated:</b> {task.eta()}"
+            if hasattr(task, "tracks") and (tracks := task.tracks()):
+                task_msg += f"\n{tracks}"
+            if hasattr(task, "split") and (split := task.split()):
+                task_msg += f"\n<b>Split:</b> {split}"
             if task.listener and (
                 (
                     tstatus == MirrorStatus.STATUS_DOWNLOAD
@@ -1,5 +1,4 @@
 import time
-from asyncio import Event
 
 from bot import (
     LOGGER,
@@ -9,11 +8,13 @@ from bot import (
     queued_dl,
     queued_up,
 )
+from bot.core.config_manager import Config
 from bot.helper.mirror_leech_utils.gdrive_utils.search import GoogleDriveSearch
 
 from .bot_utils import get_telegraph_list, sync_to_async
 from .files_utils import get_base_name
 from .links_utils import is_gdrive_id
+from .task_scheduler import HELD_KINDS, task_scheduler
 
 
 async def stop_duplicate_check(listener):
@@ -62,336 +63,78 @@ async def stop_duplicate_check(listener):
 
 
 async def check_running_tasks(listener, state="dl"):
-    from bot.core.config_manager import Config
-
-    all_limit = Config.QUEUE_ALL
-    state_limit = Config.QUEUE_DOWNLOAD if state == "dl" else Config.QUEUE_UPLOAD
-    event = None
-    is_over_limit = False
+    """
+    Admission of a task stage: ``dl`` for the download, ``proc`` for the
+    processing after it and ``up`` for the upload. Returns whether the stage
+    was queued and the event to wait for before it may run.
+    """
+    force = listener.force_run or (
+        listener.force_download if state == "dl" else listener.force_upload
+    )
+    held, reason = _held_kinds()
 
-    # Check system resources before allowing new tasks using shared resource manager
-    # Only apply resource constraints if task monitoring is enabled
-    try:
-        from bot.core.config_manager import Config
-        from bot.helper.ext_utils.gc_utils import smart_garbage_collection
+    if state in held and not force:
         from bot.helper.ext_utils.task_monitor import resource_manager
 
-        if Config.TASK_MONITOR_ENABLED:
-            should_queue, reason = resource_manager.should_force_queue()
-
-            if should_queue:
-                # Get detailed analysis for consolidated logging when resources are extremely critical
-                cpu_percent, memory_percent = resource_manager.get_resource_usage()
-                if memory_percent > 95 or cpu_percent > 98:
-                    detailed_analysis = _get_task_manager_resource_analysis()
-                    disk_info = _get_disk_usage_info()
-                    LOGGER.warning(
-                        f"🚨 EXTREMELY CRITICAL RESOURCES - {disk_info} {reason} Forcing task {listener.mid} to queue. "
-                        f"Will start only 1 task to prevent system overload. "
-                        f"📊 DETAILS: {detailed_analysis}"
-                    )
-                else:
-                    LOGGER.warning(f"{reason} Forcing task {listener.mid} to queue.")
-
-                # Force garbage collection to try to free up resources
-                startup_phase = resource_manager.is_startup_phase()
-                smart_garbage_collection(aggressive=not startup_phase)
-
-                # Create event for queuing
-                event = Event()
-                async with queue_dict_lock:
-                    if state == "dl":
-                        queued_dl[listener.mid] = event
-                    else:
-                        queued_up[listener.mid] = event
-
-                return True, event
-    except ImportError:
-        # If psutil is not available, continue with normal limit checks
-        pass
+        cpu_percent, memory_percent = resource_manager.get_resource_usage()
+        if memory_percent > 95 or cpu_percent > 98:
+            detailed_analysis = _get_task_manager_resource_analysis()
+            disk_info = _get_disk_usage_info()
+            LOGGER.warning(
+                f"🚨 EXTREMELY CRITICAL RESOURCES - {disk_info} {reason} Forcing task {listener.mid} to queue. "
+                f"It starts once resources recover. "
+                f"📊 DETAILS: {detailed_analysis}"
+            )
+        else:
+            LOGGER.warning(f"{reason} Forcing task {listener.mid} to queue.")
 
     async with queue_dict_lock:
-        if state == "up" and listener.mid in non_queued_dl:
-            non_queued_dl.remove(listener.mid)
-        if (
-            (all_limit or state_limit)
-            and not listener.force_run
-            and not (listener.force_upload and state == "up")
-            and not (listener.force_download and state == "dl")
-        ):
-            dl_count = len(non_queued_dl)
-            up_count = len(non_queued_up)
-            t_count = dl_count if state == "dl" else up_count
-            is_over_limit = (
-                all_limit
-                and dl_count + up_count >= all_limit
-                and (not state_limit or t_count >= state_limit)
-            ) or (state_limit and t_count >= state_limit)
-            if is_over_limit:
-                event = Event()
-                if state == "dl":
-                    queued_dl[listener.mid] = event
-                else:
-                    queued_up[listener.mid] = event
-        if not is_over_limit:
-            if state == "up":
-                non_queued_up.add(listener.mid)
-            else:
-                non_queued_dl.add(listener.mid)
+        return task_scheduler.submit(listener, state, force, held)
 
-    return is_over_limit, event
+
+def _held_kinds():
+    """
+    Pool kinds that start nothing while the system is short of resources,
+    and the reason. Only with task monitoring enabled.
+    """
+    if not Config.TASK_MONITOR_ENABLED:
+        return (), ""
+    try:
+        from bot.helper.ext_utils.task_monitor import resource_manager
+    except ImportError:
+        # If psutil is not available, continue with normal limit checks
+        return (), ""
+    should_queue, reason = resource_manager.should_force_queue()
+    return (HELD_KINDS, reason) if should_queue else ((), "")
 
 
 async def start_dl_from_queued(mid: int):
-    queued_dl[mid].set()
-    del queued_dl[mid]
-    non_queued_dl.add(mid)
+    task_scheduler.force_start(mid)
 
 
 async def start_up_from_queued(mid: int):
-    queued_up[mid].set()
-    del queued_up[mid]
-    non_queued_up.add(mid)
+    task_scheduler.force_start(mid)
 
 
 async def start_from_queued():
     # Check system resources before starting queued tasks using shared resource manager
     # Only apply resource constraints if task monitoring is enabled
-    resource_constraint = "normal"  # Default to normal if monitoring disabled
-
-    try:
-        from bot.core.config_manager import Config
-        from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-        from bot.helper.ext_utils.task_monitor import (
-            ResourceConstraint,
-            resource_manager,
-        )
-
-        if Config.TASK_MONITOR_ENABLED:
-            resource_constraint = resource_manager.get_constraint_level()
-            cpu_percent, memory_percent = resource_manager.get_resource_usage()
-
-            if resource_constraint == ResourceConstraint.CRITICAL:
-                # Only log here if we haven't already logged in check_running_tasks
-                # This prevents duplicate logging when both functions detect critical resources
-
-                # Force garbage collection to try to free up resources
-                smart_garbage_collection(aggressive=True)
-            elif resource_constraint == ResourceConstraint.MODERATE:
-                LOGGER.info(
-                    f"System resources moderately high: Memory {memory_percent:.1f}%, CPU {cpu_percent:.1f}%. "
-                    f"Will start at most 2 tasks."
-                )
-        else:
-            # Task monitoring disabled - use normal resource constraint
-            resource_constraint = "normal"
-    except ImportError:
-        # If psutil is not available, assume no resource constraints
-        resource_constraint = "normal"  # Use string fallback
-
-    if all_limit := Config.QUEUE_ALL:
-        dl_limit = Config.QUEUE_DOWNLOAD
-        up_limit = Config.QUEUE_UPLOAD
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            up = len(non_queued_up)
-            all_ = dl + up
-            if all_ < all_limit:
-                f_tasks = all_limit - all_
-
-                # Apply resource constraints using shared resource manager
-                # Only apply if task monitoring is enabled
-                if Config.TASK_MONITOR_ENABLED:
-                    try:
-                        from bot.helper.ext_utils.task_monitor import (
-                            ResourceConstraint,
-                        )
-
-                        max_tasks = resource_manager.get_max_tasks(
-                            resource_constraint
-                        )
-                        if max_tasks != float("inf"):
-                            f_tasks = min(f_tasks, max_tasks)
-                    except ImportError:
-                        # Fallback to old logic if import fails
-                        if resource_constraint == ResourceConstraint.CRITICAL:
-                            f_tasks = min(f_tasks, 1)
-                        elif resource_constraint == ResourceConstraint.MODERATE:
-                            f_tasks = min(f_tasks, 2)
-
-                if queued_up and (not up_limit or up < up_limit):
-                    for index, mid in enumerate(list(queued_up.keys()), start=1):
-                        await start_up_from_queued(mid)
-                        f_tasks -= 1
-                        if f_tasks == 0 or (up_limit and index >= up_limit - up):
-                            break
-                if queued_dl and (not dl_limit or dl < dl_limit) and f_tasks != 0:
-                    for index, mid in enumerate(list(queued_dl.keys()), start=1):
-                        await start_dl_from_queued(mid)
-                        if (dl_limit and index >= dl_limit - dl) or index == f_tasks:
-                            break
-        return
-
-    # Handle individual queue limits with resource constraints
-    if up_limit := Config.QUEUE_UPLOAD:
-        async with queue_dict_lock:
-            up = len(non_queued_up)
-            if queued_up and up < up_limit:
-                f_tasks = up_limit - up
-
-                # Apply resource constraints using shared resource manager
-                # Only apply if task monitoring is enabled
-                if Config.TASK_MONITOR_ENABLED:
-                    try:
-                        from bot.helper.ext_utils.task_monitor import (
-                            ResourceConstraint,
-                        )
-
-                        max_tasks = resource_manager.get_max_tasks(
-                            resource_constraint
-                        )
-                        if max_tasks != float("inf"):
-                            f_tasks = min(f_tasks, max_tasks)
-                    except ImportError:
-                        # Fallback to old logic if import fails
-                        if resource_constraint == ResourceConstraint.CRITICAL:
-                            f_tasks = min(f_tasks, 1)
-                        elif resource_constraint == ResourceConstraint.MODERATE:
-                            f_tasks = min(f_tasks, 2)
-
-                for index, mid in enumerate(list(queued_up.keys()), start=1):
-                    await start_up_from_queued(mid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_up:
-                # Even without upload limits, respect resource constraints if task monitoring is enabled
-                if Config.TASK_MONITOR_ENABLED:
-                    try:
-                        from bot.helper.ext_utils.task_monitor import (
-                            ResourceConstraint,
-                        )
-
-                        max_tasks = resource_manager.get_max_tasks(
-                            resource_constraint
-                        )
-
-                        if max_tasks == 1:
-                            # Start only 1 upload task under critical conditions
-                            mid = next(iter(queued_up.keys()))
-                            await start_up_from_queued(mid)
-                        elif max_tasks == 2:
-                            # Start at most 2 upload tasks under moderate conditions
-                            for index, mid in enumerate(
-                                list(queued_up.keys()), start=1
-                            ):
-                                await start_up_from_queued(mid)
-                                if index >= 2:
-                                    break
-                        else:
-                            # No resource constraints, start all queued uploads
-                            for mid in list(queued_up.keys()):
-                                await start_up_from_queued(mid)
-                    except ImportError:
-                        # Fallback to old logic if import fails
-                        if resource_constraint == ResourceConstraint.CRITICAL:
-                            mid = next(iter(queued_up.keys()))
-                            await start_up_from_queued(mid)
-                        elif resource_constraint == ResourceConstraint.MODERATE:
-                            for index, mid in enumerate(
-                                list(queued_up.keys()), start=1
-                            ):
-                                await start_up_from_queued(mid)
-                                if index >= 2:
-                                    break
-                        else:
-                            for mid in list(queued_up.keys()):
-                                await start_up_from_queued(mid)
-                else:
-                    # Task monitoring disabled - start all queued uploads without resource constraints
-                    for mid in list(queued_up.keys()):
-                        await start_up_from_queued(mid)
-
-    if dl_limit := Config.QUEUE_DOWNLOAD:
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            if queued_dl and dl < dl_limit:
-                f_tasks = dl_limit - dl
-
-                # Apply resource constraints using shared resource manager
-                # Only apply if task monitoring is enabled
-                if Config.TASK_MONITOR_ENABLED:
-                    try:
-                        from bot.helper.ext_utils.task_monitor import (
-                            ResourceConstraint,
-                        )
-
-                        max_tasks = resource_manager.get_max_tasks(
-                            resource_constraint
-                        )
-                        if max_tasks != float("inf"):
-                            f_tasks = min(f_tasks, max_tasks)
-                    except ImportError:
-                        # Fallback to old logic if import fails
-                        if resource_constraint == ResourceConstraint.CRITICAL:
-                            f_tasks = min(f_tasks, 1)
-                        elif resource_constraint == ResourceConstraint.MODERATE:
-                            f_tasks = min(f_tasks, 2)
-
-                for index, mid in enumerate(list(queued_dl.keys()), start=1):
-                    await start_dl_from_queued(mid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_dl:
-                # Even without download limits, respect resource constraints if task monitoring is enabled
-                if Config.TASK_MONITOR_ENABLED:
-                    try:
-                        from bot.helper.ext_utils.task_monitor import (
-                            ResourceConstraint,
-                        )
+    limit = None
+    if Config.TASK_MONITOR_ENABLED:
+        try:
+            from bot.helper.ext_utils.task_monitor import resource_manager
 
-                        max_tasks = resource_manager.get_max_tasks(
-                            resource_constraint
-                        )
+            max_tasks = resource_manager.get_max_tasks(
+                resource_manager.get_constraint_level()
+            )
+            if max_tasks != float("inf"):
+                limit = max_tasks
+        except ImportError:
+            pass
 
-                        if max_tasks == 1:
-                            # Start only 1 download task under critical conditions
-                            mid = next(iter(queued_dl.keys()))
-                            await start_dl_from_queued(mid)
-                        elif max_tasks == 2:
-                            # Start at most 2 download tasks under moderate conditions
-                            for index, mid in enumerate(
-                                list(queued_dl.keys()), start=1
-                            ):
-                                await start_dl_from_queued(mid)
-                                if index >= 2:
-                                    break
-                        else:
-                            # No resource constraints, start all queued downloads
-                            for mid in list(queued_dl.keys()):
-                                await start_dl_from_queued(mid)
-                    except ImportError:
-                        # Fallback to old logic if import fails
-                        if resource_constraint == ResourceConstraint.CRITICAL:
-                            mid = next(iter(queued_dl.keys()))
-                            await start_dl_from_queued(mid)
-                        elif resource_constraint == ResourceConstraint.MODERATE:
-                            for index, mid in enumerate(
-                                list(queued_dl.keys()), start=1
-                            ):
-                                await start_dl_from_queued(mid)
-                                if index >= 2:
-                                    break
-                        else:
-                            for mid in list(queued_dl.keys()):
-                                await start_dl_from_queued(mid)
-                else:
-                    # Task monitoring disabled - start all queued downloads without resource constraints
-                    for mid in list(queued_dl.keys()):
-                        await start_dl_from_queued(mid)
+    held, _ = _held_kinds()
+    async with queue_dict_lock:
+        task_scheduler.dispatch(limit, held)
 
 
 async def start_queue_processor():
@@ -464,16 +207,6 @@ async def start_queue_processor():
                 LOGGER.info(f"Queue processor: {reason}")
                 await start_from_queued()
 
-                # Minimal garbage collection only when needed
-                if Config.TASK_MONITOR_ENABLED and resource_manager:
-                    level = resource_manager.get_constraint_level()
-                    if level == ResourceLevel.CRITICAL:
-                        from bot.helper.ext_utils.gc_utils import (
-                            smart_garbage_collection,
-                        )
-
-                        smart_garbage_collection(aggressive=True)
-
             # Optimized adaptive sleep intervals to reduce CPU usage
             if running_count == 0 and has_queued:
                 sleep_time = 30  # Increased from 15 to 30 for urgent cases
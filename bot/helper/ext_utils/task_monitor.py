@@ -20,16 +20,13 @@ except ImportError:
 
 from bot import (
     LOGGER,
-    non_queued_dl,
-    non_queued_up,
-    queued_dl,
-    queued_up,
     task_dict,
     task_dict_lock,
 )
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import sync_to_async
 from bot.helper.ext_utils.status_utils import MirrorStatus
+from bot.helper.ext_utils.task_scheduler import task_scheduler
 from bot.helper.telegram_helper.message_utils import (
     auto_delete_message,
     send_message,
@@ -236,7 +233,7 @@ def get_memory_low() -> int:
 
 async def is_task_in_global_queue(mid: int) -> bool:
     """Check if task is in global queue - O(1)"""
-    return mid in queued_dl or mid in queued_up
+    return task_scheduler.is_queued(mid)
 
 
 async def get_task_speed(task) -> int:
@@ -392,15 +389,9 @@ async def queue_task(mid: int, reason: str):
                 queued_by_monitor.discard(mid)
                 return
 
-            # Move to appropriate queue
-            if mid in non_queued_dl:
-                non_queued_dl.remove(mid)
-                queued_dl[mid] = asyncio.Event()
-                LOGGER.info(f"Queued download task {listener.name} due to {reason}")
-            elif mid in non_queued_up:
-                non_queued_up.remove(mid)
-                queued_up[mid] = asyncio.Event()
-                LOGGER.info(f"Queued upload task {listener.name} due to {reason}")
+            # Give its slot back to the scheduler
+            if task_scheduler.requeue(mid):
+                LOGGER.info(f"Queued task {listener.name} due to {reason}")
             else:
                 queued_by_monitor.discard(mid)
                 return
@@ -461,45 +452,11 @@ async def resume_queued_tasks(resource_type: str):
         if not tasks_to_resume:
             return
 
-        # Check available slots
-        async with task_dict_lock:
-            dl_slots = (
-                max(0, Config.QUEUE_DOWNLOAD - len(non_queued_dl))
-                if Config.QUEUE_DOWNLOAD
-                else float("inf")
-            )
-            up_slots = (
-                max(0, Config.QUEUE_UPLOAD - len(non_queued_up))
-                if Config.QUEUE_UPLOAD
-                else float("inf")
-            )
-            all_slots = (
-                max(0, Config.QUEUE_ALL - len(non_queued_dl) - len(non_queued_up))
-                if Config.QUEUE_ALL
-                else float("inf")
-            )
-
-            resumed = 0
-            for mid in tasks_to_resume:
-                if resumed >= all_slots:
-                    break
-
-                if mid in queued_dl and dl_slots > 0:
-                    queued_dl[mid].set()
-                    del queued_dl[mid]
-                    non_queued_dl.add(mid)
-                    queued_by_monitor.discard(mid)
-                    dl_slots -= 1
-                    resumed += 1
-                    LOGGER.info(f"Resumed download task {mid}")
-                elif mid in queued_up and up_slots > 0:
-                    queued_up[mid].set()
-                    del queued_up[mid]
-                    non_queued_up.add(mid)
-                    queued_by_monitor.discard(mid)
-                    up_slots -= 1
-                    resumed += 1
-                    LOGGER.info(f"Resumed upload task {mid}")
+        for mid in tasks_to_resume:
+            if not task_scheduler.resume(mid):
+                break
+            queued_by_monitor.discard(mid)
+            LOGGER.info(f"Resumed task {mid}")
 
     except Exception as e:
         LOGGER.error(f"Error resuming tasks: {e}")
@@ -0,0 +1,324 @@
+"""
+Fair share scheduling of task stages.
+
+Tasks used to wait in two insertion ordered dicts and were released first
+in, first out, so one user's bulk job kept everyone else queued, and
+processing held on to a download slot. Every task stage now asks its own
+resource pool for admission: ``dl`` for network downloads, ``proc`` for the
+CPU bound processing between download and upload and ``up:<destination>``
+for uploads. Inside a pool waiting tasks are ordered by start-time fair
+queueing over users: each started stage advances its user's virtual time by
+its estimated cost divided by the weight of the user's priority class, and
+the user with the lowest virtual time goes next. The ``queued_*`` and
+``non_queued_*`` registries of the bot package are kept as read only views.
+"""
+
+from asyncio import Event
+from itertools import count
+
+from bot import (
+    LOGGER,
+    non_queued_dl,
+    non_queued_up,
+    queued_dl,
+    queued_up,
+    sudo_users,
+    user_data,
+)
+from bot.core.config_manager import Config
+
+from .links_utils import is_gdrive_id
+
+GIB = 1024**3
+
+# Fair share weight of each priority class
+CLASS_WEIGHTS = {"sudo": 4, "premium": 2, "default": 1}
+
+# Relative cost of a GiB in each pool, processing reads and rewrites it
+POOL_COSTS = {"dl": 1.0, "proc": 2.0, "up": 1.0}
+
+# Pools are served in this order, tasks closest to completion first
+POOL_ORDER = ("up", "proc", "dl")
+
+# Pools that start nothing while the system is short of resources, uploads
+# go on because they free disk space and memory
+HELD_KINDS = ("dl", "proc")
+
+
+def priority_class(user_id):
+    if user_id == Config.OWNER_ID or user_id in sudo_users:
+        return "sudo"
+    data = user_data.get(user_id, {})
+    if data.get("SUDO"):
+        return "sudo"
+    if data.get("PREMIUM") or str(user_id) in Config.PREMIUM_USERS.split():
+        return "premium"
+    return "default"
+
+
+def upload_destination(listener):
+    """Name of the upload pool of a task"""
+    if listener.is_leech:
+        return "tg"
+    up_dest = listener.up_dest or ""
+    if up_dest == "yt" or up_dest.startswith("yt:"):
+        return "yt"
+    if up_dest == "mg":
+        return "mg"
+    if up_dest == "ddl" or up_dest.startswith("ddl:"):
+        return "ddl"
+    if up_dest == "gd" or is_gdrive_id(up_dest):
+        return "gd"
+    return "rc"
+
+
+class Ticket:
+    __slots__ = (
+        "cost",
+        "event",
+        "kind",
+        "listener",
+        "mid",
+        "order",
+        "pool",
+        "priority",
+        "user_id",
+    )
+
+    def __init__(self, listener, kind, pool, order):
+        self.listener = listener
+        self.mid = listener.mid
+        self.user_id = listener.user_id
+        self.kind = kind
+        self.pool = pool
+        self.order = order
+        self.priority = priority_class(self.user_id)
+        size = listener.size if isinstance(listener.size, int | float) else 0
+        self.cost = POOL_COSTS[kind] * (1 + max(size, 0) / GIB)
+        self.event = Event()
+
+
+class Pool:
+    __slots__ = ("finish", "kind", "name", "queue", "running", "vclock")
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.queue = []
+        self.running = {}
+        # Virtual finish time of each user's last started stage
+        self.finish = {}
+        self.vclock = 0.0
+
+    def start_tag(self, ticket):
+        return max(self.vclock, self.finish.get(ticket.user_id, 0.0))
+
+    def users_running(self, user_id):
+        return sum(1 for t in self.running.values() if t.user_id == user_id)
+
+
+class TaskScheduler:
+    """Admission of the download, processing and upload stage of each task"""
+
+    def __init__(self):
+        self.pools = {}
+        self._tickets = {}
+        self._order = count()
+
+    def _pool(self, kind, listener):
+        name = f"up:{upload_destination(listener)}" if kind == "up" else kind
+        if (pool := self.pools.get(name)) is None:
+            pool = self.pools[name] = Pool(name, kind)
+        return pool
+
+    def _running(self, kind=None):
+        return sum(
+            len(pool.running)
+            for pool in self.pools.values()
+            if kind is None or pool.kind == kind
+        )
+
+    def _has_room(self, pool, user_id):
+        if Config.QUEUE_ALL and self._running() >= Config.QUEUE_ALL:
+            return False
+        if pool.kind == "dl":
+            limit = Config.QUEUE_DOWNLOAD
+        elif pool.kind == "proc":
+            limit = Config.QUEUE_PROCESS
+        else:
+            limit = Config.QUEUE_UPLOAD
+            if (
+                Config.QUEUE_UPLOAD_PER_DEST
+                and len(pool.running) >= Config.QUEUE_UPLOAD_PER_DEST
+            ):
+                return False
+        if limit and self._running(pool.kind) >= limit:
+            return False
+        return not (
+            Config.QUEUE_USER_LIMIT
+            and pool.users_running(user_id) >= Config.QUEUE_USER_LIMIT
+        )
+
+    def _update_views(self, ticket, running):
+        mid = ticket.mid
+        queued_dl.pop(mid, None)
+        queued_up.pop(mid, None)
+        non_queued_dl.discard(mid)
+        non_queued_up.discard(mid)
+        if ticket.pool is None:
+            return
+        if running:
+            (non_queued_up if ticket.kind == "up" else non_queued_dl).add(mid)
+        else:
+            (queued_dl if ticket.kind == "dl" else queued_up)[mid] = ticket.event
+
+    def _start(self, ticket):
+        pool = self.pools[ticket.pool]
+        pool.queue.remove(ticket)
+        start = pool.start_tag(ticket)
+        weight = CLASS_WEIGHTS[ticket.priority]
+        pool.finish[ticket.user_id] = start + ticket.cost / weight
+        pool.vclock = start
+        pool.running[ticket.mid] = ticket
+        self._update_views(ticket, True)
+        ticket.event.set()
+
+    def _detach(self, mid):
+        """Take the current stage of a task out of its pool"""
+        ticket = self._tickets.pop(mid, None)
+        if ticket is None:
+            return None
+        pool = self.pools[ticket.pool]
+        if pool.running.pop(mid, None) is None and ticket in pool.queue:
+            pool.queue.remove(ticket)
+        if not pool.queue and not pool.running:
+            # Nothing to be fair about anymore, forget the history
+            pool.finish.clear()
+            pool.vclock = 0.0
+        return ticket
+
+    def submit(self, listener, kind, force=False, held=()):
+        """
+        Admit the ``kind`` stage of a task or queue it. The pool kinds in
+        ``held`` are only started while nothing runs, see ``dispatch``.
+        Returns whether it was queued and the event that is set when it may
+        start.
+        """
+        self._detach(listener.mid)
+        pool = self._pool(kind, listener)
+        ticket = Ticket(listener, kind, pool.name, next(self._order))
+        self._tickets[ticket.mid] = ticket
+        pool.queue.append(ticket)
+        if force:
+            self._start(ticket)
+            return False, None
+        self._update_views(ticket, False)
+        self.dispatch(held=held)
+        if ticket.event.is_set():
+            return False, None
+        LOGGER.info(
+            f"Queued {pool.name} for {listener.name}: "
+            f"{len(pool.queue)} waiting, {len(pool.running)} running"
+        )
+        return True, ticket.event
+
+    def release(self, mid):
+        """A task finished or was cancelled, free its slot or queue place"""
+        ticket = self._detach(mid)
+        if ticket is None:
+            return
+        queued = not ticket.event.is_set()
+        ticket.pool = None
+        self._update_views(ticket, False)
+        if queued:
+            # Wake the waiter so it can see that the task is cancelled
+            ticket.event.set()
+
+    def is_queued(self, mid, *kinds):
+        """Whether a stage of the task, of one of ``kinds`` if given, waits"""
+        ticket = self._tickets.get(mid)
+        return (
+            ticket is not None
+            and not ticket.event.is_set()
+            and (not kinds or ticket.kind in kinds)
+        )
+
+    def force_start(self, mid):
+        if not self.is_queued(mid):
+            return False
+        self._start(self._tickets[mid])
+        return True
+
+    def requeue(self, mid):
+        """
+        Give the slot of a running stage back without stopping it, used by
+        the task monitor. ``resume`` takes a slot again.
+        """
+        ticket = self._tickets.get(mid)
+        if ticket is None or not ticket.event.is_set():
+            return False
+        pool = self.pools[ticket.pool]
+        del pool.running[mid]
+        ticket.event = Event()
+        pool.queue.insert(0, ticket)
+        self._update_views(ticket, False)
+        return True
+
+    def resume(self, mid):
+        ticket = self._tickets.get(mid)
+        if ticket is None or ticket.event.is_set():
+            return False
+        if not self._has_room(self.pools[ticket.pool], ticket.user_id):
+            return False
+        self._start(ticket)
+        return True
+
+    def _next(self, pool):
+        best = None
+        best_key = None
+        seen = set()
+        for ticket in pool.queue:
+            # Only the oldest waiting stage of each user competes
+            if ticket.user_id in seen:
+                continue
+            seen.add(ticket.user_id)
+            if not self._has_room(pool, ticket.user_id):
+                continue
+            key = (pool.start_tag(ticket), ticket.order)
+            if best_key is None or key < best_key:
+                best, best_key = ticket, key
+        return best
+
+    def dispatch(self, limit=None, held=()):
+        """
+        Start waiting stages while their pools have room. Kinds in ``held``
+        start nothing, except one stage each while nothing runs at all, so
+        the queue keeps moving when the shortage is not caused by the bot.
+        """
+        started = 0
+        idle = not self._running()
+        for kind in POOL_ORDER:
+            if kind in held and not idle:
+                continue
+            kind_started = 0
+            for pool in [p for p in self.pools.values() if p.kind == kind]:
+                while pool.queue and (limit is None or started < limit):
+                    if kind in held and kind_started:
+                        break
+                    if (ticket := self._next(pool)) is None:
+                        break
+                    self._start(ticket)
+                    started += 1
+                    kind_started += 1
+        return started
+
+    def status(self):
+        """Waiting and running stages of each pool"""
+        return {
+            name: (len(pool.queue), len(pool.running))
+            for name, pool in sorted(self.pools.items())
+            if pool.queue or pool.running
+        }
+
+
+task_scheduler = TaskScheduler()
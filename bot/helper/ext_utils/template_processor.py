@@ -1,22 +1,14 @@
 #!/usr/bin/env python3
-import gc
 import re
 from logging import getLogger
 
+from bot.helper.ext_utils.cache_utils import Cache
 from bot.helper.ext_utils.font_utils import (
     FONT_STYLES,
-    apply_font_style,
-    apply_google_font_style,
+    google_font_markup,
     is_google_font,
 )
 
-# Legacy implementation is used directly in this file
-
-try:
-    from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-except ImportError:
-    smart_garbage_collection = None
-
 LOGGER = getLogger(__name__)
 
 # Regular expression patterns for template variables with different styling options
@@ -25,6 +17,16 @@ QUAD_NESTED_TEMPLATE_VAR_PATTERN = r"{{{{([^{}]+)}([^{}]*)}([^{}]*)}([^{}]*)}"
 NESTED_TEMPLATE_VAR_PATTERN = r"{{{([^{}]+)}([^{}]*)}([^{}]*)}"
 TEMPLATE_VAR_PATTERN = r"{{([^{}]+)}([^{}]*)}|{([^{}]+)}"
 
+# All forms in one pass, the most nested form wins at each position.
+# Groups: 1-4 quadruple, 5-7 triple, 8-9 double and 10 single braces.
+TEMPLATE_TOKEN_PATTERN = re.compile(
+    f"{QUAD_NESTED_TEMPLATE_VAR_PATTERN}|{NESTED_TEMPLATE_VAR_PATTERN}|"
+    f"{TEMPLATE_VAR_PATTERN}"
+)
+
+# Compiled templates by template text, shared by every user with the same one
+_compiled_templates = Cache("caption_templates", max_entries=256)
+
 
 async def extract_metadata_from_filename(name):
     """
@@ -457,18 +459,129 @@ async def extract_metadata_from_filename(name):
     }
 
 
+class TemplateField:
+    """A variable of a compiled template and the styles applied to it"""
+
+    __slots__ = ("literal", "name", "stylers", "text")
+
+    def __init__(self, name, stylers, literal, text):
+        self.name = name
+        # Innermost first, None for a style name that means nothing
+        self.stylers = stylers
+        # How a name that is not a variable renders: "text" for the name
+        # itself, "code" for the name in <code>, "raw" for the original text
+        self.literal = literal
+        self.text = text
+
+    def render(self, data_dict):
+        if self.name in data_dict:
+            value = str(data_dict[self.name])
+        elif self.literal == "raw":
+            return self.text
+        else:
+            value = self.name
+            if self.literal == "code" and self.stylers[0] is None:
+                return f"<code>{value}</code>"
+        for styler in self.stylers:
+            if styler is not None:
+                value = styler(value)
+        return value
+
+
+def _wrap(text, mark):
+    return f"{mark}{text}{mark}"
+
+
+def _font_style(text, style):
+    return FONT_STYLES[style](text) if text else ""
+
+
+async def resolve_style(style):
+    """
+    Turn a style name into a function of the text, or None for a name that
+    is no style. Google Fonts are looked up once, see ``is_google_font``.
+    """
+    style_lower = style.lower()
+    if style_lower in FONT_STYLES:
+        return lambda text: _font_style(text, style_lower)
+    if await is_google_font(style):
+        font_name, _, font_weight = style.partition(":")
+        return lambda text: google_font_markup(text, font_name, font_weight)
+    # Support for emoji (which can be 2 chars)
+    if len(style) in (1, 2):
+        return lambda text: _wrap(text, style)
+    # Special handling for the literal string "style"
+    if style_lower == "style":
+        return lambda text: f"<code>{text}</code>"
+    return None
+
+
+async def compile_template(template):
+    """
+    Parse a template once into literal text and fields with their styles
+    resolved. Rendering the result for a file is a string join.
+    """
+    parts = []
+    position = 0
+    for match in TEMPLATE_TOKEN_PATTERN.finditer(template):
+        if match.start() > position:
+            parts.append(template[position : match.start()])
+        position = match.end()
+        groups = match.groups()
+        if groups[0] is not None:
+            name, styles, literal = groups[0], groups[1:4], "text"
+        elif groups[4] is not None:
+            name, styles, literal = groups[4], groups[5:7], "text"
+        elif groups[7] is not None:
+            name, styles, literal = groups[7], groups[8:9], "code"
+        else:
+            name, styles, literal = groups[9], (), "raw"
+        stylers = []
+        for style in styles:
+            style = (style or "").strip()
+            if not style:
+                continue
+            try:
+                stylers.append(await resolve_style(style))
+            except Exception as e:
+                LOGGER.error(f"Error resolving style {style}: {e}")
+                stylers.append(None)
+        if literal == "code" and not stylers:
+            # {{variable}} without a style renders the name as it is
+            literal = "text"
+        parts.append(TemplateField(name.strip(), stylers, literal, match.group(0)))
+    if position < len(template):
+        parts.append(template[position:])
+    return parts
+
+
+def render_template(parts, data_dict):
+    rendered = []
+    for part in parts:
+        if isinstance(part, str):
+            rendered.append(part)
+            continue
+        try:
+            rendered.append(part.render(data_dict))
+        except Exception as e:
+            LOGGER.error(f"Error rendering template field {part.text}: {e}")
+            rendered.append(str(data_dict.get(part.name, part.name)))
+    return "".join(rendered)
+
+
 async def process_template(template, data_dict):
     """
     Process a template string with advanced formatting options including Google Fonts,
     HTML formatting, Unicode styling, and nested templates.
 
+    The template is compiled once and cached, see ``compile_template``.
+
     Args:
         template (str): The template string with variables in various formats:
                         - {var} - Simple variable
                         - {{var}style} - Variable with styling (Google Font, HTML, Unicode)
                         - {{{var}style1}style2} - Nested styling with two levels
                         - {{{{var}style1}style2}style3} - Nested styling with three levels
-                        - Any arbitrary nesting depth with any combination of styles
         data_dict (dict): Dictionary containing values for template variables
 
     Returns:
@@ -477,249 +590,11 @@ async def process_template(template, data_dict):
     if not template:
         return ""
 
-    # Use the legacy template processor directly# Legacy template processor for backward compatibility
-    # Make a copy of the template to avoid modifying the original
-    processed_template = template
-
-    # First, process quadruple nested template variables (four braces)
-    # Format: {{{{variable}font1}font2}font3}
-    for match in re.finditer(QUAD_NESTED_TEMPLATE_VAR_PATTERN, processed_template):
-        var_name = match.group(1).strip()
-        style1 = match.group(2).strip() if match.group(2) else None
-        style2 = match.group(3).strip() if match.group(3) else None
-        style3 = match.group(4).strip() if match.group(4) else None
-        original_match = match.group(0)
-
-        if var_name in data_dict:
-            value = str(data_dict[var_name])
-        else:
-            # If it's not a template variable, treat it as custom text
-            value = var_name  # Apply first style (innermost)
-        if style1:
-            try:  # Check if it's a Google Font
-                if await is_google_font(style1):
-                    value = await apply_google_font_style(
-                        value, style1
-                    )  # Check if it's an HTML style
-                elif style1.lower() in FONT_STYLES:
-                    value = await apply_font_style(
-                        value, style1
-                    )  # Check if it's a single character (emoji/unicode)
-                elif (
-                    len(style1) == 1 or len(style1) == 2
-                ):  # Support for emoji (which can be 2 chars)
-                    value = f"{style1}{value}{style1}"  # Special handling for the literal string "style"
-                elif style1.lower() == "style":
-                    value = f"<code>{value}</code>"
-                else:
-                    pass
-            except Exception as e:
-                LOGGER.error(f"Error applying style1 {style1}: {e}")
-
-            # Apply second style
-            if style2:
-                try:  # Check if it's a Google Font
-                    if await is_google_font(style2):
-                        value = await apply_google_font_style(
-                            value, style2
-                        )  # Check if it's an HTML style
-                    elif style2.lower() in FONT_STYLES:
-                        value = await apply_font_style(value, style2)
-                        # Special handling for combined HTML styles
-                        if "_" in style2.lower():
-                            pass
-                        # Check if it's a single character (emoji/unicode)
-                    elif (
-                        len(style2) == 1 or len(style2) == 2
-                    ):  # Support for emoji (which can be 2 chars)
-                        value = f"{style2}{value}{style2}"  # Special handling for the literal string "style"
-                    elif style2.lower() == "style":
-                        value = f"<code>{value}</code>"
-                    else:
-                        pass
-                except Exception as e:
-                    LOGGER.error(f"Error applying style2 {style2}: {e}")
-
-            # Apply third style (outermost)
-            if style3:
-                try:  # Check if it's a Google Font
-                    if await is_google_font(style3):
-                        value = await apply_google_font_style(
-                            value, style3
-                        )  # Check if it's an HTML style
-                    elif style3.lower() in FONT_STYLES:
-                        value = await apply_font_style(value, style3)
-                        # Special handling for combined HTML styles
-                        if "_" in style3.lower():
-                            pass
-                        # Check if it's a single character (emoji/unicode)
-                    elif (
-                        len(style3) == 1 or len(style3) == 2
-                    ):  # Support for emoji (which can be 2 chars)
-                        value = f"{style3}{value}{style3}"  # Special handling for the literal string "style"
-                    elif style3.lower() == "style":
-                        value = f"<code>{value}</code>"
-                    else:
-                        pass
-                except Exception as e:
-                    LOGGER.error(f"Error applying style3 {style3}: {e}")
-
-            # Replace in the template
-            processed_template = processed_template.replace(original_match, value)
-
-    # Next, process nested template variables (triple braces)
-    # Format: {{{variable}font1}font2}
-    for match in re.finditer(NESTED_TEMPLATE_VAR_PATTERN, processed_template):
-        var_name = match.group(1).strip()
-        inner_style = match.group(2).strip() if match.group(2) else None
-        outer_style = match.group(3).strip() if match.group(3) else None
-        original_match = match.group(0)
-
-        if var_name in data_dict:
-            value = str(data_dict[var_name])
-        else:
-            # If it's not a template variable, treat it as custom text
-            value = var_name  # Apply inner style first
-        if inner_style:
-            try:  # Check if it's a Google Font
-                if await is_google_font(inner_style):
-                    value = await apply_google_font_style(
-                        value, inner_style
-                    )  # Check if it's an HTML style
-                elif inner_style.lower() in FONT_STYLES:
-                    value = await apply_font_style(
-                        value, inner_style
-                    )  # Check if it's a single character (emoji/unicode)
-                elif (
-                    len(inner_style) == 1 or len(inner_style) == 2
-                ):  # Support for emoji (which can be 2 chars)
-                    value = f"{inner_style}{value}{inner_style}"  # Special handling for the literal string "style"
-                elif inner_style.lower() == "style":
-                    value = f"<code>{value}</code>"
-                else:
-                    pass
-            except Exception as e:
-                LOGGER.error(f"Error applying inner style {inner_style}: {e}")
-
-            # Apply outer style
-            if outer_style:
-                try:  # Check if it's a Google Font
-                    if await is_google_font(outer_style):
-                        value = await apply_google_font_style(
-                            value, outer_style
-                        )  # Check if it's an HTML style
-                    elif outer_style.lower() in FONT_STYLES:
-                        value = await apply_font_style(value, outer_style)
-                        # Special handling for combined HTML styles to ensure proper nesting
-                        if "_" in outer_style.lower():
-                            pass
-                        # Check if it's a single character (emoji/unicode)
-                    elif (
-                        len(outer_style) == 1 or len(outer_style) == 2
-                    ):  # Support for emoji (which can be 2 chars)
-                        value = f"{outer_style}{value}{outer_style}"  # Special handling for the literal string "style"
-                    elif outer_style.lower() == "style":
-                        value = f"<code>{value}</code>"
-                    else:
-                        pass
-                except Exception as e:
-                    LOGGER.error(f"Error applying outer style {outer_style}: {e}")
-
-            # Replace in the template
-            processed_template = processed_template.replace(original_match, value)
-
-    # Function to process regular template variables
-    async def replace_match(match):
-        # Check which group matched
-        if match.group(1) is not None:
-            # Format: {{variable}style}
-            var_name = match.group(1).strip()
-            style_name = (
-                match.group(2).strip() if match.group(2) else None
-            )  # Get the variable value
-            if var_name in data_dict:
-                value = str(data_dict[var_name])
-                # Handle None or empty values
-                if value is None or value == "":
-                    value = ""
-                # Apply styling if specified
-                if style_name:
-                    try:  # Check if it's a Google Font
-                        if await is_google_font(style_name):
-                            return await apply_google_font_style(value, style_name)
-                        # Check if it's an HTML style
-                        if style_name.lower() in FONT_STYLES:
-                            return await apply_font_style(value, style_name)
-                        # Check if it's a single character (emoji/unicode)
-                        if (
-                            len(style_name) == 1 or len(style_name) == 2
-                        ):  # Support for emoji (which can be 2 chars)
-                            return f"{style_name}{value}{style_name}"
-                        # Special handling for the literal string "style"
-                        if style_name.lower() == "style":
-                            return f"<code>{value}</code>"
-                        return value
-                    except Exception as e:
-                        LOGGER.error(f"Error applying style {style_name}: {e}")
-                        # Continue with original value on error
-                        return value
-                return value
-            # If it's not a template variable, treat it as custom text
-            value = var_name  # Apply styling if specified
-            if style_name:
-                try:  # Check if it's a Google Font
-                    if await is_google_font(style_name):
-                        return await apply_google_font_style(value, style_name)
-                    # Check if it's an HTML style
-                    if style_name.lower() in FONT_STYLES:
-                        return await apply_font_style(value, style_name)
-                    # Check if it's a single character (emoji/unicode)
-                    if (
-                        len(style_name) == 1 or len(style_name) == 2
-                    ):  # Support for emoji (which can be 2 chars)
-                        return f"{style_name}{value}{style_name}"
-                    # Special handling for the literal string "style"
-                    if style_name.lower() == "style":
-                        return f"<code>{value}</code>"
-                    return f"<code>{value}</code>"
-                except Exception as e:
-                    LOGGER.error(f"Error applying style {style_name}: {e}")
-                    # Continue with original value on error
-                    return value
-            return value
-
-        # Format: {variable}
-        if match.group(3) is not None:
-            var_name = match.group(3).strip()
-            if var_name in data_dict:
-                value = str(data_dict[var_name])
-                # Handle None or empty values
-                if value is None:
-                    return ""
-                return value
-
-        # Return the original if variable not found or no match
-        return match.group(0)
-
-    # Process regular template variables
-    result = processed_template
-    for match in re.finditer(TEMPLATE_VAR_PATTERN, processed_template):
-        replacement = await replace_match(match)
-        result = result.replace(match.group(0), replacement)
-
+    parts = await _compiled_templates.get_or_load(
+        template, lambda: compile_template(template)
+    )
     # Final processing of HTML tags to ensure they're properly formatted
-    processed_result = await process_html_tags(result)
-
-    # Force garbage collection after processing complex templates
-    # This can create many temporary strings and objects
-    if smart_garbage_collection and len(template) > 1000:  # Only for large templates
-        # Use normal mode for template processing
-        smart_garbage_collection(aggressive=False)
-    elif len(template) > 1000:  # Only for large templates
-        # Only collect generation 0 (youngest objects) for better performance
-        gc.collect(0)
-
-    return processed_result
+    return await process_html_tags(render_template(parts, data_dict))
 
 
 async def process_html_tags(text):
@@ -796,12 +671,4 @@ async def process_html_tags(text):
         pass
 
     # Return the potentially modified text
-    # Force garbage collection if the text is very large
-    if smart_garbage_collection and len(text) > 10000:  # Only for very large texts
-        # Use normal mode for HTML processing
-        smart_garbage_collection(aggressive=False)
-    elif len(text) > 10000:  # Only for very large texts
-        # Only collect generation 0 (youngest objects) for better performance
-        gc.collect(0)
-
     return text
@@ -151,7 +151,7 @@ async def _qb_listener():
     while True:
         async with qb_listener_lock:
             try:
-                torrents = await TorrentManager.qbittorrent.torrents.info()
+                torrents = (await TorrentManager.qb_snapshot(max_age=0)).values()
                 if len(torrents) == 0:
                     intervals["qb"] = ""
                     break
@@ -10,11 +10,6 @@ from bot import (
     DOWNLOAD_DIR,
     LOGGER,
     intervals,
-    non_queued_dl,
-    non_queued_up,
-    queue_dict_lock,
-    queued_dl,
-    queued_up,
     same_directory_lock,
     task_dict,
     task_dict_lock,
@@ -35,8 +30,10 @@ from bot.helper.ext_utils.files_utils import (
     remove_excluded_files,
 )
 from bot.helper.ext_utils.links_utils import is_gdrive_id, is_rclone_path
+from bot.helper.ext_utils.media_plan import MediaPlan
 from bot.helper.ext_utils.status_utils import get_readable_file_size
 from bot.helper.ext_utils.task_manager import check_running_tasks, start_from_queued
+from bot.helper.ext_utils.task_scheduler import task_scheduler
 from bot.helper.mirror_leech_utils.gdrive_utils.upload import GoogleDriveUpload
 from bot.helper.mirror_leech_utils.rclone_utils.transfer import RcloneTransferHelper
 from bot.helper.mirror_leech_utils.status_utils.gdrive_status import (
@@ -674,11 +671,21 @@ class TaskListener(TaskConfig):
             self.up_dir or self.dir,
             self.excluded_extensions,
         )
-        if not Config.QUEUE_ALL:
-            async with queue_dict_lock:
-                if self.mid in non_queued_dl:
-                    non_queued_dl.remove(self.mid)
-            await start_from_queued()
+        # The download slot is free now, processing has its own pool
+        add_to_queue, event = await check_running_tasks(self, "proc")
+        await start_from_queued()
+        if add_to_queue:
+            LOGGER.info(f"Added to Queue/Process: {self.name}")
+            async with task_dict_lock:
+                previous_status = task_dict.get(self.mid)
+                task_dict[self.mid] = QueueStatus(self, gid, "proc")
+            await event.wait()
+            if self.is_cancelled:
+                return
+            LOGGER.info(f"Start from Queued/Process: {self.name}")
+            async with task_dict_lock:
+                if previous_status is not None and self.mid in task_dict:
+                    task_dict[self.mid] = previous_status
 
         if self.join and not self.is_file:
             await join_files(up_path)
@@ -737,19 +744,8 @@ class TaskListener(TaskConfig):
         # Sort media tools by priority (lower number = higher priority)
         media_tools.sort(key=lambda x: x[0])
 
-        # Run media tools in priority order
-        for _, tool_name, tool_func in media_tools:
-            LOGGER.info(f"Running {tool_name} with priority {_}")
-            up_path = await tool_func(up_path, gid)
-            if self.is_cancelled:
-                return
-            self.is_file = await aiopath.isfile(up_path)
-            self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
-            self.clear()
-
         # Check if any metadata settings are provided (legacy or new)
-        if (
+        metadata_enabled = bool(
             self.metadata
             or self.metadata_title
             or self.metadata_author
@@ -764,8 +760,27 @@ class TaskListener(TaskConfig):
             or self.metadata_subtitle_title
             or self.metadata_subtitle_author
             or self.metadata_subtitle_comment
-        ):
-            up_path = await self.proceed_metadata(
+        )
+
+        # Plan the stages, adjacent ones ffmpeg can apply together run as
+        # one pass before the first of them, see media_plan
+        self.media_plan = MediaPlan(
+            self, [tool_name for _, tool_name, _ in media_tools], metadata_enabled
+        )
+
+        # Run media tools in priority order
+        for _, tool_name, tool_func in media_tools:
+            LOGGER.info(f"Running {tool_name} with priority {_}")
+            up_path = await self.media_plan.stage(tool_name, tool_func)(up_path, gid)
+            if self.is_cancelled:
+                return
+            self.is_file = await aiopath.isfile(up_path)
+            self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
+            self.size = await get_path_size(up_dir)
+            self.clear()
+
+        if metadata_enabled:
+            up_path = await self.media_plan.stage("metadata", self.proceed_metadata)(
                 up_path,
                 gid,
             )
@@ -1601,9 +1616,7 @@ class TaskListener(TaskConfig):
 
         if self.seed:
             await clean_target(self.up_dir)
-            async with queue_dict_lock:
-                if self.mid in non_queued_up:
-                    non_queued_up.remove(self.mid)
+            task_scheduler.release(self.mid)
             await start_from_queued()
             return
 
@@ -1621,10 +1634,7 @@ class TaskListener(TaskConfig):
         else:
             await update_status_message(self.message.chat.id)
 
-        async with queue_dict_lock:
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
+        task_scheduler.release(self.mid)
         await start_from_queued()
 
     async def on_download_error(self, error, button=None):
@@ -1691,18 +1701,7 @@ class TaskListener(TaskConfig):
         ):
             await database.rm_complete_task(self.message.link)
 
-        async with queue_dict_lock:
-            if self.mid in queued_dl:
-                queued_dl[self.mid].set()
-                del queued_dl[self.mid]
-            if self.mid in queued_up:
-                queued_up[self.mid].set()
-                del queued_up[self.mid]
-            if self.mid in non_queued_dl:
-                non_queued_dl.remove(self.mid)
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
+        task_scheduler.release(self.mid)
         await start_from_queued()
 
         # Add a delay before cleaning up to ensure all processes are complete
@@ -1770,18 +1769,7 @@ class TaskListener(TaskConfig):
         if is_super_chat and Config.INCOMPLETE_TASK_NOTIFIER and Config.DATABASE_URL:
             await database.rm_complete_task(self.message.link)
 
-        async with queue_dict_lock:
-            if self.mid in queued_dl:
-                queued_dl[self.mid].set()
-                del queued_dl[self.mid]
-            if self.mid in queued_up:
-                queued_up[self.mid].set()
-                del queued_up[self.mid]
-            if self.mid in non_queued_dl:
-                non_queued_dl.remove(self.mid)
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
+        task_scheduler.release(self.mid)
         await start_from_queued()
 
         # Add a delay before cleaning up to ensure all processes are complete
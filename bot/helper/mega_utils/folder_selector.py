@@ -101,134 +101,19 @@ except Exception as e:
     MEGA_IMPORT_ERROR = str(e)
 
 from bot import LOGGER
+from bot.helper.mega_utils.session_pool import SHORT_LEASE_WAIT, mega_session_pool
 
 LIST_LIMIT = 10
 
 
-class MegaFolderListener(MegaListener):
-    """MEGA SDK listener for folder operations"""
-
-    def __init__(self, continue_event):
-        super().__init__()
-        self.continue_event = continue_event
-        self.error = None
-        self.nodes_fetched = False
-
-    def onRequestFinish(self, api, request, error):
-        """Called when a request finishes - with exception handling to prevent SWIG errors"""
-        try:
-            if error.getErrorCode() != 0:
-                # Handle MEGA SDK v4.8.0 getErrorString() method signature changes
-                try:
-                    # Try the instance method first (no parameters)
-                    self.error = error.getErrorString()
-                except Exception:
-                    try:
-                        # Try with error code parameter
-                        error_code = error.getErrorCode()
-                        self.error = error.getErrorString(error_code)
-                    except Exception:
-                        try:
-                            # Try static method with error code
-                            error_code = error.getErrorCode()
-                            self.error = MegaError.getErrorString(error_code)
-                        except Exception:
-                            # Fallback to error code if all methods fail
-                            self.error = f"MEGA Error Code: {error.getErrorCode()}"
-
-                LOGGER.error(f"MEGA request error: {self.error}")
-            elif request.getType() == MegaRequest.TYPE_LOGIN:
-                LOGGER.info("MEGA login successful")
-            elif request.getType() == MegaRequest.TYPE_FETCH_NODES:
-                self.nodes_fetched = True
-
-            self.continue_event.set()
-        except Exception as e:
-            # Critical: Prevent any exceptions from propagating back to C++
-            # This prevents SWIG DirectorMethodException
-            try:
-                LOGGER.error(f"Exception in MEGA folder listener callback: {e}")
-                self.error = f"Listener callback error: {e!s}"
-                self.continue_event.set()
-            except Exception:
-                # Last resort: even logging failed, just set the event
-                pass
-
-
-class AsyncMegaExecutor:
-    """Async executor for MEGA operations"""
-
-    def __init__(self):
-        self.continue_event = asyncio.Event()
-
-    async def do(self, function, args=(), timeout=None):
-        """Execute MEGA function asynchronously with improved error handling and retry logic"""
-        function_name = getattr(function, "__name__", str(function))
-
-        # Try multiple attempts with increasing timeouts for login operations only
-        max_attempts = 3 if function_name == "login" else 1
-        base_timeout = timeout
-
-        for attempt in range(max_attempts):
-            if timeout is not None:
-                current_timeout = base_timeout + (
-                    attempt * 30
-                )  # Increase timeout each attempt
-            else:
-                current_timeout = None  # No timeout for main operations
-
-            if attempt > 0:
-                await asyncio.sleep(5)  # Brief delay between attempts
-
-            self.continue_event.clear()
-
-            try:
-                # Execute the MEGA function
-                await sync_to_async(function, *args)
-
-                # Wait for completion with or without timeout
-                if current_timeout is not None:
-                    await asyncio.wait_for(
-                        self.continue_event.wait(), timeout=current_timeout
-                    )
-                else:
-                    await (
-                        self.continue_event.wait()
-                    )  # No timeout - wait indefinitely
-
-                return  # Success, exit retry loop
-
-            except TimeoutError:
-                if (
-                    attempt == max_attempts - 1
-                ):  # Last attempt - this is a real failure
-                    LOGGER.error(
-                        f"MEGA {function_name} operation timed out after {current_timeout} seconds (attempt {attempt + 1}) - FINAL FAILURE"
-                    )
-                    raise Exception(
-                        f"MEGA {function_name} operation failed after {max_attempts} attempts. This may be due to network issues or MEGA server problems."
-                    )
-                # Not the last attempt - this is just a retry, log as INFO
-                LOGGER.info(
-                    f"MEGA {function_name} operation timed out after {current_timeout} seconds (attempt {attempt + 1}) - retrying with longer timeout"
-                )
-                continue  # Try again
-
-            except Exception as e:
-                # Re-raise other exceptions immediately (don't retry)
-                LOGGER.error(f"MEGA {function_name} operation failed: {e!s}")
-                raise Exception(f"MEGA {function_name} operation failed: {e!s}")
-
-
 class MegaFolderSelector:
     """MEGA folder selector similar to rclone's interface"""
 
     def __init__(self, listener):
         self.listener = listener
         self.user_id = listener.user_id
-        self.api = None
-        self.mega_listener = None
-        self.executor = AsyncMegaExecutor()
+        self.credentials = None
+        self.root_handle = None
         self.current_node_handle = None
         self.folder_list = []
         self.iter_start = 0
@@ -287,40 +172,14 @@ class MegaFolderSelector:
             global active_mega_selectors
             active_mega_selectors[self.user_id] = self
 
-            # Initialize MEGA API with custom timeout settings
-            self.api = MegaApi(None, None, None, "aimleechbot")
-
-            # Try to set MEGA SDK timeouts if available
-            try:
-                # Set connection timeout to 180 seconds if method exists
-                if hasattr(self.api, "setConnectTimeout"):
-                    self.api.setConnectTimeout(180)
-                if hasattr(self.api, "setRequestTimeout"):
-                    self.api.setRequestTimeout(180)
-                # Try additional timeout methods
-                if hasattr(self.api, "setTimeout"):
-                    self.api.setTimeout(180)
-                if hasattr(self.api, "setMaxConnections"):
-                    self.api.setMaxConnections(6)  # Reduce concurrent connections
-            except Exception as timeout_error:
-                LOGGER.warning(f"Could not set MEGA SDK timeouts: {timeout_error}")
-
-            self.mega_listener = MegaFolderListener(self.executor.continue_event)
-            self.api.addListener(self.mega_listener)
-
-            # Update progress - Login
-            await edit_message(
-                progress_msg,
-                "🔄 <b>Initializing MEGA folder selection...</b>\n\n"
-                "🔐 Logging into MEGA account...\n"
-                "📡 This may take up to 2 minutes for large accounts.",
-            )
-
-            # Login to MEGA with increased timeout
+            # Sessions are leased per listing, not for the whole browse, so the
+            # user thinking does not keep one of the pooled sessions busy
+            self.credentials = (MEGA_EMAIL, MEGA_PASSWORD)
             try:
-                await self.executor.do(
-                    self.api.login, (MEGA_EMAIL, MEGA_PASSWORD), timeout=60
-                )
+                async with mega_session_pool.lease(
+                    *self.credentials, SHORT_LEASE_WAIT
+                ) as session:
+                    root_node = session.api.getRootNode()
             except Exception as login_error:
                 LOGGER.error(f"MEGA login failed: {login_error}")
                 await delete_message(progress_msg)
@@ -328,45 +187,13 @@ class MegaFolderSelector:
                     return "❌ MEGA login timed out. Please check your internet connection and try again."
                 return f"❌ MEGA login failed: {login_error!s}"
 
-            if self.mega_listener.error:
-                await delete_message(progress_msg)
-                return f"❌ MEGA login failed: {self.mega_listener.error}"
-
-            # Update progress - Fetch nodes
-            await edit_message(
-                progress_msg,
-                "🔄 <b>Initializing MEGA folder selection...</b>\n\n"
-                "✅ Login successful!\n"
-                "📁 Fetching folder structure...\n"
-                "📡 This may take longer for accounts with many files.",
-            )
-
-            # Fetch nodes with increased timeout
-            try:
-                await self.executor.do(self.api.fetchNodes, timeout=90)
-            except Exception as fetch_error:
-                LOGGER.error(f"MEGA node fetching failed: {fetch_error}")
-                await delete_message(progress_msg)
-                if "timed out" in str(fetch_error).lower():
-                    return "❌ MEGA node fetching timed out. Your MEGA account may have many files. Please try again."
-                return f"❌ Failed to fetch MEGA nodes: {fetch_error!s}"
-
-            if self.mega_listener.error:
-                await delete_message(progress_msg)
-                return f"❌ Failed to fetch MEGA nodes: {self.mega_listener.error}"
-
-            if not self.mega_listener.nodes_fetched:
-                await delete_message(progress_msg)
-                return "❌ Failed to fetch MEGA nodes"
-
             # Start from root
-            root_node = self.api.getRootNode()
             if not root_node:
                 await delete_message(progress_msg)
                 return "❌ Could not access MEGA root folder"
 
             # Store root node handle instead of the node object
-            self.current_node_handle = root_node.getHandle()
+            self.root_handle = self.current_node_handle = root_node.getHandle()
 
             # Delete progress message and show folder selection interface
             await delete_message(progress_msg)
@@ -392,45 +219,53 @@ class MegaFolderSelector:
             # Clean up
             if self.user_id in active_mega_selectors:
                 del active_mega_selectors[self.user_id]
-            if self.api and self.mega_listener:
-                try:
-                    self.api.removeListener(self.mega_listener)
-                except Exception as cleanup_error:
-                    LOGGER.warning(
-                        f"Error during MEGA listener cleanup: {cleanup_error}"
-                    )
             # Clear references to prevent memory leaks
             self.current_node_handle = None
             self.path_node_handles = []
             self.folder_list = []
 
+    async def node_exists(self, handle):
+        """Whether the node of ``handle`` is still in the account"""
+        async with mega_session_pool.lease(
+            *self.credentials, SHORT_LEASE_WAIT
+        ) as session:
+            return session.api.getNodeByHandle(handle) is not None
+
     async def list_folders(self):
         """List folders in current directory"""
         try:
-            # Get current node from handle
-            current_node = self.api.getNodeByHandle(self.current_node_handle)
+            async with mega_session_pool.lease(
+                *self.credentials, SHORT_LEASE_WAIT
+            ) as session:
+                # Get current node from handle
+                current_node = session.api.getNodeByHandle(self.current_node_handle)
+
+                # Get children of current node
+                children = None
+                if current_node:
+                    children = await sync_to_async(
+                        session.api.getChildren, current_node
+                    )
+                self.folder_list = []
+
+                if children:
+                    for i in range(children.size()):
+                        child = children.get(i)
+                        if child and child.isFolder() and not child.isRemoved():
+                            folder_info = {
+                                "Name": child.getName() or f"Folder_{i}",
+                                "Handle": child.getHandle(),  # Store handle instead of node
+                                "IsDir": True,
+                                "Size": 0,  # Folders don't have size
+                            }
+                            self.folder_list.append(folder_info)
+
             if not current_node:
                 await self._send_list_message(
                     "❌ Error: Could not access current folder"
                 )
                 return
 
-            # Get children of current node
-            children = await sync_to_async(self.api.getChildren, current_node)
-            self.folder_list = []
-
-            if children:
-                for i in range(children.size()):
-                    child = children.get(i)
-                    if child and child.isFolder() and not child.isRemoved():
-                        folder_info = {
-                            "Name": child.getName() or f"Folder_{i}",
-                            "Handle": child.getHandle(),  # Store handle instead of node
-                            "IsDir": True,
-                            "Size": 0,  # Folders don't have size
-                        }
-                        self.folder_list.append(folder_info)
-
             # Sort folders by name
             self.folder_list.sort(key=lambda x: x["Name"].lower())
             await self.get_path_buttons()
@@ -574,8 +409,7 @@ async def _handle_callback_operation(selector, data, query, message):
                     return
 
                 # Verify the node still exists
-                test_node = selector.api.getNodeByHandle(node_handle)
-                if not test_node:
+                if not await selector.node_exists(node_handle):
                     await query.answer("❌ Folder no longer exists!")
                     await selector.list_folders()  # Refresh the list
                     return
@@ -595,20 +429,15 @@ async def _handle_callback_operation(selector, data, query, message):
                 if selector.path_node_handles:
                     # Validate the parent node handle
                     parent_handle = selector.path_node_handles[-1]
-                    parent_node = selector.api.getNodeByHandle(parent_handle)
-                    if parent_node:
+                    if await selector.node_exists(parent_handle):
                         selector.current_node_handle = parent_handle
                     else:
                         # Parent node is invalid, go to root
-                        root_node = selector.api.getRootNode()
-                        if root_node:
-                            selector.current_node_handle = root_node.getHandle()
-                            selector.path_node_handles = []
+                        selector.current_node_handle = selector.root_handle
+                        selector.path_node_handles = []
                 else:
                     # Go back to root
-                    root_node = selector.api.getRootNode()
-                    if root_node:
-                        selector.current_node_handle = root_node.getHandle()
+                    selector.current_node_handle = selector.root_handle
                 # Update path
                 if selector.path_node_handles:
                     path_parts = selector.path.split("/")
@@ -618,9 +447,7 @@ async def _handle_callback_operation(selector, data, query, message):
                 selector.iter_start = 0
                 await selector.list_folders()
         elif data[1] == "root":  # Go to root
-            root_node = selector.api.getRootNode()
-            if root_node:
-                selector.current_node_handle = root_node.getHandle()
+            selector.current_node_handle = selector.root_handle
             selector.path_node_handles = []
             selector.path = ""
             selector.iter_start = 0
@@ -0,0 +1,275 @@
+"""
+In-memory search index over a MEGA account's node tree.
+
+The index is built once per account from a pooled session's fetched tree and
+is then kept current from the session's node-update callbacks, so
+``/megasearch`` never has to walk the tree through the SDK again.
+"""
+
+from bisect import bisect_left
+from re import split as re_split
+from threading import Lock
+
+from bot import LOGGER
+from bot.helper.ext_utils.bot_utils import sync_to_async
+
+_indexes = {}
+_indexes_lock = Lock()
+
+
+def _tokenize(name):
+    return {token for token in re_split(r"[^\w]+|_", name) if token}
+
+
+def _extension(name):
+    _, dot, ext = name.rpartition(".")
+    return ext if dot and ext else ""
+
+
+class MegaIndexEntry:
+    __slots__ = (
+        "ext",
+        "handle",
+        "is_folder",
+        "mtime",
+        "name",
+        "name_lower",
+        "parent",
+        "path",
+        "size",
+        "tokens",
+    )
+
+    def __init__(self, handle, parent, name, path, size, mtime, is_folder):
+        self.handle = handle
+        self.parent = parent
+        self.name = name
+        self.name_lower = name.lower()
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.is_folder = is_folder
+        self.ext = "" if is_folder else _extension(self.name_lower)
+        self.tokens = _tokenize(self.name_lower)
+
+
+class MegaSearchIndex:
+    """Name-token index of one MEGA account"""
+
+    def __init__(self, key):
+        self.key = key
+        self.entries = {}
+        self.stale = True
+        self.sessions = []
+        self._tokens = {}
+        self._extensions = {}
+        self._children = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self._lock = Lock()
+
+    def _add(self, entry):
+        self.entries[entry.handle] = entry
+        self._children.setdefault(entry.parent, set()).add(entry.handle)
+        for token in entry.tokens:
+            handles = self._tokens.get(token)
+            if handles is None:
+                self._tokens[token] = handles = set()
+                self._vocabulary_dirty = True
+            handles.add(entry.handle)
+        if entry.ext:
+            self._extensions.setdefault(entry.ext, set()).add(entry.handle)
+
+    def _remove(self, handle, recursive=True):
+        stack = [handle]
+        while stack:
+            entry = self.entries.pop(stack.pop(), None)
+            if entry is None:
+                continue
+            siblings = self._children.get(entry.parent)
+            if siblings is not None:
+                siblings.discard(entry.handle)
+            for token in entry.tokens:
+                handles = self._tokens.get(token)
+                if handles is not None:
+                    handles.discard(entry.handle)
+                    if not handles:
+                        del self._tokens[token]
+                        self._vocabulary_dirty = True
+            if entry.ext in self._extensions:
+                self._extensions[entry.ext].discard(entry.handle)
+            if recursive:
+                stack.extend(self._children.pop(entry.handle, ()))
+
+    def _update_paths(self, handle):
+        """Refresh descendant paths after a folder was renamed or moved"""
+        stack = [handle]
+        while stack:
+            parent = self.entries.get(stack.pop())
+            if parent is None:
+                continue
+            for child_handle in self._children.get(parent.handle, ()):
+                child = self.entries.get(child_handle)
+                if child is not None:
+                    child.path = f"{parent.path}/{child.name}"
+                    stack.append(child_handle)
+
+    @staticmethod
+    def _entry_from_node(node, parent_handle, parent_path):
+        name = node.getName() or ""
+        is_folder = node.isFolder()
+        return MegaIndexEntry(
+            node.getHandle(),
+            parent_handle,
+            name,
+            f"{parent_path}/{name}" if parent_path else name,
+            0 if is_folder else node.getSize(),
+            node.getCreationTime() if is_folder else node.getModificationTime(),
+            is_folder,
+        )
+
+    def build(self, api):
+        """Walk the whole fetched tree once. Runs in a worker thread."""
+        root = api.getRootNode()
+        if root is None:
+            raise ValueError("MEGA root node not available")
+        entries = []
+        stack = [(root, "")]
+        while stack:
+            folder, folder_path = stack.pop()
+            children = api.getChildren(folder)
+            if not children:
+                continue
+            folder_handle = folder.getHandle()
+            for i in range(children.size()):
+                child = children.get(i)
+                if child is None or child.isRemoved():
+                    continue
+                entry = self._entry_from_node(child, folder_handle, folder_path)
+                entries.append(entry)
+                if entry.is_folder:
+                    stack.append((child, entry.path))
+        with self._lock:
+            self.entries = {}
+            self._tokens = {}
+            self._extensions = {}
+            self._children = {}
+            for entry in entries:
+                self._add(entry)
+            self._vocabulary_dirty = True
+            self.stale = False
+        return len(entries)
+
+    def on_nodes_update(self, api, nodes):
+        """Apply action-packet changes. Called from the SDK thread."""
+        if nodes is None:
+            # The SDK reloaded the whole tree
+            self.stale = True
+            return
+        with self._lock:
+            for i in range(nodes.size()):
+                node = nodes.get(i)
+                if node is None:
+                    continue
+                handle = node.getHandle()
+                removed = node.isRemoved()
+                # Renames and moves keep the subtree, only removals drop it
+                self._remove(handle, recursive=removed)
+                if removed:
+                    continue
+                parent_handle = node.getParentHandle()
+                parent = self.entries.get(parent_handle)
+                if parent is None:
+                    root = api.getRootNode()
+                    if root is None or root.getHandle() != parent_handle:
+                        # Moved out of the cloud drive (rubbish bin, inbox)
+                        for child in self._children.pop(handle, ()):
+                            self._remove(child)
+                        continue
+                    parent_path = ""
+                else:
+                    parent_path = parent.path
+                entry = self._entry_from_node(node, parent_handle, parent_path)
+                self._add(entry)
+                if entry.is_folder:
+                    self._update_paths(handle)
+
+    def _prefix_handles(self, prefix):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._tokens)
+            self._vocabulary_dirty = False
+        handles = set()
+        start = bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            handles |= self._tokens[token]
+        return handles
+
+    def search(self, query="", ext=None, kind=None, offset=0, limit=50):
+        """
+        Search the index.
+
+        Terms ending in ``*`` match name tokens by prefix; other terms must
+        appear as substrings of the name. ``ext`` filters by extension and
+        ``kind`` by ``"file"`` or ``"folder"``. Returns ``(total, entries)``.
+        """
+        terms = query.lower().split()
+        prefixes = [t[:-1] for t in terms if t.endswith("*") and len(t) > 1]
+        substrings = [t for t in terms if not t.endswith("*")]
+        with self._lock:
+            candidates = None
+            if ext:
+                candidates = set(self._extensions.get(ext.lower().lstrip("."), ()))
+            for prefix in prefixes:
+                handles = self._prefix_handles(prefix)
+                candidates = handles if candidates is None else candidates & handles
+            # A purely alphanumeric term can only occur inside one token, so
+            # the token vocabulary narrows candidates before checking names
+            word_terms = [t for t in substrings if t.isalnum()]
+            if word_terms and (candidates is None or len(candidates) > 1000):
+                term = max(word_terms, key=len)
+                handles = set()
+                for token, token_handles in self._tokens.items():
+                    if term in token:
+                        handles |= token_handles
+                candidates = handles if candidates is None else candidates & handles
+            pool = (
+                self.entries.values()
+                if candidates is None
+                else (self.entries[h] for h in candidates if h in self.entries)
+            )
+            results = [
+                entry
+                for entry in pool
+                if all(term in entry.name_lower for term in substrings)
+                and (kind is None or (kind == "folder") == entry.is_folder)
+            ]
+        phrase = query.lower().strip().rstrip("*")
+        results.sort(
+            key=lambda e: (
+                e.name_lower != phrase,
+                not e.name_lower.startswith(phrase),
+                e.name_lower,
+            )
+        )
+        return len(results), results[offset : offset + limit]
+
+
+async def get_search_index(session):
+    """Return a ready index for the session's account, building it if needed"""
+    with _indexes_lock:
+        index = _indexes.get(session.key)
+        if index is None:
+            index = _indexes[session.key] = MegaSearchIndex(session.key)
+    # Updates are only received while a subscribed session is alive
+    index.sessions = [s for s in index.sessions if not s.closed]
+    if not index.sessions:
+        index.stale = True
+    if session not in index.sessions:
+        session.add_node_callback(index.on_nodes_update)
+        index.sessions.append(session)
+    if index.stale:
+        count = await sync_to_async(index.build, session.api)
+        LOGGER.info(f"MEGA search index built with {count} nodes")
+    return index
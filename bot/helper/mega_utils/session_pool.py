@@ -0,0 +1,359 @@
+"""
+Long-lived MEGA session pool.
+
+Every MEGA feature (download, upload, clone, search and the folder selector)
+needs a logged-in MegaApi with a fetched node tree. Logging in and running
+fetchNodes is slow on large accounts, so sessions are kept alive per
+credential and leased to tasks instead of being created and logged out for
+every task. While a session is alive the SDK applies action packets to its
+node tree, and the on-disk SDK cache lets a fresh session resume with
+``fastLogin`` instead of downloading the whole tree again.
+"""
+
+import asyncio
+from asyncio import Event, Semaphore, create_task, sleep
+from contextlib import asynccontextmanager, suppress
+from hashlib import sha256
+from os import chmod, getcwd
+from os import path as ospath
+from time import time
+
+from aiofiles import open as aiopen
+from aiofiles.os import makedirs as aiomakedirs
+from aiofiles.os import path as aiopath
+
+from bot import LOGGER, bot_loop
+from bot.core.config_manager import Config
+from bot.helper.ext_utils.bot_utils import sync_to_async
+from bot.helper.ext_utils.exceptions import MegaSessionError
+
+# The MEGA SDK is located (and added to sys.path) by the modules that use the
+# pool before they import it, so a plain import is enough here.
+try:
+    from mega import MegaApi, MegaListener, MegaRequest
+
+    MEGA_SDK_AVAILABLE = True
+except Exception:
+
+    class MegaListener:
+        pass
+
+    MegaApi = None
+    MegaRequest = None
+    MEGA_SDK_AVAILABLE = False
+
+MEGA_CACHE_DIR = f"{getcwd()}/mega_cache"
+JANITOR_INTERVAL = 60
+
+# Seconds a search or folder listing waits for a session held by transfers
+SHORT_LEASE_WAIT = 30
+
+
+class MegaSessionListener(MegaListener):
+    """Listener owned by the pool, attached for the whole session lifetime"""
+
+    def __init__(self):
+        super().__init__()
+        self.error = None
+        self.nodes_version = 0
+        self.node_callbacks = []
+        self._waiting = None
+
+    def expect(self, request_type):
+        """Return an event that is set when a request of this type finishes"""
+        self.error = None
+        event = Event()
+        self._waiting = (request_type, event)
+        return event
+
+    def onRequestFinish(self, _api, request, error):
+        try:
+            if not self._waiting or request.getType() != self._waiting[0]:
+                return
+            if error.getErrorCode() != 0:
+                self.error = error.toString()
+            bot_loop.call_soon_threadsafe(self._waiting[1].set)
+        except Exception as e:
+            # Never let exceptions propagate back into the SDK thread
+            LOGGER.error(f"MEGA session listener error: {e}")
+
+    def onNodesUpdate(self, api, nodes):
+        """Called for action packets (remote changes) applied to the local tree"""
+        try:
+            self.nodes_version += 1
+            for callback in list(self.node_callbacks):
+                callback(api, nodes)
+        except Exception as e:
+            LOGGER.error(f"MEGA session node update callback error: {e}")
+
+
+class MegaSession:
+    """A logged-in MegaApi with a fetched node tree"""
+
+    def __init__(self, key, api, listener):
+        self.key = key
+        self.api = api
+        self.listener = listener
+        self.created_at = time()
+        self.last_used = self.created_at
+        self.leased = False
+        self.closed = False
+        self.uses = 0
+        self._task_listeners = []
+
+    @property
+    def root_node(self):
+        return self.api.getRootNode()
+
+    @property
+    def nodes_version(self):
+        return self.listener.nodes_version
+
+    def add_listener(self, listener):
+        """Attach a task listener; it is detached again when the lease ends"""
+        self.api.addListener(listener)
+        self._task_listeners.append(listener)
+
+    def add_node_callback(self, callback):
+        """Register ``callback(api, nodes)`` for node-tree updates"""
+        if callback not in self.listener.node_callbacks:
+            self.listener.node_callbacks.append(callback)
+
+    def is_healthy(self):
+        try:
+            return bool(self.api.isLoggedIn()) and self.api.getRootNode() is not None
+        except Exception:
+            return False
+
+    def detach_task_listeners(self):
+        for listener in self._task_listeners:
+            try:
+                self.api.removeListener(listener)
+            except Exception as e:
+                LOGGER.warning(f"Error removing MEGA task listener: {e}")
+        self._task_listeners.clear()
+
+
+class MegaSessionPool:
+    """Per-credential pool of MEGA sessions with idle eviction"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._semaphores = {}
+        self._janitor = None
+
+    @staticmethod
+    def _key(email, password):
+        raw = f"{email.strip().lower()}\0{password}".encode()
+        return sha256(raw).hexdigest()[:16]
+
+    @staticmethod
+    def _token_path(key):
+        return ospath.join(MEGA_CACHE_DIR, key, "session")
+
+    async def _request(self, session_listener, request_type, function, *args, limit):
+        event = session_listener.expect(request_type)
+        await sync_to_async(function, *args)
+        try:
+            await asyncio.wait_for(event.wait(), timeout=limit)
+        except TimeoutError:
+            raise MegaSessionError(
+                f"MEGA {function.__name__} timed out after {limit} seconds"
+            ) from None
+        if session_listener.error:
+            raise MegaSessionError(
+                f"MEGA {function.__name__} failed: {session_listener.error}"
+            )
+
+    async def _open(self, key, email, password):
+        """Create a new session, resuming from the SDK cache when possible"""
+        base_path = ospath.join(MEGA_CACHE_DIR, key)
+        await aiomakedirs(base_path, exist_ok=True)
+        api = MegaApi(None, None, base_path, "aimleechbot")
+        session_listener = MegaSessionListener()
+        api.addListener(session_listener)
+
+        token_path = self._token_path(key)
+        token = None
+        if await aiopath.exists(token_path):
+            async with aiopen(token_path) as f:
+                token = (await f.read()).strip() or None
+
+        start = time()
+        try:
+            logged_in = False
+            if token:
+                try:
+                    await self._request(
+                        session_listener,
+                        MegaRequest.TYPE_LOGIN,
+                        api.fastLogin,
+                        token,
+                        limit=60,
+                    )
+                    logged_in = True
+                except MegaSessionError as e:
+                    LOGGER.warning(f"MEGA fast login failed, doing full login: {e}")
+            if not logged_in:
+                await self._request(
+                    session_listener,
+                    MegaRequest.TYPE_LOGIN,
+                    api.login,
+                    email,
+                    password,
+                    limit=180,
+                )
+            await self._request(
+                session_listener,
+                MegaRequest.TYPE_FETCH_NODES,
+                api.fetchNodes,
+                limit=600,
+            )
+            if api.getRootNode() is None:
+                raise MegaSessionError(
+                    "MEGA root node not available after fetchNodes"
+                )
+        except BaseException:
+            await self._logout(api, session_listener)
+            raise
+
+        try:
+            dumped = api.dumpSession()
+            if dumped:
+                async with aiopen(token_path, "w") as f:
+                    await f.write(dumped)
+                await sync_to_async(chmod, token_path, 0o600)
+        except Exception as e:
+            LOGGER.warning(f"Could not persist MEGA session: {e}")
+
+        LOGGER.info(
+            f"MEGA session opened in {time() - start:.1f}s "
+            f"({'cached' if token and logged_in else 'full'} login)"
+        )
+        return MegaSession(key, api, session_listener)
+
+    @staticmethod
+    async def _logout(api, session_listener):
+        # localLogout keeps the session token valid so the SDK cache can be
+        # resumed with fastLogin next time
+        logout = getattr(api, "localLogout", api.logout)
+        try:
+            await asyncio.wait_for(sync_to_async(logout), timeout=30)
+        except Exception as e:
+            LOGGER.warning(f"MEGA session logout failed: {e}")
+        with suppress(Exception):
+            api.removeListener(session_listener)
+
+    async def _close(self, session):
+        session.closed = True
+        sessions = self._sessions.get(session.key, [])
+        if session in sessions:
+            sessions.remove(session)
+        session.detach_task_listeners()
+        await self._logout(session.api, session.listener)
+
+    def _take_idle(self, key):
+        for session in self._sessions.get(key, []):
+            if not session.leased:
+                session.leased = True
+                return session
+        return None
+
+    async def acquire(self, email, password, wait=None):
+        """
+        Lease a ready session for these credentials, opening one if needed.
+        Waits at most ``wait`` seconds (``MEGA_SESSION_WAIT_TIMEOUT`` by
+        default, 0 for no limit) for a session to be free.
+        """
+        if not MEGA_SDK_AVAILABLE:
+            raise MegaSessionError("MEGA SDK not available")
+        key = self._key(email, password)
+        size = max(Config.MEGA_SESSION_POOL_SIZE, 1)
+        semaphore = self._semaphores.setdefault(key, Semaphore(size))
+        if wait is None:
+            wait = Config.MEGA_SESSION_WAIT_TIMEOUT
+        if semaphore.locked():
+            LOGGER.info(f"Waiting for a MEGA session, all {size} are in use")
+        try:
+            await asyncio.wait_for(semaphore.acquire(), wait or None)
+        except TimeoutError:
+            raise MegaSessionError(
+                f"No MEGA session became free within {wait}s, all {size} are in use"
+            ) from None
+        try:
+            while session := self._take_idle(key):
+                if await sync_to_async(session.is_healthy):
+                    break
+                LOGGER.warning("Discarding unhealthy MEGA session")
+                await self._close(session)
+            else:
+                session = await self._open(key, email, password)
+                session.leased = True
+                self._sessions.setdefault(key, []).append(session)
+        except BaseException:
+            semaphore.release()
+            raise
+        session.uses += 1
+        session.last_used = time()
+        return session
+
+    async def release(self, session, discard=False):
+        """Return a leased session to the pool"""
+        if not session.leased:
+            return
+        session.detach_task_listeners()
+        session.leased = False
+        session.last_used = time()
+        try:
+            if discard or Config.MEGA_SESSION_IDLE_TIMEOUT <= 0:
+                await self._close(session)
+            elif self._janitor is None or self._janitor.done():
+                self._janitor = create_task(self._evict_idle())
+        finally:
+            self._semaphores[session.key].release()
+
+    @asynccontextmanager
+    async def lease(self, email, password, wait=None):
+        session = await self.acquire(email, password, wait)
+        discard = False
+        try:
+            yield session
+        except BaseException:
+            discard = not await sync_to_async(session.is_healthy)
+            raise
+        finally:
+            await self.release(session, discard)
+
+    async def _evict_idle(self):
+        while any(self._sessions.values()):
+            await sleep(JANITOR_INTERVAL)
+            timeout = Config.MEGA_SESSION_IDLE_TIMEOUT
+            now = time()
+            for sessions in list(self._sessions.values()):
+                for session in list(sessions):
+                    if session.leased:
+                        continue
+                    if now - session.last_used > timeout:
+                        LOGGER.info("Closing idle MEGA session")
+                        await self._close(session)
+                    elif not await sync_to_async(session.is_healthy):
+                        LOGGER.warning("Closing unhealthy idle MEGA session")
+                        await self._close(session)
+
+    async def close_all(self):
+        for sessions in list(self._sessions.values()):
+            for session in list(sessions):
+                await self._close(session)
+        if self._janitor and not self._janitor.done():
+            self._janitor.cancel()
+
+    def stats(self):
+        sessions = [s for group in self._sessions.values() for s in group]
+        return {
+            "sessions": len(sessions),
+            "leased": sum(s.leased for s in sessions),
+            "accounts": sum(bool(group) for group in self._sessions.values()),
+        }
+
+
+mega_session_pool = MegaSessionPool()
@@ -1,11 +1,14 @@
 # ruff: noqa
 from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from hashlib import sha256
 from http.cookiejar import MozillaCookieJar
 from json import loads
 from os import path as ospath
 from os.path import join as path_join
 from re import findall, match, search
+from threading import local
 from time import sleep
 from urllib.parse import parse_qs, urlparse, quote, unquote
 from uuid import uuid4
@@ -24,6 +27,57 @@ from bot.helper.ext_utils.status_utils import speed_string_to_bytes
 
 user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0"
 
+# Folders of one share listed at the same time
+FOLDER_WORKERS = 4
+
+_local = local()
+
+
+def _thread_session(scraper):
+    sessions = _local.__dict__.setdefault("sessions", {})
+    if (session := sessions.get(scraper)) is None:
+        session = create_scraper() if scraper else Session()
+        session.default_headers = session.headers.copy()
+        sessions[scraper] = session
+    return session
+
+
+@contextmanager
+def pooled_session(scraper=False):
+    """
+    The thread's requests session, or cloudscraper one with ``scraper``.
+    It stays open after the block so its connections and, for the scraper,
+    its setup are reused by the next link resolved in this thread.
+    """
+    yield _thread_session(scraper)
+
+
+def reset_sessions():
+    """Drop the headers and cookies the previous link left on the sessions"""
+    for session in getattr(_local, "sessions", {}).values():
+        session.headers.clear()
+        session.headers.update(session.default_headers)
+        session.cookies.clear()
+
+
+def fetch_folder_tree(fetch, subfolders, root):
+    """
+    Listings of a shared folder and all folders below it, by folder id.
+    ``fetch(folder_id)`` returns a listing and ``subfolders(listing)`` the
+    ids of its child folders. The folders of each level are fetched in
+    parallel.
+    """
+    listings = {root: fetch(root)}
+    level = subfolders(listings[root])
+    with ThreadPoolExecutor(FOLDER_WORKERS, thread_name_prefix="folders") as pool:
+        while level:
+            level = list(dict.fromkeys(f for f in level if f not in listings))
+            for folder_id, listing in zip(level, pool.map(fetch, level)):
+                listings[folder_id] = listing
+            level = [child for f in level for child in subfolders(listings[f])]
+    return listings
+
+
 debrid_link_supported_sites = [
     "1024tera.com",
     "1024terabox.com",
@@ -426,6 +480,7 @@ def direct_link_generator(link):
     domain = urlparse(link).hostname
     if not domain:
         raise DirectDownloadLinkException("ERROR: Invalid URL")
+    reset_sessions()
     if "yadi.sk" in link or "disk.yandex." in link:
         return yandex_disk(link)
     if Config.DEBRID_LINK_API and any(
@@ -634,7 +689,7 @@ def get_captcha_token(session, params):
 
 
 def debrid_link(url):
-    cget = create_scraper().request
+    cget = _thread_session(True).request
     resp = cget(
         "POST",
         f"https://debrid-link.com/api/v2/downloader/add?access_token={Config.DEBRID_LINK_API}",
@@ -677,20 +732,18 @@ def buzzheavier(url):
         return url
 
     def _bhscraper(url, folder=False):
-        session = Session()
+        session = _thread_session(False)
         if "/download" not in url:
             url += "/download"
         url = url.strip()
-        session.headers.update(
-            {
-                "referer": url.split("/download")[0],
-                "hx-current-url": url.split("/download")[0],
-                "hx-request": "true",
-                "priority": "u=1, i",
-            }
-        )
+        headers = {
+            "referer": url.split("/download")[0],
+            "hx-current-url": url.split("/download")[0],
+            "hx-request": "true",
+            "priority": "u=1, i",
+        }
         try:
-            response = session.get(url)
+            response = session.get(url, headers=headers)
             d_url = response.headers.get("Hx-Redirect")
             if not d_url:
                 if not folder:
@@ -702,7 +755,7 @@ def buzzheavier(url):
         except Exception as e:
             raise DirectDownloadLinkException(f"ERROR: {str(e)}") from e
 
-    with Session() as session:
+    with pooled_session() as session:
         tree = HTML(session.get(url).text)
         if link := tree.xpath(
             "//a[contains(@class, 'link-button') and contains(@class, 'gay-button')]/@hx-get"
@@ -779,7 +832,7 @@ def devuploads(url):
     @param url: URL from devuploads.com
     @return: Direct download link
     """
-    with Session() as session:
+    with pooled_session() as session:
         res = session.get(url)
         html = HTML(res.text)
         if not html.xpath("//input[@name]"):
@@ -848,7 +901,7 @@ def uploadhaven(url):
 
 
 def osdn(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(session.get(url).text)
         except Exception as e:
@@ -884,7 +937,7 @@ def github(url):
         findall(r"\bhttps?://.*github\.com.*releases\S+", url)[0]
     except IndexError as e:
         raise DirectDownloadLinkException("No GitHub Releases links found") from e
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         _res = session.get(url, stream=True, allow_redirects=False)
         if "location" in _res.headers:
             return _res.headers["location"]
@@ -922,7 +975,7 @@ def hxfile(url):
 def onedrive(link):
     """Onedrive direct link generator
     By https://github.com/junedkh"""
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             link = session.get(link).url
             parsed_link = urlparse(link)
@@ -987,7 +1040,7 @@ def streamtape(url):
 
 
 def racaty(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             url = session.get(url).url
             json_data = {"op": "download2", "id": url.split("/")[-1]}
@@ -1015,7 +1068,7 @@ def fichier(link):
     else:
         pswd = None
         url = link
-    cget = create_scraper().request
+    cget = _thread_session(True).request
     try:
         if pswd is None:
             req = cget("post", url)
@@ -1076,7 +1129,7 @@ def solidfiles(url):
     """Solidfiles direct link generator
     Based on https://github.com/Xonshiz/SolidFiles-Downloader
     By https://github.com/Jusidama18"""
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/36.0.1985.125 Safari/537.36",
@@ -1093,7 +1146,7 @@ def solidfiles(url):
 
 
 def krakenfiles(url):
-    with Session() as session:
+    with pooled_session() as session:
         try:
             _res = session.get(url)
         except Exception as e:
@@ -1125,7 +1178,7 @@ def krakenfiles(url):
 
 
 def uploadee(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(session.get(url).text)
         except Exception as e:
@@ -1151,7 +1204,7 @@ def terabox(url):
         api_url = f"https://wdzone-terabox-api.vercel.app/api?url={quote(url)}"
 
     try:
-        with Session() as session:
+        with pooled_session() as session:
             req = session.get(api_url, headers={"User-Agent": user_agent}).json()
     except Exception as e:
         raise DirectDownloadLinkException(f"ERROR: {e.__class__.__name__}") from e
@@ -1177,7 +1230,7 @@ def terabox(url):
 
 
 def filepress(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             url = session.get(url).url
             raw = urlparse(url)
@@ -1211,7 +1264,7 @@ def filepress(url):
 
 
 def gdtot(url):
-    cget = create_scraper().request
+    cget = _thread_session(True).request
     try:
         res = cget("GET", f"https://gdtot.pro/file/{url.split('/')[-1]}")
     except Exception as e:
@@ -1255,7 +1308,7 @@ def gdtot(url):
 
 
 def sharer_scraper(url):
-    cget = create_scraper().request
+    cget = _thread_session(True).request
     try:
         url = cget("GET", url).url
         raw = urlparse(url)
@@ -1322,7 +1375,7 @@ def sharer_scraper(url):
 
 
 def wetransfer(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             url = session.get(url).url
             splited_url = url.split("/")
@@ -1348,7 +1401,7 @@ def wetransfer(url):
 
 
 def akmfiles(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(
                 session.post(
@@ -1366,7 +1419,7 @@ def akmfiles(url):
 
 
 def shrdsk(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             _json = session.get(
                 f"https://us-central1-affiliate2apk.cloudfunctions.net/get_data?shortid={url.split('/')[-1]}",
@@ -1436,7 +1489,7 @@ def linkBox(url: str):
             details["total_size"] += size
         details["contents"].append(item)
 
-    def __fetch_links(session, _id=0, folderPath=""):
+    def __fetch_folder(session, _id):
         params = {
             "shareToken": shareToken,
             "pageSize": 1000,
@@ -1456,11 +1509,19 @@ def linkBox(url: str):
             if "msg" in _json:
                 raise DirectDownloadLinkException(f"ERROR: {_json['msg']}")
             raise DirectDownloadLinkException("ERROR: data not found")
-        try:
-            if data["shareType"] == "singleItem":
-                return __singleItem(session, data["itemId"])
-        except Exception:
-            pass
+        return data
+
+    def __subfolders(data):
+        if data.get("shareType") == "singleItem":
+            return []
+        return [
+            content["id"]
+            for content in data.get("list") or []
+            if content["type"] == "dir" and "url" not in content
+        ]
+
+    def __fetch_links(folders, _id=0, folderPath=""):
+        data = folders[_id]
         if not details["title"]:
             details["title"] = data["dirName"]
         contents = data["list"]
@@ -1474,7 +1535,7 @@ def linkBox(url: str):
                     newFolderPath = ospath.join(folderPath, content["name"])
                 if not details["title"]:
                     details["title"] = content["name"]
-                __fetch_links(session, content["id"], newFolderPath)
+                __fetch_links(folders, content["id"], newFolderPath)
             elif "url" in content:
                 if not folderPath:
                     folderPath = details["title"]
@@ -1497,8 +1558,20 @@ def linkBox(url: str):
         return None
 
     try:
-        with Session() as session:
-            __fetch_links(session)
+        with pooled_session() as session:
+            folders = fetch_folder_tree(
+                lambda folder_id: __fetch_folder(session, folder_id),
+                __subfolders,
+                0,
+            )
+            single = folders[0].get("shareType") == "singleItem"
+            if single:
+                try:
+                    __singleItem(session, folders[0]["itemId"])
+                except Exception:
+                    single = False
+            if not single:
+                __fetch_links(folders)
     except DirectDownloadLinkException as e:
         raise e
     return details
@@ -1532,7 +1605,7 @@ def gofile(url):
         except Exception as e:
             raise e
 
-    def __fetch_links(session, _id, folderPath=""):
+    def __fetch_folder(session, _id):
         _url = f"https://api.gofile.io/contents/{_id}?wt=4fd6sg89d7s6&cache=true"
         headers = {
             "User-Agent": user_agent,
@@ -1559,8 +1632,17 @@ def gofile(url):
             )
         if _json["status"] in "error-notPublic":
             raise DirectDownloadLinkException("ERROR: This folder is not public")
+        return _json["data"]
 
-        data = _json["data"]
+    def __subfolders(data):
+        return [
+            content["id"]
+            for content in data.get("children", {}).values()
+            if content["type"] == "folder" and content["public"]
+        ]
+
+    def __fetch_links(folders, _id, folderPath=""):
+        data = folders[_id]
 
         if not details["title"]:
             details["title"] = data["name"] if data["type"] == "folder" else _id
@@ -1574,7 +1656,7 @@ def gofile(url):
                     newFolderPath = ospath.join(details["title"], content["name"])
                 else:
                     newFolderPath = ospath.join(folderPath, content["name"])
-                __fetch_links(session, content["id"], newFolderPath)
+                __fetch_links(folders, content["id"], newFolderPath)
             else:
                 if not folderPath:
                     folderPath = details["title"]
@@ -1591,14 +1673,19 @@ def gofile(url):
                 details["contents"].append(item)
 
     details = {"contents": [], "title": "", "total_size": 0}
-    with Session() as session:
+    with pooled_session() as session:
         try:
             token = __get_token(session)
         except Exception as e:
             raise DirectDownloadLinkException(f"ERROR: {e.__class__.__name__}")
         details["header"] = f"Cookie: accountToken={token}"
         try:
-            __fetch_links(session, _id)
+            folders = fetch_folder_tree(
+                lambda folder_id: __fetch_folder(session, folder_id),
+                __subfolders,
+                _id,
+            )
+            __fetch_links(folders, _id)
         except Exception as e:
             raise DirectDownloadLinkException(e)
 
@@ -1630,7 +1717,7 @@ def send_cm_file(url, file_id=None):
     else:
         _password = ""
     _passwordNeed = False
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         if file_id is None:
             try:
                 html = HTML(session.get(url).text)
@@ -1771,7 +1858,7 @@ def doods(url):
     if "/e/" in url:
         url = url.replace("/e/", "/d/")
     parsed_url = urlparse(url)
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(session.get(url).text)
         except Exception as e:
@@ -1805,7 +1892,7 @@ def easyupload(url):
     else:
         _password = ""
     file_id = url.split("/")[-1]
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             _res = session.get(url)
         except Exception as e:
@@ -1938,7 +2025,7 @@ def streamvid(url: str):
     parsed_url = urlparse(url)
     url = f"{parsed_url.scheme}://{parsed_url.hostname}/d/{file_code}"
     quality_defined = bool(url.endswith(("_o", "_h", "_n", "_l")))
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(session.get(url).text)
         except Exception as e:
@@ -1991,7 +2078,7 @@ def streamhub(url):
     file_code = url.split("/")[-1]
     parsed_url = urlparse(url)
     url = f"{parsed_url.scheme}://{parsed_url.hostname}/d/{file_code}"
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             html = HTML(session.get(url).text)
         except Exception as e:
@@ -2022,7 +2109,7 @@ def streamhub(url):
 
 
 def pcloud(url):
-    with create_scraper() as session:
+    with pooled_session(scraper=True) as session:
         try:
             res = session.get(url)
         except Exception as e:
@@ -2065,7 +2152,7 @@ def qiwi(url):
 
 
 def mp4upload(url):
-    with Session() as session:
+    with pooled_session() as session:
         try:
             url = url.replace("embed-", "")
             req = session.get(url).text
@@ -0,0 +1,63 @@
+"""
+Asynchronous front of the direct link generator.
+
+Host handlers are blocking scrapers and used to run on the default executor,
+one at a time per call and without memory of earlier results. A bulk job
+against one host could occupy every worker of that executor and scrape the
+same links again for each task. Links are now resolved on a dedicated pool
+with a concurrency limit per host, concurrent requests for a link share one
+resolution, and resolved links and folder manifests are kept for
+``RESULT_TTL`` seconds.
+"""
+
+from asyncio import Semaphore, get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from urllib.parse import urlparse
+
+from bot import LOGGER
+from bot.helper.ext_utils.cache_utils import Cache
+
+from .direct_link_generator import direct_link_generator
+
+# Threads resolving links, separate from the default executor
+RESOLVER_WORKERS = 16
+
+# Links of one host resolved at the same time
+HOST_CONCURRENCY = 4
+
+# Seconds a resolved link or folder manifest is reused, hosts sign their
+# download links for a limited time
+RESULT_TTL = 600
+
+_executor = ThreadPoolExecutor(RESOLVER_WORKERS, thread_name_prefix="direct_link")
+_host_limits = {}
+_results = Cache("direct_links", max_entries=512, ttl=RESULT_TTL)
+
+
+def link_host(link):
+    host = (urlparse(link).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+async def _resolve(link):
+    host = link_host(link)
+    if (limit := _host_limits.get(host)) is None:
+        limit = _host_limits[host] = Semaphore(HOST_CONCURRENCY)
+    async with limit:
+        result = await get_running_loop().run_in_executor(
+            _executor, direct_link_generator, link
+        )
+    LOGGER.info(f"Resolved direct link of {host}")
+    return result
+
+
+async def resolve_direct_link(link):
+    """
+    ``direct_link_generator(link)`` through the result cache. Returns a
+    link, a (link, headers) tuple or a folder manifest like the generator,
+    and raises its DirectDownloadLinkException.
+    """
+    result = await _results.get_or_load(link, lambda: _resolve(link))
+    # Callers edit manifests, keep the cached one intact
+    return deepcopy(result) if isinstance(result, dict) else result
@@ -8,6 +8,7 @@ from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
 from bot.helper.ext_utils.links_utils import get_mega_link_type
 from bot.helper.ext_utils.task_manager import check_running_tasks
+from bot.helper.mega_utils.session_pool import mega_session_pool
 from bot.helper.mirror_leech_utils.status_utils.mega_status import MegaCloneStatus
 from bot.helper.mirror_leech_utils.status_utils.queue_status import QueueStatus
 from bot.helper.telegram_helper.message_utils import send_status_message
@@ -618,9 +619,16 @@ async def _navigate_to_folder(api, root_node, folder_path):
         return None
 
 
-async def _cleanup_mega_clone_api(api, executor, listener=None):
+async def _cleanup_mega_clone_api(api, executor, listener=None, session=None):
     """Helper function to cleanup MEGA API instances with enhanced memory safety"""
     try:
+        # Pooled sessions stay logged in; releasing detaches the task listener
+        if session:
+            if executor and hasattr(executor, "continue_event"):
+                executor.continue_event.set()
+            await mega_session_pool.release(session)
+            return
+
         # Remove listener first to prevent callbacks during cleanup
         if listener and api:
             try:
@@ -729,38 +737,24 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
     executor = AsyncMegaCloneExecutor()
     api = None
     mega_listener = None
+    session = None
+    ready = False
 
     try:
-        # Initialize MEGA API with error checking and safer patterns
-        try:
-            # Use a unique app key for each instance to avoid conflicts
-            app_key = f"aimleechbot_clone_{int(time())}"
-            api = MegaApi(None, None, None, app_key)
-            if not api:
-                raise Exception("Failed to create MEGA API instance")
-
-            # Add a small delay to allow API initialization
-            await asyncio.sleep(0.1)
-
-        except Exception as e:
-            error_msg = f"Failed to initialize MEGA API: {e!s}"
-            LOGGER.error(error_msg)
-            await listener.on_download_error(error_msg)
-            return
-
         try:
             mega_listener = MegaCloneListener(executor.continue_event, listener)
-            api.addListener(mega_listener)
         except Exception as e:
-            error_msg = f"Failed to attach MEGA listener: {e!s}"
+            error_msg = f"Failed to create MEGA listener: {e!s}"
             LOGGER.error(error_msg)
             await listener.on_download_error(error_msg)
             return
 
-        # Login with credentials
+        # Lease a logged-in session from the pool
         try:
-            # Increase timeout for clone login to 120 seconds
-            await executor.do(api.login, (MEGA_EMAIL, MEGA_PASSWORD), timeout=120)
+            session = await mega_session_pool.acquire(MEGA_EMAIL, MEGA_PASSWORD)
+            api = session.api
+            session.add_listener(mega_listener)
+            mega_listener.node = session.root_node
         except Exception as e:
             error_msg = f"MEGA login failed: {e!s}"
             LOGGER.error(error_msg)
@@ -770,12 +764,6 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
             await listener.on_download_error(error_msg)
             return
 
-        if mega_listener.error is not None:
-            error_msg = f"Failed to login to MEGA: {mega_listener.error}"
-            LOGGER.error(error_msg)
-            await listener.on_download_error(error_msg)
-            return
-
         # Detect account type and get optimized settings
         try:
             await _detect_mega_clone_account_type(api)
@@ -869,12 +857,16 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
                         f"Could not calculate folder size: {e}, using reported size"
                     )
 
+        ready = True
     except Exception as e:
         error_msg = f"Error accessing MEGA for clone: {e!s}"
         LOGGER.error(error_msg)
         await listener.on_download_error(error_msg)
-        await _cleanup_mega_clone_api(api, executor, mega_listener)
         return
+    finally:
+        # Return the session on every early exit, not only on exceptions
+        if not ready:
+            await _cleanup_mega_clone_api(api, executor, mega_listener, session)
 
     # Set name and size based on the node
     # Preserve the original folder name from the MEGA link, not the SDK default
@@ -887,6 +879,11 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
 
     gid = token_hex(4)
 
+    # The clone runs as a download and upload that lease their own sessions,
+    # this one is not needed while queued or afterwards
+    await _cleanup_mega_clone_api(api, executor, mega_listener, session)
+    session = api = None
+
     # Check if clone should be queued
     added_to_queue, event = await check_running_tasks(listener)
     if added_to_queue:
@@ -899,7 +896,7 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
         async with task_dict_lock:
             if listener.mid not in task_dict:
                 LOGGER.info("MEGA clone was cancelled while in queue")
-                await _cleanup_mega_clone_api(api, executor)
+                await _cleanup_mega_clone_api(api, executor, session=session)
                 return
         from_queue = True
         LOGGER.info(f"Starting queued MEGA clone: {listener.name}")
@@ -940,9 +937,6 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
             else None
         )
 
-        # Cleanup current API instances before fallback to prevent segfaults
-        await _cleanup_mega_clone_api(api, executor, mega_listener)
-
         # Fall back to download + upload with the selected destination path
         await _fallback_to_download_upload(listener, mega_link, selected_clone_path)
         return
@@ -973,7 +967,7 @@ async def add_mega_clone(listener, mega_link, clone_path=None):
     finally:
         # Always cleanup API connections with enhanced safety
         try:
-            await _cleanup_mega_clone_api(api, executor, mega_listener)
+            await _cleanup_mega_clone_api(api, executor, mega_listener, session)
             LOGGER.info("MEGA clone: Final cleanup completed")
         except Exception as cleanup_error:
             LOGGER.error(f"MEGA clone: Error during final cleanup: {cleanup_error}")
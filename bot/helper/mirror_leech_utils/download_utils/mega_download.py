@@ -112,12 +112,14 @@ except Exception as e:
 from bot import LOGGER, task_dict, task_dict_lock
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
+from bot.helper.ext_utils.exceptions import MegaSessionError
 from bot.helper.ext_utils.limit_checker import limit_checker
 from bot.helper.ext_utils.links_utils import get_mega_link_type
 from bot.helper.ext_utils.task_manager import (
     check_running_tasks,
     stop_duplicate_check,
 )
+from bot.helper.mega_utils.session_pool import mega_session_pool
 from bot.helper.mirror_leech_utils.status_utils.mega_status import MegaDownloadStatus
 from bot.helper.mirror_leech_utils.status_utils.queue_status import QueueStatus
 from bot.helper.telegram_helper.message_utils import send_status_message
@@ -544,7 +546,7 @@ class AsyncExecutor:
             await self.continue_event.wait()  # No timeout - wait indefinitely
 
 
-async def _cleanup_mega_apis(api, folder_api, executor):
+async def _cleanup_mega_apis(api, folder_api, executor, session=None):
     """Helper function to cleanup MEGA API instances"""
     try:
         # Set the executor event to prevent any lingering timeouts
@@ -562,6 +564,11 @@ async def _cleanup_mega_apis(api, folder_api, executor):
         ):
             executor.continue_event.listener._cleanup_mode = True
 
+        # Pooled sessions stay logged in and go back to the pool
+        if session:
+            await mega_session_pool.release(session)
+            api = None
+
         # Logout directly without using executor to avoid timeout issues
         if api:
             try:
@@ -649,14 +656,15 @@ async def add_mega_download(listener, path):
         MEGA_PASSWORD = Config.MEGA_PASSWORD
 
     executor = AsyncExecutor()
-    api = MegaApi(None, None, None, "aimleechbot")
+    api = None
     folder_api = None
+    session = None
+    ready = False
 
     mega_listener = MegaAppListener(executor.continue_event, listener)
-    api.addListener(mega_listener)
 
     try:
-        # Login if credentials are provided
+        # Lease a logged-in session if credentials are provided
         if MEGA_EMAIL and MEGA_PASSWORD:
             # Validate credentials format before attempting login
             if not MEGA_EMAIL or not MEGA_PASSWORD:
@@ -705,59 +713,14 @@ async def add_mega_download(listener, path):
             if MEGA_PASSWORD.strip() != MEGA_PASSWORD:
                 LOGGER.warning("MEGA password has leading/trailing whitespace")
 
-            # Reset listener state before login
-            mega_listener.error = None
-            mega_listener.is_cancelled = False
-
             try:
-                # Increase timeout to 180 seconds to handle slow MEGA servers
-                await executor.do(
-                    api.login, (MEGA_EMAIL, MEGA_PASSWORD), timeout=180
-                )
-                LOGGER.info("MEGA login successful")
-            except TimeoutError:
-                LOGGER.error("MEGA login timed out after 180 seconds")
-
-                # Check if we had persistent error -3 during timeout
-                if hasattr(mega_listener, "_retry_counts"):
-                    error_3_count = mega_listener._retry_counts.get(
-                        "1_-3", 0
-                    )  # LOGIN type = 1
-                    if error_3_count >= 10:
-                        LOGGER.error(
-                            f"MEGA login timed out with {error_3_count} error -3 retries - likely invalid credentials"
-                        )
-                        friendly_msg = (
-                            "❌ MEGA Login Failed: Invalid credentials (persistent error -3).\n\n"
-                            "After 180 seconds of retries, the login is still failing with error -3.\n"
-                            "This strongly suggests:\n"
-                            "• Incorrect MEGA email or password\n"
-                            "• Email format issues (check for typos)\n"
-                            "• Password encoding problems\n"
-                            "• Account verification required\n\n"
-                            "Please verify your credentials by logging into mega.nz manually."
-                        )
-                    else:
-                        friendly_msg = (
-                            "❌ MEGA Login Timeout: Connection took too long.\n\n"
-                            "This usually means:\n"
-                            "• MEGA servers are experiencing high load\n"
-                            "• Network connectivity issues\n"
-                            "• Firewall blocking MEGA connections\n\n"
-                            "Please try again in a few minutes."
-                        )
-                else:
-                    friendly_msg = (
-                        "❌ MEGA Login Timeout: Connection took too long.\n\n"
-                        "This usually means:\n"
-                        "• MEGA servers are experiencing high load\n"
-                        "• Network connectivity issues\n"
-                        "• Firewall blocking MEGA connections\n\n"
-                        "Please try again in a few minutes."
-                    )
-
-                await listener.on_download_error(friendly_msg)
-                return
+                # Reuses a warm session when one is idle, otherwise logs in
+                # and fetches nodes once for the pool
+                session = await mega_session_pool.acquire(MEGA_EMAIL, MEGA_PASSWORD)
+                api = session.api
+                session.add_listener(mega_listener)
+                mega_listener.node = session.root_node
+                LOGGER.info("MEGA session ready")
             except Exception as login_error:
                 error_msg = str(login_error).lower()
                 LOGGER.error(f"MEGA login failed: {login_error}")
@@ -866,65 +829,8 @@ async def add_mega_download(listener, path):
                 return
         else:
             LOGGER.info("Using anonymous MEGA access (no credentials provided)")
-            # Anonymous access
-
-        # Check for login errors after authentication attempt
-        # Note: After successful login, mega_listener.error may still contain the last temporary error
-        # We need to check if login actually succeeded by verifying we can fetch nodes
-        if mega_listener.error is not None:
-            error_msg = str(mega_listener.error).lower()
-
-            # Skip temporary network errors that should be retried or were resolved
-            if any(
-                temp_error in error_msg
-                for temp_error in [
-                    "request failed, retrying",
-                    "temporary error",
-                    "network error",
-                    "connection timeout",
-                    "error code: -1",
-                    "error code: -2",
-                    "error code: -3",
-                    "error code: -4",
-                    "error code: -5",
-                    "invalid login credentials (error -3)",  # This was from temporary retries
-                ]
-            ):
-                LOGGER.warning(
-                    f"MEGA temporary network error during authentication (ignoring after successful login): {mega_listener.error}"
-                )
-                # Reset the error and allow the process to continue since login succeeded
-                mega_listener.error = None
-            else:
-                # Only treat as real authentication error if it's not a temporary error
-                LOGGER.error(
-                    f"MEGA authentication error detected: {mega_listener.error}"
-                )
-
-                if any(
-                    auth_error in error_msg
-                    for auth_error in [
-                        "access denied",
-                        "invalid credentials",
-                        "authentication failed",
-                        "unauthorized",
-                        "forbidden",
-                        "login required",
-                    ]
-                ):
-                    friendly_msg = (
-                        "❌ MEGA Authentication Failed: Access denied.\n\n"
-                        "This usually means:\n"
-                        "• Invalid MEGA email or password\n"
-                        "• Account suspended or restricted\n"
-                        "• Two-factor authentication enabled (not supported)\n\n"
-                        "Please check your MEGA credentials in bot settings."
-                    )
-                else:
-                    friendly_msg = f"❌ MEGA Error: {mega_listener.error}"
-
-                await listener.on_download_error(friendly_msg)
-                return
+            api = MegaApi(None, None, None, "aimleechbot")
+            api.addListener(mega_listener)
 
         # Handle file vs folder links
         link_type = get_mega_link_type(listener.link)
@@ -950,13 +856,16 @@ async def add_mega_download(listener, path):
             await listener.on_download_error(error_msg)
             return
 
+        ready = True
     except Exception as e:
         error_msg = f"Error accessing MEGA link: {e!s}"
         LOGGER.error(error_msg)
         await listener.on_download_error(error_msg)
         return
     finally:
-        pass  # Cleanup will be done later after download completes
+        # On success cleanup is done later after download completes
+        if not ready:
+            await _cleanup_mega_apis(api, folder_api, executor, session)
 
     # Set name and size based on the node type
     link_type = get_mega_link_type(listener.link)
@@ -1035,7 +944,7 @@ async def add_mega_download(listener, path):
         if limit_msg:
             LOGGER.warning(f"MEGA download size limit exceeded: {limit_msg}")
             await listener.on_download_error(limit_msg)
-            await _cleanup_mega_apis(api, folder_api, executor)
+            await _cleanup_mega_apis(api, folder_api, executor, session)
             return
         LOGGER.info("MEGA download size limit check passed")
     else:
@@ -1046,7 +955,7 @@ async def add_mega_download(listener, path):
     if msg:
         LOGGER.info(f"MEGA download duplicate detected: {msg}")
         await listener.on_download_error(msg, button)
-        await _cleanup_mega_apis(api, folder_api, executor)
+        await _cleanup_mega_apis(api, folder_api, executor, session)
         return
     LOGGER.info("MEGA download duplicate check passed")
 
@@ -1058,12 +967,36 @@ async def add_mega_download(listener, path):
             task_dict[listener.mid] = QueueStatus(listener, gid, "dl")
         await listener.on_download_start()
         await send_status_message(listener.message)
+        # Queued tasks give their session back, the pool is small and
+        # running tasks and searches need it
+        if session:
+            await mega_session_pool.release(session)
+            session = api = None
         LOGGER.info("Waiting for queue event...")
         await event.wait()
         async with task_dict_lock:
             if listener.mid not in task_dict:
                 LOGGER.warning("MEGA download removed from task_dict while in queue")
-                await _cleanup_mega_apis(api, folder_api, executor)
+                await _cleanup_mega_apis(api, folder_api, executor, session)
+                return
+        if api is None:
+            try:
+                session = await mega_session_pool.acquire(MEGA_EMAIL, MEGA_PASSWORD)
+                api = session.api
+                session.add_listener(mega_listener)
+                # Public nodes belong to the session that fetched them
+                if link_type == "file":
+                    await executor.do(
+                        api.getPublicNode, (listener.link,), timeout=30
+                    )
+                    node = mega_listener.public_node
+                if mega_listener.error is not None or node is None:
+                    raise MegaSessionError(mega_listener.error or "node not found")
+            except Exception as e:
+                error_msg = f"Failed to resume MEGA download: {e!s}"
+                LOGGER.error(error_msg)
+                await listener.on_download_error(error_msg)
+                await _cleanup_mega_apis(api, folder_api, executor, session)
                 return
         from_queue = True
         LOGGER.info("MEGA download started from queue")
@@ -1127,4 +1060,4 @@ async def add_mega_download(listener, path):
         # Set cleanup mode to suppress harmless logout errors
         if mega_listener:
             mega_listener._cleanup_mode = True
-        await _cleanup_mega_apis(api, folder_api, executor)
+        await _cleanup_mega_apis(api, folder_api, executor, session)
@@ -1368,26 +1368,6 @@ async def add_streamrip_download(
 
             await cleanup_all_streamrip_sessions()
 
-            # Additional cleanup for any remaining sessions
-            import gc
-
-            import aiohttp
-
-            # Force garbage collection to find unclosed sessions
-            gc.collect()
-
-            # Close any remaining aiohttp sessions
-            for obj in gc.get_objects():
-                if isinstance(obj, aiohttp.ClientSession | aiohttp.TCPConnector):
-                    try:
-                        if not obj.closed:
-                            await obj.close()
-                    except Exception:
-                        pass
-
-            # Final garbage collection
-            gc.collect()
-
         except Exception as cleanup_error:
             # Only log if it's not a common cleanup error
             if "session" not in str(cleanup_error).lower():
@@ -1,4 +1,5 @@
 from asyncio import Lock, create_task, sleep
+from errno import ENOSPC
 from secrets import token_hex
 from time import time
 
@@ -128,6 +129,7 @@ class TelegramDownloadHelper:
         global LOGGER  # Ensure LOGGER is treated as global
         try:
             if self._hyper_dl:
+                hyper = None
                 try:
                     # First check if the message has downloadable media
                     media = (
@@ -147,7 +149,8 @@ class TelegramDownloadHelper:
                             "Message doesn't contain any downloadable media"
                         )
 
-                    download = await HyperTGDownload().download_media(
+                    hyper = HyperTGDownload()
+                    download = await hyper.download_media(
                         message,
                         file_name=path,
                         progress=self._on_download_progress,
@@ -157,12 +160,19 @@ class TelegramDownloadHelper:
                 except ValueError:
                     # This is a configuration or media error, fall back to normal download
                     self._hyper_dl = False
+                    if hyper:
+                        await hyper.discard_partial()
                     download = await message.download(
                         file_name=path,
                         progress=self._on_download_progress,
                     )
-                except Exception:
+                except Exception as e:
                     # This is an unexpected error, fall back to normal download
+                    if hyper:
+                        await hyper.discard_partial()
+                    if isinstance(e, OSError) and e.errno == ENOSPC:
+                        # The normal download would fill the same disk
+                        raise
                     download = await message.download(
                         file_name=path,
                         progress=self._on_download_progress,
@@ -181,7 +191,7 @@ class TelegramDownloadHelper:
             return
         except OSError as e:
             # Check specifically for "No space left on device" error
-            if e.errno == 28:  # errno 28 is "No space left on device"
+            if e.errno == ENOSPC:
                 error_msg = "No space left on device. Please free up some disk space and try again."
                 LOGGER.error(f"{error_msg} Path: {path}")
                 await self._on_download_error(error_msg)
@@ -1,7 +1,7 @@
 # ruff: noqa: ARG005, B023
 import contextlib
-import gc
 from asyncio import create_task
+from copy import deepcopy
 from logging import getLogger
 from os import listdir
 from os import path as ospath
@@ -12,16 +12,16 @@ from yt_dlp import DownloadError, YoutubeDL
 
 from bot import task_dict, task_dict_lock
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
+from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 from bot.helper.ext_utils.limit_checker import limit_checker
 from bot.helper.ext_utils.task_manager import (
     check_running_tasks,
     stop_duplicate_check,
 )
-
-try:
-    from bot.helper.ext_utils.gc_utils import smart_garbage_collection
-except ImportError:
-    smart_garbage_collection = None
+from bot.helper.mirror_leech_utils.download_utils.yt_dlp_info import (
+    extract_info_cached,
+    is_fresh,
+)
 from bot.helper.mirror_leech_utils.status_utils.queue_status import QueueStatus
 from bot.helper.mirror_leech_utils.status_utils.yt_dlp_status import YtDlpStatus
 from bot.helper.telegram_helper.message_utils import (
@@ -86,6 +86,9 @@ class YoutubeDLHelper:
         self._gid = ""
         self._ext = ""
         self.is_playlist = False
+        # Info dict of the link and when it was extracted, see _take_info
+        self._info = None
+        self._info_time = 0
 
         # Initialize with default cookies, will be updated in async_init
         self.user_cookies_list = []
@@ -443,9 +446,16 @@ class YoutubeDLHelper:
 
         with YoutubeDL(self.opts) as ydl:
             try:
-                result = ydl.extract_info(self._listener.link, download=False)
-                if result is None:
-                    raise ValueError("Info result is None")
+                if self._info is not None:
+                    # Extracted for the quality menu, the formats are
+                    # selected again with the options of this download
+                    result = ydl.process_ie_result(
+                        deepcopy(self._info), download=False
+                    )
+                else:
+                    result, self._info_time = extract_info_cached(
+                        ydl, self._listener.link
+                    )
 
                 # Check if it's a live stream and configure accordingly
                 if result.get("is_live"):
@@ -634,8 +644,8 @@ class YoutubeDLHelper:
 
                         # Retry extraction
                         try:
-                            result = ydl.extract_info(
-                                self._listener.link, download=False
+                            result, self._info_time = extract_info_cached(
+                                ydl, self._listener.link
                             )
                             if result and result.get("formats"):
                                 LOGGER.info(
@@ -662,11 +672,9 @@ class YoutubeDLHelper:
                         # Retry the extraction with the new cookie
                         try:
                             with YoutubeDL(self.opts) as ydl:
-                                result = ydl.extract_info(
-                                    self._listener.link, download=False
+                                result, self._info_time = extract_info_cached(
+                                    ydl, self._listener.link
                                 )
-                                if result is None:
-                                    raise ValueError("Info result is None")
                                 # Continue with the rest of the extraction logic...
                                 # (The rest of the code will handle the result)
                         except Exception as retry_e:
@@ -679,11 +687,11 @@ class YoutubeDLHelper:
                                 # One more retry attempt
                                 try:
                                     with YoutubeDL(self.opts) as ydl:
-                                        result = ydl.extract_info(
-                                            self._listener.link, download=False
+                                        result, self._info_time = (
+                                            extract_info_cached(
+                                                ydl, self._listener.link
+                                            )
                                         )
-                                        if result is None:
-                                            raise ValueError("Info result is None")
                                 except Exception:
                                     return self._on_download_error(
                                         f"All cookies failed. Last error: {retry_e!s}"
@@ -698,6 +706,7 @@ class YoutubeDLHelper:
                         )
                 else:
                     return self._on_download_error(error_str)
+            self._info = result
             if "entries" in result:
                 for entry in result["entries"]:
                     if not entry:
@@ -799,6 +808,15 @@ class YoutubeDLHelper:
                 return None
             return None
 
+    def _take_info(self):
+        """
+        The extracted info dict for the first download attempt. Retries
+        change clients or cookies and extract again, and so does a download
+        that waited in the queue until the stream URLs expired.
+        """
+        info, self._info = self._info, None
+        return info if is_fresh(self._info_time) else None
+
     def _download(self, path):
         try:
             # Track which clients we've tried
@@ -821,8 +839,12 @@ class YoutubeDLHelper:
                                 tried_clients.append(current_client)
                                 LOGGER.info(f"YouTube client: {current_client}")
 
-                            # Attempt download
-                            ydl.download([self._listener.link])
+                            # Attempt download, from the info dict of the
+                            # metadata step when it is still fresh
+                            if (info := self._take_info()) is not None:
+                                ydl.process_ie_result(info, download=True)
+                            else:
+                                ydl.download([self._listener.link])
                             # If we get here, download was successful
                             break
 
@@ -941,12 +963,7 @@ class YoutubeDLHelper:
                         finally:
                             # Force garbage collection after download attempt
                             # YT-DLP can create large objects in memory
-                            if smart_garbage_collection:
-                                smart_garbage_collection(aggressive=True)
-                            else:
-                                # Multiple collection passes to ensure memory is freed
-                                gc.collect()
-                                gc.collect()
+                            smart_garbage_collection(aggressive=True)
 
                             # Try to free more memory by clearing large variables
                             try:
@@ -1081,12 +1098,7 @@ class YoutubeDLHelper:
         except Exception as e:
             LOGGER.error(f"Error in YT-DLP download: {e}")
             # Force garbage collection after error
-            if smart_garbage_collection:
-                smart_garbage_collection(aggressive=True)
-            else:
-                # Multiple collection passes to ensure memory is freed
-                gc.collect()
-                gc.collect()
+            smart_garbage_collection(aggressive=True)
 
             # Try to free more memory by clearing large variables
             try:
@@ -1235,6 +1247,18 @@ class YoutubeDLHelper:
 
         self.opts["format"] = qual
 
+        listener = self._listener
+        # A playlist info dict of the quality menu has no entries, only the
+        # info dict of a single video can be reused
+        if (
+            listener.ytdl_info is not None
+            and "entries" not in listener.ytdl_info
+            and is_fresh(listener.ytdl_info_time)
+        ):
+            self._info = listener.ytdl_info
+            self._info_time = listener.ytdl_info_time
+        listener.ytdl_info = None
+
         await sync_to_async(self._extract_meta_data)
         if self._listener.is_cancelled:
             return
@@ -1378,10 +1402,7 @@ class YoutubeDLHelper:
         LOGGER.info(f"Cancelling Download: {self._listener.name}")
 
         # Force garbage collection after cancellation
-        if smart_garbage_collection:
-            smart_garbage_collection(aggressive=True)
-        else:
-            gc.collect()
+        smart_garbage_collection(aggressive=True)
 
         # Log memory usage after garbage collection if available
         try:
@@ -0,0 +1,132 @@
+"""
+Short lived disk cache of yt-dlp info dicts.
+
+Extracting a link is the slow part of a yt-dlp task, a playlist can take
+tens of seconds and hundreds of requests. The quality menu, the metadata
+step and the download used to extract the same link again, and so did every
+repeated request for it. Info dicts are kept on disk for ``INFO_TTL``
+seconds, keyed by the link, the cookies used and the options that change
+what the extractor returns. The stream URLs inside an info dict expire, so
+entries are never used after that.
+"""
+
+import json
+from contextlib import suppress
+from hashlib import sha256
+from logging import getLogger
+from os import listdir, makedirs, remove, replace, stat
+from os import path as ospath
+from time import time
+
+from yt_dlp import YoutubeDL
+
+LOGGER = getLogger(__name__)
+
+INFO_CACHE_DIR = "yt-dlp-info"
+
+# Seconds an extracted info dict may be reused
+INFO_TTL = 600
+
+# Options that change the info dict an extractor returns, or the formats
+# selected in it
+KEY_OPTIONS = (
+    "playlist_items",
+    "extractor_args",
+    "usenetrc",
+    "noplaylist",
+    "format",
+    "format_sort",
+    "merge_output_format",
+)
+
+
+def _cookie_identity(cookiefile):
+    """The cookie file and its version, edited cookies are a new identity"""
+    if not cookiefile:
+        return ""
+    try:
+        st = stat(cookiefile)
+    except OSError:
+        return cookiefile
+    return f"{cookiefile}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def info_key(link, options):
+    parts = {
+        "link": link,
+        "cookies": _cookie_identity(options.get("cookiefile")),
+        **{key: options.get(key) for key in KEY_OPTIONS},
+    }
+    return sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _purge(now):
+    with suppress(OSError):
+        for name in listdir(INFO_CACHE_DIR):
+            file = ospath.join(INFO_CACHE_DIR, name)
+            with suppress(OSError):
+                if now - stat(file).st_mtime > INFO_TTL:
+                    remove(file)
+
+
+def load_info(link, options):
+    """Cached info dict and its extraction time, or (None, 0)"""
+    file = ospath.join(INFO_CACHE_DIR, f"{info_key(link, options)}.json")
+    try:
+        extracted = stat(file).st_mtime
+        if time() - extracted > INFO_TTL:
+            return None, 0
+        with open(file, encoding="utf-8") as f:
+            return json.load(f), extracted
+    except (OSError, ValueError):
+        return None, 0
+
+
+def _has_formats(info):
+    """Whether the info dict, or every entry of a playlist, lists formats"""
+    if info.get("_type") == "playlist":
+        entries = info.get("entries") or []
+        # Lazy entries are consumed by reading them, and are not cacheable
+        return isinstance(entries, list) and all(
+            entry and _has_formats(entry) for entry in entries
+        )
+    return bool(info.get("formats"))
+
+
+def save_info(link, options, info):
+    # Extractions that came back without formats failed partially, a retry
+    # with other cookies or clients has to extract again
+    if not _has_formats(info):
+        return
+    now = time()
+    _purge(now)
+    file = ospath.join(INFO_CACHE_DIR, f"{info_key(link, options)}.json")
+    try:
+        makedirs(INFO_CACHE_DIR, exist_ok=True)
+        with open(f"{file}.tmp", "w", encoding="utf-8") as f:
+            json.dump(YoutubeDL.sanitize_info(info), f)
+        replace(f"{file}.tmp", file)
+    except (OSError, TypeError, ValueError) as e:
+        LOGGER.warning(f"Could not cache yt-dlp info of {link}: {e}")
+
+
+def extract_info_cached(ydl, link):
+    """
+    ``ydl.extract_info(link, download=False)`` through the disk cache.
+    Returns the info dict and the time it was extracted.
+    """
+    info, extracted = load_info(link, ydl.params)
+    if info is not None:
+        LOGGER.info(f"Using cached yt-dlp info of {link}")
+        return info, extracted
+    info = ydl.extract_info(link, download=False)
+    if info is None:
+        raise ValueError("Info result is None")
+    save_info(link, ydl.params, info)
+    return info, time()
+
+
+def is_fresh(extracted):
+    return bool(extracted) and time() - extracted < INFO_TTL
@@ -9,6 +9,7 @@ import time
 from pathlib import Path
 from typing import Any
 
+from aiofiles.os import remove
 from zotify import Session
 from zotify.collections import Album, Artist, Playlist, Show
 from zotify.utils import AudioFormat, ImageSize
@@ -19,6 +20,7 @@ from bot import (
     task_dict,
     task_dict_lock,
 )
+from bot.core.config_manager import Config
 from bot.helper.ext_utils.limit_checker import limit_checker
 from bot.helper.ext_utils.task_manager import (
     check_running_tasks,
@@ -28,7 +30,10 @@ from bot.helper.mirror_leech_utils.status_utils.zotify_status import (
     ZotifyDownloadStatus,
 )
 from bot.helper.telegram_helper.message_utils import send_status_message
-from bot.helper.zotify_utils.improved_session_manager import improved_session_manager
+from bot.helper.zotify_utils.improved_session_manager import (
+    improved_session_manager,
+    is_rate_limited,
+)
 from bot.helper.zotify_utils.quality_selector import show_zotify_quality_selector
 from bot.helper.zotify_utils.special_downloads import (
     get_special_download_info,
@@ -39,6 +44,37 @@ from bot.helper.zotify_utils.url_parser import ZotifyUrlParser
 from bot.helper.zotify_utils.zotify_config import zotify_config
 
 
+class TrackSlot:
+    """One track or episode of a collection being downloaded"""
+
+    __slots__ = (
+        "downloaded",
+        "error",
+        "kind",
+        "name",
+        "number",
+        "output",
+        "playable_id",
+        "previous",
+        "state",
+        "turn",
+    )
+
+    def __init__(self, number, playable_id, kind, previous):
+        self.number = number
+        self.playable_id = playable_id
+        self.kind = kind
+        self.name = f"{kind.title()} {number}"
+        self.state = "starting"
+        self.downloaded = 0
+        self.error = None
+        self.output = None
+        # Set once the output file of this slot is settled, the next slot
+        # waits for it so names are resolved in collection order
+        self.previous = previous
+        self.turn = asyncio.Event()
+
+
 class ZotifyDownloadHelper:
     """Helper class for Zotify downloads"""
 
@@ -51,6 +87,9 @@ class ZotifyDownloadHelper:
         self._current_track = ""
         self._total_tracks = 0
         self._downloaded_tracks = 0
+        # Collection tracks in flight by number and output files in use
+        self._slots = {}
+        self._claims = {}
         self._start_time = time.time()
         # Optimized progress tracking with memory efficiency
         self._current_downloaded = 0
@@ -68,9 +107,6 @@ class ZotifyDownloadHelper:
         self._speed_samples = deque(maxlen=10)  # Keep only last 10 samples
         self._last_downloaded = 0
         self._progress_callback = None
-        # Memory optimization
-        self._last_gc_time = time.time()
-        self._gc_interval = 60  # Force GC every minute
 
     async def get_session(self) -> Session | None:
         """Get or create Zotify session using improved session manager with enhanced error handling"""
@@ -137,15 +173,6 @@ class ZotifyDownloadHelper:
 
     def get_progress_info(self) -> dict:
         """Get optimized progress information with minimal CPU overhead"""
-        current_time = time.time()
-
-        # Periodic garbage collection for memory optimization
-        if current_time - self._last_gc_time > self._gc_interval:
-            import gc
-
-            gc.collect()
-            self._last_gc_time = current_time
-
         # Calculate speed efficiently
         speed = 0
         if self._speed_samples:
@@ -409,21 +436,24 @@ class ZotifyDownloadHelper:
             LOGGER.error(f"Special download failed: {e}")
             return False
 
-    async def _download_track(self, session: Session, track_id: str) -> bool:
+    async def _download_track(
+        self, session: Session, track_id: str, slot: TrackSlot | None = None
+    ) -> bool:
         """Download a single track with enhanced error handling and free account optimizations"""
         try:
-            self._total_tracks = 1
-            self._current_track = "Downloading track..."
+            if slot is None:
+                self._current_track = "Downloading track..."
 
             # Get zotify config object
             config_obj = await self.get_zotify_config()
 
-            # Apply rate limiting before track access for free accounts
-            session.rate_limiter.apply_limit()
+            # Apply rate limiting before track access for free accounts, the
+            # limiter sleeps so it runs off the event loop
+            await asyncio.to_thread(session.rate_limiter.apply_limit)
 
             # Get track with enhanced error handling
             try:
-                track = session.get_track(track_id)
+                track = await asyncio.to_thread(session.get_track, track_id)
                 if not track:
                     LOGGER.error(f"Failed to get track metadata for {track_id}")
                     return False
@@ -432,9 +462,11 @@ class ZotifyDownloadHelper:
                 # Try one more time with longer delay for free accounts
                 await asyncio.sleep(2)
                 try:
-                    track = session.get_track(track_id)
+                    track = await asyncio.to_thread(session.get_track, track_id)
                 except Exception as e2:
                     LOGGER.error(f"Track access retry failed for {track_id}: {e2}")
+                    if slot is not None:
+                        slot.error = str(e2)
                     return False
 
             # Add genre and all artists if configured (these are Track methods)
@@ -448,14 +480,13 @@ class ZotifyDownloadHelper:
 
             # Create output path using Zotify's exact method signature with proper folder structure
             # Use the configured template from Config.ZOTIFY_OUTPUT_ALBUM
-            from bot.core.config_manager import Config
-
             output_template = getattr(
                 Config,
                 "ZOTIFY_OUTPUT_ALBUM",
                 "{album_artist}/{album}/{track_number}. {artists} - {title}",
             )
 
+            await self._wait_turn(slot)
             try:
                 # Use Zotify's create_output method with correct parameter order
                 # Based on Zotify source: create_output(ext, library, output, replace)
@@ -486,15 +517,20 @@ class ZotifyDownloadHelper:
                 LOGGER.error(f"Track object type: {type(track)}")
                 return False
 
-            self._current_track = f"Downloading: {track.name}"
+            if not await self._claim_output(
+                slot, output, config_obj.replace_existing
+            ):
+                return False
+
+            self._set_current(slot, track.name)
 
             # Apply rate limiting using Zotify's built-in rate limiter
-            session.rate_limiter.apply_limit()
+            await asyncio.to_thread(session.rate_limiter.apply_limit)
 
             # Download track using Zotify's exact method signature with progress tracking
             try:
                 file = await self._download_track_with_progress(
-                    track, output, config_obj.download_real_time
+                    track, output, config_obj.download_real_time, slot
                 )
 
                 if not file:
@@ -543,7 +579,9 @@ class ZotifyDownloadHelper:
 
                     for size in artwork_sizes:
                         try:
-                            cover_art = track.get_cover_art(size)
+                            cover_art = await asyncio.to_thread(
+                                track.get_cover_art, size
+                            )
                             if cover_art:
                                 break
                         except Exception:
@@ -610,7 +648,9 @@ class ZotifyDownloadHelper:
             # Handle transcoding if needed using Zotify's exact method
             if config_obj.audio_format.name != "VORBIS" or config_obj.ffmpeg_args:
                 try:
-                    file.transcode(
+                    # ffmpeg runs off the event loop so other tracks go on
+                    await asyncio.to_thread(
+                        file.transcode,
                         audio_format=config_obj.audio_format,  # audio_format parameter
                         download_quality=config_obj.download_quality,  # download_quality parameter
                         bitrate=config_obj.transcode_bitrate,  # bitrate parameter
@@ -637,6 +677,8 @@ class ZotifyDownloadHelper:
         except Exception as e:
             error_msg = str(e)
             LOGGER.error(f"Failed to download track {track_id}: {error_msg}")
+            if slot is not None:
+                slot.error = error_msg
 
             # Provide specific error information for common issues
             if "context manager protocol" in error_msg:
@@ -667,23 +709,7 @@ class ZotifyDownloadHelper:
             # Create album collection using Zotify's exact constructor
             config_obj = await self.get_zotify_config()
             album = Album(album_id, session.api(), config_obj)
-
-            self._total_tracks = len(album.playables)
-            self._current_track = (
-                f"Downloading album ({self._total_tracks} tracks)..."
-            )
-
-            # Download all tracks in album
-            for i, playable_data in enumerate(album.playables):
-                if self.listener.is_cancelled:
-                    return False
-
-                self._current_track = f"Track {i + 1}/{self._total_tracks}"
-
-                # Download individual track (track method handles increment)
-                await self._download_track(session, playable_data.id)
-
-            return self._downloaded_tracks > 0
+            return await self._download_playables(session, album.playables, "album")
 
         except Exception as e:
             LOGGER.error(f"Failed to download album {album_id}: {e}")
@@ -695,29 +721,10 @@ class ZotifyDownloadHelper:
             # Create playlist collection using Zotify's exact constructor
             config_obj = await self.get_zotify_config()
             playlist = Playlist(playlist_id, session.api(), config_obj)
-
-            self._total_tracks = len(playlist.playables)
-            self._current_track = (
-                f"Downloading playlist ({self._total_tracks} tracks)..."
+            return await self._download_playables(
+                session, playlist.playables, "playlist"
             )
 
-            # Download all tracks in playlist
-            for i, playable_data in enumerate(playlist.playables):
-                if self.listener.is_cancelled:
-                    return False
-
-                self._current_track = f"Track {i + 1}/{self._total_tracks}"
-
-                # Download based on playable type (methods handle increment)
-                if playable_data.type.name == "TRACK":
-                    await self._download_track(session, playable_data.id)
-                elif playable_data.type.name == "EPISODE":
-                    await self._download_episode(session, playable_data.id)
-                else:
-                    continue
-
-            return self._downloaded_tracks > 0
-
         except Exception as e:
             LOGGER.error(f"Failed to download playlist {playlist_id}: {e}")
             return False
@@ -728,24 +735,10 @@ class ZotifyDownloadHelper:
             # Create artist collection using Zotify's exact constructor
             config_obj = await self.get_zotify_config()
             artist = Artist(artist_id, session.api(), config_obj)
-
-            self._total_tracks = len(artist.playables)
-            self._current_track = (
-                f"Downloading artist tracks ({self._total_tracks} tracks)..."
+            return await self._download_playables(
+                session, artist.playables, "artist tracks"
             )
 
-            # Download all tracks
-            for i, playable_data in enumerate(artist.playables):
-                if self.listener.is_cancelled:
-                    return False
-
-                self._current_track = f"Track {i + 1}/{self._total_tracks}"
-
-                # Download track (method handles increment)
-                await self._download_track(session, playable_data.id)
-
-            return self._downloaded_tracks > 0
-
         except Exception as e:
             LOGGER.error(f"Failed to download artist {artist_id}: {e}")
             return False
@@ -756,43 +749,172 @@ class ZotifyDownloadHelper:
             # Create show collection using Zotify's exact constructor
             config_obj = await self.get_zotify_config()
             show = Show(show_id, session.api(), config_obj)
-
-            self._total_tracks = len(show.playables)
-            self._current_track = (
-                f"Downloading show ({self._total_tracks} episodes)..."
-            )
-
-            # Download all episodes
-            for i, playable_data in enumerate(show.playables):
-                if self.listener.is_cancelled:
-                    return False
-
-                self._current_track = f"Episode {i + 1}/{self._total_tracks}"
-
-                # Download episode (method handles increment)
-                await self._download_episode(session, playable_data.id)
-
-            return self._downloaded_tracks > 0
+            return await self._download_playables(session, show.playables, "show")
 
         except Exception as e:
             LOGGER.error(f"Failed to download show {show_id}: {e}")
             return False
 
-    async def _download_episode(self, session: Session, episode_id: str) -> bool:
+    async def _download_playables(self, session: Session, playables, what) -> bool:
+        """
+        Download the tracks and episodes of a collection, up to
+        ZOTIFY_CONCURRENT_DOWNLOADS at a time over the shared session.
+        Slots start in collection order and settle their output files in
+        that order, so names and duplicates come out as in a serial download.
+        """
+        config_obj = await self.get_zotify_config()
+        maximum = max(1, Config.ZOTIFY_CONCURRENT_DOWNLOADS)
+        if config_obj.download_real_time:
+            # Real time streams are paced like playback, keep them serial
+            maximum = 1
+        limiter = improved_session_manager.download_limiter
+
+        self._total_tracks = len(playables)
+        self._current_track = f"Downloading {what} ({self._total_tracks} tracks)..."
+
+        tasks = []
+        started = []
+        previous = None
+        for number, playable_data in enumerate(playables, 1):
+            kind = playable_data.type.name
+            if kind not in ("TRACK", "EPISODE"):
+                continue
+            await limiter.acquire(maximum)
+            if self.listener.is_cancelled:
+                await limiter.release(maximum, False)
+                break
+            slot = TrackSlot(number, playable_data.id, kind, previous)
+            previous = slot.turn
+            self._slots[number] = slot
+            started.append(slot)
+            tasks.append(
+                asyncio.create_task(
+                    self._download_slot(session, slot, limiter, maximum)
+                )
+            )
+
+        results = await asyncio.gather(*tasks)
+        if self.listener.is_cancelled:
+            return False
+        failed = [
+            slot.name for slot, ok in zip(started, results, strict=True) if not ok
+        ]
+        if failed:
+            LOGGER.warning(
+                f"Zotify {what}: {len(failed)} of {len(results)} failed: "
+                + ", ".join(failed[:10])
+            )
+        return self._downloaded_tracks > 0
+
+    async def _download_slot(self, session, slot, limiter, maximum) -> bool:
+        """Download one slot, a rate limited one is retried once after a pause"""
+        download = (
+            self._download_track if slot.kind == "TRACK" else self._download_episode
+        )
+        success = False
+        try:
+            for attempt in range(2):
+                slot.error = None
+                slot.state = "starting"
+                if await download(session, slot.playable_id, slot):
+                    success = True
+                    return True
+                if (
+                    attempt
+                    or self.listener.is_cancelled
+                    or not is_rate_limited(slot.error)
+                ):
+                    break
+                slot.state = "waiting"
+                self._refresh_current()
+                await asyncio.sleep(await limiter.throttle(maximum))
+                if slot.output:
+                    # Drop the partial file so the retry can write it again
+                    with contextlib.suppress(OSError):
+                        await remove(slot.output)
+            return False
+        finally:
+            slot.turn.set()
+            if slot.output and (claim := self._claims.get(slot.output)):
+                claim.set()
+            self._slots.pop(slot.number, None)
+            await limiter.release(maximum, success)
+            self._refresh_current()
+
+    async def _wait_turn(self, slot):
+        if slot is not None and slot.previous is not None:
+            await slot.previous.wait()
+
+    async def _claim_output(self, slot, output, replace) -> bool:
+        """
+        Take the output file of a slot. A name already taken by an earlier
+        track of the collection is skipped, or replaced once that track is
+        done when existing files are replaced, like a serial download would.
+        """
+        if slot is None:
+            return True
+        key = str(output)
+        try:
+            if slot.output != key and (claim := self._claims.get(key)):
+                if not replace:
+                    LOGGER.warning(f"Skipping duplicate output file: {key}")
+                    return False
+                await claim.wait()
+            self._claims[key] = asyncio.Event()
+            slot.output = key
+            return True
+        finally:
+            slot.turn.set()
+
+    def _set_current(self, slot, name):
+        if slot is None:
+            self._current_track = f"Downloading: {name}"
+            return
+        slot.name = name
+        slot.state = "downloading"
+        self._refresh_current()
+
+    def _refresh_current(self):
+        """Status name of a collection: finished count and tracks in flight"""
+        done = f"{self._downloaded_tracks}/{self._total_tracks}"
+        active = sorted(self._slots.values(), key=lambda s: s.number)
+        self._current_track = (
+            f"{done} | {', '.join(slot.name for slot in active)}"
+            if active
+            else f"{done} tracks"
+        )
+
+    def track_table(self) -> list[dict[str, Any]]:
+        """Progress of the tracks in flight, in collection order"""
+        return [
+            {
+                "number": slot.number,
+                "name": slot.name,
+                "state": slot.state,
+                "downloaded": slot.downloaded,
+            }
+            for slot in sorted(self._slots.values(), key=lambda s: s.number)
+        ]
+
+    async def _download_episode(
+        self, session: Session, episode_id: str, slot: TrackSlot | None = None
+    ) -> bool:
         """Download a podcast episode"""
         try:
-            self._current_track = "Downloading episode..."
+            if slot is None:
+                self._current_track = "Downloading episode..."
 
             # Get zotify config object
             config_obj = await self.get_zotify_config()
 
             # Get episode
-            episode = session.get_episode(episode_id)
+            episode = await asyncio.to_thread(session.get_episode, episode_id)
 
             # Get file extension from AudioFormat enum
             file_ext = self._get_file_extension(config_obj.audio_format)
 
             # Create output path using Zotify's exact method signature with proper folder structure
+            await self._wait_turn(slot)
             try:
                 # Use Zotify's create_output method with correct parameter order
                 # Based on Zotify source: create_output(ext, library, output, replace)
@@ -825,14 +947,19 @@ class ZotifyDownloadHelper:
                 LOGGER.error(f"Episode object type: {type(episode)}")
                 return False
 
-            self._current_track = f"Downloading: {episode.name}"
+            if not await self._claim_output(
+                slot, output, config_obj.replace_existing
+            ):
+                return False
+
+            self._set_current(slot, episode.name)
 
             # Apply rate limiting using Zotify's built-in rate limiter
-            session.rate_limiter.apply_limit()
+            await asyncio.to_thread(session.rate_limiter.apply_limit)
 
             # Download episode using Zotify's exact method signature with progress tracking
             file = await self._download_episode_with_progress(
-                episode, output, config_obj.download_real_time
+                episode, output, config_obj.download_real_time, slot
             )
 
             # Clear consecutive hits on successful download
@@ -846,7 +973,9 @@ class ZotifyDownloadHelper:
             # Handle transcoding if needed using Zotify's exact method
             if config_obj.audio_format.name != "VORBIS" or config_obj.ffmpeg_args:
                 try:
-                    file.transcode(
+                    # ffmpeg runs off the event loop so other tracks go on
+                    await asyncio.to_thread(
+                        file.transcode,
                         audio_format=config_obj.audio_format,  # audio_format parameter
                         download_quality=config_obj.download_quality,  # download_quality parameter
                         bitrate=config_obj.transcode_bitrate,  # bitrate parameter
@@ -871,6 +1000,8 @@ class ZotifyDownloadHelper:
 
         except Exception as e:
             LOGGER.error(f"Failed to download episode {episode_id}: {e}")
+            if slot is not None:
+                slot.error = str(e)
             return False
 
     async def _finalize_download(self):
@@ -896,11 +1027,15 @@ class ZotifyDownloadHelper:
         except Exception as e:
             LOGGER.error(f"Failed to finalize download: {e}")
 
-    def _update_progress(self, downloaded: int, total: int):
+    def _update_progress(self, downloaded: int, total: int, slot=None):
         """Update download progress with speed calculation"""
         current_time = time.time()
-        self._current_file_downloaded = downloaded
         self._current_file_size = total
+        if slot is not None:
+            # Tracks of a collection download side by side, count them all
+            slot.downloaded = downloaded
+            downloaded = sum(s.downloaded for s in self._slots.values())
+        self._current_file_downloaded = downloaded
 
         # Calculate total downloaded size
         self._downloaded_size = (
@@ -934,7 +1069,9 @@ class ZotifyDownloadHelper:
             # Estimate 5MB per track on average
             self._total_size = self._total_tracks * 5 * 1024 * 1024
 
-    async def _download_track_with_progress(self, track, output, real_time=False):
+    async def _download_track_with_progress(
+        self, track, output, real_time=False, slot=None
+    ):
         """Download track with progress tracking by monitoring file size"""
         import asyncio
 
@@ -964,7 +1101,9 @@ class ZotifyDownloadHelper:
             raise
 
         # Monitor progress while download is running
-        progress_task = asyncio.create_task(self._monitor_download_progress(output))
+        progress_task = asyncio.create_task(
+            self._monitor_download_progress(output, slot)
+        )
 
         try:
             # Wait for download to complete
@@ -984,7 +1123,7 @@ class ZotifyDownloadHelper:
                 await progress_task
             raise e
 
-    async def _monitor_download_progress(self, output_path):
+    async def _monitor_download_progress(self, output_path, slot=None):
         """Monitor download progress by checking file size"""
         import asyncio
         import os
@@ -1012,7 +1151,7 @@ class ZotifyDownloadHelper:
                         estimated_total = 5 * 1024 * 1024
 
                         # Update progress
-                        self._update_progress(current_size, estimated_total)
+                        self._update_progress(current_size, estimated_total, slot)
 
                         # If file seems complete (close to estimated size), break
                         if current_size >= estimated_total * 0.9:
@@ -1031,7 +1170,7 @@ class ZotifyDownloadHelper:
             LOGGER.warning(f"Progress monitoring failed: {e}")
 
     async def _download_episode_with_progress(
-        self, episode, output, real_time=False
+        self, episode, output, real_time=False, slot=None
     ):
         """Download episode with progress tracking by monitoring file size"""
         import asyncio
@@ -1062,7 +1201,9 @@ class ZotifyDownloadHelper:
             raise
 
         # Monitor progress while download is running
-        progress_task = asyncio.create_task(self._monitor_download_progress(output))
+        progress_task = asyncio.create_task(
+            self._monitor_download_progress(output, slot)
+        )
 
         try:
             # Wait for download to complete
@@ -1100,6 +1241,7 @@ class ZotifyDownloadHelper:
             "downloaded_size": self._downloaded_size,
             "current_file_size": self._current_file_size,
             "current_file_downloaded": self._current_file_downloaded,
+            "tracks": self.track_table(),
         }
 
 
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from logging import getLogger
 from os import path as ospath
+from threading import Lock, local
 from time import time
 
 from googleapiclient.errors import HttpError
@@ -11,6 +14,7 @@ from tenacity import (
     wait_exponential,
 )
 
+from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import async_to_sync
 from bot.helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
@@ -23,6 +27,8 @@ class GoogleDriveClone(GoogleDriveHelper):
         self._start_time = time()
         super().__init__()
         self.is_cloning = True
+        self._lock = Lock()
+        self._local = local()
         self.user_setting()
 
     def user_setting(self):
@@ -109,30 +115,93 @@ class GoogleDriveClone(GoogleDriveHelper):
             async_to_sync(self.listener.on_upload_error, msg)
             return None, None, None, None, None
 
+    def _worker(self):
+        """
+        The clone helper of the calling thread. Drive services are not thread
+        safe, so every worker thread copies through its own connection and,
+        with service accounts, switches its own account on rate limits.
+        """
+        worker = getattr(self._local, "worker", None)
+        if worker is None:
+            worker = copy(self)
+            worker.service = worker.authorize()
+            self._local.worker = worker
+        return worker
+
+    def _list_folder(self, folder_id):
+        if self.listener.is_cancelled:
+            return []
+        return self._worker().get_files_by_folder_id(folder_id)
+
+    def _make_folder(self, name, dest_id):
+        if self.listener.is_cancelled:
+            return None
+        return self._worker().create_directory(name, dest_id)
+
+    def _clone_file(self, file, dest_id):
+        if self.listener.is_cancelled:
+            return
+        self._worker()._copy_file(file.get("id"), dest_id)
+        with self._lock:
+            self.proc_bytes += int(file.get("size", 0))
+            self.total_time = int(time() - self._start_time)
+
     def _clone_folder(self, folder_name, folder_id, dest_id):
-        LOGGER.info(f"Syncing: {folder_name}")
-        files = self.get_files_by_folder_id(folder_id)
-        if len(files) == 0:
-            return dest_id
-        for file in files:
-            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self.total_folders += 1
-                file_path = ospath.join(folder_name, file.get("name"))
-                current_dir_id = self.create_directory(file.get("name"), dest_id)
-                self._clone_folder(file_path, file.get("id"), current_dir_id)
-            elif (
-                not file.get("name")
-                .strip()
-                .lower()
-                .endswith(tuple(self.listener.excluded_extensions))
-            ):
-                self.total_files += 1
-                self._copy_file(file.get("id"), dest_id)
-                self.proc_bytes += int(file.get("size", 0))
-                self.total_time = int(time() - self._start_time)
-            if self.listener.is_cancelled:
-                break
-        return None
+        """
+        Clone the tree breadth first. Each level is listed and its folders
+        are created in parallel, while the files found so far are copied by
+        the same pool of ``GDRIVE_CLONE_WORKERS`` threads.
+        """
+        workers = max(Config.GDRIVE_CLONE_WORKERS, 1)
+        with ThreadPoolExecutor(workers, thread_name_prefix="gdclone") as pool:
+            copies = []
+            level = [(folder_name, folder_id, dest_id)]
+            try:
+                while level and not self.listener.is_cancelled:
+                    for path, _, _ in level:
+                        LOGGER.info(f"Syncing: {path}")
+                    listings = pool.map(
+                        self._list_folder, [src_id for _, src_id, _ in level]
+                    )
+                    folders = []
+                    for (path, _, dest), files in zip(level, listings, strict=True):
+                        for file in files:
+                            name = file.get("name")
+                            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                                self.total_folders += 1
+                                folders.append(
+                                    (
+                                        ospath.join(path, name),
+                                        file.get("id"),
+                                        name,
+                                        dest,
+                                    )
+                                )
+                            elif (
+                                not name.strip()
+                                .lower()
+                                .endswith(tuple(self.listener.excluded_extensions))
+                            ):
+                                self.total_files += 1
+                                copies.append(
+                                    pool.submit(self._clone_file, file, dest)
+                                )
+                    created = pool.map(
+                        self._make_folder,
+                        [name for _, _, name, _ in folders],
+                        [dest for _, _, _, dest in folders],
+                    )
+                    level = [
+                        (path, src_id, new_id)
+                        for (path, src_id, _, _), new_id in zip(
+                            folders, created, strict=True
+                        )
+                    ]
+                for future in copies:
+                    future.result()
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -1,7 +1,11 @@
 import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from logging import getLogger
 from os import listdir, remove
 from os import path as ospath
+from threading import Lock, local
 from time import sleep
 
 from googleapiclient.errors import HttpError
@@ -28,6 +32,12 @@ class GoogleDriveUpload(GoogleDriveHelper):
         self._updater = None
         self._path = path
         self._is_errored = False
+        self._lock = Lock()
+        self._local = local()
+        self._workers = []
+        self._queue = deque()
+        self._counted = 0
+        self._failed = False
         super().__init__()
         self.is_uploading = True
 
@@ -108,10 +118,13 @@ class GoogleDriveUpload(GoogleDriveHelper):
                     ospath.basename(ospath.abspath(self.listener.name)),
                     self.listener.up_dest,
                 )
-                result = self._upload_dir(
-                    self._path,
-                    dir_id,
-                )
+                if Config.GDRIVE_UPLOAD_WORKERS > 1:
+                    result = self._upload_dir_parallel(self._path, dir_id)
+                else:
+                    result = self._upload_dir(
+                        self._path,
+                        dir_id,
+                    )
                 if result is None:
                     raise ValueError("Upload has been manually cancelled!")
                 link = self.G_DRIVE_DIR_BASE_DOWNLOAD_URL.format(dir_id)
@@ -178,6 +191,122 @@ class GoogleDriveUpload(GoogleDriveHelper):
                 break
         return new_id
 
+    async def progress(self):
+        if not self._workers:
+            await super().progress()
+            return
+        with self._lock:
+            for worker in self._workers:
+                if (status := worker.status) is not None:
+                    done = status.total_size * status.progress()
+                    self.proc_bytes += done - worker._counted
+                    worker._counted = done
+        self.total_time += self.update_interval
+
+    def _worker(self):
+        """
+        The upload helper of the calling thread, with its own Drive service
+        (the client is not thread safe) and, with service accounts, its own
+        account to switch on rate limits.
+        """
+        worker = getattr(self._local, "worker", None)
+        if worker is None:
+            worker = copy(self)
+            worker.service = worker.authorize()
+            worker.status = None
+            worker._counted = 0
+            with self._lock:
+                self._workers.append(worker)
+            self._local.worker = worker
+        return worker
+
+    def _make_folder(self, name, dest_id):
+        if self.listener.is_cancelled:
+            return None
+        return self._worker().create_directory(name, dest_id)
+
+    def _create_tree(self, pool, input_directory, dest_id):
+        """
+        Create the folder hierarchy level by level, folders of a level in
+        parallel, and return the files to upload with their parent ids
+        """
+        files = []
+        level = [(input_directory, dest_id)]
+        while level and not self.listener.is_cancelled:
+            folders = []
+            for path, parent_id in level:
+                for item in sorted(listdir(path)):
+                    item_path = ospath.join(path, item)
+                    if ospath.isdir(item_path):
+                        folders.append((item_path, item, parent_id))
+                    else:
+                        size = ospath.getsize(item_path)
+                        files.append((size, item_path, item, parent_id))
+            created = pool.map(
+                self._make_folder,
+                [name for _, name, _ in folders],
+                [parent_id for _, _, parent_id in folders],
+            )
+            level = [
+                (path, folder_id)
+                for (path, _, _), folder_id in zip(folders, created, strict=True)
+            ]
+            self.total_folders += len(level)
+        return files
+
+    def _next_file(self, largest):
+        with self._lock:
+            if not self._queue or self._failed or self.listener.is_cancelled:
+                return None
+            return self._queue.pop() if largest else self._queue.popleft()
+
+    def _run_worker(self, largest):
+        while (item := self._next_file(largest)) is not None:
+            size, file_path, file_name, dest_id = item
+            worker = self._worker()
+            try:
+                worker._upload_file(
+                    file_path,
+                    file_name,
+                    get_mime_type(file_path),
+                    dest_id,
+                )
+            except BaseException:
+                # Stop the other workers, the error fails the upload
+                self._failed = True
+                raise
+            with self._lock:
+                worker.status = None
+                if not self.listener.is_cancelled:
+                    self.proc_bytes += size - worker._counted
+                    self.total_files += 1
+                worker._counted = 0
+
+    def _upload_dir_parallel(self, input_directory, dest_id):
+        """
+        Upload a folder with ``GDRIVE_UPLOAD_WORKERS`` threads. The folders
+        are created first, then one worker takes the largest files while the
+        others take the smallest ones, so big files keep a lane busy without
+        holding back the small files behind them.
+        """
+        workers = Config.GDRIVE_UPLOAD_WORKERS
+        with ThreadPoolExecutor(workers, thread_name_prefix="gdupload") as pool:
+            files = self._create_tree(pool, input_directory, dest_id)
+            if self.listener.is_cancelled:
+                return None
+            if not files:
+                return dest_id
+            self._queue.extend(sorted(files))
+            runs = [
+                pool.submit(self._run_worker, lane == 0)
+                for lane in range(min(workers, len(files)))
+            ]
+            for run in runs:
+                run.result()
+        if self.listener.is_cancelled:
+            return None
+        return dest_id
+
     @retry(
         wait=wait_exponential(multiplier=2, min=5, max=30),
         stop=stop_after_attempt(5),
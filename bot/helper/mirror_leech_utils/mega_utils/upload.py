@@ -117,6 +117,7 @@ from bot import LOGGER, task_dict, task_dict_lock
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
 from bot.helper.ext_utils.task_manager import check_running_tasks
+from bot.helper.mega_utils.session_pool import mega_session_pool
 from bot.helper.mirror_leech_utils.status_utils.mega_status import MegaUploadStatus
 from bot.helper.mirror_leech_utils.status_utils.queue_status import QueueStatus
 from bot.helper.telegram_helper.message_utils import send_status_message
@@ -691,9 +692,14 @@ async def _navigate_to_folder(api, root_node, folder_path):
         return None
 
 
-async def _cleanup_mega_upload_api(api, executor, listener=None):
+async def _cleanup_mega_upload_api(api, executor, listener=None, session=None):
     """Helper function to cleanup MEGA API instances"""
     try:
+        # Pooled sessions stay logged in; releasing detaches the task listener
+        if session:
+            await mega_session_pool.release(session)
+            return
+
         if listener and api:
             try:
                 api.removeListener(listener)
@@ -780,55 +786,20 @@ async def add_mega_upload(listener, path):
     executor = AsyncMegaExecutor()
     api = None
     mega_listener = None
+    session = None
+    ready = False
 
     try:
-        # Initialize MEGA API with error checking and safer patterns
-        api_attempts = 3
-        api = None
-
-        for attempt in range(api_attempts):
-            try:
-                # Use a unique app key for each instance to avoid conflicts
-                app_key = f"aimleechbot_upload_{int(time())}_{attempt}"
-
-                api = MegaApi(None, None, None, app_key)
-                if not api:
-                    raise Exception("Failed to create MEGA API instance")
-
-                # Add a small delay to allow API initialization
-                await asyncio.sleep(0.2)
-                break
-
-            except Exception as e:
-                LOGGER.warning(
-                    f"MEGA API creation attempt {attempt + 1} failed: {e}"
-                )
-                if attempt == api_attempts - 1:
-                    error_msg = f"Failed to initialize MEGA API after {api_attempts} attempts: {e!s}"
-                    LOGGER.error(error_msg)
-                    await listener.on_upload_error(error_msg)
-                    return
-                # Wait before retry
-                await asyncio.sleep(1.0)
-                continue
+        mega_listener = MegaUploadListener(executor.continue_event, listener)
 
+        # Lease a logged-in session with a warm node tree from the pool
         try:
-            mega_listener = MegaUploadListener(executor.continue_event, listener)
-            api.addListener(mega_listener)
+            session = await mega_session_pool.acquire(MEGA_EMAIL, MEGA_PASSWORD)
+            api = session.api
+            session.add_listener(mega_listener)
+            mega_listener.node = session.root_node
         except Exception as e:
-            error_msg = f"Failed to attach MEGA listener: {e!s}"
-            LOGGER.error(error_msg)
-            await listener.on_upload_error(error_msg)
-            return
-
-        # Login with credentials
-        try:
-            await executor.do(api.login, (MEGA_EMAIL, MEGA_PASSWORD), timeout=60)
-        except Exception as e:
-            error_msg = f"MEGA login failed: {e!s}"
-            LOGGER.error(error_msg)
-            await listener.on_upload_error(error_msg)
-            return
+            mega_listener.error = str(e)
 
         if mega_listener.error is not None:
             error_msg = mega_listener.error
@@ -916,13 +887,17 @@ async def add_mega_upload(listener, path):
 
         # Store node handle for memory safety (prevent segmentation faults)
         upload_folder_handle = upload_folder_node.getHandle()
+        ready = True
 
     except Exception as e:
         error_msg = f"Error accessing MEGA for upload: {e!s}"
         LOGGER.error(error_msg)
         await listener.on_upload_error(error_msg)
-        await _cleanup_mega_upload_api(api, executor, mega_listener)
         return
+    finally:
+        # Return the session on every early exit, not only on exceptions
+        if not ready:
+            await _cleanup_mega_upload_api(api, executor, mega_listener, session)
 
     # Set name and size based on the path
     if ospath.isfile(path):
@@ -956,6 +931,10 @@ async def add_mega_upload(listener, path):
     if added_to_queue:
         async with task_dict_lock:
             task_dict[listener.mid] = QueueStatus(listener, gid, "up")
+        # Queued tasks give their session back, the pool is small and
+        # running tasks and searches need it
+        await mega_session_pool.release(session)
+        session = api = None
         await send_status_message(listener.message)
         await event.wait()
         async with task_dict_lock:
@@ -963,6 +942,17 @@ async def add_mega_upload(listener, path):
                 LOGGER.info("MEGA upload was cancelled while in queue")
                 await _cleanup_mega_upload_api(api, executor)
                 return
+        # Node handles stay valid across sessions of the same account
+        try:
+            session = await mega_session_pool.acquire(MEGA_EMAIL, MEGA_PASSWORD)
+            api = session.api
+            session.add_listener(mega_listener)
+        except Exception as e:
+            error_msg = f"Failed to resume MEGA upload: {e!s}"
+            LOGGER.error(error_msg)
+            await listener.on_upload_error(error_msg)
+            await _cleanup_mega_upload_api(api, executor, mega_listener, session)
+            return
         from_queue = True
     else:
         from_queue = False
@@ -1039,4 +1029,4 @@ async def add_mega_upload(listener, path):
         await listener.on_upload_error(error_msg)
     finally:
         # Always cleanup API connections
-        await _cleanup_mega_upload_api(api, executor, mega_listener)
+        await _cleanup_mega_upload_api(api, executor, mega_listener, session)
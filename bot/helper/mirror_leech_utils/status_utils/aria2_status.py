@@ -11,6 +11,9 @@ from bot.helper.ext_utils.status_utils import (
 
 async def get_download(gid, old_info=None):
     try:
+        if res := await TorrentManager.aria2_download(gid):
+            return res
+        # Not in the snapshot yet (just added), ask for this one directly
         res = await TorrentManager.aria2.tellStatus(gid)
         return res or old_info
     except Exception as e:
@@ -11,6 +11,9 @@ from bot.helper.ext_utils.status_utils import (
 
 async def get_download(tag, old_info=None):
     try:
+        if res := await TorrentManager.qb_torrent(tag):
+            return res
+        # Not in the snapshot yet (just added), ask for this one directly
         res = (await TorrentManager.qbittorrent.torrents.info(tag=tag))[0]
         return res or old_info
     except Exception as e:
@@ -67,4 +67,6 @@ class SevenZStatus:
         ):
             with contextlib.suppress(Exception):
                 self.listener.subproc.kill()
+        # Archive sets extracted side by side each have their own process
+        self._obj.kill()
         await self.listener.on_upload_error(f"{self._cstatus} stopped by user!")
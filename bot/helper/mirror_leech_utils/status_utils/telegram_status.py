@@ -58,6 +58,12 @@ class TelegramStatus:
         except Exception:
             return "-"
 
+    def split(self):
+        """Progress of the split that writes the parts being uploaded"""
+        if self._status == "up" and (pipeline := self.listener.split_pipeline):
+            return pipeline.progress()
+        return None
+
     def gid(self):
         return self._gid
 
@@ -3,6 +3,7 @@ Zotify download status tracking
 """
 
 import time
+from html import escape
 
 from bot import LOGGER
 from bot.helper.ext_utils.status_utils import (
@@ -146,8 +147,11 @@ class ZotifyDownloadStatus:
                     ):
                         # Add current file progress to overall
                         file_contribution = (1 / total_tracks) * 100
-                        total_progress = overall_progress + (
-                            current_file_progress * file_contribution / 100
+                        # Parallel tracks can add up to several files
+                        total_progress = min(
+                            overall_progress
+                            + current_file_progress * file_contribution / 100,
+                            100,
                         )
                         return f"{total_progress:.1f}% ({downloaded_tracks + 1}/{total_tracks})"
                     return f"{overall_progress:.1f}% ({downloaded_tracks}/{total_tracks})"
@@ -155,6 +159,21 @@ class ZotifyDownloadStatus:
         except Exception:
             return "0%"
 
+    def tracks(self):
+        """Progress table of the tracks downloading in parallel"""
+        try:
+            table = self.download_helper.get_progress_info().get("tracks") or []
+        except Exception:
+            return ""
+        if len(table) < 2:
+            return ""
+        return "\n".join(
+            f"<b>#{row['number']}</b> {row['state']} "
+            f"{get_readable_file_size(row['downloaded'])} | "
+            f"{escape(row['name'][:30])}"
+            for row in table
+        )
+
     def task(self):
         """Get task object (standard method)"""
         return self
@@ -1,7 +1,9 @@
 import contextlib
-import gc
 import re
-from asyncio import sleep
+from asyncio import Semaphore, create_task, sleep
+from collections import deque
+from contextlib import aclosing
+from copy import copy
 from logging import getLogger
 from os import path as ospath
 from os import walk
@@ -39,6 +41,7 @@ from bot.helper.ext_utils.files_utils import (
     get_base_name,
     is_archive,
 )
+from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 from bot.helper.ext_utils.media_utils import (
     get_audio_thumbnail,
     get_document_type,
@@ -47,6 +50,7 @@ from bot.helper.ext_utils.media_utils import (
     get_video_thumbnail,
 )
 from bot.helper.ext_utils.template_processor import extract_metadata_from_filename
+from bot.helper.mirror_leech_utils.upload_pool import UploadClientPool
 from bot.helper.telegram_helper.message_utils import delete_message
 
 LOGGER = getLogger(__name__)
@@ -108,7 +112,7 @@ async def wait_for_memory_availability(max_memory_percent=80, max_wait_time=60):
         LOGGER.warning(
             f"Memory usage high ({memory_percent}%). Waiting for memory to free up..."
         )
-        gc.collect()
+        smart_garbage_collection(aggressive=True)
         await sleep(2)
     return False
 
@@ -140,6 +144,13 @@ class TelegramUploader:
         self.log_msg = None
         self._user_session = self._listener.user_transmission
         self._error = ""
+        # Concurrent uploads: the client pool, running per-file copies of
+        # this uploader and, in such a copy, its client slot and reply anchor
+        self._pool = None
+        self._jobs = set()
+        self._deferred = False
+        self._slot = None
+        self._anchor = None
 
         # Streamrip-specific attributes
         self._is_streamrip = hasattr(listener, "url") and hasattr(
@@ -263,8 +274,6 @@ class TelegramUploader:
         return True
 
     async def _prepare_file(self, file_, dirpath):
-        import gc
-
         # re module is already imported at the top of the file
         # re_match and re_sub are already imported at the top of the file
         from bot.helper.ext_utils.font_utils import apply_font_style
@@ -392,8 +401,6 @@ class TelegramUploader:
                         LOGGER.error(f"Error applying font style: {e}")
                         # If font styling fails, use the core filename with HTML formatting
                         cap_mono = f"<code>{core_filename}</code>"
-                    # Force garbage collection after font styling
-                    gc.collect()
                 else:
                     # Build default caption with <code>core</code>
                     styled_core = f"<code>{core_filename}</code>"
@@ -1061,143 +1068,21 @@ class TelegramUploader:
         res = await self._msg_to_reply()
         if not res:
             return
-        for dirpath, _, files in natsorted(await sync_to_async(walk, self._path)):
-            if dirpath.strip().endswith("/yt-dlp-thumb"):
-                continue
-            if dirpath.strip().endswith("_ss"):
-                await self._send_screenshots(dirpath, files)
-                await rmtree(dirpath, ignore_errors=True)
-                continue
-            for file_ in natsorted(files):
-                self._error = ""
-                self._up_path = ospath.join(dirpath, file_)
-                if not await aiopath.exists(self._up_path):
-                    LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
-                    continue
-                try:
-                    f_size = await aiopath.getsize(self._up_path)
-                    self._total_files += 1
-                    if f_size == 0:
-                        LOGGER.error(
-                            f"{self._up_path} size is zero, telegram don't upload zero size files",
-                        )
-                        self._corrupted += 1
-                        continue
-
-                    # Pre-check file size against Telegram's limit (based on premium status)
-                    from bot.core.aeon_client import TgClient
-
-                    # Use the MAX_SPLIT_SIZE from TgClient which is already set based on premium status
-                    telegram_limit = TgClient.MAX_SPLIT_SIZE
-                    limit_in_gb = telegram_limit / (1024 * 1024 * 1024)
-
-                    if f_size > telegram_limit:
-                        premium_status = (
-                            "premium" if TgClient.IS_PREMIUM_USER else "non-premium"
-                        )
-                        LOGGER.error(
-                            f"Can't upload files bigger than {limit_in_gb:.1f} GiB ({premium_status} account). Path: {self._up_path}",
-                        )
-                        self._error = f"File size exceeds Telegram's {limit_in_gb:.1f} GiB {premium_status} limit"
-                        self._corrupted += 1
-                        continue
-                    if self._listener.is_cancelled:
-                        return
-                    # Prepare the file (apply prefix, suffix, font style, etc.)
-                    cap_mono = await self._prepare_file(file_, dirpath)
-                    # Use the updated path after file preparation (in case file was renamed)
-                    actual_file_path = self._up_path
-                    if self._last_msg_in_group:
-                        group_lists = [
-                            x for v in self._media_dict.values() for x in v
-                        ]
-                        match = re_match(
-                            r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)",
-                            actual_file_path,
-                        )
-                        if not match or (
-                            match and match.group(0) not in group_lists
-                        ):
-                            for key, value in list(self._media_dict.items()):
-                                for subkey, msgs in list(value.items()):
-                                    if len(msgs) > 1:
-                                        await self._send_media_group(
-                                            subkey,
-                                            key,
-                                            msgs,
-                                        )
-                    if (
-                        self._listener.hybrid_leech
-                        and self._listener.user_transmission
-                        and not self._listener.is_cancelled
-                        and self._sent_msg is not None
-                        and hasattr(self._sent_msg, "chat")
-                        and self._sent_msg.chat is not None
-                    ):
-                        self._user_session = f_size > 2097152000
-                        if self._user_session:
-                            self._sent_msg = await TgClient.user.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
-                            )
-                        else:
-                            self._sent_msg = (
-                                await self._listener.client.get_messages(
-                                    chat_id=self._sent_msg.chat.id,
-                                    message_ids=self._sent_msg.id,
-                                )
-                            )
-                    self._last_msg_in_group = False
-                    self._last_uploaded = 0
-
-                    await self._upload_file(cap_mono, file_, actual_file_path)
-                    if self._listener.is_cancelled:
-                        return
-
-                    # Perform memory cleanup after each file upload for memory-constrained environments
-                    try:
-                        from bot.helper.ext_utils.gc_utils import (
-                            smart_garbage_collection,
-                        )
-
-                        smart_garbage_collection(aggressive=False)
-                    except ImportError:
-                        import gc
-
-                        gc.collect()
-
-                    # Store the actual filename (which may have been modified by leech filename)
-                    actual_filename = ospath.basename(self._up_path)
-                    if (
-                        not self._is_corrupted
-                        and (self._listener.is_super_chat or self._listener.up_dest)
-                        and not self._is_private
-                        and self._sent_msg is not None
-                        and hasattr(self._sent_msg, "link")
-                    ):
-                        self._msgs_dict[self._sent_msg.link] = actual_filename
-                    await sleep(1)
-                except Exception as err:
-                    if isinstance(err, RetryError):
-                        LOGGER.info(
-                            f"Total Attempts: {err.last_attempt.attempt_number}",
-                        )
-                        err = err.last_attempt.exception()
-                    LOGGER.error(f"{err}. Path: {self._up_path}")
-                    self._error = str(err)
-                    self._corrupted += 1
-                    if self._listener.is_cancelled:
+        limit = max(Config.LEECH_UPLOAD_CONCURRENCY, 1)
+        if limit > 1 and self._sent_msg is not None:
+            self._pool = UploadClientPool(self._listener)
+            if not await self._pool.setup(self._sent_msg):
+                self._pool = None
+        if self._pool is not None:
+            if not await self._upload_concurrently(limit):
+                return
+        else:
+            async with aclosing(self._iter_files()) as files:
+                async for dirpath, file_ in files:
+                    uploaded = await self._upload_path(dirpath, file_)
+                    self._part_uploaded(dirpath, file_)
+                    if not uploaded:
                         return
-                if not self._listener.is_cancelled and await aiopath.exists(
-                    self._up_path,
-                ):
-                    try:
-                        await remove(self._up_path)
-                    except FileNotFoundError:
-                        # File was already deleted, ignore
-                        pass
-                    except Exception as e:
-                        LOGGER.error(f"Error removing file {self._up_path}: {e}")
         # Process any remaining media groups at the end of the task
         try:
             for key, value in list(self._media_dict.items()):
@@ -1240,6 +1125,234 @@ class TelegramUploader:
         )
         return
 
+    async def _upload_path(self, dirpath, file_):
+        """Upload one file, returns False when the task was cancelled"""
+        self._error = ""
+        self._up_path = ospath.join(dirpath, file_)
+        if not await aiopath.exists(self._up_path):
+            LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+            return True
+        try:
+            f_size = await aiopath.getsize(self._up_path)
+            self._total_files += 1
+            if f_size == 0:
+                LOGGER.error(
+                    f"{self._up_path} size is zero, telegram don't upload zero size files",
+                )
+                self._corrupted += 1
+                return True
+
+            # Pre-check file size against Telegram's limit (based on premium status)
+            from bot.core.aeon_client import TgClient
+
+            # Use the MAX_SPLIT_SIZE from TgClient which is already set based on premium status
+            telegram_limit = TgClient.MAX_SPLIT_SIZE
+            limit_in_gb = telegram_limit / (1024 * 1024 * 1024)
+
+            if f_size > telegram_limit:
+                premium_status = (
+                    "premium" if TgClient.IS_PREMIUM_USER else "non-premium"
+                )
+                LOGGER.error(
+                    f"Can't upload files bigger than {limit_in_gb:.1f} GiB ({premium_status} account). Path: {self._up_path}",
+                )
+                self._error = f"File size exceeds Telegram's {limit_in_gb:.1f} GiB {premium_status} limit"
+                self._corrupted += 1
+                return True
+            if self._listener.is_cancelled:
+                return False
+            # Prepare the file (apply prefix, suffix, font style, etc.)
+            cap_mono = await self._prepare_file(file_, dirpath)
+            # Use the updated path after file preparation (in case file was renamed)
+            actual_file_path = self._up_path
+            if self._last_msg_in_group:
+                await self._flush_media_groups(actual_file_path)
+            if (
+                not self._deferred
+                and self._listener.hybrid_leech
+                and self._listener.user_transmission
+                and not self._listener.is_cancelled
+                and self._sent_msg is not None
+                and hasattr(self._sent_msg, "chat")
+                and self._sent_msg.chat is not None
+            ):
+                self._user_session = f_size > 2097152000
+                if self._user_session:
+                    self._sent_msg = await TgClient.user.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+                else:
+                    self._sent_msg = await self._listener.client.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+            self._last_msg_in_group = False
+            self._last_uploaded = 0
+
+            if self._deferred:
+                await self._upload_through_pool(
+                    cap_mono, file_, actual_file_path, f_size
+                )
+            else:
+                await self._upload_file(cap_mono, file_, actual_file_path)
+            if self._listener.is_cancelled:
+                return False
+
+            if not self._deferred:
+                self._record_link()
+                await sleep(1)
+        except Exception as err:
+            if isinstance(err, RetryError):
+                LOGGER.info(
+                    f"Total Attempts: {err.last_attempt.attempt_number}",
+                )
+                err = err.last_attempt.exception()
+            LOGGER.error(f"{err}. Path: {self._up_path}")
+            self._error = str(err)
+            self._corrupted += 1
+            if self._listener.is_cancelled:
+                return False
+        if not self._listener.is_cancelled and await aiopath.exists(
+            self._up_path,
+        ):
+            try:
+                await remove(self._up_path)
+            except FileNotFoundError:
+                # File was already deleted, ignore
+                pass
+            except Exception as e:
+                LOGGER.error(f"Error removing file {self._up_path}: {e}")
+        return True
+
+    def _record_link(self):
+        # Store the actual filename (which may have been modified by leech filename)
+        actual_filename = ospath.basename(self._up_path)
+        if (
+            not self._is_corrupted
+            and (self._listener.is_super_chat or self._listener.up_dest)
+            and not self._is_private
+            and self._sent_msg is not None
+            and hasattr(self._sent_msg, "link")
+        ):
+            self._msgs_dict[self._sent_msg.link] = actual_filename
+
+    async def _flush_media_groups(self, up_path):
+        """Send the pending media groups unless ``up_path`` continues one"""
+        group_lists = [x for v in self._media_dict.values() for x in v]
+        match = re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", up_path)
+        if not match or (match and match.group(0) not in group_lists):
+            for key, value in list(self._media_dict.items()):
+                for subkey, msgs in list(value.items()):
+                    if len(msgs) > 1:
+                        await self._send_media_group(subkey, key, msgs)
+
+    async def _iter_files(self):
+        """Files to upload in order, with split files replaced by their parts"""
+        pipeline = self._listener.split_pipeline
+        for dirpath, _, files in natsorted(await sync_to_async(walk, self._path)):
+            if dirpath.strip().endswith("/yt-dlp-thumb"):
+                continue
+            if dirpath.strip().endswith("_ss"):
+                await self._send_screenshots(dirpath, files)
+                await rmtree(dirpath, ignore_errors=True)
+                continue
+            for file_ in natsorted(files):
+                up_path = ospath.join(dirpath, file_)
+                if pipeline and pipeline.is_part(up_path):
+                    # Uploaded while its source file was being split
+                    continue
+                if pipeline and pipeline.is_source(up_path):
+                    async with aclosing(pipeline.parts(up_path)) as parts:
+                        async for part in parts:
+                            yield dirpath, ospath.basename(part)
+                    # A failed split keeps the source, it is uploaded whole
+                    if not (
+                        pipeline.split_failed(up_path)
+                        and await aiopath.exists(up_path)
+                    ):
+                        continue
+                yield dirpath, file_
+
+    async def _upload_concurrently(self, limit):
+        """
+        Upload up to ``limit`` files at once through the client pool. Each
+        finished upload is published (copied to the dump chats, grouped and
+        linked) in the original file order.
+        """
+        free = Semaphore(limit)
+        jobs = deque()
+        async with aclosing(self._iter_files()) as files:
+            async for dirpath, file_ in files:
+                await free.acquire()
+                while jobs and jobs[0].done():
+                    await self._publish(jobs.popleft().result())
+                if self._listener.is_cancelled:
+                    free.release()
+                    break
+                jobs.append(create_task(self._upload_job(dirpath, file_, free)))
+        while jobs:
+            await self._publish(await jobs.popleft())
+        return not self._listener.is_cancelled
+
+    async def _upload_job(self, dirpath, file_, free):
+        job = copy(self)
+        job._deferred = True
+        job._anchor = None
+        job._slot = None
+        job._total_files = job._corrupted = 0
+        job._processed_bytes = job._last_uploaded = 0
+        job._error = ""
+        job._last_msg_in_group = False
+        self._jobs.add(job)
+        try:
+            await job._upload_path(dirpath, file_)
+        except Exception as e:
+            LOGGER.error(f"{e}. Path: {ospath.join(dirpath, file_)}")
+            job._error = str(e)
+            job._corrupted += 1
+        finally:
+            self._jobs.discard(job)
+            self._processed_bytes += job._processed_bytes
+            self._part_uploaded(dirpath, file_)
+            free.release()
+        return job
+
+    def _part_uploaded(self, dirpath, file_):
+        """Let the split pipeline write the next part in place of this one"""
+        if (pipeline := self._listener.split_pipeline) is not None:
+            pipeline.uploaded(ospath.join(dirpath, file_))
+
+    async def _upload_through_pool(self, cap_mono, file_, o_path, f_size):
+        self._slot = await self._pool.acquire(f_size)
+        self._anchor = self._sent_msg = self._slot.anchor
+        self._user_session = self._slot.is_user
+        try:
+            await self._upload_file(cap_mono, file_, o_path)
+        finally:
+            self._pool.release(self._slot)
+
+    async def _publish(self, job):
+        self._total_files += job._total_files
+        self._corrupted += job._corrupted
+        if job._error:
+            self._error = job._error
+        if (
+            self._listener.is_cancelled
+            or job._anchor is None
+            or job._sent_msg is None
+            or job._sent_msg is job._anchor
+        ):
+            return
+        if self._last_msg_in_group:
+            await self._flush_media_groups(job._up_path)
+        self._last_msg_in_group = False
+        self._sent_msg = job._sent_msg
+        self._up_path = job._up_path
+        self._is_corrupted = job._is_corrupted
+        await self._after_send(job._up_path)
+        self._record_link()
+
     @retry(
         wait=wait_exponential(multiplier=2, min=4, max=8),
         stop=stop_after_attempt(3),
@@ -1497,40 +1610,9 @@ class TelegramUploader:
                         else:
                             raise
 
-            # Check if task is cancelled before copying message
-            if not self._listener.is_cancelled and self._sent_msg is not None:
-                await self._copy_message()
-
-            if (
-                not self._listener.is_cancelled
-                and self._media_group
-                and self._sent_msg is not None
-                and hasattr(self._sent_msg, "chat")
-                and self._sent_msg.chat is not None
-                and (
-                    (hasattr(self._sent_msg, "video") and self._sent_msg.video)
-                    or (
-                        hasattr(self._sent_msg, "document")
-                        and self._sent_msg.document
-                    )
-                )
-            ):
-                key = "documents" if self._sent_msg.document else "videos"
-                if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
-                    pname = match.group(0)
-                    if pname in self._media_dict[key]:
-                        self._media_dict[key][pname].append(
-                            [self._sent_msg.chat.id, self._sent_msg.id],
-                        )
-                    else:
-                        self._media_dict[key][pname] = [
-                            [self._sent_msg.chat.id, self._sent_msg.id],
-                        ]
-                    msgs = self._media_dict[key][pname]
-                    if len(msgs) == 10:
-                        await self._send_media_group(pname, key, msgs)
-                    else:
-                        self._last_msg_in_group = True
+            # Pooled uploads are copied and grouped later, in task order
+            if not self._deferred:
+                await self._after_send(o_path)
 
             if (
                 self._thumb is None
@@ -1539,7 +1621,15 @@ class TelegramUploader:
             ):
                 await remove(thumb)
         except (FloodWait, FloodPremiumWait) as f:
-            await sleep(f.value * 1.3)
+            if self._slot is not None:
+                # Only this client is limited, continue through another one
+                self._slot = await self._pool.flood(
+                    self._slot, f.value, await aiopath.getsize(self._up_path)
+                )
+                self._anchor = self._sent_msg = self._slot.anchor
+                self._user_session = self._slot.is_user
+            else:
+                await sleep(f.value * 1.3)
             if (
                 self._thumb is None
                 and thumb is not None
@@ -1573,17 +1663,8 @@ class TelegramUploader:
                     f"Memory error detected during upload. Path: {self._up_path}"
                 )
 
-                # Aggressive memory cleanup for memory errors
-                try:
-                    from bot.helper.ext_utils.gc_utils import (
-                        smart_garbage_collection,
-                    )
-
-                    smart_garbage_collection(aggressive=True, memory_error=True)
-                except ImportError:
-                    # Fallback to basic garbage collection
-                    gc.collect()
-                    gc.collect()  # Run twice for better cleanup
+                # Let the memory governor run a full collection right away
+                smart_garbage_collection(aggressive=True, memory_error=True)
 
                 if not force_document:
                     LOGGER.info(
@@ -1602,6 +1683,40 @@ class TelegramUploader:
                 return await self._upload_file(cap_mono, file, o_path, True)
             raise err
 
+    async def _after_send(self, o_path):
+        """Copy the sent message to the dump chats and collect media groups"""
+        # Check if task is cancelled before copying message
+        if not self._listener.is_cancelled and self._sent_msg is not None:
+            await self._copy_message()
+
+        if (
+            not self._listener.is_cancelled
+            and self._media_group
+            and self._sent_msg is not None
+            and hasattr(self._sent_msg, "chat")
+            and self._sent_msg.chat is not None
+            and (
+                (hasattr(self._sent_msg, "video") and self._sent_msg.video)
+                or (hasattr(self._sent_msg, "document") and self._sent_msg.document)
+            )
+        ):
+            key = "documents" if self._sent_msg.document else "videos"
+            if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
+                pname = match.group(0)
+                if pname in self._media_dict[key]:
+                    self._media_dict[key][pname].append(
+                        [self._sent_msg.chat.id, self._sent_msg.id],
+                    )
+                else:
+                    self._media_dict[key][pname] = [
+                        [self._sent_msg.chat.id, self._sent_msg.id],
+                    ]
+                msgs = self._media_dict[key][pname]
+                if len(msgs) == 10:
+                    await self._send_media_group(pname, key, msgs)
+                else:
+                    self._last_msg_in_group = True
+
     async def _copy_media_group(self, msgs_list):
         """Copy a media group to additional destinations based on user settings"""
         # Check if task is cancelled before proceeding
@@ -1972,13 +2087,15 @@ class TelegramUploader:
     @property
     def speed(self):
         try:
-            return self._processed_bytes / (time() - self._start_time)
+            return self.processed_bytes / (time() - self._start_time)
         except Exception:
             return 0
 
     @property
     def processed_bytes(self):
-        return self._processed_bytes
+        return self._processed_bytes + sum(
+            job._processed_bytes for job in self._jobs
+        )
 
     async def cancel_task(self):
         self._listener.is_cancelled = True
@@ -0,0 +1,109 @@
+"""
+Telegram clients a leech task can upload through.
+
+The main bot, the user session and the helper bots all have their own
+upload connections, so files of one task can be uploaded through several of
+them at once. Helper bot loads are counted in ``TgClient.helper_loads``, the
+same counters hyper download uses, so both features spread over the least
+busy bots. A FloodWait only blocks the client that received it.
+"""
+
+from asyncio import sleep
+from time import monotonic
+
+from bot import LOGGER
+from bot.core.aeon_client import TgClient
+
+# Files above this size need the premium user session
+BOT_UPLOAD_LIMIT = 2097152000
+
+# Client name -> monotonic time its FloodWait ends, shared by all tasks
+_flood_until = {}
+_loads = {}
+
+
+class UploadSlot:
+    __slots__ = ("anchor", "client", "is_user", "name")
+
+    def __init__(self, name, client, anchor, is_user):
+        self.name = name
+        self.client = client
+        self.anchor = anchor
+        self.is_user = is_user
+
+
+class UploadClientPool:
+    """Clients that can reply to the task's upload anchor message"""
+
+    def __init__(self, listener):
+        self._listener = listener
+        self._slots = []
+
+    async def _bind(self, name, client, anchor, is_user):
+        """Fetch the anchor through ``client`` so replies are sent by it"""
+        try:
+            msg = await client.get_messages(
+                chat_id=anchor.chat.id,
+                message_ids=anchor.id,
+            )
+        except Exception as e:
+            LOGGER.info(f"Upload client {name} can't access the chat: {e}")
+            return
+        if msg is None or getattr(msg, "empty", False):
+            return
+        self._slots.append(UploadSlot(name, client, msg, is_user))
+
+    async def setup(self, anchor):
+        listener = self._listener
+        if TgClient.user and listener.user_transmission:
+            await self._bind("user", TgClient.user, anchor, True)
+        if not listener.user_transmission or listener.hybrid_leech:
+            await self._bind("bot", listener.client, anchor, False)
+            for no, client in TgClient.helper_bots.items():
+                await self._bind(f"helper{no}", client, anchor, False)
+        LOGGER.info(
+            f"Uploading {listener.name} through "
+            f"{', '.join(slot.name for slot in self._slots) or 'no client'}"
+        )
+        return bool(self._slots)
+
+    @staticmethod
+    def _load(slot):
+        if slot.name.startswith("helper"):
+            return TgClient.helper_loads.get(int(slot.name[6:]), 0)
+        return _loads.get(slot.name, 0)
+
+    @staticmethod
+    def _add_load(slot, value):
+        if slot.name.startswith("helper"):
+            no = int(slot.name[6:])
+            if no in TgClient.helper_loads:
+                TgClient.helper_loads[no] += value
+        else:
+            _loads[slot.name] = _loads.get(slot.name, 0) + value
+
+    async def acquire(self, size):
+        """Take the least loaded client able to send a file of this size"""
+        big = size > BOT_UPLOAD_LIMIT
+        candidates = [slot for slot in self._slots if slot.is_user or not big]
+        if not candidates:
+            # Let the upload fail with Telegram's own error as before
+            candidates = self._slots
+        while True:
+            now = monotonic()
+            ready = [s for s in candidates if _flood_until.get(s.name, 0) <= now]
+            if ready:
+                slot = min(ready, key=self._load)
+                self._add_load(slot, 1)
+                return slot
+            await sleep(min(_flood_until[s.name] for s in candidates) - now)
+
+    def release(self, slot):
+        self._add_load(slot, -1)
+
+    async def flood(self, slot, seconds, size):
+        """Block the client for the FloodWait and move to another one"""
+        _flood_until[slot.name] = monotonic() + seconds * 1.3
+        LOGGER.warning(f"FloodWait of {seconds}s on upload client {slot.name}")
+        self.release(slot)
+        return await self.acquire(size)
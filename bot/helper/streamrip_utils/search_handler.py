@@ -19,6 +19,8 @@ from pyrogram.types import (
 from bot import LOGGER
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
+from bot.helper.ext_utils.cache_utils import Cache
+from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 from bot.helper.ext_utils.status_utils import get_readable_time
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.telegram_helper.message_utils import (
@@ -265,11 +267,7 @@ class StreamripSearchHandler:
 
             # Clear clients dict
             self.clients.clear()
-
-            # Force garbage collection to help with cleanup
-            import gc
-
-            gc.collect()
+            smart_garbage_collection()
 
         except Exception as e:
             LOGGER.error(f"Error during client cleanup: {e}")
@@ -1635,20 +1633,16 @@ async def cleanup_all_streamrip_sessions():
 
         import aiohttp
 
-        # Force garbage collection to identify unclosed sessions
-        gc.collect()
-
-        # Look for any remaining aiohttp sessions in garbage
+        # Sessions still tracked by the collector, the unreachable ones are
+        # left to the memory governor
         for obj in gc.get_objects():
-            if isinstance(obj, aiohttp.ClientSession):
+            if isinstance(obj, aiohttp.ClientSession | aiohttp.TCPConnector):
                 try:
                     if not obj.closed:
                         await obj.close()
                 except Exception as e:
                     LOGGER.warning(f"Failed to close orphaned session: {e}")
-
-        # Final garbage collection
-        gc.collect()
+        smart_garbage_collection(for_music_download=True)
 
     except Exception as e:
         LOGGER.error(f"Error during emergency cleanup: {e}")
@@ -1657,20 +1651,49 @@ async def cleanup_all_streamrip_sessions():
 # ===== INLINE SEARCH FUNCTIONALITY =====
 
 # Cache for streamrip search results to avoid redundant searches
-STREAMRIP_SEARCH_CACHE = {}
+STREAMRIP_SEARCH_CACHE = Cache(
+    "streamrip.searches", max_entries=50, ttl=300
+)  # 5 minutes expiry
 STREAMRIP_CACHE_COUNTER = 0
 
-# Cache for streamrip result info (for start command access)
-STREAMRIP_RESULT_CACHE = {}
+# Cache for streamrip result info (for start command access), and the id
+# already given to each result
+STREAMRIP_RESULT_CACHE = Cache(
+    "streamrip.ids",
+    max_entries=500,
+    on_evict=lambda _, data_string: STREAMRIP_IDS_BY_DATA.pop(data_string, None),
+)
+STREAMRIP_IDS_BY_DATA = {}
 
-# Global cache for authenticated clients with activity tracking
-STREAMRIP_CLIENT_CACHE = {}
 CLIENT_CACHE_EXPIRY = (
     3600  # 1 hour max age - but will be cleaned based on inactivity
 )
 CLIENT_INACTIVITY_TIMEOUT = 60  # 1 minute of inactivity before cleanup
-CLIENT_LAST_ACTIVITY = {}  # Track last activity per client
 _cleanup_task = None  # Background cleanup task
+_closing_sessions = set()  # Session close tasks of evicted clients
+
+
+async def _close_client_session(client):
+    if hasattr(client, "session") and client.session and not client.session.closed:
+        await client.session.close()
+
+
+def _close_evicted_client(cache_key, client):
+    """Close the session of a client dropped for age, inactivity or space"""
+    task = asyncio.create_task(_close_client_session(client))
+    _closing_sessions.add(task)
+    task.add_done_callback(_closing_sessions.discard)
+    LOGGER.debug(f"Closing cached streamrip client {cache_key}")
+
+
+# Global cache for authenticated clients, used ones stay alive
+STREAMRIP_CLIENT_CACHE = Cache(
+    "streamrip.clients",
+    max_entries=10,
+    ttl=CLIENT_CACHE_EXPIRY,
+    idle=CLIENT_INACTIVITY_TIMEOUT,
+    on_evict=_close_evicted_client,
+)
 
 # Circuit breaker for failed platforms
 PLATFORM_FAILURE_TRACKER = {}
@@ -1724,29 +1747,18 @@ def encrypt_streamrip_data(data_string):
     """Create a compact token for streamrip result data."""
     global STREAMRIP_CACHE_COUNTER
     try:
-        # Use hash-based lookup instead of linear search to reduce CPU overhead
-        import hashlib
-
-        data_hash = hashlib.md5(data_string.encode()).hexdigest()[:16]
-
-        # Check if this hash is already in the cache (more efficient lookup)
-        for key in STREAMRIP_RESULT_CACHE:
-            if key.endswith(data_hash):
-                return key
+        # Reuse the id of data that is still cached
+        short_id = STREAMRIP_IDS_BY_DATA.get(data_string)
+        if short_id is not None and short_id in STREAMRIP_RESULT_CACHE:
+            return short_id
 
         # Generate a new short ID
         STREAMRIP_CACHE_COUNTER += 1
         short_id = f"sr{STREAMRIP_CACHE_COUNTER}"
 
-        # Store in cache
-        STREAMRIP_RESULT_CACHE[short_id] = data_string
-
-        # Clean up cache if it gets too large (keep last 500 entries)
-        if len(STREAMRIP_RESULT_CACHE) > 500:
-            # Get oldest keys (first 50)
-            oldest_keys = list(STREAMRIP_RESULT_CACHE.keys())[:50]
-            for key in oldest_keys:
-                del STREAMRIP_RESULT_CACHE[key]
+        # Store in cache, the oldest ids are evicted beyond 500 entries
+        STREAMRIP_RESULT_CACHE.put(short_id, data_string)
+        STREAMRIP_IDS_BY_DATA[data_string] = short_id
 
         return short_id
     except Exception as e:
@@ -1757,8 +1769,9 @@ def encrypt_streamrip_data(data_string):
 def decrypt_streamrip_data(short_id):
     """Get the original data from the short ID."""
     try:
-        if short_id in STREAMRIP_RESULT_CACHE:
-            return STREAMRIP_RESULT_CACHE[short_id]
+        data_string = STREAMRIP_RESULT_CACHE.get(short_id)
+        if data_string is not None:
+            return data_string
         LOGGER.warning(f"Streamrip ID not found in cache: {short_id}")
         return short_id
     except Exception as e:
@@ -1768,39 +1781,13 @@ def decrypt_streamrip_data(short_id):
 
 def _update_client_activity(platform_name):
     """Update last activity time for a client"""
-    CLIENT_LAST_ACTIVITY[platform_name] = time_module.time()
+    STREAMRIP_CLIENT_CACHE.touch(f"{platform_name}_client")
 
 
 async def _cleanup_inactive_clients():
     """Clean up clients that have been inactive for more than CLIENT_INACTIVITY_TIMEOUT"""
-    current_time = time_module.time()
-    clients_to_remove = []
-
-    for platform_name in list(CLIENT_LAST_ACTIVITY.keys()):
-        last_activity = CLIENT_LAST_ACTIVITY.get(platform_name, 0)
-        if current_time - last_activity > CLIENT_INACTIVITY_TIMEOUT:
-            clients_to_remove.append(platform_name)
-
-    for platform_name in clients_to_remove:
-        cache_key = f"{platform_name}_client"
-        if cache_key in STREAMRIP_CLIENT_CACHE:
-            try:
-                cached_time, cached_client = STREAMRIP_CLIENT_CACHE[cache_key]
-                # Clean up client session
-                if (
-                    hasattr(cached_client, "session")
-                    and cached_client.session
-                    and not cached_client.session.closed
-                ):
-                    await cached_client.session.close()
-
-            except Exception as e:
-                LOGGER.warning(
-                    f"Error cleaning up inactive {platform_name} client: {e}"
-                )
-            finally:
-                del STREAMRIP_CLIENT_CACHE[cache_key]
-                CLIENT_LAST_ACTIVITY.pop(platform_name, None)
+    # Expired clients have their sessions closed by the eviction callback
+    STREAMRIP_CLIENT_CACHE.purge()
 
 
 async def _start_cleanup_task():
@@ -1831,7 +1818,6 @@ async def _get_or_create_cached_client(platform_name, config):
             LOGGER.warning(f"Circuit breaker open for {platform_name}, skipping")
             return None
 
-        current_time = time_module.time()
         cache_key = f"{platform_name}_client"
 
         # Start background cleanup task if needed
@@ -1840,30 +1826,21 @@ async def _get_or_create_cached_client(platform_name, config):
         # Clean up inactive clients first
         await _cleanup_inactive_clients()
 
-        # Check if we have a valid cached client
-        if cache_key in STREAMRIP_CLIENT_CACHE:
-            cached_time, cached_client = STREAMRIP_CLIENT_CACHE[cache_key]
-            # Check both max age and inactivity
-            last_activity = CLIENT_LAST_ACTIVITY.get(platform_name, cached_time)
+        # Check if we have a valid cached client, expired ones are gone
+        cached_client = STREAMRIP_CLIENT_CACHE.get(cache_key)
+        if cached_client is not None:
+            # Verify client is still valid
             if (
-                current_time - cached_time < CLIENT_CACHE_EXPIRY
-                and current_time - last_activity < CLIENT_INACTIVITY_TIMEOUT
+                hasattr(cached_client, "session")
+                and cached_client.session
+                and not cached_client.session.closed
             ):
-                # Verify client is still valid
-                if (
-                    hasattr(cached_client, "session")
-                    and cached_client.session
-                    and not cached_client.session.closed
-                ):
-                    # Update activity and reset circuit breaker
-                    _update_client_activity(platform_name)
-                    record_platform_success(platform_name)
-
-                    return cached_client
-            # Remove invalid or inactive cached client
+                # Reset circuit breaker
+                record_platform_success(platform_name)
 
-            STREAMRIP_CLIENT_CACHE.pop(cache_key, None)
-            CLIENT_LAST_ACTIVITY.pop(platform_name, None)
+                return cached_client
+            # Remove invalid cached client
+            STREAMRIP_CLIENT_CACHE.pop(cache_key)
         # Create new client with timeout
         client = None
         try:
@@ -1885,30 +1862,13 @@ async def _get_or_create_cached_client(platform_name, config):
                     client.login(), timeout=10.0
                 )  # Increased auth timeout to 10 seconds for better reliability
 
-            # Cache the authenticated client and track activity
-            STREAMRIP_CLIENT_CACHE[cache_key] = (current_time, client)
-            _update_client_activity(platform_name)
+            # Cache the authenticated client, the least recently used one
+            # is closed when more than 10 are cached
+            STREAMRIP_CLIENT_CACHE.put(cache_key, client)
             record_platform_success(
                 platform_name
             )  # Reset circuit breaker on success
 
-            # Clean up old cache entries
-            if len(STREAMRIP_CLIENT_CACHE) > 10:
-                oldest_key = min(
-                    STREAMRIP_CLIENT_CACHE.keys(),
-                    key=lambda k: STREAMRIP_CLIENT_CACHE[k][0],
-                )
-                old_time, old_client = STREAMRIP_CLIENT_CACHE[oldest_key]
-                # Clean up old client session
-                if (
-                    hasattr(old_client, "session")
-                    and old_client.session
-                    and not old_client.session.closed
-                ):
-                    with contextlib.suppress(Exception):
-                        await old_client.session.close()
-                del STREAMRIP_CLIENT_CACHE[oldest_key]
-
             return client
 
         except TimeoutError:
@@ -1968,11 +1928,9 @@ async def perform_inline_streamrip_search(query, platform, media_type, user_id):
         cache_key = generate_streamrip_cache_key(
             query, platform, media_type, user_id
         )
-        if cache_key in STREAMRIP_SEARCH_CACHE:
-            cached_time, cached_results = STREAMRIP_SEARCH_CACHE[cache_key]
-            # Use cached results if less than 5 minutes old
-            if time_module.time() - cached_time < 300:
-                return cached_results
+        cached_results = STREAMRIP_SEARCH_CACHE.get(cache_key)
+        if cached_results is not None:
+            return cached_results
 
         # Initialize streamrip clients directly for inline search
         clients = {}
@@ -2116,16 +2074,8 @@ async def perform_inline_streamrip_search(query, platform, media_type, user_id):
 
         all_results.sort(key=relevance_score, reverse=True)
 
-        # Cache results
-        STREAMRIP_SEARCH_CACHE[cache_key] = (time_module.time(), all_results)
-
-        # Clean up cache if too large (increased for more results)
-        if len(STREAMRIP_SEARCH_CACHE) > 50:
-            oldest_key = min(
-                STREAMRIP_SEARCH_CACHE.keys(),
-                key=lambda k: STREAMRIP_SEARCH_CACHE[k][0],
-            )
-            del STREAMRIP_SEARCH_CACHE[oldest_key]
+        # Cache results, the oldest of more than 50 searches are evicted
+        STREAMRIP_SEARCH_CACHE.put(cache_key, all_results)
 
         return all_results
 
@@ -0,0 +1,270 @@
+"""
+Broadcasts to the PM users of the bot.
+
+Broadcasts used to copy the message to one user after another and only
+slowed down after Telegram answered with a FloodWait, so fifty thousand
+users took hours and a restart lost the broadcast. Now ``WORKERS`` sends
+run concurrently in the bulk lane of the Telegram gateway, which keeps them
+under the global rate of the bot, behind every other request, and waits
+out FloodWaits for all of them. Users are sent to in ``_id`` order. Every
+``CHECKPOINT_INTERVAL`` seconds the job stores the last user before which
+everything was sent, with its counters, so an interrupted broadcast resumes
+there after a restart. Users that blocked the bot are removed in bulk at
+each checkpoint.
+"""
+
+from asyncio import create_task, gather, wait
+from functools import partial
+from time import monotonic, time
+
+from pyrogram.errors import InputUserDeactivated, UserIsBlocked
+
+from bot import LOGGER
+from bot.core.aeon_client import TgClient
+from bot.helper.ext_utils.db_handler import database
+from bot.helper.ext_utils.status_utils import get_readable_time
+from bot.helper.telegram_helper.tg_gateway import BULK, REPLY, STATUS, gateway
+
+# Concurrent sends of one broadcast
+WORKERS = 16
+
+# Seconds between checkpoints and status updates
+CHECKPOINT_INTERVAL = 10
+
+PENDING, SENT, BLOCKED, FAILED = range(4)
+
+# Running broadcasts by id
+broadcasts = {}
+
+
+def generate_status(
+    total,
+    successful,
+    blocked,
+    unsuccessful,
+    elapsed_time="",
+    rate=0.0,
+    eta="",
+):
+    status = "<b>Broadcast Stats :</b>\n\n"
+    status += f"<b>• Total users:</b> {total}\n"
+    status += f"<b>• Success:</b> {successful}\n"
+    status += f"<b>• Blocked or deleted:</b> {blocked}\n"
+    status += f"<b>• Unsuccessful attempts:</b> {unsuccessful}"
+    if rate:
+        status += f"\n<b>• Speed:</b> {rate:.1f} msg/s"
+    if eta:
+        status += f"\n<b>• ETA:</b> {eta}"
+    if elapsed_time:
+        status += f"\n\n<b>Elapsed Time:</b> {elapsed_time}"
+    return status
+
+
+class Broadcast:
+    """
+    One broadcast, either a copy of ``message_id`` from ``from_chat_id`` or
+    ``text``. Progress is shown by editing ``status_message_id`` in
+    ``status_chat_id`` when given.
+    """
+
+    def __init__(
+        self,
+        from_chat_id=None,
+        message_id=None,
+        text=None,
+        status_chat_id=None,
+        status_message_id=None,
+        job_id=None,
+    ):
+        self.id = job_id or str(int(time() * 1000))
+        self.from_chat_id = from_chat_id
+        self.message_id = message_id
+        self.text = text
+        self.status_chat_id = status_chat_id
+        self.status_message_id = status_message_id
+        # Everything up to and including this user was sent
+        self.after = None
+        self.total = 0
+        self.successful = 0
+        self.blocked = 0
+        self.unsuccessful = 0
+        # Seconds spent before the last restart
+        self.elapsed = 0.0
+        self.started = monotonic()
+        # Counters up to ``after``, the ones that are checkpointed
+        self._saved = [0, 0, 0, 0]
+        self._blocked_users = []
+        self._last_done = 0
+        self._last_report = self.started
+
+    @classmethod
+    def from_doc(cls, doc):
+        job = cls(
+            doc.get("from_chat_id"),
+            doc.get("message_id"),
+            doc.get("text"),
+            doc.get("status_chat_id"),
+            doc.get("status_message_id"),
+            doc["_id"],
+        )
+        job.after = doc.get("after")
+        job.total = doc.get("total", 0)
+        job.successful = doc.get("successful", 0)
+        job.blocked = doc.get("blocked", 0)
+        job.unsuccessful = doc.get("unsuccessful", 0)
+        job.elapsed = doc.get("elapsed", 0.0)
+        job._saved = [0, job.successful, job.blocked, job.unsuccessful]
+        return job
+
+    @property
+    def done(self):
+        return self.successful + self.blocked + self.unsuccessful
+
+    def to_doc(self):
+        return {
+            "from_chat_id": self.from_chat_id,
+            "message_id": self.message_id,
+            "text": self.text,
+            "status_chat_id": self.status_chat_id,
+            "status_message_id": self.status_message_id,
+            "after": self.after,
+            "total": self.total,
+            "successful": self._saved[SENT],
+            "blocked": self._saved[BLOCKED],
+            "unsuccessful": self._saved[FAILED],
+            "elapsed": self.elapsed + monotonic() - self.started,
+        }
+
+    async def _send_one(self, uid):
+        if self.text is not None:
+            await TgClient.bot.send_message(
+                chat_id=uid,
+                text=self.text,
+                disable_web_page_preview=True,
+                disable_notification=True,
+            )
+        else:
+            await TgClient.bot.copy_message(
+                chat_id=uid,
+                from_chat_id=self.from_chat_id,
+                message_id=self.message_id,
+            )
+
+    async def _send(self, uid):
+        try:
+            await gateway.call(TgClient.bot, uid, partial(self._send_one, uid), BULK)
+        except (UserIsBlocked, InputUserDeactivated) as user_err:
+            LOGGER.info(f"Removing user {uid} from database: {user_err!s}")
+            self._blocked_users.append(uid)
+            self.blocked += 1
+            return BLOCKED
+        except Exception as e:
+            LOGGER.error(f"Error sending broadcast to {uid}: {e!s}")
+            self.unsuccessful += 1
+            return FAILED
+        self.successful += 1
+        return SENT
+
+    def status(self, final=False):
+        elapsed = self.elapsed + monotonic() - self.started
+        if final:
+            return generate_status(
+                self.total,
+                self.successful,
+                self.blocked,
+                self.unsuccessful,
+                get_readable_time(elapsed, True),
+            )
+        now = monotonic()
+        rate = (self.done - self._last_done) / max(now - self._last_report, 1e-3)
+        self._last_done, self._last_report = self.done, now
+        remaining = max(self.total - self.done, 0)
+        return generate_status(
+            self.total,
+            self.successful,
+            self.blocked,
+            self.unsuccessful,
+            rate=rate,
+            eta=get_readable_time(remaining / rate) if rate else "",
+        )
+
+    async def _report(self, final=False):
+        status = self.status(final)
+        LOGGER.info(
+            f"Broadcast {self.id}: {self.successful}/{self.total} successful, "
+            f"{self.blocked} blocked, {self.unsuccessful} failed"
+        )
+        if self.status_chat_id is None:
+            return
+        try:
+            await gateway.call(
+                TgClient.bot,
+                self.status_chat_id,
+                partial(
+                    TgClient.bot.edit_message_text,
+                    chat_id=self.status_chat_id,
+                    message_id=self.status_message_id,
+                    text=status,
+                ),
+                REPLY if final else STATUS,
+                key=self.status_message_id,
+            )
+        except Exception as e:
+            LOGGER.error(f"Could not update broadcast status: {e}")
+
+    async def _checkpoint(self, users, outcomes, watermark):
+        """Advance the sent prefix of ``users``, store it, returns its end"""
+        while watermark < len(users) and outcomes[watermark] != PENDING:
+            self._saved[outcomes[watermark]] += 1
+            watermark += 1
+        if watermark:
+            self.after = users[watermark - 1]
+        if self._blocked_users:
+            blocked, self._blocked_users = self._blocked_users, []
+            await database.rm_pm_users(blocked)
+        await database.save_broadcast(self.id, self.to_doc())
+        return watermark
+
+    async def run(self):
+        """
+        Send to every PM user not reached yet, returns the final status or
+        None when there are no PM users
+        """
+        broadcasts[self.id] = self
+        try:
+            users = await database.get_pm_uids(self.after) or []
+            if self.after is None:
+                if not users:
+                    await database.remove_broadcast(self.id)
+                    return None
+                self.total = len(users)
+            LOGGER.info(f"Broadcast {self.id}: sending to {len(users)} users")
+            outcomes = bytearray(len(users))
+            queue = iter(enumerate(users))
+
+            async def worker():
+                for i, uid in queue:
+                    outcomes[i] = await self._send(uid)
+
+            workers = gather(*(worker() for _ in range(min(WORKERS, len(users)))))
+            watermark = 0
+            while not workers.done():
+                await wait({workers}, timeout=CHECKPOINT_INTERVAL)
+                watermark = await self._checkpoint(users, outcomes, watermark)
+                if not workers.done():
+                    await self._report()
+            await workers
+            await self._checkpoint(users, outcomes, watermark)
+            await database.remove_broadcast(self.id)
+            await self._report(final=True)
+            return self.status(final=True)
+        finally:
+            broadcasts.pop(self.id, None)
+
+
+async def resume_broadcasts():
+    """Continue the broadcasts a restart interrupted"""
+    for doc in await database.get_broadcasts():
+        job = Broadcast.from_doc(doc)
+        LOGGER.info(f"Resuming broadcast {job.id} after user {job.after}")
+        create_task(job.run())  # noqa: RUF006
@@ -0,0 +1,298 @@
+"""
+Scheduled message deletions.
+
+Every message given to ``auto_delete_message`` used to be stored in MongoDB
+only, and a sweep every fifteen minutes read back all rows, fetched each due
+message, deleted it on its own and removed its row on its own, thousands of
+API calls and round trips for a busy group. Deletions are now kept in an
+in-memory timer wheel of ``TICK`` second slots and stored in the database
+only so they survive a restart. When a slot is due its messages are deleted
+per bot and chat with one ``delete_messages`` call for up to ``BATCH_SIZE``
+ids, and the finished rows are removed with a single ``delete_many``.
+"""
+
+from asyncio import Event, wait_for
+from contextlib import suppress
+from functools import partial
+from heapq import heapify, heappop, heappush
+from time import time
+
+from pyrogram.errors import FloodWait
+
+from bot import LOGGER
+from bot.core.aeon_client import TgClient
+from bot.core.config_manager import get_config_bool
+from bot.helper.ext_utils.db_handler import database
+from bot.helper.ext_utils.exceptions import TelegramBusy
+from bot.helper.telegram_helper.tg_gateway import NOTICE, gateway
+
+# Seconds covered by one slot of the wheel, deletions due in the same slot
+# are sent together
+TICK = 5
+
+# Most message ids Telegram deletes in one call
+BATCH_SIZE = 100
+
+# A batch that failed for an unknown reason is retried after
+# RETRY_DELAY * attempt seconds, and given up after MAX_ATTEMPTS
+RETRY_DELAY = 300
+MAX_ATTEMPTS = 3
+
+# Longest sleep between two checks of the configuration
+CHECK_INTERVAL = 900
+
+# Seconds between clean ups of rows that were never deleted
+CLEANUP_INTERVAL = 86400
+
+# Errors after which retrying a deletion is pointless
+PERMANENT_ERRORS = (
+    "MESSAGE_DELETE_FORBIDDEN",
+    "MESSAGE_ID_INVALID",
+    "CHANNEL_INVALID",
+    "CHANNEL_PRIVATE",
+    "CHAT_INVALID",
+    "USER_INVALID",
+    "PEER_ID_INVALID",
+)
+
+
+def is_permanent(error):
+    if getattr(error, "CODE", None) in (400, 403):
+        return True
+    error_str = str(error)
+    return any(marker in error_str for marker in PERMANENT_ERRORS)
+
+
+def _slot(delete_time):
+    # Rounded up, a message is never deleted before its time
+    return -(-int(delete_time) // TICK)
+
+
+class DeletionScheduler:
+    """Timer wheel of pending deletions, sent per bot and chat in batches"""
+
+    def __init__(self):
+        # Slot -> {(bot_id, chat_id): message ids}
+        self._slots = {}
+        # Slots with deletions, soonest first. Slots emptied by cancel stay
+        # until they are popped.
+        self._heap = []
+        # (chat_id, message_id) -> (slot, bot_id)
+        self._due = {}
+        self._attempts = {}
+        self._wake = Event()
+        self._loaded = False
+        self._running = False
+        self._last_cleanup = 0
+        self.deleted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._due)
+
+    def _add(self, chat_id, message_id, bot_id, delete_time):
+        self._discard((chat_id, message_id))
+        slot = _slot(delete_time)
+        if (batches := self._slots.get(slot)) is None:
+            batches = self._slots[slot] = {}
+            heappush(self._heap, slot)
+            if self._heap[0] == slot:
+                self._wake.set()
+        batches.setdefault((bot_id, chat_id), set()).add(message_id)
+        self._due[(chat_id, message_id)] = (slot, bot_id)
+
+    def _discard(self, key):
+        if (entry := self._due.pop(key, None)) is None:
+            return False
+        slot, bot_id = entry
+        batches = self._slots.get(slot, {})
+        chat_id, message_id = key
+        if (ids := batches.get((bot_id, chat_id))) is not None:
+            ids.discard(message_id)
+            if not ids:
+                del batches[(bot_id, chat_id)]
+        return True
+
+    async def schedule(self, chat_ids, message_ids, delete_time, bot_id):
+        if get_config_bool("SCHEDULED_DELETION_ENABLED", True):
+            for chat_id, message_id in zip(chat_ids, message_ids, strict=True):
+                self._add(chat_id, message_id, bot_id, delete_time)
+        await database.store_scheduled_deletion(
+            chat_ids, message_ids, delete_time, bot_id
+        )
+
+    async def cancel(self, messages):
+        """Forget (chat_id, message_id) pairs that were deleted another way"""
+        messages = [
+            key for key in messages if self._discard(key) or not self._loaded
+        ]
+        for key in messages:
+            self._attempts.pop(key, None)
+        if messages:
+            await database.remove_scheduled_deletions(messages)
+
+    async def load(self, again=False):
+        """Add the deletions stored in the database, once unless ``again``"""
+        if self._loaded and not again:
+            return
+        rows = await database.get_scheduled_deletions()
+        for chat_id, message_id, bot_id, delete_time in rows:
+            if (chat_id, message_id) not in self._due:
+                self._add(chat_id, message_id, bot_id, delete_time)
+        self._loaded = True
+        if rows:
+            LOGGER.info(f"Loaded {len(rows)} scheduled deletions")
+
+    def _clients(self):
+        clients = {str(TgClient.ID): TgClient.bot}
+        for key, client in getattr(TgClient, "helper_bots", {}).items():
+            clients[str(key)] = client
+            if (me := getattr(client, "me", None)) is not None:
+                clients[str(me.id)] = client
+        return clients
+
+    def _retry(self, bot_id, chat_id, message_ids, delay, count=True):
+        for message_id in message_ids:
+            key = (chat_id, message_id)
+            attempt = 1
+            if count:
+                attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+                if attempt >= MAX_ATTEMPTS:
+                    # The row stays until the daily clean up
+                    del self._attempts[key]
+                    self.failed += 1
+                    continue
+            self._add(chat_id, message_id, bot_id, time() + delay * attempt)
+
+    async def _delete(self, client, bot_id, chat_id, message_ids):
+        """Delete the messages of one chat, returns the ids that are done"""
+        done = []
+        for i in range(0, len(message_ids), BATCH_SIZE):
+            batch = message_ids[i : i + BATCH_SIZE]
+            try:
+                await gateway.call(
+                    client,
+                    chat_id,
+                    partial(
+                        client.delete_messages, chat_id=chat_id, message_ids=batch
+                    ),
+                    NOTICE,
+                    retry=False,
+                    edit=True,
+                )
+            except (FloodWait, TelegramBusy) as f:
+                self._retry(bot_id, chat_id, message_ids[i:], f.value, False)
+                break
+            except Exception as e:
+                if is_permanent(e):
+                    LOGGER.warning(
+                        f"Dropping {len(batch)} scheduled deletions in {chat_id}: {e}"
+                    )
+                    self.dropped += len(batch)
+                    done.extend(batch)
+                else:
+                    LOGGER.error(f"Failed to delete messages in {chat_id}: {e}")
+                    self._retry(bot_id, chat_id, batch, RETRY_DELAY)
+                continue
+            self.deleted += len(batch)
+            done.extend(batch)
+        return done
+
+    async def _fire(self, slot):
+        batches = self._slots.pop(slot, None)
+        if not batches:
+            return
+        clients = self._clients()
+        done = []
+        for (bot_id, chat_id), ids in batches.items():
+            for message_id in ids:
+                self._due.pop((chat_id, message_id), None)
+            if (client := clients.get(str(bot_id))) is None:
+                self._retry(bot_id, chat_id, ids, RETRY_DELAY)
+                continue
+            for message_id in await self._delete(
+                client, bot_id, chat_id, sorted(ids)
+            ):
+                self._attempts.pop((chat_id, message_id), None)
+                done.append((chat_id, message_id))
+        if done:
+            await database.remove_scheduled_deletions(done)
+
+    async def _cleanup(self):
+        if time() - self._last_cleanup < CLEANUP_INTERVAL:
+            return
+        self._last_cleanup = time()
+        if count := await database.clean_old_scheduled_deletions(days=1):
+            LOGGER.info(f"Cleaned {count} stale scheduled deletions")
+
+    async def run(self):
+        """Delete due messages until scheduled deletion is disabled"""
+        if self._running:
+            return
+        self._running = True
+        try:
+            await self.load()
+            while get_config_bool("SCHEDULED_DELETION_ENABLED", True):
+                try:
+                    await self._cleanup()
+                    while self._heap and self._heap[0] * TICK <= time():
+                        await self._fire(heappop(self._heap))
+                except Exception as e:
+                    LOGGER.error(f"Error in deletion scheduler: {e}")
+                self._wake.clear()
+                delay = (
+                    self._heap[0] * TICK - time() if self._heap else CHECK_INTERVAL
+                )
+                with suppress(TimeoutError):
+                    await wait_for(
+                        self._wake.wait(), min(max(delay, 0), CHECK_INTERVAL)
+                    )
+        finally:
+            self._running = False
+
+    async def flush(self, until=None):
+        """
+        Fire now the slots due by ``until``, all of them when it is None.
+        Returns how many of their messages were deleted, dropped for a
+        permanent error and given up after retries, and how many wait for
+        a retry.
+        """
+        # Rows stored while scheduled deletion was disabled are not in memory
+        await self.load(again=True)
+        limit = float("inf") if until is None else _slot(until)
+        slots = sorted({slot for slot in self._heap if slot <= limit})
+        self._heap = [slot for slot in self._heap if slot > limit]
+        heapify(self._heap)
+        before = (self.deleted, self.dropped, self.failed)
+        messages = [
+            (chat_id, message_id)
+            for slot in slots
+            for (_, chat_id), ids in self._slots.get(slot, {}).items()
+            for message_id in ids
+        ]
+        for slot in slots:
+            await self._fire(slot)
+        deleted, dropped, failed = (
+            now - then
+            for now, then in zip(
+                (self.deleted, self.dropped, self.failed), before, strict=True
+            )
+        )
+        return {
+            "deleted": deleted,
+            "dropped": dropped,
+            "failed": failed,
+            "retrying": sum(key in self._due for key in messages),
+        }
+
+    def status(self):
+        return {
+            "pending": len(self._due),
+            "deleted": self.deleted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+deletion_scheduler = DeletionScheduler()
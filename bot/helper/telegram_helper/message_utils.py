@@ -1,6 +1,7 @@
 import contextlib
 import re
-from asyncio import gather, sleep
+from asyncio import gather
+from functools import partial
 from re import match as re_match
 from time import time as get_time
 
@@ -25,9 +26,16 @@ from bot import (
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import SetInterval
-from bot.helper.ext_utils.db_handler import database
-from bot.helper.ext_utils.exceptions import TgLinkException
+from bot.helper.ext_utils.exceptions import TelegramBusy, TgLinkException
 from bot.helper.ext_utils.status_utils import get_readable_message
+from bot.helper.telegram_helper.deletion_scheduler import deletion_scheduler
+from bot.helper.telegram_helper.tg_gateway import NOTICE, REPLY, STATUS, gateway
+
+
+def _client_of(message):
+    """Client a Pyrogram message was received or sent with"""
+    return getattr(message, "_client", None) or TgClient.bot
+
 
 session_cache = TTLCache(
     maxsize=100,
@@ -43,6 +51,7 @@ async def send_message(
     markdown=False,
     block=True,
     bot_client=None,
+    lane=REPLY,
 ):
     """Send a message using the specified bot client
 
@@ -54,6 +63,7 @@ async def send_message(
         markdown: Whether to use Markdown formatting
         block: Whether to block until the message is sent
         bot_client: Bot client to use for sending (default: main bot)
+        lane: Gateway lane of the request (default: reply)
     """
     parse_mode = enums.ParseMode.MARKDOWN if markdown else enums.ParseMode.HTML
 
@@ -93,63 +103,83 @@ async def send_message(
             if isinstance(message, str) and message.isdigit():
                 message = int(message)
 
-            return await client.send_message(
-                chat_id=message,
-                text=text,
-                disable_web_page_preview=True,
-                disable_notification=True,
-                reply_markup=buttons,
-                parse_mode=parse_mode,
+            return await gateway.call(
+                client,
+                message,
+                partial(
+                    client.send_message,
+                    chat_id=message,
+                    text=text,
+                    disable_web_page_preview=True,
+                    disable_notification=True,
+                    reply_markup=buttons,
+                    parse_mode=parse_mode,
+                ),
+                lane,
+                retry=block,
             )
 
         # Check if message has required attributes
         if not hasattr(message, "chat") or not hasattr(message.chat, "id"):
             # Try to send to chat directly if message has an id attribute
             if hasattr(message, "id"):
-                return await client.send_message(
-                    chat_id=message.id,
-                    text=text,
-                    disable_web_page_preview=True,
-                    disable_notification=True,
-                    reply_markup=buttons,
-                    parse_mode=parse_mode,
+                return await gateway.call(
+                    client,
+                    message.id,
+                    partial(
+                        client.send_message,
+                        chat_id=message.id,
+                        text=text,
+                        disable_web_page_preview=True,
+                        disable_notification=True,
+                        reply_markup=buttons,
+                        parse_mode=parse_mode,
+                    ),
+                    lane,
+                    retry=block,
                 )
 
             return f"Invalid message object: {type(message)}"
 
         if photo:
-            return await message.reply_photo(
-                photo=photo,
-                reply_to_message_id=message.id,
-                caption=text,
-                reply_markup=buttons,
-                disable_notification=True,
-                parse_mode=parse_mode,
+            return await gateway.call(
+                _client_of(message),
+                message.chat.id,
+                partial(
+                    message.reply_photo,
+                    photo=photo,
+                    reply_to_message_id=message.id,
+                    caption=text,
+                    reply_markup=buttons,
+                    disable_notification=True,
+                    parse_mode=parse_mode,
+                ),
+                lane,
+                retry=block,
             )
 
-        return await message.reply(
-            text=text,
-            quote=True,
-            disable_web_page_preview=True,
-            disable_notification=True,
-            reply_markup=buttons,
-            parse_mode=parse_mode,
+        return await gateway.call(
+            _client_of(message),
+            message.chat.id,
+            partial(
+                message.reply,
+                text=text,
+                quote=True,
+                disable_web_page_preview=True,
+                disable_notification=True,
+                reply_markup=buttons,
+                parse_mode=parse_mode,
+            ),
+            lane,
+            retry=block,
         )
 
-    except FloodWait as f:
+    except (FloodWait, TelegramBusy) as f:
+        # The gateway already waited out the FloodWaits it was allowed to
         if not block:
             return message
-        # More aggressive backoff to prevent repeated FloodWait errors
-        await sleep(f.value * 1.5 + 2)  # Add extra buffer time
-        return await send_message(
-            message,
-            text,
-            buttons,
-            photo,
-            markdown,
-            block,
-            bot_client,
-        )
+        LOGGER.error(str(f))
+        return str(f)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -162,6 +192,7 @@ async def edit_message(
     photo=None,
     markdown=False,
     block=True,
+    lane=REPLY,
 ):
     # Check if message is valid
     if not message or not hasattr(message, "chat") or not hasattr(message, "id"):
@@ -208,24 +239,39 @@ async def edit_message(
             if photo:
                 # Create InputMediaPhoto with the correct parse_mode
                 media = InputMediaPhoto(photo, caption=text, parse_mode=parse_mode)
-                return await message.edit_media(media=media, reply_markup=buttons)
-            return await message.edit_caption(
-                caption=text,
+                edit = partial(message.edit_media, media=media, reply_markup=buttons)
+            else:
+                edit = partial(
+                    message.edit_caption,
+                    caption=text,
+                    reply_markup=buttons,
+                    parse_mode=parse_mode,
+                )
+        else:
+            edit = partial(
+                message.edit,
+                text=text,
+                disable_web_page_preview=True,
                 reply_markup=buttons,
                 parse_mode=parse_mode,
             )
-        await message.edit(
-            text=text,
-            disable_web_page_preview=True,
-            reply_markup=buttons,
-            parse_mode=parse_mode,
+        # Waiting edits of the same message are coalesced, the latest wins
+        result = await gateway.call(
+            _client_of(message),
+            chat_id,
+            edit,
+            lane,
+            key=message_id,
+            retry=block,
         )
-    except FloodWait as f:
+        if message.media:
+            return result
+    except (FloodWait, TelegramBusy) as f:
+        # The gateway already waited out the FloodWaits it was allowed to
         if not block:
             return message
-        # More aggressive backoff to prevent repeated FloodWait errors
-        await sleep(f.value * 1.5 + 2)  # Add extra buffer time
-        return await edit_message(message, text, buttons, photo, markdown)
+        LOGGER.error(str(f))
+        return str(f)
     except (MessageNotModified, MessageEmpty):
         # Message content hasn't changed or is empty, not an error
         return message
@@ -238,19 +284,31 @@ async def edit_message(
             )
             # Try to send a notification about using expandable blockquotes
             with contextlib.suppress(Exception):
-                await message.reply(
-                    "The message is too long for Telegram. Please use expandable blockquotes for long content sections.",
-                    quote=True,
+                await gateway.call(
+                    _client_of(message),
+                    chat_id,
+                    partial(
+                        message.reply,
+                        "The message is too long for Telegram. Please use expandable blockquotes for long content sections.",
+                        quote=True,
+                    ),
                 )
         # Handle REPLY_MARKUP_INVALID error
         elif "REPLY_MARKUP_INVALID" in error_str:
             LOGGER.error(f"Telegram says: {error_str}")
             # Try to edit the message without buttons
             try:
-                await message.edit(
-                    text=text,
-                    disable_web_page_preview=True,
-                    parse_mode=parse_mode,
+                await gateway.call(
+                    _client_of(message),
+                    chat_id,
+                    partial(
+                        message.edit,
+                        text=text,
+                        disable_web_page_preview=True,
+                        parse_mode=parse_mode,
+                    ),
+                    lane,
+                    edit=True,
                 )
                 return message
             except Exception as e2:
@@ -268,17 +326,18 @@ async def edit_message(
 
 async def send_file(message, file, caption="", buttons=None):
     try:
-        return await message.reply_document(
-            document=file,
-            quote=True,
-            caption=caption,
-            disable_notification=True,
-            reply_markup=buttons,
+        return await gateway.call(
+            _client_of(message),
+            message.chat.id,
+            partial(
+                message.reply_document,
+                document=file,
+                quote=True,
+                caption=caption,
+                disable_notification=True,
+                reply_markup=buttons,
+            ),
         )
-
-    except FloodWait as f:
-        await sleep(f.value * 1.2)
-        return await send_file(message, file, caption, buttons)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -298,48 +357,48 @@ async def send_rss(text, chat_id, thread_id):
     text = text.replace("\u200b", "").replace("\u200c", "").replace("\u200d", "")
     text = "".join(c if ord(c) >= 32 or c == "\n" else " " for c in text)
 
-    try:
-        app = TgClient.user or TgClient.bot
-        return await app.send_message(
-            chat_id=chat_id,
-            text=text,
-            disable_web_page_preview=True,
-            message_thread_id=thread_id,
-            disable_notification=True,
+    app = TgClient.user or TgClient.bot
+
+    def post(content):
+        return gateway.call(
+            app,
+            chat_id,
+            partial(
+                app.send_message,
+                chat_id=chat_id,
+                text=content,
+                disable_web_page_preview=True,
+                message_thread_id=thread_id,
+                disable_notification=True,
+            ),
+            NOTICE,
         )
 
+    simplified_text = (
+        "RSS Update: Unable to display full content due to formatting issues."
+    )
+    try:
+        return await post(text)
+
     except MessageEmpty:
         LOGGER.error("Telegram says: Message is empty")
         # Try with a simplified message as a fallback
         try:
-            simplified_text = "RSS Update: Unable to display full content due to formatting issues."
-            return await app.send_message(
-                chat_id=chat_id,
-                text=simplified_text,
-                disable_web_page_preview=True,
-                message_thread_id=thread_id,
-                disable_notification=True,
-            )
+            return await post(simplified_text)
 
         except Exception as e2:
             LOGGER.error(f"Failed to send simplified message too: {e2}")
             return str(e2)
     except (FloodWait, FloodPremiumWait) as f:
-        await sleep(f.value * 1.2)
-        return await send_rss(text, chat_id, thread_id)
+        # The gateway already waited out the FloodWaits it was allowed to
+        LOGGER.error(f"Error sending RSS message: {f!s}")
+        return str(f)
     except Exception as e:
         LOGGER.error(f"Error sending RSS message: {e!s}")
         # Try with a simplified message as a fallback if it seems to be a formatting issue
         if "MESSAGE_EMPTY" in str(e) or "400" in str(e):
             try:
-                simplified_text = "RSS Update: Unable to display full content due to formatting issues."
-                return await app.send_message(
-                    chat_id=chat_id,
-                    text=simplified_text,
-                    disable_web_page_preview=True,
-                    message_thread_id=thread_id,
-                    disable_notification=True,
-                )
+                return await post(simplified_text)
 
             except Exception as e2:
                 LOGGER.error(f"Failed to send simplified message too: {e2}")
@@ -348,32 +407,37 @@ async def send_rss(text, chat_id, thread_id):
 
 async def delete_message(*args):
     msgs = []
+    deleting = []
+    scheduled = []
     for msg in args:
         if msg:
+            # Forget any scheduled deletion, service messages cannot be
+            # deleted and the others are deleted now
+            if hasattr(msg, "id") and hasattr(msg, "chat"):
+                scheduled.append((msg.chat.id, msg.id))
             # Check if this is a service message that cannot be deleted
-            is_service_msg = hasattr(msg, "service") and msg.service is not None
-            if is_service_msg:
-                # Remove from database if it exists since we can't delete it
-                if hasattr(msg, "id") and hasattr(msg, "chat"):
-                    try:
-                        await database.remove_scheduled_deletion(msg.chat.id, msg.id)
-                    except Exception as e:
-                        LOGGER.error(
-                            f"Error removing scheduled deletion for service message: {e}"
-                        )
+            if hasattr(msg, "service") and msg.service is not None:
                 continue
+            msgs.append(
+                gateway.call(
+                    _client_of(msg),
+                    getattr(getattr(msg, "chat", None), "id", None),
+                    msg.delete,
+                    NOTICE,
+                    edit=True,
+                )
+            )
+            deleting.append(msg)
 
-            msgs.append(msg.delete())
-            # Remove from database if it exists
-            if hasattr(msg, "id") and hasattr(msg, "chat"):
-                try:
-                    await database.remove_scheduled_deletion(msg.chat.id, msg.id)
-                except Exception as e:
-                    LOGGER.error(f"Error removing scheduled deletion: {e}")
+    if scheduled:
+        try:
+            await deletion_scheduler.cancel(scheduled)
+        except Exception as e:
+            LOGGER.error(f"Error removing scheduled deletion: {e}")
 
     results = await gather(*msgs, return_exceptions=True)
 
-    for msg, result in zip(args, results, strict=False):
+    for msg, result in zip(deleting, results, strict=True):
         if isinstance(result, Exception):
             error_str = str(result)
             # Handle permission-related errors more gracefully
@@ -381,26 +445,10 @@ async def delete_message(*args):
                 LOGGER.warning(
                     f"Cannot delete message {msg.id} in chat {msg.chat.id}: {error_str}"
                 )
-                # Remove from database since we can't delete it
-                if hasattr(msg, "id") and hasattr(msg, "chat"):
-                    try:
-                        await database.remove_scheduled_deletion(msg.chat.id, msg.id)
-                    except Exception as e:
-                        LOGGER.error(
-                            f"Error removing scheduled deletion for forbidden message: {e}"
-                        )
             elif "MESSAGE_ID_INVALID" in error_str or "400" in error_str:
                 LOGGER.error(
                     f"Message {msg.id} in chat {msg.chat.id} no longer exists: {error_str}"
                 )
-                # Remove from database since message doesn't exist
-                if hasattr(msg, "id") and hasattr(msg, "chat"):
-                    try:
-                        await database.remove_scheduled_deletion(msg.chat.id, msg.id)
-                    except Exception as e:
-                        LOGGER.error(
-                            f"Error removing scheduled deletion for invalid message: {e}"
-                        )
             else:
                 # Log other errors as actual errors
                 LOGGER.error(
@@ -461,18 +509,17 @@ async def auto_delete_message(*args, time=300, bot_id=None):
                     # Using default bot ID
 
             try:
-                await database.store_scheduled_deletion(
+                await deletion_scheduler.schedule(
                     chat_ids,
                     message_ids,
                     delete_time,
                     bot_id,
                 )
-                # Messages stored for deletion
             except Exception as e:
                 LOGGER.error(f"Error storing scheduled deletion: {e}")
 
-        # Instead of blocking with sleep, let the scheduled deletion system handle it
-        # The process_pending_deletions function will handle this on next run
+        # Instead of blocking with sleep, the deletion scheduler deletes them
+        # when they are due
 
 
 async def delete_status():
@@ -681,32 +728,44 @@ async def update_status_message(sid, force=False):
                 obj.cancel()
                 del intervals["status"][sid]
             return
-        if text != status_dict[sid]["message"].text:
-            message = await edit_message(
-                status_dict[sid]["message"],
-                text,
-                buttons,
-                block=False,
-            )
-            if isinstance(message, str):
-                # Check for common Telegram API errors that indicate the message is no longer valid
-                if (
-                    message.startswith("Telegram says: [40")
-                    or "MESSAGE_ID_INVALID" in message
-                    or "message to edit not found" in message.lower()
-                ):
-                    del status_dict[sid]
-                    if obj := intervals["status"].get(sid):
-                        obj.cancel()
-                        del intervals["status"][sid]
-                else:
-                    # Only log as error for non-standard issues
-                    LOGGER.error(
-                        f"Status with id: {sid} haven't been updated. Error: {message}",
-                    )
-                return
-            status_dict[sid]["message"].text = text
-            status_dict[sid]["time"] = get_time()
+        status_message = status_dict[sid]["message"]
+        if text == status_message.text:
+            return
+    # Edited outside the lock, the gateway may hold the edit back for the
+    # rate limit of the chat
+    message = await edit_message(
+        status_message,
+        text,
+        buttons,
+        block=False,
+        lane=STATUS,
+    )
+    async with task_dict_lock:
+        if (
+            not status_dict.get(sid)
+            or status_dict[sid]["message"] is not status_message
+        ):
+            # Removed or sent again meanwhile
+            return
+        if isinstance(message, str):
+            # Check for common Telegram API errors that indicate the message is no longer valid
+            if (
+                message.startswith("Telegram says: [40")
+                or "MESSAGE_ID_INVALID" in message
+                or "message to edit not found" in message.lower()
+            ):
+                del status_dict[sid]
+                if obj := intervals["status"].get(sid):
+                    obj.cancel()
+                    del intervals["status"][sid]
+            else:
+                # Only log as error for non-standard issues
+                LOGGER.error(
+                    f"Status with id: {sid} haven't been updated. Error: {message}",
+                )
+            return
+        status_message.text = text
+        status_dict[sid]["time"] = get_time()
 
 
 async def send_status_message(msg, user_id=0):
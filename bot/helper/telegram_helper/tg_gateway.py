@@ -0,0 +1,331 @@
+"""
+Single outbound path for Telegram requests.
+
+``send_message``, ``edit_message`` and friends used to call Pyrogram
+directly and each slept on its own after a FloodWait, so status edits,
+completion messages, log copies, RSS posts and broadcasts competed for the
+same limits and one FloodWait stalled unrelated chats. Every request now
+goes through ``gateway``:
+
+- a request takes a token from the bucket of its client (``GLOBAL_RATE``
+  per second) and from the bucket of its chat (``PRIVATE_RATE`` or
+  ``GROUP_RATE``)
+- edits and deletions take their chat token from a bucket of their own
+  (``EDIT_RATE``), so status edits and clean up do not eat the budget of
+  the messages that are sent to the chat
+- waiting requests are started by lane, replies before notices, status
+  edits and broadcasts
+- an edit of a message that already has an edit waiting replaces it, the
+  callers of both get the result of the one that is sent
+- a FloodWait pauses the whole client, the request is queued again
+- queue depth, queue wait and call latency are kept for /stats
+"""
+
+from asyncio import CancelledError, Event, get_running_loop, shield, wait_for
+from collections import deque
+from contextlib import suppress
+from time import monotonic
+
+from pyrogram.errors import FloodPremiumWait, FloodWait
+
+from bot import LOGGER
+from bot.helper.ext_utils.cache_utils import Cache
+from bot.helper.ext_utils.exceptions import TelegramBusy
+
+REPLY, NOTICE, STATUS, BULK = range(4)
+LANE_NAMES = ("reply", "notice", "status", "bulk")
+
+# Requests per second of one client over all chats
+GLOBAL_RATE = 30
+GLOBAL_BURST = 30
+
+# Requests per second to one private chat, and to one group or channel
+PRIVATE_RATE = 1
+PRIVATE_BURST = 3
+GROUP_RATE = 20 / 60
+GROUP_BURST = 5
+
+# Edits and deletions per second in one chat, counted apart from the sends
+EDIT_RATE = 1
+EDIT_BURST = 5
+
+# Times a request is queued again after a FloodWait
+MAX_ATTEMPTS = 3
+
+# Weight of the newest sample in the averaged latencies
+EWMA = 0.1
+
+
+class Bucket:
+    __slots__ = ("burst", "rate", "tokens", "updated")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = monotonic()
+
+    def wait(self, now):
+        """Seconds until a token is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class Request:
+    __slots__ = (
+        "attempts",
+        "call",
+        "chat_id",
+        "client",
+        "edit",
+        "enqueued",
+        "future",
+        "key",
+        "lane",
+        "retry",
+    )
+
+    def __init__(self, client, chat_id, call, lane, key, retry, edit):
+        self.client = client
+        self.chat_id = chat_id
+        self.call = call
+        self.lane = lane
+        self.key = key
+        self.retry = retry
+        self.edit = edit
+        self.attempts = 0
+        self.enqueued = monotonic()
+        self.future = get_running_loop().create_future()
+
+
+class TelegramGateway:
+    """Rate limited, prioritised queue in front of the Telegram clients"""
+
+    def __init__(self):
+        self._lanes = tuple(deque() for _ in LANE_NAMES)
+        self._clients = {}
+        # Unused chat buckets are full again after a while anyway
+        self._chats = Cache("gateway_chats", 4096, idle=300)
+        self._paused = {}
+        # Waiting edits by (client, chat, message)
+        self._edits = {}
+        self._wake = Event()
+        self._task = None
+        self._running = set()
+        self.inflight = 0
+        self.stats = {
+            "sent": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "flood_waits": 0,
+        }
+        self.wait_avg = 0.0
+        self.wait_max = 0.0
+        self.latency_avg = 0.0
+        self.latency_max = 0.0
+
+    def _client_bucket(self, client):
+        if (bucket := self._clients.get(id(client))) is None:
+            bucket = self._clients[id(client)] = Bucket(GLOBAL_RATE, GLOBAL_BURST)
+        return bucket
+
+    def _chat_bucket(self, client, chat_id, edit=False):
+        if chat_id is None:
+            return None
+        key = (id(client), chat_id, edit)
+        if (bucket := self._chats.get(key)) is None:
+            if edit:
+                bucket = Bucket(EDIT_RATE, EDIT_BURST)
+            elif isinstance(chat_id, int) and chat_id < 0:
+                bucket = Bucket(GROUP_RATE, GROUP_BURST)
+            else:
+                bucket = Bucket(PRIVATE_RATE, PRIVATE_BURST)
+            bucket = self._chats.put(key, bucket, 1)
+        return bucket
+
+    def paused(self, client):
+        """Seconds until a FloodWait of ``client`` is over"""
+        return max(0.0, self._paused.get(id(client), 0.0) - monotonic())
+
+    def _pause(self, client, seconds):
+        self.stats["flood_waits"] += 1
+        until = monotonic() + seconds
+        if until > self._paused.get(id(client), 0.0):
+            self._paused[id(client)] = until
+            LOGGER.warning(f"FloodWait: pausing Telegram requests for {seconds}s")
+
+    async def call(
+        self,
+        client,
+        chat_id,
+        call,
+        lane=REPLY,
+        key=None,
+        retry=True,
+        edit=False,
+    ):
+        """
+        Result of ``await call()`` once the limits of ``client`` and
+        ``chat_id`` allow it. Requests with the same ``key`` that are still
+        waiting are coalesced, only the last ``call`` is made. Requests with
+        a ``key`` and the ones marked ``edit`` change or delete messages
+        that exist and use the edit budget of the chat. Without ``retry`` a
+        FloodWait is raised instead of waiting for it, and ``TelegramBusy``
+        while the client waits one out.
+        """
+        if not retry and (pause := self.paused(client)):
+            raise TelegramBusy(pause)
+        if self._task is None or self._task.done():
+            self._task = get_running_loop().create_task(self._run())
+        if key is not None:
+            key = (id(client), chat_id, key)
+            if (request := self._edits.get(key)) is not None:
+                request.call = call
+                request.lane = min(request.lane, lane)
+                request.retry = request.retry or retry
+                self.stats["coalesced"] += 1
+                return await shield(request.future)
+        request = Request(
+            client, chat_id, call, lane, key, retry, edit or key is not None
+        )
+        if key is not None:
+            self._edits[key] = request
+        self._lanes[lane].append(request)
+        self._wake.set()
+        return await shield(request.future)
+
+    def _dispatch(self):
+        """Start the requests that may run now, returns seconds until the next"""
+        now = monotonic()
+        soonest = None
+        for lane, queue in enumerate(self._lanes):
+            for _ in range(len(queue)):
+                request = queue.popleft()
+                if request.lane != lane:
+                    # Raised by a coalesced edit
+                    self._lanes[request.lane].append(request)
+                    soonest = 0
+                    continue
+                chat = self._chat_bucket(
+                    request.client, request.chat_id, request.edit
+                )
+                delay = max(
+                    self._paused.get(id(request.client), 0.0) - now,
+                    self._client_bucket(request.client).wait(now),
+                    chat.wait(now) if chat is not None else 0,
+                )
+                if delay > 0:
+                    queue.append(request)
+                    soonest = delay if soonest is None else min(soonest, delay)
+                    continue
+                self._client_bucket(request.client).take()
+                if chat is not None:
+                    chat.take()
+                if request.key is not None:
+                    self._edits.pop(request.key, None)
+                task = get_running_loop().create_task(self._execute(request))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+        return soonest
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                delay = self._dispatch()
+            except Exception as e:
+                LOGGER.error(f"Telegram gateway dispatch failed: {e}")
+                delay = 1
+            if delay is None:
+                await self._wake.wait()
+            else:
+                with suppress(TimeoutError):
+                    await wait_for(self._wake.wait(), delay)
+
+    def _requeue(self, request):
+        if request.key is not None:
+            if (newer := self._edits.get(request.key)) is not None:
+                # A newer edit waits already, it answers this one too
+                newer.future.add_done_callback(lambda f: _forward(f, request.future))
+                return
+            self._edits[request.key] = request
+        self._lanes[request.lane].appendleft(request)
+
+    async def _execute(self, request):
+        started = monotonic()
+        waited = started - request.enqueued
+        self.wait_avg += (waited - self.wait_avg) * EWMA
+        self.wait_max = max(self.wait_max, waited)
+        self.inflight += 1
+        try:
+            result = await request.call()
+        except (FloodWait, FloodPremiumWait) as f:
+            self._pause(request.client, f.value)
+            request.attempts += 1
+            if request.retry and request.attempts < MAX_ATTEMPTS:
+                self._requeue(request)
+            else:
+                self.stats["failed"] += 1
+                request.future.set_exception(f)
+        except CancelledError:
+            request.future.cancel()
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            request.future.set_exception(e)
+        else:
+            self.stats["sent"] += 1
+            request.future.set_result(result)
+        finally:
+            self.inflight -= 1
+            latency = monotonic() - started
+            self.latency_avg += (latency - self.latency_avg) * EWMA
+            self.latency_max = max(self.latency_max, latency)
+            self._wake.set()
+
+    def status(self):
+        return {
+            **self.stats,
+            "queued": {
+                name: len(queue)
+                for name, queue in zip(LANE_NAMES, self._lanes, strict=True)
+            },
+            "inflight": self.inflight,
+            "wait_avg_ms": self.wait_avg * 1000,
+            "wait_max_ms": self.wait_max * 1000,
+            "latency_avg_ms": self.latency_avg * 1000,
+            "latency_max_ms": self.latency_max * 1000,
+        }
+
+
+def _forward(source, target):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif (error := source.exception()) is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+gateway = TelegramGateway()
+
+
+def gateway_report():
+    """Queue and latency lines for /stats"""
+    status = gateway.status()
+    queued = " | ".join(f"{k} {v}" for k, v in status["queued"].items())
+    return [
+        f"queued: {queued} | running {status['inflight']}",
+        f"sent {status['sent']} | failed {status['failed']} | "
+        f"coalesced {status['coalesced']} | flood waits {status['flood_waits']}",
+        f"wait: avg {status['wait_avg_ms']:.0f}ms | "
+        f"max {status['wait_max_ms']:.0f}ms",
+        f"latency: avg {status['latency_avg_ms']:.0f}ms | "
+        f"max {status['latency_max_ms']:.0f}ms",
+    ]
@@ -5,7 +5,6 @@ Handles connection stability, rate limiting, and free account optimizations
 
 import asyncio
 import contextlib
-import gc
 import time
 import weakref
 from typing import Any
@@ -13,6 +12,7 @@ from typing import Any
 from zotify import Session
 
 from bot import LOGGER
+from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 from bot.helper.zotify_utils.zotify_config import zotify_config
 
 # Memory optimization: Track active objects for cleanup
@@ -22,6 +22,93 @@ _cache_timestamps = {}
 MAX_CACHE_SIZE = 100
 CACHE_TTL = 300  # 5 minutes
 
+# Pause in seconds after the first rate limited track, doubled for each
+# following one up to MAX_BACKOFF
+MIN_BACKOFF = 5.0
+MAX_BACKOFF = 120.0
+
+RATE_LIMIT_MARKERS = ("429", "rate limit", "too many requests", "ratelimit")
+
+
+def is_rate_limited(error) -> bool:
+    """Whether an error message says the account is being throttled"""
+    text = str(error or "").lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+class DownloadLimiter:
+    """
+    Concurrent track downloads of the account, shared by every task.
+
+    The number of downloads adapts like TCP congestion control: a rate
+    limited track halves it and pauses new downloads for a backoff that
+    doubles while the throttling goes on, and each full round of successful
+    tracks allows one more download again, up to the configured maximum.
+    """
+
+    __slots__ = (
+        "_backoff",
+        "_condition",
+        "_limit",
+        "_paused_until",
+        "_streak",
+        "active",
+    )
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._limit = 0
+        self._streak = 0
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self.active = 0
+
+    def limit(self, maximum: int) -> int:
+        return min(self._limit, maximum) if self._limit else maximum
+
+    def pause_remaining(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    async def acquire(self, maximum: int):
+        """Wait for a download slot"""
+        async with self._condition:
+            while True:
+                pause = self.pause_remaining()
+                if not pause and self.active < self.limit(maximum):
+                    break
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._condition.wait(), pause or None)
+            self.active += 1
+
+    async def release(self, maximum: int, success: bool):
+        async with self._condition:
+            self.active -= 1
+            if success:
+                self._streak += 1
+                limit = self.limit(maximum)
+                if self._streak >= limit:
+                    self._streak = 0
+                    self._backoff = 0.0
+                    if limit < maximum:
+                        self._limit = limit + 1
+            self._condition.notify_all()
+
+    async def throttle(self, maximum: int) -> float:
+        """A track was rate limited, shrink and pause. Returns the pause."""
+        async with self._condition:
+            self._streak = 0
+            self._limit = max(1, self.limit(maximum) // 2)
+            self._backoff = min(self._backoff * 2 or MIN_BACKOFF, MAX_BACKOFF)
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + self._backoff
+            )
+            LOGGER.warning(
+                f"Zotify rate limited, {self._limit} concurrent downloads "
+                f"after a {self._backoff:.0f}s pause"
+            )
+            self._condition.notify_all()
+            return self.pause_remaining()
+
 
 class ImprovedZotifySessionManager:
     """Enhanced session manager with stability improvements for free accounts"""
@@ -46,6 +133,8 @@ class ImprovedZotifySessionManager:
         # Memory optimization
         self._memory_cleanup_interval = 300  # 5 minutes
         self._last_memory_cleanup = 0
+        # Track downloads of all tasks share the account's rate limit
+        self.download_limiter = DownloadLimiter()
         # Register for cleanup tracking
         _active_sessions.add(weakref.ref(self, self._cleanup_callback))
 
@@ -155,8 +244,7 @@ class ImprovedZotifySessionManager:
             _api_call_cache.clear()
             _cache_timestamps.clear()
 
-            # Force garbage collection
-            gc.collect()
+            smart_garbage_collection()
 
         except Exception as e:
             LOGGER.warning(f"Error clearing session cache: {e}")
@@ -184,8 +272,7 @@ class ImprovedZotifySessionManager:
                     _api_call_cache.pop(key, None)
                     _cache_timestamps.pop(key, None)
 
-            # Force garbage collection
-            gc.collect()
+            smart_garbage_collection()
 
             LOGGER.debug(
                 f"Memory cleanup completed. Cache size: {len(_api_call_cache)}"
@@ -613,6 +700,8 @@ class ImprovedZotifySessionManager:
             "time_since_last_api_call": current_time - self._last_api_call,
             "time_since_last_activity": time_since_activity,
             "inactivity_timeout": self._inactivity_timeout,
+            "active_downloads": self.download_limiter.active,
+            "download_pause": self.download_limiter.pause_remaining(),
             "is_healthy": (
                 self._session is not None
                 and self._consecutive_failures < self._max_consecutive_failures
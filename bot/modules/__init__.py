@@ -1,195 +1,181 @@
-from .ad_broadcaster import init_ad_broadcaster
-from .ai import ask_ai
-from .bot_settings import edit_bot_settings, send_bot_settings
-from .broadcast import (
-    broadcast,
-    broadcast_media,
-    handle_broadcast_command,
-    handle_broadcast_media,
-    handle_cancel_broadcast_command,
-)
-from .cancel_task import cancel, cancel_all_buttons, cancel_all_update, cancel_multi
-from .chat_permission import add_sudo, authorize, remove_sudo, unauthorize
-from .check_deletion import (
-    check_scheduled_deletions,
-    delete_pending_messages,
-    force_delete_all_messages,
-)
-from .clone import clone_node
-from .encoding import (
-    decode_command,
-    encode_command,
-    encoding_callback,
-    encoding_help_command,
-    handle_encoding_message,
-    list_methods_command,
-)
-from .exec import aioexecute, clear, execute
-from .file_selector import confirm_selection, select
-from .font_styles import font_styles_cmd
-from .force_start import remove_from_queue
-from .gd_count import count_node
-from .gd_delete import delete_file
-from .gd_search import gdrive_search, select_type
-from .gen_session import (
-    gen_session,
-    handle_cancel_button,
-    handle_command,
-    handle_group_gensession,
-    handle_session_input,
-)
-from .help import arg_usage, bot_help
-from .imdb import imdb_callback, imdb_search
-from .media_search import (
-    inline_media_search,
-    media_cancel_callback,
-    media_get_callback,
-    media_search,
-)
-from .media_tools import edit_media_tools_settings, media_tools_settings
-from .media_tools_help import media_tools_help_cmd
-from .mediainfo import mediainfo
-from .megaclone import mega_clone
-from .mirror_leech import (
-    jd_leech,
-    jd_mirror,
-    leech,
-    mirror,
-    nzb_leech,
-    nzb_mirror,
-)
-from .nzb_search import hydra_search
-from .paste import paste_text
-from .quickinfo import (
-    handle_forwarded_message,
-    handle_shared_entities,
-    quickinfo_callback,
-    quickinfo_command,
-)
-from .restart import (
-    confirm_restart,
-    restart_bot,
-    restart_notification,
-)
-from .rss import get_rss_menu, rss_listener
-from .search import initiate_search_tools, torrent_search, torrent_search_update
-from .services import aeon_callback, log, login, ping, start
-from .shell import run_shell
-from .sox import spectrum_handler
-from .speedtest import speedtest
-from .stats import bot_stats, get_packages_version
-from .status import status_pages, task_status
-from .truecaller import truecaller_lookup
-from .users_settings import (
-    edit_user_settings,
-    get_users_settings,
-    send_user_settings,
-)
-from .virustotal import virustotal_scan
-from .wrong_cmds import handle_no_suffix_commands, handle_qb_commands
-from .ytdlp import ytdl, ytdl_leech
-from .zotify import zotify_leech, zotify_mirror, zotify_search
-
-__all__ = [
-    "add_sudo",
-    "aeon_callback",
-    "aioexecute",
-    "arg_usage",
-    "ask_ai",
-    "authorize",
-    "bot_help",
-    "bot_stats",
-    "broadcast",
-    "broadcast_media",
-    "cancel",
-    "cancel_all_buttons",
-    "cancel_all_update",
-    "cancel_multi",
-    "check_scheduled_deletions",
-    "clear",
-    "clone_node",
-    "confirm_restart",
-    "confirm_selection",
-    "count_node",
-    "decode_command",
-    "delete_file",
-    "delete_pending_messages",
-    "edit_bot_settings",
-    "edit_media_tools_settings",
-    "edit_user_settings",
-    # Encoding/Decoding functions
-    "encode_command",
-    "encoding_callback",
-    "encoding_help_command",
-    "execute",
-    "font_styles_cmd",
-    "force_delete_all_messages",
-    "gdrive_search",
-    "gen_session",
-    "get_packages_version",
-    "get_rss_menu",
-    "get_users_settings",
-    "handle_broadcast_command",
-    "handle_broadcast_media",
-    "handle_cancel_broadcast_command",
-    "handle_cancel_button",
-    "handle_command",
-    "handle_encoding_message",
-    "handle_forwarded_message",
-    "handle_group_gensession",
-    "handle_no_suffix_commands",
-    "handle_qb_commands",
-    "handle_session_input",
-    "handle_shared_entities",
-    "hydra_search",
-    "imdb_callback",
-    "imdb_search",
-    "initiate_search_tools",
-    "inline_media_search",
-    "jd_leech",
-    "jd_mirror",
-    "leech",
-    "list_methods_command",
-    "log",
-    "login",
-    "media_cancel_callback",
-    "media_get_callback",
-    "media_search",
-    "media_tools_help_cmd",
-    "media_tools_settings",
-    "mediainfo",
-    "mega_clone",
-    "mirror",
-    "nzb_leech",
-    "nzb_mirror",
-    "paste_text",
-    "ping",
-    "quickinfo_callback",
-    # QuickInfo functions
-    "quickinfo_command",
-    "remove_from_queue",
-    "remove_sudo",
-    "restart_bot",
-    "restart_notification",
-    "rss_listener",
-    "run_shell",
-    "select",
-    "select_type",
-    "send_bot_settings",
-    "send_user_settings",
-    "spectrum_handler",
-    "speedtest",
-    "start",
-    "status_pages",
-    "task_status",
-    "torrent_search",
-    "torrent_search_update",
-    "truecaller_lookup",
-    "unauthorize",
-    "virustotal_scan",
-    "ytdl",
-    "ytdl_leech",
-    "zotify_leech",
-    "zotify_mirror",
-    "zotify_search",
-]
+"""
+Command handlers of the bot.
+
+Every module below used to be imported with this package, so bot_settings,
+media_tools, the generated command tables and everything they import were
+compiled and kept in memory before the bot answered its first command,
+mostly for commands that are rarely used. The names are now resolved on
+first access. With ``LAZY_MODULE_LOADING`` a handler name stands for a
+proxy that imports its module the first time the handler runs, otherwise
+the module is imported when the name is first accessed.
+"""
+
+from asyncio import isfuture
+from importlib import import_module
+from inspect import isawaitable
+from time import perf_counter
+from types import ModuleType
+
+from bot import LOGGER
+from bot.core.config_manager import Config
+
+# Handler names by the module that defines them
+_MODULES = {
+    "ad_broadcaster": ("init_ad_broadcaster",),
+    "ai": ("ask_ai",),
+    "bot_settings": ("edit_bot_settings", "send_bot_settings"),
+    "broadcast": (
+        "broadcast",
+        "broadcast_media",
+        "handle_broadcast_command",
+        "handle_broadcast_media",
+        "handle_cancel_broadcast_command",
+    ),
+    "cancel_task": (
+        "cancel",
+        "cancel_all_buttons",
+        "cancel_all_update",
+        "cancel_multi",
+    ),
+    "chat_permission": ("add_sudo", "authorize", "remove_sudo", "unauthorize"),
+    "check_deletion": (
+        "check_scheduled_deletions",
+        "delete_pending_messages",
+        "force_delete_all_messages",
+    ),
+    "clone": ("clone_node",),
+    "encoding": (
+        "decode_command",
+        "encode_command",
+        "encoding_callback",
+        "encoding_help_command",
+        "handle_encoding_message",
+        "list_methods_command",
+    ),
+    "exec": ("aioexecute", "clear", "execute"),
+    "file_selector": ("confirm_selection", "select"),
+    "font_styles": ("font_styles_callback", "font_styles_cmd"),
+    "force_start": ("remove_from_queue",),
+    "gd_count": ("count_node",),
+    "gd_delete": ("delete_file",),
+    "gd_search": ("gdrive_search", "select_type"),
+    "gen_session": (
+        "gen_session",
+        "handle_cancel_button",
+        "handle_command",
+        "handle_group_gensession",
+        "handle_session_input",
+    ),
+    "help": ("arg_usage", "bot_help"),
+    "imdb": ("imdb_callback", "imdb_search"),
+    "media_search": (
+        "chosen_inline_result_handler",
+        "inline_media_search",
+        "media_cancel_callback",
+        "media_get_callback",
+        "media_page_callback",
+        "media_search",
+    ),
+    "media_tools": ("edit_media_tools_settings", "media_tools_settings"),
+    "media_tools_help": ("media_tools_help_callback", "media_tools_help_cmd"),
+    "mediainfo": ("mediainfo",),
+    "mega_search": ("mega_search_command",),
+    "megaclone": ("mega_clone",),
+    "mirror_leech": (
+        "jd_leech",
+        "jd_mirror",
+        "leech",
+        "mirror",
+        "nzb_leech",
+        "nzb_mirror",
+    ),
+    "nzb_search": ("hydra_search",),
+    "paste": ("paste_text",),
+    "quickinfo": (
+        "handle_forwarded_message",
+        "handle_shared_entities",
+        "quickinfo_callback",
+        "quickinfo_command",
+    ),
+    "restart": ("confirm_restart", "restart_bot", "restart_notification"),
+    "rss": ("get_rss_menu", "rss_listener"),
+    "search": ("initiate_search_tools", "torrent_search", "torrent_search_update"),
+    "services": ("aeon_callback", "log", "login", "ping", "start"),
+    "shell": ("run_shell",),
+    "sox": ("spectrum_handler",),
+    "speedtest": ("speedtest",),
+    "stats": ("bot_stats", "get_packages_version"),
+    "status": ("status_pages", "task_status"),
+    "streamrip": ("streamrip_leech", "streamrip_mirror", "streamrip_search"),
+    "truecaller": ("truecaller_lookup",),
+    "users_settings": (
+        "edit_user_settings",
+        "get_users_settings",
+        "send_user_settings",
+    ),
+    "virustotal": ("virustotal_scan", "vt_callback_handler"),
+    "wrong_cmds": ("handle_no_suffix_commands", "handle_qb_commands"),
+    "ytdlp": ("ytdl", "ytdl_leech"),
+    "zotify": ("zotify_leech", "zotify_mirror", "zotify_search"),
+}
+
+_OWNERS = {name: module for module, names in _MODULES.items() for name in names}
+
+# Not handlers, called as soon as they are imported
+_EAGER = frozenset({"init_ad_broadcaster"})
+
+# Functions of the modules imported so far, by name
+_loaded = {}
+
+
+def _resolve(name):
+    if (func := _loaded.get(name)) is not None:
+        return func
+    module_name = _OWNERS[name]
+    namespace = globals()
+    shadowed = namespace.get(module_name)
+    started = perf_counter()
+    module = import_module(f"{__name__}.{module_name}")
+    # Importing a submodule binds it on the package, over the handler that
+    # has the same name
+    if module_name in _OWNERS and isinstance(namespace.get(module_name), ModuleType):
+        if shadowed is None or isinstance(shadowed, ModuleType):
+            del namespace[module_name]
+        else:
+            namespace[module_name] = shadowed
+    for export in _MODULES[module_name]:
+        _loaded[export] = getattr(module, export)
+    LOGGER.info(
+        f"Loaded {module.__name__} in {(perf_counter() - started) * 1000:.0f}ms"
+    )
+    return _loaded[name]
+
+
+def _proxy(name):
+    """Handler that imports the module of ``name`` when it first runs"""
+
+    async def handler(*args, **kwargs):
+        result = _resolve(name)(*args, **kwargs)
+        # new_task handlers return the task they started, it runs on its own
+        if isawaitable(result) and not isfuture(result):
+            return await result
+        return result
+
+    handler.__name__ = handler.__qualname__ = name
+    handler.__module__ = f"{__name__}.{_OWNERS[name]}"
+    return handler
+
+
+def __getattr__(name):
+    if name not in _OWNERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if Config.LAZY_MODULE_LOADING and name not in _EAGER:
+        value = _proxy(name)
+    else:
+        value = _resolve(name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(_OWNERS)
@@ -1,15 +1,12 @@
-from asyncio import sleep as asyncio_sleep
 from logging import getLogger
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait, InputUserDeactivated, UserIsBlocked
 from pyrogram.handlers import MessageHandler
 
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import new_task
-from bot.helper.ext_utils.db_handler import database
-from bot.helper.telegram_helper.message_utils import send_message
+from bot.helper.telegram_helper.broadcast_engine import Broadcast
 
 LOGGER = getLogger(__name__)
 
@@ -92,43 +89,10 @@ async def handle_ad_message(_, message):
         f"<a href='{message_link}'><b>➡️ View Original Message</b></a>"
     )
 
-    # Get all users
-    pm_users = await database.get_pm_uids()
-    if not pm_users:
+    # Broadcast to all users, sharing the rate limit with other broadcasts
+    LOGGER.info(f"Starting ad broadcast for message {message_id}")
+    if await Broadcast(text=broadcast_text).run() is None:
         LOGGER.info("No users found in database for ad broadcast")
-        return
-
-    # Start broadcasting
-    LOGGER.info(f"Starting ad broadcast to {len(pm_users)} users")
-
-    successful, blocked, unsuccessful = 0, 0, 0
-
-    for uid in pm_users:
-        try:
-            await send_message(uid, broadcast_text)
-            successful += 1
-        except FloodWait as e:
-            LOGGER.warning(f"FloodWait: Sleeping for {e.value} seconds")
-            await asyncio_sleep(e.value)
-            try:
-                await send_message(uid, broadcast_text)
-                successful += 1
-            except Exception as retry_err:
-                LOGGER.error(
-                    f"Failed to send ad broadcast to {uid} after FloodWait: {retry_err}"
-                )
-                unsuccessful += 1
-        except (UserIsBlocked, InputUserDeactivated) as user_err:
-            LOGGER.info(f"Removing user {uid} from database: {user_err}")
-            await database.rm_pm_user(uid)
-            blocked += 1
-        except Exception as e:
-            LOGGER.error(f"Error sending ad broadcast to {uid}: {e}")
-            unsuccessful += 1
-
-    LOGGER.info(
-        f"Ad Broadcast completed: {successful} successful, {blocked} blocked, {unsuccessful} unsuccessful"
-    )
 
 
 def init_ad_broadcaster():
@@ -223,6 +223,7 @@ DEFAULT_VALUES = {
     "ZOTIFY_ARTWORK_SIZE": "large",
     "ZOTIFY_TRANSCODE_BITRATE": -1,
     "ZOTIFY_DOWNLOAD_REAL_TIME": False,
+    "ZOTIFY_CONCURRENT_DOWNLOADS": 3,
     "ZOTIFY_REPLACE_EXISTING": False,
     "ZOTIFY_SKIP_DUPLICATES": True,
     "ZOTIFY_SKIP_PREVIOUS": True,
@@ -2941,6 +2942,7 @@ These settings primarily affect the streamrip CLI behavior and may not directly
         general_settings = [
             "ZOTIFY_ENABLED",
             "ZOTIFY_DOWNLOAD_REAL_TIME",
+            "ZOTIFY_CONCURRENT_DOWNLOADS",
             "ZOTIFY_REPLACE_EXISTING",
             "ZOTIFY_SKIP_DUPLICATES",
             "ZOTIFY_SKIP_PREVIOUS",
@@ -2997,6 +2999,7 @@ These settings primarily affect the streamrip CLI behavior and may not directly
 
 <b>Status:</b> {enabled}
 <b>Real-Time Download:</b> {real_time}
+<b>Concurrent Downloads:</b> {Config.ZOTIFY_CONCURRENT_DOWNLOADS}
 <b>Replace Existing:</b> {replace_existing}
 <b>Skip Duplicates:</b> {skip_duplicates}
 <b>Skip Previous:</b> {skip_previous}
@@ -3004,6 +3007,7 @@ These settings primarily affect the streamrip CLI behavior and may not directly
 <b>Description:</b>
 • <b>Enabled:</b> Master toggle for Zotify functionality
 • <b>Real-Time Download:</b> Download tracks in real-time (slower but more stable)
+• <b>Concurrent Downloads:</b> Tracks of an album or playlist downloaded at once, reduced automatically when rate limited
 • <b>Replace Existing:</b> Overwrite existing files instead of skipping
 • <b>Skip Duplicates:</b> Skip tracks that have already been downloaded
 • <b>Skip Previous:</b> Skip tracks that were previously downloaded (uses database)
@@ -8795,7 +8799,14 @@ async def edit_variable(_, message, pre_message, key):
     await delete_message(message)
     await database.update_config({key: value})
 
-    if key in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+    if key in [
+        "QUEUE_ALL",
+        "QUEUE_DOWNLOAD",
+        "QUEUE_UPLOAD",
+        "QUEUE_PROCESS",
+        "QUEUE_UPLOAD_PER_DEST",
+        "QUEUE_USER_LIMIT",
+    ]:
         await start_from_queued()
     elif key == "BASE_URL_PORT":
         # Kill any running web server
@@ -12224,6 +12235,9 @@ async def edit_bot_settings(client, query):
         Config.ZOTIFY_DOWNLOAD_REAL_TIME = DEFAULT_VALUES.get(
             "ZOTIFY_DOWNLOAD_REAL_TIME", False
         )
+        Config.ZOTIFY_CONCURRENT_DOWNLOADS = DEFAULT_VALUES.get(
+            "ZOTIFY_CONCURRENT_DOWNLOADS", 3
+        )
         Config.ZOTIFY_REPLACE_EXISTING = DEFAULT_VALUES.get(
             "ZOTIFY_REPLACE_EXISTING", False
         )
@@ -12239,6 +12253,7 @@ async def edit_bot_settings(client, query):
             {
                 "ZOTIFY_ENABLED": Config.ZOTIFY_ENABLED,
                 "ZOTIFY_DOWNLOAD_REAL_TIME": Config.ZOTIFY_DOWNLOAD_REAL_TIME,
+                "ZOTIFY_CONCURRENT_DOWNLOADS": Config.ZOTIFY_CONCURRENT_DOWNLOADS,
                 "ZOTIFY_REPLACE_EXISTING": Config.ZOTIFY_REPLACE_EXISTING,
                 "ZOTIFY_SKIP_DUPLICATES": Config.ZOTIFY_SKIP_DUPLICATES,
                 "ZOTIFY_SKIP_PREVIOUS": Config.ZOTIFY_SKIP_PREVIOUS,
@@ -13279,6 +13294,7 @@ async def edit_bot_settings(client, query):
                 if data[2] in [
                     "ZOTIFY_ENABLED",
                     "ZOTIFY_DOWNLOAD_REAL_TIME",
+                    "ZOTIFY_CONCURRENT_DOWNLOADS",
                     "ZOTIFY_REPLACE_EXISTING",
                     "ZOTIFY_SKIP_DUPLICATES",
                     "ZOTIFY_SKIP_PREVIOUS",
@@ -13736,6 +13752,7 @@ async def edit_bot_settings(client, query):
             if data[2] in [
                 "ZOTIFY_ENABLED",
                 "ZOTIFY_DOWNLOAD_REAL_TIME",
+                "ZOTIFY_CONCURRENT_DOWNLOADS",
                 "ZOTIFY_REPLACE_EXISTING",
                 "ZOTIFY_SKIP_DUPLICATES",
                 "ZOTIFY_SKIP_PREVIOUS",
@@ -14423,7 +14440,14 @@ async def edit_bot_settings(client, query):
         if data[2] == "DATABASE_URL":
             await database.disconnect()
         await database.update_config({data[2]: value})
-        if data[2] in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+        if data[2] in [
+            "QUEUE_ALL",
+            "QUEUE_DOWNLOAD",
+            "QUEUE_UPLOAD",
+            "QUEUE_PROCESS",
+            "QUEUE_UPLOAD_PER_DEST",
+            "QUEUE_USER_LIMIT",
+        ]:
             await start_from_queued()
         elif data[2] in [
             "RCLONE_SERVE_URL",
@@ -1,13 +1,8 @@
-import asyncio
 import traceback
 from logging import getLogger
-from time import time
-
-from pyrogram.errors import FloodWait, InputUserDeactivated, UserIsBlocked
 
 from bot.helper.ext_utils.bot_utils import new_task
-from bot.helper.ext_utils.db_handler import database
-from bot.helper.ext_utils.status_utils import get_readable_time
+from bot.helper.telegram_helper.broadcast_engine import Broadcast
 from bot.helper.telegram_helper.message_utils import edit_message, send_message
 
 LOGGER = getLogger(__name__)
@@ -35,63 +30,22 @@ async def broadcast(_, message):
         )
         return
 
-    total, successful, blocked, unsuccessful = 0, 0, 0, 0
-    start_time = time()
-    updater = time()
     broadcast_message = await send_message(message, "Broadcast in progress...")
+    await run_broadcast(message.reply_to_message, broadcast_message)
 
-    # Get the message to broadcast
-    msg_to_broadcast = message.reply_to_message
 
+async def run_broadcast(msg_to_broadcast, broadcast_message):
+    """Copy ``msg_to_broadcast`` to all PM users, progress in the status message"""
     try:
-        pm_users = await database.get_pm_uids()
-        if not pm_users:
+        # Copy handles all media types automatically
+        status = await Broadcast(
+            from_chat_id=msg_to_broadcast.chat.id,
+            message_id=msg_to_broadcast.id,
+            status_chat_id=broadcast_message.chat.id,
+            status_message_id=broadcast_message.id,
+        ).run()
+        if status is None:
             await edit_message(broadcast_message, "No users found in database.")
-            return
-
-        LOGGER.info(f"Starting broadcast to {len(pm_users)} users")
-
-        for uid in pm_users:
-            try:
-                # Use copy method which handles all media types automatically
-                await msg_to_broadcast.copy(uid)
-                successful += 1
-            except FloodWait as e:
-                await asyncio.sleep(e.value)
-                try:
-                    await msg_to_broadcast.copy(uid)
-                    successful += 1
-                except Exception as retry_err:
-                    LOGGER.error(
-                        f"Failed to send broadcast to {uid} after FloodWait: {retry_err!s}"
-                    )
-                    unsuccessful += 1
-            except (UserIsBlocked, InputUserDeactivated) as user_err:
-                LOGGER.info(f"Removing user {uid} from database: {user_err!s}")
-                await database.rm_pm_user(uid)
-                blocked += 1
-            except Exception as e:
-                LOGGER.error(f"Error sending broadcast to {uid}: {e!s}")
-                unsuccessful += 1
-
-            total += 1
-
-            if (time() - updater) > 10:
-                status = generate_status(total, successful, blocked, unsuccessful)
-                await edit_message(broadcast_message, status)
-                updater = time()
-                LOGGER.info(
-                    f"Broadcast progress: {successful}/{total} successful, {blocked} blocked, {unsuccessful} failed"
-                )
-
-        elapsed_time = get_readable_time(time() - start_time, True)
-        status = generate_status(
-            total, successful, blocked, unsuccessful, elapsed_time
-        )
-        await edit_message(broadcast_message, status)
-        LOGGER.info(
-            f"Broadcast completed: {successful}/{total} successful, {blocked} blocked, {unsuccessful} failed, time: {elapsed_time}"
-        )
 
     except Exception as e:
         error_traceback = traceback.format_exc()
@@ -100,7 +54,6 @@ async def broadcast(_, message):
             broadcast_message,
             f"<b>❌ Broadcast failed with error:</b>\n<code>{e!s}</code>",
         )
-        return
 
 
 # Enhanced broadcast function that supports a two-step process and multiple media types
@@ -176,81 +129,11 @@ async def broadcast_media(client, message, options=None):
 
     LOGGER.info(f"Broadcasting message of type: {msg_type}")
 
-    # Initialize counters
-    total, successful, blocked, unsuccessful = 0, 0, 0, 0
-    start_time = time()
-    updater = time()
     broadcast_message = await send_message(message, "Broadcast in progress...")
 
-    # Get all PM users
-    try:
-        # Reset the broadcast state for this user
-        user_id = message.from_user.id
-        broadcast_awaiting_message.pop(user_id, None)
-
-        pm_users = await database.get_pm_uids()
-        if not pm_users:
-            await edit_message(broadcast_message, "No users found in database.")
-            return
-
-        # Start broadcasting to users
-        LOGGER.info(f"Starting broadcast to {len(pm_users)} users")
-
-        for uid in pm_users:
-            try:
-                # Use the copy method which handles all media types automatically
-                result = await message.copy(uid)
-
-                if result:
-                    successful += 1
-                else:
-                    unsuccessful += 1
-            except FloodWait as e:
-                await asyncio.sleep(e.value)
-                try:
-                    await message.copy(uid)
-                    successful += 1
-                except Exception:
-                    unsuccessful += 1
-            except (UserIsBlocked, InputUserDeactivated):
-                await database.rm_pm_user(uid)
-                blocked += 1
-            except Exception:
-                unsuccessful += 1
-
-            total += 1
-
-            if (time() - updater) > 10:
-                status = generate_status(total, successful, blocked, unsuccessful)
-                await edit_message(broadcast_message, status)
-                updater = time()
-
-        elapsed_time = get_readable_time(time() - start_time, True)
-        status = generate_status(
-            total, successful, blocked, unsuccessful, elapsed_time
-        )
-        await edit_message(broadcast_message, status)
-        LOGGER.info(f"Broadcast completed in {elapsed_time}")
-
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        LOGGER.error(f"Broadcast failed with error: {e!s}\n{error_traceback}")
-        await edit_message(
-            broadcast_message,
-            f"<b>❌ Broadcast failed with error:</b>\n<code>{e!s}</code>",
-        )
-        return
-
-
-def generate_status(total, successful, blocked, unsuccessful, elapsed_time=""):
-    status = "<b>Broadcast Stats :</b>\n\n"
-    status += f"<b>• Total users:</b> {total}\n"
-    status += f"<b>• Success:</b> {successful}\n"
-    status += f"<b>• Blocked or deleted:</b> {blocked}\n"
-    status += f"<b>• Unsuccessful attempts:</b> {unsuccessful}"
-    if elapsed_time:
-        status += f"\n\n<b>Elapsed Time:</b> {elapsed_time}"
-    return status
+    # Reset the broadcast state for this user
+    broadcast_awaiting_message.pop(user_id, None)
+    await run_broadcast(message, broadcast_message)
 
 
 async def is_owner(message):
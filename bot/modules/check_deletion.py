@@ -3,10 +3,10 @@ from time import time
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from bot import LOGGER, sudo_users, user_data
-from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import new_task
 from bot.helper.ext_utils.db_handler import database
+from bot.helper.telegram_helper.deletion_scheduler import deletion_scheduler
 from bot.helper.telegram_helper.message_utils import edit_message, send_message
 
 
@@ -131,136 +131,15 @@ async def delete_pending_messages(_, callback_query):
 
     await callback_query.answer("Processing...")
 
-    # Get all pending deletions
-    current_time = int(time())
-    all_deletions = await database.get_all_scheduled_deletions()
-    pending_deletions = [
-        item for item in all_deletions if item["delete_time"] <= current_time
-    ]
-
-    if not pending_deletions:
+    # Fire the due slots of the scheduler now instead of at their tick
+    result = await deletion_scheduler.flush(time())
+    if not any(result.values()):
         await edit_message(callback_query.message, "No pending deletions found")
         return
 
-    # Process each pending deletion
-    success_count = 0
-    fail_count = 0
-    removed_from_db_count = 0
-
-    for entry in pending_deletions:
-        chat_id = entry["chat_id"]
-        msg_id = entry["message_id"]
-        bot_id = entry["bot_id"]
-
-        # Get the appropriate bot client
-        bot_client = None
-        if bot_id == TgClient.ID:
-            bot_client = TgClient.bot
-        elif hasattr(TgClient, "helper_bots") and bot_id in TgClient.helper_bots:
-            bot_client = TgClient.helper_bots[bot_id]
-
-        if bot_client is None:
-            fail_count += 1
-            continue
-
-        try:
-            # Try to get the message first to verify it exists
-            try:
-                msg = await bot_client.get_messages(
-                    chat_id=chat_id,
-                    message_ids=int(msg_id),
-                )
-
-                if msg is None or getattr(msg, "empty", False):
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                    continue
-
-                LOGGER.info(
-                    f"Found message {msg_id} in chat {chat_id}, attempting to delete",
-                )
-            except Exception as e:
-                LOGGER.error(
-                    f"Error getting message {msg_id} in chat {chat_id}: {e}",
-                )
-
-            # Make sure message_id is an integer
-            message_id_int = int(msg_id)
-            result = await bot_client.delete_messages(
-                chat_id=chat_id,
-                message_ids=[message_id_int],  # Pass as a list with a single item
-            )
-            LOGGER.info(
-                f"Delete API call result for message {msg_id} in chat {chat_id}: {result}",
-            )
-            LOGGER.info(
-                f"Successfully deleted message {msg_id} in chat {chat_id} using bot {bot_id}",
-            )
-            success_count += 1
-            # Remove from database after successful deletion
-            try:
-                await database.remove_scheduled_deletion(chat_id, msg_id)
-                removed_from_db_count += 1
-            except Exception as e:
-                LOGGER.error(
-                    f"Error removing scheduled deletion after successful deletion: {e}"
-                )
-        except Exception as e:
-            error_str = str(e)
-            # Handle different types of errors appropriately
-            if "MESSAGE_DELETE_FORBIDDEN" in error_str or "403" in error_str:
-                LOGGER.warning(
-                    f"Cannot delete message {msg_id} in chat {chat_id}: {error_str}"
-                )
-                # Remove from database since we can't delete it
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for forbidden message: {e}"
-                    )
-            elif "MESSAGE_ID_INVALID" in error_str or "400" in error_str:
-                LOGGER.error(
-                    f"Message {msg_id} in chat {chat_id} no longer exists: {error_str}"
-                )
-                # Remove from database since message doesn't exist
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid message: {e}"
-                    )
-            elif (
-                "CHANNEL_INVALID" in error_str
-                or "CHAT_INVALID" in error_str
-                or "USER_INVALID" in error_str
-                or "PEER_ID_INVALID" in error_str
-            ):
-                LOGGER.warning(f"Chat {chat_id} is invalid: {error_str}")
-                # Remove from database since the chat is invalid
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid chat: {e}"
-                    )
-            else:
-                # Log other errors as actual errors
-                LOGGER.error(
-                    f"Failed to delete message {msg_id} in chat {chat_id}: {e}"
-                )
-                fail_count += 1
-
-    # Update the message with results
-    result_msg = "Deletion results:\n"
-    result_msg += f"✅ Successfully deleted: {success_count}\n"
-    result_msg += f"❌ Failed to delete: {fail_count}\n"
-    result_msg += f"🗑️ Removed from database: {removed_from_db_count}\n"
-
-    await edit_message(callback_query.message, result_msg)
+    await edit_message(
+        callback_query.message, _result_message("Deletion results", result)
+    )
 
 
 @new_task
@@ -290,120 +169,26 @@ async def force_delete_all_messages(_, callback_query):
 
     await callback_query.answer("Processing...")
 
-    # Get all scheduled deletions
-    all_deletions = await database.get_all_scheduled_deletions()
-
-    if not all_deletions:
+    # Fire every slot of the scheduler, due or not
+    result = await deletion_scheduler.flush()
+    if not any(result.values()):
         await edit_message(callback_query.message, "No scheduled deletions found")
         return
 
-    # Process each scheduled deletion
-    success_count = 0
-    fail_count = 0
-    removed_from_db_count = 0
-
-    for entry in all_deletions:
-        chat_id = entry["chat_id"]
-        msg_id = entry["message_id"]
-        bot_id = entry["bot_id"]
-
-        # Get the appropriate bot client
-        bot_client = None
-        if bot_id == TgClient.ID:
-            bot_client = TgClient.bot
-        elif hasattr(TgClient, "helper_bots") and bot_id in TgClient.helper_bots:
-            bot_client = TgClient.helper_bots[bot_id]
-
-        if bot_client is None:
-            fail_count += 1
-            continue
-
-        try:
-            # Try to get the message first to verify it exists
-            try:
-                msg = await bot_client.get_messages(
-                    chat_id=chat_id,
-                    message_ids=int(msg_id),
-                )
-
-                if msg is None or getattr(msg, "empty", False):
-                    # Message not found, removing from database
-                    try:
-                        await database.remove_scheduled_deletion(chat_id, msg_id)
-                        removed_from_db_count += 1
-                    except Exception as e:
-                        LOGGER.error(
-                            f"Error removing scheduled deletion for missing message: {e}"
-                        )
-                    continue
-
-                # Message found, will attempt to delete
-            except Exception:
-                # Error getting message, skipping
-                continue
-
-            # Make sure message_id is an integer
-            message_id_int = int(msg_id)
-            await bot_client.delete_messages(
-                chat_id=chat_id,
-                message_ids=[message_id_int],  # Pass as a list with a single item
-            )
-            # Successfully deleted the message
-            success_count += 1
-            # Remove from database after successful deletion
-            try:
-                await database.remove_scheduled_deletion(chat_id, msg_id)
-                removed_from_db_count += 1
-            except Exception as e:
-                LOGGER.error(
-                    f"Error removing scheduled deletion after successful deletion: {e}"
-                )
-        except Exception as e:
-            error_str = str(e)
-            # Handle different types of errors appropriately
-            if "MESSAGE_DELETE_FORBIDDEN" in error_str or "403" in error_str:
-                # Cannot delete message due to permissions, remove from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for forbidden message: {e}"
-                    )
-            elif "MESSAGE_ID_INVALID" in error_str or "400" in error_str:
-                # Message doesn't exist, remove from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid message: {e}"
-                    )
-            elif (
-                "CHANNEL_INVALID" in error_str
-                or "CHAT_INVALID" in error_str
-                or "USER_INVALID" in error_str
-                or "PEER_ID_INVALID" in error_str
-            ):
-                # Chat is invalid, removing from database
-                try:
-                    await database.remove_scheduled_deletion(chat_id, msg_id)
-                    removed_from_db_count += 1
-                except Exception as e:
-                    LOGGER.error(
-                        f"Error removing scheduled deletion for invalid chat: {e}"
-                    )
-            else:
-                # Other errors count as failures
-                fail_count += 1
+    await edit_message(
+        callback_query.message, _result_message("Force deletion results", result)
+    )
 
-    # Update the message with results
-    result_msg = "Force deletion results:\n"
-    result_msg += f"✅ Successfully deleted: {success_count}\n"
-    result_msg += f"❌ Failed to delete: {fail_count}\n"
-    result_msg += f"🗑️ Removed from database: {removed_from_db_count}\n"
 
-    await edit_message(callback_query.message, result_msg)
+def _result_message(title, result):
+    result_msg = f"{title}:\n"
+    result_msg += f"✅ Successfully deleted: {result['deleted']}\n"
+    result_msg += f"❌ Failed to delete: {result['failed']}\n"
+    result_msg += f"🔁 Waiting for a retry: {result['retrying']}\n"
+    result_msg += (
+        f"🗑️ Removed from database: {result['deleted'] + result['dropped']}\n"
+    )
+    return result_msg
 
 
 # Handler registration is now done in handlers.py
@@ -21,8 +21,8 @@ from bot.helper.ext_utils.links_utils import (
 )
 from bot.helper.ext_utils.task_manager import stop_duplicate_check
 from bot.helper.listeners.task_listener import TaskListener
-from bot.helper.mirror_leech_utils.download_utils.direct_link_generator import (
-    direct_link_generator,
+from bot.helper.mirror_leech_utils.download_utils.direct_link_resolver import (
+    resolve_direct_link,
 )
 from bot.helper.mirror_leech_utils.gdrive_utils.clone import GoogleDriveClone
 from bot.helper.mirror_leech_utils.gdrive_utils.count import GoogleDriveCount
@@ -146,7 +146,7 @@ class Clone(TaskListener):
     async def _proceed_to_clone(self, sync):
         if is_share_link(self.link):
             try:
-                self.link = await sync_to_async(direct_link_generator, self.link)
+                self.link = await resolve_direct_link(self.link)
                 LOGGER.info(f"Generated link: {self.link}")
             except DirectDownloadLinkException as e:
                 LOGGER.error(str(e))
@@ -1,7 +1,5 @@
 from bot import (
     queue_dict_lock,
-    queued_dl,
-    queued_up,
     task_dict,
     task_dict_lock,
     user_data,
@@ -13,6 +11,7 @@ from bot.helper.ext_utils.task_manager import (
     start_dl_from_queued,
     start_up_from_queued,
 )
+from bot.helper.ext_utils.task_scheduler import task_scheduler
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.message_utils import send_message
 
@@ -62,14 +61,14 @@ By reply to task cmd:
     async with queue_dict_lock:
         if status == "fu":
             listener.force_upload = True
-            if listener.mid in queued_up:
+            if task_scheduler.is_queued(listener.mid, "proc", "up"):
                 await start_up_from_queued(listener.mid)
                 msg = "Task have been force started to upload!"
             else:
                 msg = "Force upload enabled for this task!"
         elif status == "fd":
             listener.force_download = True
-            if listener.mid in queued_dl:
+            if task_scheduler.is_queued(listener.mid, "dl"):
                 await start_dl_from_queued(listener.mid)
                 msg = "Task have been force started to download only!"
             else:
@@ -77,10 +76,10 @@ By reply to task cmd:
         else:
             listener.force_download = True
             listener.force_upload = True
-            if listener.mid in queued_up:
+            if task_scheduler.is_queued(listener.mid, "proc", "up"):
                 await start_up_from_queued(listener.mid)
                 msg = "Task have been force started to upload!"
-            elif listener.mid in queued_dl:
+            elif task_scheduler.is_queued(listener.mid, "dl"):
                 await start_dl_from_queued(listener.mid)
                 msg = "Task have been force started to download and upload will start once download finish!"
             else:
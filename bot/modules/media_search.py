@@ -26,11 +26,12 @@ except ImportError:
 # Check if we're using Electrogram (package name is electrogram but imports are from pyrogram)
 USING_ELECTROGRAM = importlib.util.find_spec("electrogram") is not None
 
-from bot import LOGGER
+from bot import LOGGER, bot_loop
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import new_task
-from bot.helper.telegram_helper.bot_commands import BotCommands
+from bot.helper.ext_utils.cache_utils import Cache
+from bot.helper.ext_utils.media_index import media_index
 from bot.helper.telegram_helper.message_utils import (
     auto_delete_message,
     edit_message,
@@ -53,8 +54,13 @@ def get_encryption_key():
     return hashlib.sha256(Config.BOT_TOKEN.encode()).digest()
 
 
-# Cache for media IDs to avoid sending full IDs in callback data
-MEDIA_ID_CACHE = {}
+# Short ids of callback data, and the id already given to each data string
+MEDIA_ID_CACHE = Cache(
+    "media_search.ids",
+    max_entries=1000,
+    on_evict=lambda _, data_string: MEDIA_IDS_BY_DATA.pop(data_string, None),
+)
+MEDIA_IDS_BY_DATA = {}
 MEDIA_ID_COUNTER = 0
 
 
@@ -67,23 +73,17 @@ def encrypt_data(data_string):
     global MEDIA_ID_COUNTER
     try:
         # Check if this data is already in the cache
-        for key, value in MEDIA_ID_CACHE.items():
-            if value == data_string:
-                return key
+        short_id = MEDIA_IDS_BY_DATA.get(data_string)
+        if short_id is not None and short_id in MEDIA_ID_CACHE:
+            return short_id
 
         # Generate a new short ID
         MEDIA_ID_COUNTER += 1
         short_id = f"m{MEDIA_ID_COUNTER}"
 
-        # Store in cache
-        MEDIA_ID_CACHE[short_id] = data_string
-
-        # Clean up cache if it gets too large (keep last 1000 entries)
-        if len(MEDIA_ID_CACHE) > 1000:
-            # Get oldest keys (first 100)
-            oldest_keys = list(MEDIA_ID_CACHE.keys())[:100]
-            for key in oldest_keys:
-                del MEDIA_ID_CACHE[key]
+        # Store in cache, the oldest ids are evicted beyond 1000 entries
+        MEDIA_ID_CACHE.put(short_id, data_string)
+        MEDIA_IDS_BY_DATA[data_string] = short_id
 
         return short_id
     except Exception as e:
@@ -96,8 +96,9 @@ def decrypt_data(short_id):
     """Get the original data from the short ID."""
     try:
         # Look up the data in the cache
-        if short_id in MEDIA_ID_CACHE:
-            return MEDIA_ID_CACHE[short_id]
+        data_string = MEDIA_ID_CACHE.get(short_id)
+        if data_string is not None:
+            return data_string
 
         # If not found, return the ID itself (fallback)
         MEDIA_LOGGER.warning(f"ID not found in cache: {short_id}")
@@ -108,77 +109,24 @@ def decrypt_data(short_id):
         return short_id
 
 
-# Cache for valid chat IDs to avoid repeated errors
-# Using LRU cache pattern with size limits to prevent memory leaks
-class LRUCache:
-    """LRU Cache implementation with size limit and expiration to prevent memory leaks."""
-
-    def __init__(self, max_size=100, expiry_seconds=3600):
-        self.cache = {}  # {key: (value, timestamp)}
-        self.max_size = max_size
-        self.access_order = []
-        self.expiry_seconds = expiry_seconds
-
-    def _is_expired(self, timestamp):
-        """Check if a cache entry has expired."""
-        if self.expiry_seconds <= 0:  # No expiration
-            return False
-        return (time.time() - timestamp) > self.expiry_seconds
-
-    def get(self, key):
-        """Get a value from the cache."""
-        if key not in self.cache:
-            return None
-        value, timestamp = self.cache[key]
-        if self._is_expired(timestamp):
-            # Remove expired entry
-            self.cache.pop(key)
-            self.access_order.remove(key)
-            return None
-        # Update access order
-        self.access_order.remove(key)
-        self.access_order.append(key)
-        return value
-
-    def put(self, key, value):
-        """Add a value to the cache."""
-        # If key exists, update it
-        if key in self.cache:
-            self.access_order.remove(key)
-        # If cache is full, remove least recently used item
-        elif len(self.cache) >= self.max_size:
-            lru_key = self.access_order.pop(0)
-            self.cache.pop(lru_key)
-        # Add new item
-        self.cache[key] = (value, time.time())
-        self.access_order.append(key)
-
-    def contains(self, key):
-        """Check if a key exists in the cache."""
-        if key not in self.cache:
-            return False
-        _, timestamp = self.cache[key]
-        if self._is_expired(timestamp):
-            # Remove expired entry
-            self.cache.pop(key)
-            self.access_order.remove(key)
-            return False
-        return True
-
-
 # Cache for search results to avoid redundant searches
-SEARCH_RESULTS_CACHE = LRUCache(
-    max_size=20, expiry_seconds=300
+SEARCH_RESULTS_CACHE = Cache(
+    "media_search.results", max_entries=20, ttl=300
 )  # 5 minutes expiry for search results
 
 # Cache for valid chat IDs to avoid repeated errors
 VALID_CHAT_IDS = {
-    "user": LRUCache(max_size=100, expiry_seconds=3600),  # 1 hour expiry
-    "bot": LRUCache(max_size=100, expiry_seconds=3600),  # 1 hour expiry
+    "user": Cache("media_search.user_chats", max_entries=100, ttl=3600),
+    "bot": Cache("media_search.bot_chats", max_entries=100, ttl=3600),
 }
 
 # Cache for media information (for start command access)
-MEDIA_INFO_CACHE = LRUCache(max_size=500, expiry_seconds=3600)  # 1 hour expiry
+MEDIA_INFO_CACHE = Cache(
+    "media_search.media_info", max_entries=500, ttl=3600
+)  # 1 hour expiry
+
+# Results taken from the local media index per search
+INDEX_RESULTS = 50
 
 
 def generate_search_key(chat_id, query, client_type, media_type="all"):
@@ -642,6 +590,60 @@ async def _check_media_match(query, *fields):
     return False
 
 
+async def search_index(query, media_type, chat_ids, limit=INDEX_RESULTS, offset=0):
+    """
+    Ranked results of the indexed chats among ``chat_ids``, ``limit`` of
+    them from ``offset`` on, and the total number of matches
+    """
+    results, total = await media_index.search(
+        query, media_type, chat_ids, limit=limit, offset=offset
+    )
+    for result in results:
+        # The index was read through the user session, so it can fetch them
+        VALID_CHAT_IDS["user"].put(result["chat_id"], True)
+    if total and not offset:
+        MEDIA_LOGGER.info(f"Media index: {total} matches for {query}")
+    return results, total
+
+
+async def index_row(msg):
+    """The media index row of a message, None when it has no searchable media"""
+    media_info = await get_media_info(msg)
+    if not media_info or msg.chat is None:
+        return None
+    media_type, title, performer, duration, file_size, file_id, relevance = (
+        media_info
+    )
+    media = getattr(msg, media_type, None)
+    if isinstance(media, list):
+        media = media[-1]
+    return (
+        msg.chat.id,
+        msg.id,
+        media_type,
+        title,
+        performer,
+        getattr(media, "file_name", "") or "",
+        msg.caption or "",
+        int(duration),
+        file_size,
+        getattr(media, "mime_type", "") or "",
+        file_id,
+        relevance,
+        int(msg.date.timestamp()) if msg.date else 0,
+    )
+
+
+async def index_message(_, message):
+    await media_index.add(message, index_row)
+
+
+async def unindex_messages(_, messages):
+    for message in messages:
+        if message.chat is not None and message.chat.id in Config.MEDIA_SEARCH_CHATS:
+            await media_index.remove(message.chat.id, [message.id])
+
+
 async def update_search_status(message, query, total_chats):
     """Update the search status message with an animation to show progress."""
     animation_chars = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
@@ -851,13 +853,21 @@ async def media_search(_, message: Message):
             SEARCH_RESULTS_CACHE.put(task_cache_key, [])
             return []
 
+    # Indexed chats are searched locally, only the others need live searches
+    index_results, _ = await search_index(query, media_type, media_channels)
+    live_channels = [
+        chat_id for chat_id in media_channels if not media_index.covers(chat_id)
+    ]
+
     # Create search tasks - always use user client for searching since bots cannot search messages
-    if TgClient.user:
+    if not live_channels:
+        search_tasks = []
+    elif TgClient.user:
         # User client can search messages
         # Searching channels using user client
         search_tasks = [
             process_search_results(TgClient.user, chat_id, "user")
-            for chat_id in media_channels
+            for chat_id in live_channels
         ]
     elif TgClient.bot:
         # Only use bot client if user client is not available (will likely fail for searching)
@@ -872,7 +882,7 @@ async def media_search(_, message: Message):
         # Even though bot client will likely fail for searching, try it as a last resort
         search_tasks = [
             process_search_results(TgClient.bot, chat_id, "bot")
-            for chat_id in media_channels
+            for chat_id in live_channels
         ]
 
     # Record start time for performance measurement
@@ -893,14 +903,15 @@ async def media_search(_, message: Message):
         search_status_task.cancel()
 
         # Combine all results
+        all_results.extend(index_results)
         for results in search_results:
             all_results.extend(results)
 
         # Sort results by relevance (higher is better)
         all_results.sort(key=lambda x: x["relevance"], reverse=True)
 
-        # Limit total results
-        all_results = all_results[:20]  # Limit to 20 results total
+        # Limit total results, the index returns more ranked matches per chat
+        all_results = all_results[: INDEX_RESULTS if index_results else 20]
 
         # Calculate search time
         search_time = time.time() - search_start_time
@@ -911,10 +922,10 @@ async def media_search(_, message: Message):
             error_msg = "No media found matching your query."
 
             # Add more specific error information
-            if not TgClient.user:
+            if live_channels and not TgClient.user:
                 error_msg += "\n\n⚠️ <b>User client is not available.</b> Bots cannot search messages in channels.\n"
                 error_msg += "Please add a user session to enable media search.\n\n"
-            elif TgClient.user and len(media_channels) > 0:
+            elif TgClient.user and live_channels:
                 # Check if any channels were successfully validated
                 user_valid_channels = [
                     ch
@@ -1153,6 +1164,12 @@ async def perform_inline_search(
             SEARCH_RESULTS_CACHE.put(task_cache_key, [])
             return []
 
+    # Indexed chats are searched locally, only the others need live searches
+    index_results, _ = await search_index(query, media_type, media_channels)
+    media_channels = [
+        chat_id for chat_id in media_channels if not media_index.covers(chat_id)
+    ]
+
     # Create search tasks for each channel
     search_tasks = []
     if can_use_bot_client:
@@ -1173,7 +1190,7 @@ async def perform_inline_search(
         search_results = await gather(*search_tasks)
 
         # Combine all results
-        all_results = []
+        all_results = list(index_results)
         for results in search_results:
             all_results.extend(results)
 
@@ -1981,7 +1998,9 @@ async def inline_media_search(_, inline_query: InlineQuery):
     # Check if we're using Electrogram/Pyrogram with MessagesFilter and if bot client can search
     can_use_bot_client = False
 
-    if USING_ELECTROGRAM or MESSAGES_FILTER_AVAILABLE:
+    # No probe needed when every chat is searched in the local index
+    indexed = all(media_index.covers(chat_id) for chat_id in media_channels)
+    if (USING_ELECTROGRAM or MESSAGES_FILTER_AVAILABLE) and not indexed:
         try:
             # First, make sure the bot has joined the channel or has access to it
             try:
@@ -2022,37 +2041,48 @@ async def inline_media_search(_, inline_query: InlineQuery):
         )
         return
 
-    # Generate a cache key for this search
-    search_cache_key = f"inline_{inline_query.from_user.id}_{media_type}_{query}"
-
-    # Check if we have cached results for this search
-    cached_results = SEARCH_RESULTS_CACHE.get(search_cache_key)
+    # Results per page
+    results_per_page = 10
 
-    # If we have cached results and this is a pagination request, use the cached results
-    if cached_results is not None and current_offset > 0:
-        all_results = cached_results
-    else:
-        # We need to perform a new search
-        all_results = await perform_inline_search(
-            query, media_type, media_channels, can_use_bot_client
+    if indexed:
+        # Every chat is in the local index, it returns the requested page
+        all_results, total_results = await search_index(
+            query,
+            media_type,
+            media_channels,
+            limit=results_per_page,
+            offset=current_offset,
         )
+        page_results = all_results
+    else:
+        # Generate a cache key for this search
+        search_cache_key = f"inline_{inline_query.from_user.id}_{media_type}_{query}"
 
-        # Cache the results for future pagination requests
-        if all_results:
-            SEARCH_RESULTS_CACHE.put(search_cache_key, all_results)
+        # Check if we have cached results for this search
+        cached_results = SEARCH_RESULTS_CACHE.get(search_cache_key)
+
+        # If we have cached results and this is a pagination request, use the cached results
+        if cached_results is not None and current_offset > 0:
+            all_results = cached_results
+        else:
+            # We need to perform a new search
+            all_results = await perform_inline_search(
+                query, media_type, media_channels, can_use_bot_client
+            )
+
+            # Cache the results for future pagination requests
+            if all_results:
+                SEARCH_RESULTS_CACHE.put(search_cache_key, all_results)
 
-    try:
         # Store the total number of results
         total_results = len(all_results)
 
-        # Results per page
-        results_per_page = 10
-
         # Get results for the current page
         page_results = all_results[
             current_offset : current_offset + results_per_page
         ]
 
+    try:
         # Calculate next offset
         next_offset = (
             str(current_offset + results_per_page)
@@ -2749,52 +2779,31 @@ async def handle_media_get_command(client, message):
             MEDIA_LOGGER.error(f"Failed to send error message: {send_error}")
 
 
-def init_media_search(bot):
-    """Initialize the media search module."""
+def init_media_index():
+    """
+    Keep the local media index of the search chats current. Only the user
+    session can read chat history, so without it every search stays live.
+    The search handlers are registered in bot.core.handlers.
+    """
     from pyrogram import filters
-    from pyrogram.filters import command
     from pyrogram.handlers import (
-        CallbackQueryHandler,
-        ChosenInlineResultHandler,
+        DeletedMessagesHandler,
+        EditedMessageHandler,
         MessageHandler,
     )
 
-    from bot.helper.telegram_helper.filters import CustomFilters
-
-    # Register the command handler
-    bot.add_handler(
-        MessageHandler(
-            media_search,
-            filters=command(BotCommands.MediaSearchCommand)
-            & CustomFilters.authorized,
+    search_chat = filters.create(
+        lambda _, __, message: (
+            message.chat is not None and message.chat.id in Config.MEDIA_SEARCH_CHATS
         )
     )
-
-    # Register the callback handlers
-    bot.add_handler(
-        CallbackQueryHandler(media_get_callback, filters=filters.regex(r"^medget_"))
+    TgClient.user.add_handler(
+        MessageHandler(index_message, filters=search_chat & filters.media)
     )
-
-    bot.add_handler(
-        CallbackQueryHandler(
-            media_cancel_callback, filters=filters.regex(r"^medcancel_")
-        )
+    TgClient.user.add_handler(
+        EditedMessageHandler(index_message, filters=search_chat)
     )
-
-    bot.add_handler(
-        CallbackQueryHandler(
-            media_page_callback, filters=filters.regex(r"^medpage_")
-        )
-    )
-
-    bot.add_handler(
-        CallbackQueryHandler(
-            media_page_callback, filters=filters.regex(r"^medpageinfo_")
-        )
+    TgClient.user.add_handler(DeletedMessagesHandler(unindex_messages))
+    bot_loop.create_task(
+        media_index.start(TgClient.user, Config.MEDIA_SEARCH_CHATS, index_row)
     )
-
-    # Note: Inline query handler is now registered by unified inline search router
-    # bot.add_handler(InlineQueryHandler(inline_media_search))
-
-    # Register the chosen inline result handler
-    bot.add_handler(ChosenInlineResultHandler(chosen_inline_result_handler))
@@ -21,6 +21,7 @@ from bot.helper.ext_utils.gc_utils import smart_garbage_collection
 from bot.helper.ext_utils.links_utils import (
     is_url,  # Used for URL validation at line ~826
 )
+from bot.helper.ext_utils.media_probe import probe_media
 
 # Resource manager removed
 from bot.helper.ext_utils.telegraph_helper import telegraph
@@ -2443,7 +2444,13 @@ async def gen_mediainfo(
             des_path,
         ]
 
-        stdout, stderr, return_code = await cmd_exec(cmd)
+        # Files already probed by the leech pipeline are served from the
+        # shared probe cache; the direct call is kept for its error output
+        probe = await probe_media(des_path)
+        if probe is not None:
+            stdout, stderr, return_code = "", "", 0
+        else:
+            stdout, stderr, return_code = await cmd_exec(cmd)
 
         if return_code != 0:
             LOGGER.warning(
@@ -2600,7 +2607,11 @@ async def gen_mediainfo(
                 f"ffprobe failed with return code {return_code}: {stderr}. The file may be corrupted or in an unsupported format."
             )
 
-        if stdout:
+        if probe is not None:
+            tc = parse_ffprobe_info(
+                probe.as_dict(), file_size, ospath.basename(des_path)
+            )
+        elif stdout:
             try:
                 data = json.loads(stdout)
                 tc = parse_ffprobe_info(data, file_size, ospath.basename(des_path))
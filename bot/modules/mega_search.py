@@ -122,152 +122,10 @@ except Exception as e:
     MEGA_IMPORT_ERROR = str(e)
 
 from bot import LOGGER
+from bot.helper.mega_utils.search_index import get_search_index
+from bot.helper.mega_utils.session_pool import SHORT_LEASE_WAIT, mega_session_pool
 
-
-class MegaSearchListener(MegaListener):
-    """MEGA SDK listener for search operations"""
-
-    def __init__(self, continue_event):
-        super().__init__()
-        self.continue_event = continue_event
-        self.error = None
-        self.temp_error = None
-        self.search_results = []
-        self.nodes_fetched = False
-
-    def onRequestFinish(self, api, request, error):
-        """Called when a request finishes - with exception handling to prevent SWIG errors"""
-        try:
-            if error.getErrorCode() != 0:
-                # Handle MEGA error with proper signature
-                error_code = error.getErrorCode()
-                try:
-                    # Try the static method first (most common in MEGA SDK v4.8.0)
-                    if hasattr(error, "getErrorString") and callable(
-                        error.getErrorString
-                    ):
-                        # Try instance method first
-                        self.error = error.getErrorString()
-                    else:
-                        # Try static method with error code
-                        from mega import MegaError
-
-                        self.error = MegaError.getErrorString(error_code)
-                except Exception:
-                    # Fallback to error code only
-                    self.error = f"MEGA Error Code: {error_code}"
-
-                # Classify error severity based on error code
-                if error_code == -1:
-                    # Error code -1 is typically a temporary network/connection issue
-                    # Log as INFO since these are usually automatically retried and succeed
-                    LOGGER.info(
-                        f"MEGA temporary connection issue (will retry): {self.error}"
-                    )
-                    # Don't treat temporary errors as permanent failures
-                    self.temp_error = self.error
-                elif error_code in [-2, -3, -4, -5]:
-                    # These are also typically temporary errors
-                    LOGGER.warning(
-                        f"MEGA temporary error (will retry): {self.error}"
-                    )
-                    # Don't treat temporary errors as permanent failures
-                    self.temp_error = self.error
-                else:
-                    # Other error codes are more serious
-                    LOGGER.error(f"MEGA request error: {self.error}")
-            else:
-                request_type = request.getType()
-
-                if request_type == MegaRequest.TYPE_LOGIN:
-                    LOGGER.info("MEGA login successful")
-                    # Clear any temporary errors after successful login
-                    if hasattr(self, "temp_error"):
-                        self.error = None
-                elif request_type == MegaRequest.TYPE_FETCH_NODES:
-                    self.nodes_fetched = True
-                    # Clear any temporary errors after successful node fetching
-                    if hasattr(self, "temp_error"):
-                        self.error = None
-                # Note: Search results are handled differently in MEGA SDK
-                # The search method returns a MegaNodeList directly, not through request
-
-            self.continue_event.set()
-        except Exception as e:
-            # Critical: Prevent any exceptions from propagating back to C++
-            # This prevents SWIG DirectorMethodException
-            try:
-                LOGGER.error(f"Exception in MEGA listener callback: {e}")
-                self.error = f"Listener callback error: {e!s}"
-                self.continue_event.set()
-            except Exception:
-                # Last resort: even logging failed, just set the event
-                pass
-
-
-class AsyncMegaExecutor:
-    """Async executor for MEGA operations"""
-
-    def __init__(self):
-        self.continue_event = asyncio.Event()
-
-    async def do(self, function, args=(), timeout=None):
-        """Execute MEGA function asynchronously with improved error handling and retry logic"""
-        function_name = getattr(function, "__name__", str(function))
-
-        # Try multiple attempts with increasing timeouts for login operations only
-        max_attempts = 3 if function_name == "login" else 1
-        base_timeout = timeout
-
-        for attempt in range(max_attempts):
-            if timeout is not None:
-                current_timeout = base_timeout + (
-                    attempt * 30
-                )  # Increase timeout each attempt
-            else:
-                current_timeout = None  # No timeout for main operations
-
-            if attempt > 0:
-                await asyncio.sleep(5)  # Brief delay between attempts
-
-            self.continue_event.clear()
-
-            try:
-                # Execute the MEGA function
-                await sync_to_async(function, *args)
-
-                # Wait for completion with or without timeout
-                if current_timeout is not None:
-                    await asyncio.wait_for(
-                        self.continue_event.wait(), timeout=current_timeout
-                    )
-                else:
-                    await (
-                        self.continue_event.wait()
-                    )  # No timeout - wait indefinitely
-
-                return  # Success, exit retry loop
-
-            except TimeoutError:
-                if (
-                    attempt == max_attempts - 1
-                ):  # Last attempt - this is a real failure
-                    LOGGER.error(
-                        f"MEGA {function_name} operation timed out after {current_timeout} seconds (attempt {attempt + 1}) - FINAL FAILURE"
-                    )
-                    raise Exception(
-                        f"MEGA {function_name} operation failed after {max_attempts} attempts. This may be due to network issues or MEGA server problems."
-                    )
-                # Not the last attempt - this is just a retry, log as INFO
-                LOGGER.info(
-                    f"MEGA {function_name} operation timed out after {current_timeout} seconds (attempt {attempt + 1}) - retrying with longer timeout"
-                )
-                continue  # Try again
-
-            except Exception as e:
-                # Re-raise other exceptions immediately (don't retry)
-                LOGGER.error(f"MEGA {function_name} operation failed: {e!s}")
-                raise Exception(f"MEGA {function_name} operation failed: {e!s}")
+RESULTS_PER_PAGE = 100
 
 
 class MegaSearchHandler:
@@ -278,55 +136,28 @@ class MegaSearchHandler:
         self.query = query
         self.user_id = message.from_user.id
         self.results = []
-
-    async def _manual_search(self, api, root_node, query):
-        """Manual search through MEGA drive when API search fails"""
-        try:
-            results = []
-            query_lower = query.lower()
-
-            # Get all children recursively
-            await self._search_node_recursive(api, root_node, query_lower, results)
-
-            return results
-        except Exception:
-            return []
-
-    async def _search_node_recursive(
-        self, api, node, query_lower, results, depth=0, max_depth=10
-    ):
-        """Recursively search through MEGA nodes"""
-        try:
-            # Prevent infinite recursion
-            if depth > max_depth:
-                return
-
-            # Check current node name
-            node_name = node.getName() if node.getName() else ""
-            if query_lower in node_name.lower():
-                results.append(node)
-
-            # If it's a folder, search its children
-            if node.isFolder():
-                try:
-                    children = await sync_to_async(api.getChildren, node)
-                    if children:
-                        for i in range(children.size()):
-                            child = children.get(i)
-                            if child:
-                                await self._search_node_recursive(
-                                    api,
-                                    child,
-                                    query_lower,
-                                    results,
-                                    depth + 1,
-                                    max_depth,
-                                )
-                except Exception:
-                    pass  # Ignore folder access errors
-
-        except Exception:
-            pass  # Ignore node processing errors
+        self.total = 0
+        self.terms = query
+        self.ext = None
+        self.kind = None
+        self.page = 1
+        self._parse_query()
+
+    def _parse_query(self):
+        """Split ``ext:``, ``type:`` and ``page:`` filters from the search text"""
+        terms = []
+        for word in self.query.split():
+            option, _, value = word.partition(":")
+            option = option.lower()
+            if value and option == "ext":
+                self.ext = value
+            elif value and option == "type" and value.lower() in {"file", "folder"}:
+                self.kind = value.lower()
+            elif value and option == "page" and value.isdigit():
+                self.page = max(int(value), 1)
+            else:
+                terms.append(word)
+        self.terms = " ".join(terms)
 
     async def search(self):
         """Perform MEGA search"""
@@ -385,35 +216,17 @@ class MegaSearchHandler:
             "⏳ Please wait...",
         )
 
-        executor = AsyncMegaExecutor()
         api = None
-        mega_listener = None
+        session = None
 
         try:
-            # Initialize MEGA API with custom timeout settings
-            api = MegaApi(None, None, None, "aimleechbot")
-
-            # Try to set MEGA SDK timeouts if available
+            # Lease a logged-in session; back-to-back searches reuse the
+            # already fetched node tree instead of logging in again
             try:
-                # Set connection timeout to 180 seconds if method exists
-                if hasattr(api, "setConnectTimeout"):
-                    api.setConnectTimeout(180)
-                if hasattr(api, "setRequestTimeout"):
-                    api.setRequestTimeout(180)
-                # Try additional timeout methods
-                if hasattr(api, "setTimeout"):
-                    api.setTimeout(180)
-                if hasattr(api, "setMaxConnections"):
-                    api.setMaxConnections(6)  # Reduce concurrent connections
-            except Exception as timeout_error:
-                LOGGER.warning(f"Could not set MEGA SDK timeouts: {timeout_error}")
-
-            mega_listener = MegaSearchListener(executor.continue_event)
-            api.addListener(mega_listener)
-
-            # Login to MEGA with increased timeout
-            try:
-                await executor.do(api.login, (MEGA_EMAIL, MEGA_PASSWORD), timeout=60)
+                session = await mega_session_pool.acquire(
+                    MEGA_EMAIL, MEGA_PASSWORD, SHORT_LEASE_WAIT
+                )
+                api = session.api
             except Exception as login_error:
                 LOGGER.error(f"MEGA login failed: {login_error}")
                 if "timed out" in str(login_error).lower():
@@ -427,179 +240,15 @@ class MegaSearchHandler:
                     )
                 return
 
-            if mega_listener.error:
-                await edit_message(
-                    search_msg, f"❌ MEGA login failed: {mega_listener.error}"
-                )
-                return
-
-            # Fetch nodes with increased timeout
             try:
-                await executor.do(api.fetchNodes, timeout=90)
-
-                # Additional verification - wait a bit for listener to process
-                await asyncio.sleep(0.5)
-
-                # Force check if nodes are available
-                try:
-                    root_node_check = api.getRootNode()
-                    if root_node_check:
-                        mega_listener.nodes_fetched = True  # Ensure flag is set
-                        LOGGER.info("MEGA nodes verified immediately after fetch")
-                except Exception as verify_error:
-                    LOGGER.debug(f"Initial node verification failed: {verify_error}")
-                    # Ignore verification errors - will be handled in fallback
-
-            except Exception as fetch_error:
-                if "timed out" in str(fetch_error).lower():
-                    await edit_message(
-                        search_msg,
-                        "❌ MEGA node fetching timed out. Your MEGA account may have many files. Please try again.",
-                    )
-                else:
-                    await edit_message(
-                        search_msg, f"❌ Failed to fetch MEGA nodes: {fetch_error!s}"
-                    )
-                return
-
-            # Check if node fetching actually succeeded despite temporary errors
-            if mega_listener.error and not mega_listener.nodes_fetched:
-                # Only treat as error if nodes weren't fetched AND there's a non-temporary error
-                error_str = str(mega_listener.error).lower()
-                if "error code: -1" not in error_str:
-                    # This is a real error, not a temporary connection issue
-                    await edit_message(
-                        search_msg,
-                        f"❌ Failed to fetch MEGA nodes: {mega_listener.error}",
-                    )
-                    return
-
-            if not mega_listener.nodes_fetched:
-                # Try to get root node as a fallback check
-                try:
-                    root_node_test = api.getRootNode()
-                    if root_node_test:
-                        mega_listener.nodes_fetched = True  # Manually set the flag
-                        LOGGER.info(
-                            "MEGA nodes verified via fallback check - proceeding with search"
-                        )
-                    # Check if we have a temporary error that should be ignored
-                    elif (
-                        mega_listener.error
-                        and "error code: -1" in str(mega_listener.error).lower()
-                    ):
-                        # Temporary error but no root node - try one more time
-                        await asyncio.sleep(2)
-                        try:
-                            root_node_test = api.getRootNode()
-                            if root_node_test:
-                                mega_listener.nodes_fetched = True
-                                LOGGER.info(
-                                    "MEGA nodes verified after retry - proceeding with search"
-                                )
-                            else:
-                                await edit_message(
-                                    search_msg,
-                                    "❌ Failed to fetch MEGA nodes after retry",
-                                )
-                                return
-                        except Exception:
-                            await edit_message(
-                                search_msg,
-                                "❌ Failed to fetch MEGA nodes after retry",
-                            )
-                            return
-                    else:
-                        await edit_message(
-                            search_msg, "❌ Failed to fetch MEGA nodes"
-                        )
-                        return
-                except Exception as e:
-                    # Check if we have a temporary error that should be ignored
-                    if (
-                        mega_listener.error
-                        and "error code: -1" in str(mega_listener.error).lower()
-                    ):
-                        # Temporary error - try one more time
-                        await asyncio.sleep(2)
-                        try:
-                            root_node_test = api.getRootNode()
-                            if root_node_test:
-                                mega_listener.nodes_fetched = True
-                                LOGGER.info(
-                                    "MEGA nodes verified after exception retry - proceeding with search"
-                                )
-                            else:
-                                await edit_message(
-                                    search_msg, f"❌ Failed to fetch MEGA nodes: {e}"
-                                )
-                                return
-                        except Exception as retry_e:
-                            await edit_message(
-                                search_msg,
-                                f"❌ Failed to fetch MEGA nodes: {retry_e}",
-                            )
-                            return
-                    else:
-                        await edit_message(
-                            search_msg, f"❌ Failed to fetch MEGA nodes: {e}"
-                        )
-                        return
-
-            # Perform search
-            root_node = api.getRootNode()
-            if not root_node:
-                await edit_message(
-                    search_msg, "❌ Could not access MEGA root folder"
-                )
-                return
-
-            # MEGA search returns results directly, not through listener
-            try:
-                # Update search message to show progress
-                await edit_message(
-                    search_msg,
-                    f"🔍 Searching MEGA drive for: <code>{self.query}</code>\n\n"
-                    "🔄 Searching through files and folders...",
+                index = await get_search_index(session)
+                self.total, self.results = index.search(
+                    self.terms,
+                    ext=self.ext,
+                    kind=self.kind,
+                    offset=(self.page - 1) * RESULTS_PER_PAGE,
+                    limit=RESULTS_PER_PAGE,
                 )
-
-                # Try different search methods as MEGA SDK can be inconsistent
-                # Method 1: Try the standard search with recursive flag
-                try:
-                    node_list = await sync_to_async(
-                        api.search, root_node, self.query, True
-                    )
-                except Exception:
-                    node_list = None
-
-                # Method 2: If standard search fails, try without recursive flag
-                if not node_list or (
-                    hasattr(node_list, "size") and node_list.size() == 0
-                ):
-                    try:
-                        node_list = await sync_to_async(
-                            api.search, root_node, self.query
-                        )
-                    except Exception:
-                        node_list = None
-
-                # Method 3: If both fail, try manual traversal search
-                if not node_list or (
-                    hasattr(node_list, "size") and node_list.size() == 0
-                ):
-                    node_list = await self._manual_search(api, root_node, self.query)
-
-                if node_list and hasattr(node_list, "size") and node_list.size() > 0:
-                    for i in range(node_list.size()):
-                        node = node_list.get(i)
-                        if node:
-                            self.results.append(node)
-                elif isinstance(node_list, list) and len(node_list) > 0:
-                    # Handle case where manual search returns a list
-                    for node in node_list:
-                        if node:
-                            self.results.append(node)
-
             except Exception as search_error:
                 await edit_message(
                     search_msg, f"❌ MEGA search failed: {search_error!s}"
@@ -621,25 +270,31 @@ class MegaSearchHandler:
             LOGGER.error(f"MEGA search error: {e}")
             await edit_message(search_msg, f"❌ Search failed: {e!s}")
         finally:
-            if api and mega_listener:
-                api.removeListener(mega_listener)
+            if session:
+                await mega_session_pool.release(session)
 
     async def display_all_results(self, message, api):
-        """Display all search results like Google Drive search using Telegraph"""
-        total_results = len(self.results)
+        """Display one page of search results using Telegraph"""
+        pages = (self.total + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE
 
         # Build HTML content for Telegraph (similar to Google Drive search)
         telegraph_content = []
         msg = f"<h4>🔍 MEGA Search Results for: {self.query}</h4><br>"
-        msg += f"📊 Found <b>{total_results}</b> results<br><br>"
+        msg += f"📊 Found <b>{self.total}</b> results"
+        if pages > 1:
+            msg += f" (page {self.page}/{pages}, use <code>page:N</code>)"
+        msg += "<br><br>"
 
         contents_no = 0
 
-        for i, node in enumerate(self.results):
+        for i, entry in enumerate(self.results):
             try:
-                name = node.getName() or f"Unknown_{i}"
-                size = node.getSize()
-                is_folder = node.isFolder()
+                name = entry.name or f"Unknown_{i}"
+                size = entry.size
+                is_folder = entry.is_folder
+                node = api.getNodeByHandle(entry.handle)
+                if node is None:
+                    continue
 
                 # Get public link
                 link = None
@@ -664,6 +319,7 @@ class MegaSearchHandler:
                     except Exception:
                         pass
 
+                msg += f"📂 <i>/{entry.path}</i><br>"
                 if is_folder:
                     msg += f"📁 <code>{name}<br>(folder)</code><br>"
                     if link:
@@ -698,7 +354,9 @@ class MegaSearchHandler:
         if telegraph_content:
             try:
                 button = await get_telegraph_list(telegraph_content)
-                result_msg = f"<b>🔍 Found {contents_no} MEGA results for <i>{self.query}</i></b>"
+                result_msg = f"<b>🔍 Found {self.total} MEGA results for <i>{self.query}</i></b>"
+                if pages > 1:
+                    result_msg += f"\n<i>Showing page {self.page}/{pages}</i>"
                 await edit_message(message, result_msg, button)
             except Exception as e:
                 LOGGER.error(f"Error creating Telegraph page: {e}")
@@ -750,7 +408,10 @@ async def mega_search_command(_, message):
             "<b>Examples:</b>\n"
             "• <code>/megasearch movie</code> - Search for files containing 'movie'\n"
             "• <code>/megasearch .mp4</code> - Search for MP4 files\n"
-            "• <code>/megasearch folder_name</code> - Search for specific folder\n\n"
+            "• <code>/megasearch folder_name</code> - Search for specific folder\n"
+            "• <code>/megasearch mov*</code> - Words starting with 'mov'\n"
+            "• <code>/megasearch avengers ext:mkv</code> - Filter by extension\n"
+            "• <code>/megasearch series type:folder page:2</code> - Folders only, page 2\n\n"
             "<b>Note:</b> You need MEGA credentials configured to use this feature."
         )
 
@@ -12,7 +12,6 @@ from bot.helper.ext_utils.bot_utils import (
     COMMAND_USAGE,
     arg_parser,
     get_content_type,
-    sync_to_async,
 )
 from bot.helper.ext_utils.exceptions import DirectDownloadLinkException
 from bot.helper.ext_utils.limit_checker import limit_checker
@@ -32,8 +31,8 @@ from bot.helper.mirror_leech_utils.download_utils.aria2_download import (
 from bot.helper.mirror_leech_utils.download_utils.direct_downloader import (
     add_direct_download,
 )
-from bot.helper.mirror_leech_utils.download_utils.direct_link_generator import (
-    direct_link_generator,
+from bot.helper.mirror_leech_utils.download_utils.direct_link_resolver import (
+    resolve_direct_link,
 )
 from bot.helper.mirror_leech_utils.download_utils.gd_download import add_gd_download
 from bot.helper.mirror_leech_utils.download_utils.jd_download import add_jd_download
@@ -1021,7 +1020,7 @@ class Mirror(TaskListener):
                 content_type,
             ):
                 try:
-                    self.link = await sync_to_async(direct_link_generator, self.link)
+                    self.link = await resolve_direct_link(self.link)
                     if isinstance(self.link, tuple):
                         self.link, headers = self.link
                     elif isinstance(self.link, str):
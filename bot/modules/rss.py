@@ -1,21 +1,27 @@
-from asyncio import Lock, sleep
+from asyncio import CancelledError, Lock, Semaphore, gather, sleep
 from datetime import datetime, timedelta
 from functools import partial
+from hashlib import md5
 from io import BytesIO
 from re import IGNORECASE, compile
 from time import time
+from urllib.parse import urlparse
 
 from apscheduler.triggers.interval import IntervalTrigger
 from feedparser import parse as feed_parse
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from pyrogram.filters import create
 from pyrogram.handlers import MessageHandler
 
 from bot import LOGGER, rss_dict, scheduler
 from bot.core.config_manager import Config
-from bot.helper.ext_utils.bot_utils import arg_parser, get_size_bytes, new_task
+from bot.helper.ext_utils.bot_utils import (
+    arg_parser,
+    get_size_bytes,
+    new_task,
+    sync_to_async,
+)
 from bot.helper.ext_utils.db_handler import database
-from bot.helper.ext_utils.exceptions import RssShutdownException
 from bot.helper.ext_utils.help_messages import RSS_HELP_MESSAGE
 from bot.helper.ext_utils.status_utils import get_readable_file_size
 from bot.helper.telegram_helper.button_build import ButtonMaker
@@ -30,6 +36,20 @@ from bot.helper.telegram_helper.message_utils import (
 
 rss_dict_lock = Lock()
 handler_dict = {}
+
+# Feeds fetched at the same time by one monitor run
+FETCH_CONCURRENCY = 10
+
+# Entry ids kept per feed to recognise entries that were already sent
+SEEN_LIMIT = 200
+
+# A feed without news is polled at most every this many monitor runs
+MAX_SKIP = 8
+
+_client = None
+_send_lock = Lock()
+# (user, title) -> FeedState
+_feed_states = {}
 size_regex = compile(r"(\d+(\.\d+)?\s?(GB|MB|KB|GiB|MiB|KiB))", IGNORECASE)
 
 headers = {
@@ -171,13 +191,7 @@ async def rss_sub(_, message, pre_event):
             cmd = None
             stv = False
         try:
-            async with AsyncClient(
-                headers=headers,
-                follow_redirects=True,
-                timeout=60,
-                verify=False,
-            ) as client:
-                res = await client.get(feed_link)
+            res = await get_client().get(feed_link)
             html = res.text
             rss_d = feed_parse(html)
 
@@ -223,8 +237,6 @@ async def rss_sub(_, message, pre_event):
 
             # Add site name
             try:
-                from urllib.parse import urlparse
-
                 parsed_url = urlparse(feed_link)
                 site_name = parsed_url.netloc.replace("www.", "")
                 feed_msg += f"\n<b>Site: </b><code>{site_name}</code>"
@@ -236,13 +248,12 @@ async def rss_sub(_, message, pre_event):
             msg += feed_msg
             # Get site name from the URL
             try:
-                from urllib.parse import urlparse
-
                 parsed_url = urlparse(feed_link)
                 site_name = parsed_url.netloc.replace("www.", "")
             except Exception:
                 site_name = "Unknown"
 
+            seen = [entry_id(entry) for entry in rss_d.entries]
             async with rss_dict_lock:
                 if rss_dict.get(user_id, False):
                     rss_dict[user_id][title] = {
@@ -256,6 +267,7 @@ async def rss_sub(_, message, pre_event):
                         "sensitive": stv,
                         "tag": tag,
                         "site_name": site_name,
+                        "seen": seen,
                     }
                 else:
                     rss_dict[user_id] = {
@@ -270,6 +282,7 @@ async def rss_sub(_, message, pre_event):
                             "sensitive": stv,
                             "tag": tag,
                             "site_name": site_name,
+                            "seen": seen,
                         },
                     }
             LOGGER.info(
@@ -494,13 +507,7 @@ async def rss_get(_, message, pre_event):
                     message,
                     f"Getting the last <b>{count}</b> item(s) from {title}",
                 )
-                async with AsyncClient(
-                    headers=headers,
-                    follow_redirects=True,
-                    timeout=60,
-                    verify=False,
-                ) as client:
-                    res = await client.get(data["link"])
+                res = await get_client().get(data["link"])
                 html = res.text
                 rss_d = feed_parse(html)
                 item_info = ""
@@ -848,33 +855,228 @@ Timeout: 60 sec. Argument -c for command and arguments
             await query.answer(text="Already Running!", show_alert=True)
 
 
-async def rss_monitor():
-    # Add memory management
-    import gc
+class FeedState:
+    """Conditional request validators and polling interval of a feed"""
+
+    __slots__ = ("etag", "link", "modified", "skip", "wait")
+
+    def __init__(self, link):
+        self.link = link
+        self.etag = None
+        self.modified = None
+        # Poll every ``skip`` job runs, ``wait`` runs are left until the next
+        self.skip = 1
+        self.wait = 0
+
+    def polled(self, news):
+        # Quiet feeds are polled less often, news resets the interval
+        self.skip = 1 if news else min(self.skip * 2, MAX_SKIP)
+        self.wait = self.skip - 1
+
+
+def get_client():
+    """HTTP client shared by all feed requests"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = AsyncClient(
+            headers=headers,
+            follow_redirects=True,
+            timeout=60,
+            verify=False,
+            limits=Limits(
+                max_connections=FETCH_CONCURRENCY * 2,
+                max_keepalive_connections=FETCH_CONCURRENCY,
+            ),
+        )
+    return _client
 
-    import psutil
 
-    # Force garbage collection before starting
-    gc.collect()
+def entry_link(entry):
+    if "links" in entry and len(entry["links"]) > 1:
+        return entry["links"][1]["href"]
+    return entry["link"]
 
-    # Check memory usage
-    memory_info = psutil.virtual_memory()
-    if memory_info.percent > 90:  # If memory usage is above 90%
-        return
 
-    # Add memory management
-    import gc
+def entry_size(entry):
+    if entry.get("size"):
+        return int(entry["size"])
+    if entry.get("summary") and (matches := size_regex.findall(entry["summary"])):
+        return get_size_bytes(matches[0][0])
+    return 0
+
 
-    import psutil
+def entry_id(entry):
+    """Short hash of the entry id, or of its link and title without one"""
+    key = entry.get("id") or f"{entry.get('link', '')}|{entry.get('title', '')}"
+    return md5(key.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+async def fetch_feed(link, state):
+    """Feed body, or None when the server says it did not change"""
+    request_headers = {}
+    if state.etag:
+        request_headers["If-None-Match"] = state.etag
+    if state.modified:
+        request_headers["If-Modified-Since"] = state.modified
+    tries = 0
+    while True:
+        try:
+            res = await get_client().get(link, headers=request_headers)
+            break
+        except Exception:
+            tries += 1
+            if tries > 3:
+                raise
+    if res.status_code == 304:
+        return None
+    res.raise_for_status()
+    state.etag = res.headers.get("ETag")
+    state.modified = res.headers.get("Last-Modified")
+    return res.text
+
+
+def new_entries(entries, data):
+    """Entries not sent yet, newest first"""
+    seen = data.get("seen")
+    if seen is None:
+        # Subscribed before entry ids were kept, stop at the last sent entry
+        fresh = []
+        for entry in entries:
+            if data["last_title"] == entry.get("title") or (
+                "link" in entry and data["last_feed"] == entry_link(entry)
+            ):
+                break
+            fresh.append(entry)
+        return fresh
+    seen = set(seen)
+    return [entry for entry in entries if entry_id(entry) not in seen]
+
+
+def matches_filters(title, data):
+    sensitive = data.get("sensitive", False)
+    if sensitive:
+        title = title.lower()
+    for flist in data["inf"]:
+        if all((x.lower() if sensitive else x) not in title for x in flist):
+            return False
+    for flist in data["exf"]:
+        if any((x.lower() if sensitive else x) in title for x in flist):
+            return False
+    return True
+
+
+def feed_message(entry, user, data):
+    """Message of a matching entry, or None to skip it"""
+    title = entry.get("title", "Unknown Title")
+    if not matches_filters(title, data):
+        return None
+    url = entry_link(entry)
+    size = entry_size(entry)
+    # Remove characters Telegram rejects or parses as markup
+    title = title.replace(">", "").replace("<", "")
+    title = "".join(c if ord(c) >= 32 or c == "\n" else " " for c in title)
+    if command := data["command"]:
+        if size and Config.RSS_SIZE_LIMIT and size > Config.RSS_SIZE_LIMIT:
+            return None
+        cmd = command.split(maxsplit=1)
+        cmd.insert(1, url)
+        feed_msg = " ".join(cmd)
+        if not feed_msg.startswith("/"):
+            feed_msg = f"/{feed_msg}"
+    else:
+        feed_msg = f"<b>Name: </b><code>{title}</code>"
+        feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
+        if size:
+            feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
+    site_name = data.get("site_name") or (
+        urlparse(data["link"]).netloc.replace("www.", "") or "Unknown"
+    )
+    feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code> | <b>Site:</b> <code>{site_name}</code>\n\n<blockquote><b>>> {Config.CREDIT} <<</b></blockquote>"
+    feed_msg = (
+        feed_msg.replace("\u200b", "").replace("\u200c", "").replace("\u200d", "")
+    )
+    # Ensure the message is not too long
+    if len(feed_msg) > 4096:
+        feed_msg = feed_msg[:4093] + "..."
+    return feed_msg
+
+
+async def dispatch_entries(entries, user, title, data, chat_id, topic_id):
+    # One feed sends at a time so messages of a feed stay together and
+    # send_rss can wait out FloodWait without other feeds piling on
+    async with _send_lock:
+        for entry in entries:
+            try:
+                feed_msg = feed_message(entry, user, data)
+            except (IndexError, KeyError):
+                continue
+            if feed_msg is None:
+                continue
+            try:
+                await send_rss(feed_msg, chat_id, topic_id)
+            except Exception as e:
+                LOGGER.error(f"Error sending RSS message for {title}: {e}")
+                try:
+                    await send_rss(
+                        f"<b>Title:</b> {entry.get('title', '')}\n"
+                        f"<b>Link:</b> {entry_link(entry)}",
+                        chat_id,
+                        topic_id,
+                    )
+                except Exception as e2:
+                    LOGGER.error(f"Failed to send simplified message too: {e2}")
 
-    # Force garbage collection before starting
-    gc.collect()
 
-    # Check memory usage
-    memory_info = psutil.virtual_memory()
-    if memory_info.percent > 90:  # If memory usage is above 90%
+async def poll_feed(user, title, data, semaphore, chat_id, topic_id):
+    key = (user, title)
+    state = _feed_states.get(key)
+    if state is None or state.link != data["link"]:
+        state = _feed_states[key] = FeedState(data["link"])
+    if state.wait:
+        state.wait -= 1
         return
+    try:
+        async with semaphore:
+            html = await fetch_feed(data["link"], state)
+        if html is None:
+            state.polled(False)
+            return
+        rss_d = await sync_to_async(feed_parse, html)
+        if not rss_d.entries:
+            state.polled(False)
+            return
+        fresh = new_entries(rss_d.entries, data)
+        state.polled(bool(fresh))
+        if fresh:
+            await dispatch_entries(fresh, user, title, data, chat_id, topic_id)
+        newest = rss_d.entries[0]
+        seen = [entry_id(entry) for entry in rss_d.entries]
+        if data.get("seen") is not None:
+            # Keep ids that dropped out of the feed, some feeds reorder
+            current = set(seen)
+            seen += [i for i in data["seen"] if i not in current]
+        async with rss_dict_lock:
+            if user not in rss_dict or not rss_dict[user].get(title, False):
+                return
+            rss_dict[user][title].update(
+                {
+                    "last_feed": entry_link(newest)
+                    if "link" in newest or "links" in newest
+                    else data["last_feed"],
+                    "last_title": newest.get("title", "Unknown Title"),
+                    "seen": seen[: max(SEEN_LIMIT, len(rss_d.entries))],
+                }
+            )
+        if fresh or data.get("seen") is None:
+            await database.rss_update(user)
+    except CancelledError:
+        raise
+    except Exception as e:
+        state.polled(False)
+        LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
 
+
+async def rss_monitor():
     chat = Config.RSS_CHAT
     if not chat:
         scheduler.shutdown(wait=False)
@@ -882,7 +1084,6 @@ async def rss_monitor():
     if len(rss_dict) == 0:
         scheduler.pause()
         return
-    all_paused = True
     rss_topic_id = rss_chat_id = None
     if isinstance(chat, int):
         rss_chat_id = chat
@@ -893,254 +1094,25 @@ async def rss_monitor():
     elif chat.lstrip("-").isdigit():
         rss_chat_id = int(chat)
 
-    # Initialize variables
-
-    # Make a copy of the dictionary to avoid modification during iteration
-    for user, items in list(rss_dict.items()):
-        for title, data in list(items.items()):
-            try:
-                if data["paused"]:
-                    continue
-
-                # Regular RSS feed processing
-                tries = 0
-                while True:
-                    try:
-                        async with AsyncClient(
-                            headers=headers,
-                            follow_redirects=True,
-                            timeout=60,
-                            verify=False,
-                        ) as client:
-                            res = await client.get(data["link"])
-                        html = res.text
-                        break
-                    except Exception:
-                        tries += 1
-                        if tries > 3:
-                            raise
-                        continue
-                rss_d = feed_parse(html)
-                all_paused = False
-
-                # Check if there are any entries in the feed
-                if not rss_d.entries:
-                    continue
-
-                try:
-                    # Safely get the last link
-                    if (
-                        "links" in rss_d.entries[0]
-                        and len(rss_d.entries[0]["links"]) > 1
-                    ):
-                        last_link = rss_d.entries[0]["links"][1]["href"]
-                    elif "link" in rss_d.entries[0]:
-                        last_link = rss_d.entries[0]["link"]
-                    else:
-                        # If we can't get a link, use a placeholder and log it
-                        last_link = "No link available"
-                        LOGGER.warning(f"No link found in RSS feed: {data['link']}")
-                except (IndexError, KeyError) as e:
-                    LOGGER.error(
-                        f"Error getting link from RSS feed: {e} - {data['link']}"
-                    )
-                    continue
-
-                # Safely get the last title
-                if "title" in rss_d.entries[0]:
-                    last_title = rss_d.entries[0]["title"]
-                else:
-                    last_title = "Unknown Title"
-                # Check if we've seen this item before
-                if (
-                    data["last_feed"] == last_link
-                    or data["last_title"] == last_title
-                ):
-                    continue
-                feed_count = 0
-                while True:
-                    try:
-                        await sleep(10)
-                    except Exception:
-                        raise RssShutdownException("Rss Monitor Stopped!") from None
-                    try:
-                        # Check if feed_count is within the range of available entries
-                        if feed_count >= len(rss_d.entries):
-                            # Only log at debug level to avoid cluttering logs
-                            break
-
-                        # Safely get the item title
-                        if "title" in rss_d.entries[feed_count]:
-                            item_title = rss_d.entries[feed_count]["title"]
-                        else:
-                            item_title = f"Unknown Title {feed_count}"
-
-                        # Safely get the URL
-                        try:
-                            if (
-                                "links" in rss_d.entries[feed_count]
-                                and len(rss_d.entries[feed_count]["links"]) > 1
-                            ):
-                                url = rss_d.entries[feed_count]["links"][1]["href"]
-                            else:
-                                url = rss_d.entries[feed_count]["link"]
-                        except (IndexError, KeyError):
-                            # If we can't get a URL, skip this entry
-                            feed_count += 1
-                            continue
-
-                        # Check if we've seen this item before
-                        if (
-                            data["last_feed"] == url
-                            or data["last_title"] == item_title
-                        ):
-                            break
-                        if rss_d.entries[feed_count].get("size"):
-                            size = int(rss_d.entries[feed_count]["size"])
-                        elif rss_d.entries[feed_count].get("summary"):
-                            summary = rss_d.entries[feed_count]["summary"]
-                            matches = size_regex.findall(summary)
-                            sizes = [match[0] for match in matches]
-                            size = get_size_bytes(sizes[0])
-                        else:
-                            size = 0
-                    except IndexError:
-                        # Only log at debug level to avoid cluttering logs
-                        break
-                    parse = True
-                    for flist in data["inf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and all(
-                                x.lower() not in item_title.lower() for x in flist
-                            )
-                        ) or (
-                            not data.get("sensitive", False)
-                            and all(x not in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    for flist in data["exf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and any(x.lower() in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and any(x in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    # Sanitize item title and URL to prevent Telegram API errors
-                    sanitized_title = item_title.replace(">", "").replace("<", "")
-                    # Remove zero-width characters and other potentially problematic characters
-                    sanitized_title = (
-                        sanitized_title.replace("\u200b", "")
-                        .replace("\u200c", "")
-                        .replace("\u200d", "")
-                    )
-                    # Replace any other control characters
-                    sanitized_title = "".join(
-                        c if ord(c) >= 32 or c == "\n" else " "
-                        for c in sanitized_title
-                    )
-
-                    # Sanitize URL
-                    sanitized_url = url
-
-                    if command := data["command"]:
-                        if (
-                            size
-                            and Config.RSS_SIZE_LIMIT
-                            and size > Config.RSS_SIZE_LIMIT
-                        ):
-                            feed_count += 1
-                            continue
-                        cmd = command.split(maxsplit=1)
-                        cmd.insert(1, sanitized_url)
-                        feed_msg = " ".join(cmd)
-                        if not feed_msg.startswith("/"):
-                            feed_msg = f"/{feed_msg}"
-                    else:
-                        feed_msg = f"<b>Name: </b><code>{sanitized_title}</code>"
-                        feed_msg += f"\n\n<b>Link: </b><code>{sanitized_url}</code>"
-                        if size:
-                            feed_msg += (
-                                f"\n<b>Size: </b>{get_readable_file_size(size)}"
-                            )
-                    # Add site name for all feeds
-                    # Use the site_name from the dictionary if available, otherwise extract it from the URL
-                    site_name = data.get("site_name", "")
-                    if not site_name:
-                        # Extract the site name from the URL
-                        try:
-                            from urllib.parse import urlparse
-
-                            parsed_url = urlparse(data["link"])
-                            site_name = parsed_url.netloc.replace("www.", "")
-                        except Exception:
-                            site_name = "Unknown"
-
-                    site_info = f" | <b>Site:</b> <code>{site_name}</code>"
-                    feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>{site_info}\n\n<blockquote><b>>> {Config.CREDIT} <<</b></blockquote>"
-
-                    # Validate message content before sending
-                    if not feed_msg.strip():
-                        LOGGER.error(
-                            f"Empty message generated for {title}. Skipping."
-                        )
-                        feed_count += 1
-                        continue
-
-                    # Sanitize message content to avoid Telegram API errors
-                    try:
-                        # Remove any potentially problematic characters
-                        feed_msg = (
-                            feed_msg.replace("\u200b", "")
-                            .replace("\u200c", "")
-                            .replace("\u200d", "")
-                        )
-
-                        # Ensure the message is not too long
-                        if len(feed_msg) > 4096:
-                            feed_msg = feed_msg[:4093] + "..."
-
-                        await send_rss(feed_msg, rss_chat_id, rss_topic_id)
-
-                        feed_count += 1
-                    except Exception as e:
-                        LOGGER.error(f"Error sending RSS message for {title}: {e}")
-                        # Try with a simplified message as a fallback
-                        try:
-                            simplified_msg = (
-                                f"<b>Title:</b> {item_title}\n<b>Link:</b> {url}"
-                            )
-                            await send_rss(simplified_msg, rss_chat_id, rss_topic_id)
-                            feed_count += 1
-                        except Exception as e2:
-                            LOGGER.error(
-                                f"Failed to send simplified message too: {e2}"
-                            )
-                            feed_count += 1
-                async with rss_dict_lock:
-                    if user not in rss_dict or not rss_dict[user].get(title, False):
-                        continue
-                    update_data = {"last_feed": last_link, "last_title": last_title}
-
-                    rss_dict[user][title].update(update_data)
-                await database.rss_update(user)
-            except RssShutdownException:
-                break
-            except Exception as e:
-                LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
-                continue
-    if all_paused:
+    feeds = [
+        (user, title, data)
+        for user, items in list(rss_dict.items())
+        for title, data in list(items.items())
+        if not data["paused"]
+    ]
+    if not feeds:
         scheduler.pause()
+        return
+    live = {(user, title) for user, title, _ in feeds}
+    for key in [key for key in _feed_states if key not in live]:
+        del _feed_states[key]
+    semaphore = Semaphore(FETCH_CONCURRENCY)
+    await gather(
+        *(
+            poll_feed(user, title, data, semaphore, rss_chat_id, rss_topic_id)
+            for user, title, data in feeds
+        )
+    )
 
 
 def add_job():
@@ -1174,12 +1146,17 @@ def add_job():
     )
 
 
-# Only start RSS if enabled
-from bot.core.config_manager import get_config_bool
+def start_rss():
+    """
+    Schedule the RSS job and start the shared scheduler, called once at
+    start up. This used to happen when the module was imported, which is
+    now deferred to the first RSS command.
+    """
+    from bot.core.config_manager import get_config_bool
 
-if get_config_bool("RSS_ENABLED", True):
-    add_job()
-    scheduler.start()
-    LOGGER.info("RSS system started")
-else:
-    LOGGER.info("RSS system disabled via configuration")
+    if get_config_bool("RSS_ENABLED", True):
+        add_job()
+        scheduler.start()
+        LOGGER.info("RSS system started")
+    else:
+        LOGGER.info("RSS system disabled via configuration")
@@ -16,6 +16,8 @@ from bot import bot_start_time
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.aiofiles_compat import aiopath
 from bot.helper.ext_utils.bot_utils import cmd_exec, new_task
+from bot.helper.ext_utils.cache_utils import cache_report
+from bot.helper.ext_utils.gc_utils import gc_report
 from bot.helper.ext_utils.status_utils import (
     get_readable_file_size,
     get_readable_time,
@@ -25,6 +27,7 @@ from bot.helper.telegram_helper.message_utils import (
     delete_links,
     send_message,
 )
+from bot.helper.telegram_helper.tg_gateway import gateway_report
 
 commands = {
     "aria2": (["xria", "--version"], r"aria2 version ([\d.]+)"),
@@ -199,8 +202,36 @@ async def bot_stats(_, message):
 <b>7z:</b> {commands["7z"]}
 """
 
+    # Cache usage section
+    cache_stats = ""
+    if cache_lines := cache_report():
+        cache_stats = "\n<b>🗃 CACHES 🗃</b>\n\n" + "\n".join(
+            f"<code>{line}</code>" for line in cache_lines
+        )
+        cache_stats += "\n"
+
+    # Loop lag and GC pause section
+    gc_stats = "\n<b>🗑 MEMORY GOVERNOR 🗑</b>\n\n" + "\n".join(
+        f"<code>{line}</code>" for line in gc_report()
+    )
+    gc_stats += "\n"
+
+    # Outbound Telegram queue section
+    gateway_stats = "\n<b>📨 TELEGRAM GATEWAY 📨</b>\n\n" + "\n".join(
+        f"<code>{line}</code>" for line in gateway_report()
+    )
+    gateway_stats += "\n"
+
     # Combine all sections
-    stats = system_stats + limits_stats + mega_info + versions_stats
+    stats = (
+        system_stats
+        + limits_stats
+        + mega_info
+        + cache_stats
+        + gc_stats
+        + gateway_stats
+        + versions_stats
+    )
 
     # Delete the /stats command message immediately
     await delete_links(message)
@@ -12,6 +12,7 @@ from vt import Client as VTClient
 from bot import DOWNLOAD_DIR
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import new_task
+from bot.helper.ext_utils.cache_utils import Cache
 from bot.helper.ext_utils.links_utils import is_url
 from bot.helper.ext_utils.status_utils import get_readable_file_size
 from bot.helper.telegram_helper.button_build import ButtonMaker
@@ -23,8 +24,9 @@ from bot.helper.telegram_helper.message_utils import (
 
 LOGGER = getLogger(__name__)
 
-# Global storage for scan results (for callback handling)
-VT_SCAN_RESULTS = {}
+# Scan results for the callbacks, kept for an hour. A timer used to sweep
+# them, started when the module was imported.
+VT_SCAN_RESULTS = Cache("virustotal.scans", max_entries=256, ttl=3600)
 
 
 def _extract_scan_data(result: dict) -> dict:
@@ -299,12 +301,11 @@ async def vt_callback_handler(_, query):
         scan_id = parts[2]
 
         # Check if scan result exists
-        if scan_id not in VT_SCAN_RESULTS:
+        scan_result = VT_SCAN_RESULTS.get(scan_id)
+        if scan_result is None:
             await safe_answer("❌ Scan result expired")
             return
 
-        scan_result = VT_SCAN_RESULTS[scan_id]
-
         # Check if user is authorized (scan owner)
         if scan_result.get("user_id") != user_id:
             await safe_answer("❌ Unauthorized")
@@ -353,30 +354,6 @@ async def vt_callback_handler(_, query):
         await safe_answer("❌ Error processing request")
 
 
-def cleanup_old_scan_results():
-    """Clean up scan results older than 1 hour."""
-    current_time = time.time()
-    expired_keys = []
-
-    for scan_id, scan_result in VT_SCAN_RESULTS.items():
-        if current_time - scan_result.get("timestamp", 0) > 3600:  # 1 hour
-            expired_keys.append(scan_id)
-
-    for key in expired_keys:
-        del VT_SCAN_RESULTS[key]
-
-    if expired_keys:
-        LOGGER.info(f"Cleaned up {len(expired_keys)} expired VT scan results")
-
-
-# Schedule periodic cleanup
-from bot.helper.ext_utils.bot_utils import SetInterval
-
-# Clean up old scan results every 30 minutes
-if Config.VT_ENABLED:
-    SetInterval(1800, cleanup_old_scan_results)  # 1800 seconds = 30 minutes
-
-
 class VirusTotalClient:
     def __init__(self):
         """Initialize the VirusTotal client."""
@@ -545,15 +522,18 @@ async def scan_file(client, message, file_msg):
         scan_id = f"{message.from_user.id}_{int(time.time())}"
 
         # Store scan result for callback handling
-        VT_SCAN_RESULTS[scan_id] = {
-            "user_id": message.from_user.id,
-            "scan_data": scan_data,
-            "file_name": file_name,
-            "file_size": file_size,
-            "vt_link": result.get("link", ""),
-            "is_url": False,
-            "timestamp": time.time(),
-        }
+        VT_SCAN_RESULTS.put(
+            scan_id,
+            {
+                "user_id": message.from_user.id,
+                "scan_data": scan_data,
+                "file_name": file_name,
+                "file_size": file_size,
+                "vt_link": result.get("link", ""),
+                "is_url": False,
+                "timestamp": time.time(),
+            },
+        )
 
         # Format response with buttons
         response, buttons = _format_basic_results(
@@ -614,14 +594,17 @@ async def scan_url(message, url):
         scan_id = f"{message.from_user.id}_{int(time.time())}"
 
         # Store scan result for callback handling
-        VT_SCAN_RESULTS[scan_id] = {
-            "user_id": message.from_user.id,
-            "scan_data": scan_data,
-            "url": url,
-            "vt_link": result.get("link", ""),
-            "is_url": True,
-            "timestamp": time.time(),
-        }
+        VT_SCAN_RESULTS.put(
+            scan_id,
+            {
+                "user_id": message.from_user.id,
+                "scan_data": scan_data,
+                "url": url,
+                "vt_link": result.get("link", ""),
+                "is_url": True,
+                "timestamp": time.time(),
+            },
+        )
 
         # Format response with buttons
         response, buttons = _format_url_results(
@@ -26,6 +26,9 @@ from bot.helper.listeners.task_listener import TaskListener
 from bot.helper.mirror_leech_utils.download_utils.yt_dlp_download import (
     YoutubeDLHelper,
 )
+from bot.helper.mirror_leech_utils.download_utils.yt_dlp_info import (
+    extract_info_cached,
+)
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.telegram_helper.message_utils import (
     auto_delete_message,
@@ -648,11 +651,9 @@ class YtSelection:
 
 
 def extract_info(link, options):
+    """Info dict of the link and the time it was extracted"""
     with YoutubeDL(options) as ydl:
-        result = ydl.extract_info(link, download=False)
-        if result is None:
-            raise ValueError("Info result is None")
-        return result
+        return extract_info_cached(ydl, link)
 
 
 async def _mdisk(link, name):
@@ -1254,7 +1255,7 @@ class YtDlp(TaskListener):
                     # Ensure TV client is used even if extractor_args already exist
                     options["extractor_args"]["youtube"]["player_client"] = ["tv"]
 
-            result = await sync_to_async(extract_info, self.link, options)
+            result, extracted = await sync_to_async(extract_info, self.link, options)
 
             # Debug: Log the extracted title and set it in the listener
             if result and result.get("title"):
@@ -1283,7 +1284,9 @@ class YtDlp(TaskListener):
                     # Try with different format specification
                     options["format"] = "best"
                     LOGGER.info("Retrying HLS stream with format=best")
-                    result = await sync_to_async(extract_info, self.link, options)
+                    result, extracted = await sync_to_async(
+                        extract_info, self.link, options
+                    )
                 except Exception:
                     try:
                         # Try with different format specification
@@ -1291,7 +1294,7 @@ class YtDlp(TaskListener):
                         LOGGER.info(
                             "Retrying HLS stream with format=bestvideo+bestaudio/best"
                         )
-                        result = await sync_to_async(
+                        result, extracted = await sync_to_async(
                             extract_info, self.link, options
                         )
                     except Exception:
@@ -1319,7 +1322,9 @@ class YtDlp(TaskListener):
                             "android"
                         ]
 
-                    result = await sync_to_async(extract_info, self.link, options)
+                    result, extracted = await sync_to_async(
+                        extract_info, self.link, options
+                    )
                 except Exception:
                     try:
                         # Last resort: try with web client
@@ -1331,7 +1336,7 @@ class YtDlp(TaskListener):
                                 "web"
                             ]
 
-                        result = await sync_to_async(
+                        result, extracted = await sync_to_async(
                             extract_info, self.link, options
                         )
                     except Exception:
@@ -1375,6 +1380,9 @@ class YtDlp(TaskListener):
 
         LOGGER.info(f"Downloading with YT-DLP: {self.link}")
         playlist = "entries" in result
+        # The download reuses the info dict instead of extracting again
+        self.ytdl_info = result
+        self.ytdl_info_time = extracted
         ydl = YoutubeDLHelper(self)
         create_task(ydl.add_download(path, qual, playlist, opt))  # noqa: RUF006
         await delete_links(self.message)
@@ -28,6 +28,7 @@ AUTHORIZED_CHATS = (
 SUDO_USERS = (
     ""  # List of sudo user IDs who can use admin commands, separated by space
 )
+PREMIUM_USERS = ""  # User IDs with a bigger share of the task queues than regular users, separated by space
 DEFAULT_UPLOAD = "gd"  # Default upload destination: 'gd' for Google Drive, 'rc' for rclone, 'ddl' for Direct Download Links
 FILELION_API = ""  # FileLion API key for direct links
 STREAMWISH_API = ""  # StreamWish API key for direct links
@@ -45,6 +46,7 @@ UPLOAD_PATHS = {}  # Custom upload paths for different file types
 MEDIA_STORE = False  # Enable media store for faster thumbnail generation
 MEDIA_SEARCH_ENABLED = True  # Enable/disable media search feature
 MEDIA_SEARCH_CHATS = []  # List of chat IDs where media search is enabled
+MEDIA_SEARCH_INDEX = True  # Index the media of MEDIA_SEARCH_CHATS locally (needs USER_SESSION_STRING) instead of searching Telegram on every query
 DELETE_LINKS = False  # Delete links after download
 FSUB_IDS = ""  # Force subscribe channel IDs, separated by space
 AD_BROADCASTER_ENABLED = (
@@ -81,6 +83,9 @@ BULK_ENABLED = True  # Enable/disable bulk operations (-b flag)
 GDRIVE_ID = ""  # Google Drive folder/TeamDrive ID where files will be uploaded
 GDRIVE_UPLOAD_ENABLED = True  # Enable/disable Google Drive upload feature
 IS_TEAM_DRIVE = False  # Whether the GDRIVE_ID is a TeamDrive
+GDRIVE_CLONE_WORKERS = 8  # Files copied at once when cloning a folder, each worker has its own connection and service account
+# Files uploaded at once from a folder, 1 uploads one by one
+GDRIVE_UPLOAD_WORKERS = 4
 STOP_DUPLICATE = False  # Skip uploading files that are already in the drive
 INDEX_URL = ""  # Index URL for Google Drive
 USE_SERVICE_ACCOUNTS = False  # Whether to use service accounts for Google Drive
@@ -100,6 +105,9 @@ JD_PASS = ""  # JDownloader password
 # Mega.nz Settings
 MEGA_EMAIL = ""  # Mega.nz account email (optional, for premium features)
 MEGA_PASSWORD = ""  # Mega.nz account password (optional, for premium features)
+MEGA_SESSION_POOL_SIZE = 2  # Logged-in MEGA sessions kept per account for reuse
+MEGA_SESSION_IDLE_TIMEOUT = 1800  # Idle seconds before a MEGA session closes
+MEGA_SESSION_WAIT_TIMEOUT = 900  # Seconds to wait for a free MEGA session, 0 = no limit
 
 # MEGA Upload Settings
 MEGA_UPLOAD_ENABLED = True  # Enable MEGA upload functionality
@@ -176,6 +184,7 @@ AS_DOCUMENT = False  # Send files as documents instead of media
 MEDIA_GROUP = False  # Group media files together when sending
 USER_TRANSMISSION = False  # Use transmission for torrents
 HYBRID_LEECH = False  # Enable hybrid leech (both document and media)
+LEECH_UPLOAD_CONCURRENCY = 1  # Files of a task uploaded at once through bot, user session and helper bots, 1 uploads one by one
 LEECH_FILENAME_PREFIX = ""  # Prefix to add to leeched filenames
 LEECH_SUFFIX = ""  # Suffix to add to leeched files
 LEECH_FONT = ""  # Font to use for leech captions
@@ -203,6 +212,11 @@ WEB_PINCODE = False  # Enable pincode protection for web server
 QUEUE_ALL = 0  # Maximum number of concurrent tasks (0 = unlimited)
 QUEUE_DOWNLOAD = 0  # Maximum number of concurrent downloads (0 = unlimited)
 QUEUE_UPLOAD = 0  # Maximum number of concurrent uploads (0 = unlimited)
+QUEUE_PROCESS = 0  # Maximum number of tasks processing between download and upload (0 = unlimited)
+QUEUE_UPLOAD_PER_DEST = 0  # Maximum concurrent uploads to each destination: Telegram, Drive, rclone... (0 = unlimited)
+QUEUE_USER_LIMIT = (
+    0  # Maximum running downloads, processing or uploads of one user (0 = unlimited)
+)
 
 # Heroku config for get BASE_URL automatically
 HEROKU_APP_NAME = ""
@@ -256,6 +270,11 @@ STATUS_UPDATE_INTERVAL = (
 STATUS_LIMIT = 10  # Number of tasks to display in status message (recommended: 4-10)
 SEARCH_LIMIT = 0  # Maximum number of search results to display (0 = unlimited)
 
+# Startup Settings
+LAZY_MODULE_LOADING = (
+    True  # Import command modules on their first use (faster start, less RAM)
+)
+
 # Task Monitoring Settings - Optimized for reduced resource usage
 TASK_MONITOR_ENABLED = (
     False  # Disabled by default for better performance (enable only if needed)
@@ -515,6 +534,9 @@ ZOTIFY_TRANSCODE_BITRATE = (
 ZOTIFY_DOWNLOAD_REAL_TIME = (
     False  # Download at the same rate as track playback (slower but more stable)
 )
+ZOTIFY_CONCURRENT_DOWNLOADS = (
+    3  # Tracks of an album/playlist downloaded at once, lowered when rate limited
+)
 ZOTIFY_REPLACE_EXISTING = False  # Replace existing files when downloading
 ZOTIFY_SKIP_DUPLICATES = True  # Skip downloading duplicate tracks
 ZOTIFY_SKIP_PREVIOUS = True  # Skip tracks that were previously downloaded
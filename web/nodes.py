@@ -1,33 +1,211 @@
-from anytree import NodeMixin
-
-
-class TorNode(NodeMixin):
-    def __init__(
-        self,
-        name,
-        is_folder=False,
-        is_file=False,
-        parent=None,
-        size=None,
-        priority=None,
-        file_id=None,
-        progress=None,
-    ):
-        super().__init__()
+"""
+File trees of the web file selector.
+
+The tree used to be an anytree built by scanning the children of every
+folder for each path component, and was sent to the page as one JSON blob on
+every request. Folders now index their children by name, so building is
+linear in the number of files, and keep the aggregated size, progress and
+selection of their subtree. The page loads one folder page at a time and
+sends selection changes, which update the aggregates along the path to the
+root instead of walking the tree.
+"""
+
+from time import monotonic
+
+ROOT_ID = "root"
+
+# Children returned per folder page, the page may ask for up to MAX_PAGE_SIZE
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+class TorNode:
+    __slots__ = (
+        "children",
+        "done",
+        "file_id",
+        "files",
+        "is_file",
+        "name",
+        "parent",
+        "priority",
+        "selected",
+        "selected_size",
+        "size",
+    )
+
+    def __init__(self, name, file_id, parent=None, size=0, priority=None, done=0):
         self.name = name
-        self.is_folder = is_folder
-        self.is_file = is_file
+        self.file_id = file_id
+        self.parent = parent
+        self.is_file = priority is not None
+        # Folder children by name, in the order they were first seen
+        self.children = None if self.is_file else {}
+        self.priority = priority
+        self.size = size
+        self.done = done
+        self.files = 1 if self.is_file else 0
+        self.selected = 1 if priority else 0
+        self.selected_size = size if priority else 0
+
+    @property
+    def progress(self):
+        return round(self.done / self.size * 100, 5) if self.size else 0
+
+    def to_dict(self):
+        if self.is_file:
+            return {
+                "id": self.file_id,
+                "name": self.name,
+                "size": self.size,
+                "type": "file",
+                "selected": bool(self.selected),
+                "progress": self.progress,
+            }
+        return {
+            "id": self.file_id,
+            "name": self.name,
+            "size": self.size,
+            "type": "folder",
+            "files": self.files,
+            "selected_files": self.selected,
+            "selected": self.files > 0 and self.selected == self.files,
+            "partial": 0 < self.selected < self.files,
+            "progress": self.progress,
+        }
+
+
+class FileTree:
+    """Folders and files of one task, indexed by id"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.root = TorNode(engine.upper(), ROOT_ID)
+        self.nodes = {ROOT_ID: self.root}
+        self.built = monotonic()
+        # Selection changed since the tree was loaded from the engine
+        self.changed = False
+        self._folders = 0
+
+    def add_file(self, path, file_id, size, priority, done):
+        folder = self.root
+        for name in path[:-1]:
+            if (child := folder.children.get(name)) is None:
+                child = TorNode(name, f"folderNode_{self._folders}", folder)
+                self._folders += 1
+                folder.children[name] = child
+                self.nodes[child.file_id] = child
+            folder = child
+        node = TorNode(path[-1], file_id, folder, size, priority, done)
+        # A name can repeat inside a folder when the engine lists it twice,
+        # keep both under distinct keys
+        key = path[-1] if path[-1] not in folder.children else file_id
+        folder.children[key] = node
+        self.nodes[str(file_id)] = node
+
+    def aggregate(self, folder=None):
+        """Sum sizes, progress and selection of every folder from its files"""
+        folder = folder or self.root
+        folder.size = folder.done = folder.files = 0
+        folder.selected = folder.selected_size = 0
+        for child in folder.children.values():
+            if not child.is_file:
+                self.aggregate(child)
+            folder.size += child.size
+            folder.done += child.done
+            folder.files += child.files
+            folder.selected += child.selected
+            folder.selected_size += child.selected_size
+        return self
+
+    def path(self, node):
+        """Folders from the root down to ``node``"""
+        nodes = []
+        while node is not None:
+            nodes.append({"id": node.file_id, "name": node.name})
+            node = node.parent
+        return nodes[::-1]
 
-        if parent is not None:
-            self.parent = parent
-        if size is not None:
-            self.fsize = size
-        if priority is not None:
-            self.priority = priority
-        if file_id is not None:
-            self.file_id = file_id
-        if progress is not None:
-            self.progress = progress
+    def stats(self):
+        root = self.root
+        return {
+            "totalCount": root.files,
+            "selectedCount": root.selected,
+            "totalSize": root.size,
+            "selectedSize": root.selected_size,
+        }
+
+    def page(self, folder_id=ROOT_ID, offset=0, limit=PAGE_SIZE):
+        folder = self.nodes.get(str(folder_id))
+        if folder is None or folder.is_file:
+            folder = self.root
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        children = list(folder.children.values())[offset : offset + limit]
+        return {
+            "engine": self.engine,
+            "folder": folder.to_dict(),
+            "path": self.path(folder),
+            "files": [child.to_dict() for child in children],
+            "offset": offset,
+            "limit": limit,
+            "total": len(folder.children),
+            "stats": self.stats(),
+        }
+
+    def _set(self, node, selected):
+        """Select or unselect a file and update the folders above it"""
+        value = 1 if selected else 0
+        if node.selected == value:
+            return
+        delta = value - node.selected
+        size = node.size * delta
+        while node is not None:
+            node.selected += delta
+            node.selected_size += size
+            node = node.parent
+
+    def _files(self, node):
+        if node.is_file:
+            yield node
+            return
+        stack = [node]
+        while stack:
+            for child in stack.pop().children.values():
+                if child.is_file:
+                    yield child
+                else:
+                    stack.append(child)
+
+    def apply(self, changes):
+        """
+        Apply selection changes, ``select``, ``unselect`` and ``invert`` are
+        lists of file or folder ids, a folder stands for all its files
+        """
+        self.changed = True
+        for key, selected in (("select", True), ("unselect", False)):
+            for node_id in changes.get(key) or []:
+                if (node := self.nodes.get(str(node_id))) is not None:
+                    for file in list(self._files(node)):
+                        self._set(file, selected)
+        for node_id in changes.get("invert") or []:
+            if (node := self.nodes.get(str(node_id))) is not None:
+                for file in list(self._files(node)):
+                    self._set(file, not file.selected)
+
+    def selection(self):
+        """Ids of all selected files and of the files whose selection changed"""
+        selected = []
+        to_select = []
+        to_unselect = []
+        for node in self._files(self.root):
+            if node.selected:
+                selected.append(str(node.file_id))
+                if not node.priority:
+                    to_select.append(str(node.file_id))
+            elif node.priority:
+                to_unselect.append(str(node.file_id))
+        return selected, to_select, to_unselect
 
 
 def qb_get_folders(path):
@@ -40,174 +218,39 @@ def get_folders(path, root_path):
 
 
 def make_tree(res, tool, root_path=""):
+    tree = FileTree(tool)
     if tool == "qbittorrent":
-        parent = TorNode("QBITTORRENT")
-        folder_id = 0
         for i in res:
-            folders = qb_get_folders(i.name)
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
-            else:
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
+            tree.add_file(
+                qb_get_folders(i.name),
+                i.index,
+                i.size,
+                i.priority,
+                i.size * i.progress,
+            )
     elif tool == "aria2":
-        parent = TorNode("ARIA2")
-        folder_id = 0
         for i in res:
-            folders = get_folders(i["path"], root_path)
-            priority = 1
-            if i["selected"] == "false":
-                priority = 0
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100,
-                        5,
-                    )
-                except Exception:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
-                )
-            else:
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100,
-                        5,
-                    )
-                except Exception:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
-                )
+            size = int(i["length"])
+            try:
+                done = int(i["completedLength"])
+            except Exception:
+                done = 0
+            tree.add_file(
+                get_folders(i["path"], root_path),
+                i["index"],
+                size,
+                0 if i["selected"] == "false" else 1,
+                done,
+            )
     else:
-        parent = TorNode("SABNZBD+")
-        priority = 1
+        tree.root.name = "SABNZBD+"
         for i in res["files"]:
-            TorNode(
-                i["filename"],
-                is_file=True,
-                parent=parent,
-                size=float(i["mb"]) * 1048576,
-                priority=priority,
-                file_id=i["nzf_id"],
-                progress=round(
-                    ((float(i["mb"]) - float(i["mbleft"])) / float(i["mb"])) * 100,
-                    5,
-                ),
-            )
-
-    result = create_list(parent)
-    return {"files": result, "engine": tool}
-
-
-"""
-def print_tree(parent):
-    for pre, _, node in RenderTree(parent):
-        treestr = u"%s%s" % (pre, node.name)
-        print(treestr.ljust(8), node.is_folder, node.is_file)
-"""
-
-
-def create_list(parent, contents=None):
-    if contents is None:
-        contents = []
-    for i in parent.children:
-        if i.is_folder:
-            children = []
-            create_list(i, children)
-            contents.append(
-                {
-                    "id": f"folderNode_{i.file_id}",
-                    "name": i.name,
-                    "type": "folder",
-                    "children": children,
-                },
-            )
-        else:
-            contents.append(
-                {
-                    "id": i.file_id,
-                    "name": i.name,
-                    "size": i.fsize,
-                    "type": "file",
-                    "selected": bool(i.priority),
-                    "progress": i.progress,
-                },
+            size = float(i["mb"]) * 1048576
+            tree.add_file(
+                [i["filename"]],
+                i["nzf_id"],
+                size,
+                1,
+                size - float(i["mbleft"]) * 1048576,
             )
-    return contents
-
-
-def extract_file_ids(data):
-    selected_files = []
-    unselected_files = []
-    for item in data:
-        if item.get("type") == "file":
-            if item.get("selected"):
-                selected_files.append(str(item["id"]))
-            else:
-                unselected_files.append(str(item["id"]))
-        if item.get("children"):
-            child_selected, child_unselected = extract_file_ids(item["children"])
-            selected_files.extend(child_selected)
-            unselected_files.extend(child_unselected)
-    return selected_files, unselected_files
+    return tree.aggregate()
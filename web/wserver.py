@@ -5,6 +5,7 @@ install()
 from asyncio import sleep
 from contextlib import asynccontextmanager
 from logging import INFO, WARNING, FileHandler, StreamHandler, basicConfig, getLogger
+from time import monotonic
 from urllib.parse import urlparse
 
 from aioaria2 import Aria2HttpClient  # type: ignore
@@ -17,7 +18,7 @@ from fastapi.responses import HTMLResponse, JSONResponse  # type: ignore
 from fastapi.templating import Jinja2Templates  # type: ignore
 
 from sabnzbdapi import SabnzbdClient
-from web.nodes import extract_file_ids, make_tree
+from web.nodes import PAGE_SIZE, ROOT_ID, make_tree
 
 getLogger("httpx").setLevel(WARNING)
 getLogger("aiohttp").setLevel(WARNING)
@@ -31,6 +32,14 @@ sabnzbd_client = SabnzbdClient(
 )
 
 from bot.core.config_manager import Config
+from bot.helper.ext_utils.cache_utils import Cache
+
+# File tree of each gid, kept while the page is in use
+trees = Cache("web_trees", max_entries=32, idle=600)
+
+# Seconds after which reopening the page reloads the tree, unless it has
+# selection changes that were not submitted yet
+TREE_REFRESH = 30
 
 SERVICES = {
     "nzb": {
@@ -199,6 +208,7 @@ async def handle_torrent(request: Request):
         if mode == "rename":
             if len(gid) > 20:
                 await handle_rename(gid, data)
+                trees.pop(gid)
                 content = {
                     "files": [],
                     "engine": "",
@@ -212,15 +222,26 @@ async def handle_torrent(request: Request):
                     "error": "Rename failed.",
                     "message": "Cannot rename aria2c torrent file",
                 }
+        elif (tree := trees.get(gid)) is None:
+            content = {
+                "files": [],
+                "engine": "",
+                "error": "Session expired",
+                "message": "The file list is outdated, reload the page",
+            }
+        elif mode == "select":
+            tree.apply(data if isinstance(data, dict) else {})
+            content = folder_page(tree, params)
         else:
-            selected_files, unselected_files = extract_file_ids(data)
+            selected_files, to_select, to_unselect = tree.selection()
             if gid.startswith("SABnzbd_nzo"):
-                await set_sabnzbd(gid, unselected_files)
+                await set_sabnzbd(gid, to_unselect)
             elif len(gid) > 20:
-                await set_qbittorrent(gid, selected_files, unselected_files)
+                await set_qbittorrent(gid, to_select, to_unselect)
             else:
-                selected_files = ",".join(selected_files)
-                await set_aria2(gid, selected_files)
+                await set_aria2(gid, ",".join(selected_files))
+            # The engine has the new selection, load it again next time
+            trees.pop(gid)
             content = {
                 "files": [],
                 "engine": "",
@@ -229,19 +250,14 @@ async def handle_torrent(request: Request):
             }
     else:
         try:
-            if gid.startswith("SABnzbd_nzo"):
-                res = await sabnzbd_client.get_files(gid)
-                content = make_tree(res, "sabnzbd")
-            elif len(gid) > 20:
-                # Use app.state.qbittorrent instead of global qbittorrent
-                res = await app.state.qbittorrent.torrents.files(gid)
-                content = make_tree(res, "qbittorrent")
-            else:
-                # Use app.state.aria2 instead of global aria2
-                res = await app.state.aria2.getFiles(gid)
-                op = await app.state.aria2.getOption(gid)
-                fpath = f"{op['dir']}/"
-                content = make_tree(res, "aria2", fpath)
+            tree = trees.get(gid)
+            if tree is None or (
+                params.get("mode") == "get"
+                and not tree.changed
+                and monotonic() - tree.built > TREE_REFRESH
+            ):
+                tree = trees.put(gid, await load_tree(gid))
+            content = folder_page(tree, params)
         except (ClientError, TimeoutError, Exception, AQError) as e:
             LOGGER.error(str(e))
             content = {
@@ -253,6 +269,28 @@ async def handle_torrent(request: Request):
     return JSONResponse(content)
 
 
+async def load_tree(gid):
+    if gid.startswith("SABnzbd_nzo"):
+        res = await sabnzbd_client.get_files(gid)
+        return make_tree(res, "sabnzbd")
+    if len(gid) > 20:
+        res = await app.state.qbittorrent.torrents.files(gid)
+        return make_tree(res, "qbittorrent")
+    res = await app.state.aria2.getFiles(gid)
+    op = await app.state.aria2.getOption(gid)
+    return make_tree(res, "aria2", f"{op['dir']}/")
+
+
+def folder_page(tree, params):
+    """Page of the folder in the query, ``folder``, ``offset`` and ``limit``"""
+    try:
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", PAGE_SIZE))
+    except ValueError:
+        offset, limit = 0, PAGE_SIZE
+    return tree.page(params.get("folder", ROOT_ID), offset, limit)
+
+
 async def handle_rename(gid, data):
     try:
         _type = data["type"]